@@ -1,20 +1,37 @@
-import copy
 import ipaddress
+import sqlite3
+import threading
+import concurrent.futures
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Tuple, Set
+from typing import List, Dict, Tuple, Set, Optional
+import requests
 import selenium
+from entities.BrowserBlockingPolicy import BrowserBlockingPolicy
 from entities.DomainName import DomainName
+from entities.EntryIpAsDatabase import EntryIpAsDatabase
+from entities.OrderedWorklist import OrderedWorklist
+from entities.ROVTablesCache import ROVTablesCache
+from entities.RowPrefixesTable import RowPrefixesTable
+from entities.SchemeUrl import SchemeUrl
+from entities.ScriptDependenciesCache import ScriptDependenciesCache
 from entities.Url import Url
+from entities.ValidatedRoaPayloadsIndex import ValidatedRoaPayloadsIndex
 from entities.resolvers.ScriptDependenciesResolver import ScriptDependenciesResolver
 from entities.MainFrameScript import MainFrameScript
 from entities.resolvers.DnsResolver import DnsResolver
 from entities.FirefoxHeadlessWebDriver import FirefoxHeadlessWebDriver
+from entities.HeadlessBrowserPool import HeadlessBrowserPool
+from entities.resolvers.HotSwappableIpAsDatabase import HotSwappableIpAsDatabase
+from entities.resolvers.HttpROVPageScraper import HttpROVPageScraper
 from entities.resolvers.IpAsDatabase import IpAsDatabase
 from entities.resolvers.LandingResolver import LandingResolver
+from entities.resolvers.OfflineROVValidator import OfflineROVValidator
 from entities.resolvers.results.ASResolverResultForROVPageScraping import ASResolverResultForROVPageScraping
 from entities.resolvers.results.AutonomousSystemResolutionResults import AutonomousSystemResolutionResults
 from entities.resolvers.results.LandingSiteResult import LandingSiteResult
+from entities.resolvers.results.LandingSiteSingleSchemeResult import LandingSiteSingleSchemeResult
 from entities.resolvers.results.MultipleMailDomainResolvingResult import MultipleMailDomainResolvingResult
 from entities.resolvers.results.MultipleDnsZoneDependenciesResult import MultipleDnsZoneDependenciesResult
 from entities.resolvers.results.ScriptDependenciesResult import ScriptDependenciesResult
@@ -26,10 +43,12 @@ from exceptions.FileWithExtensionNotFoundError import FileWithExtensionNotFoundE
 from exceptions.FilenameNotFoundError import FilenameNotFoundError
 from exceptions.InvalidUrlError import InvalidUrlError
 from exceptions.NetworkNotFoundError import NetworkNotFoundError
+from exceptions.NoAvailableBrowserError import NoAvailableBrowserError
 from exceptions.NotROVStateTypeError import NotROVStateTypeError
 from exceptions.TableEmptyError import TableEmptyError
 from exceptions.TableNotPresentError import TableNotPresentError
-from utils import file_utils, requests_utils, list_utils, datetime_utils
+from static_variables import IP_ASN_DATABASE_URL, OUTPUT_FOLDER_NAME, OUTPUT_BROWSER_PROFILES_FOLDER_NAME
+from utils import file_utils, datetime_utils
 
 
 class ApplicationResolversWrapper:
@@ -47,14 +66,30 @@ class ApplicationResolversWrapper:
         Flag that set if TLDs should be considered during DNS resolving.
     execute_script_resolving : bool
         Flag that set if script dependencies should be resolved.
+    compare_script_discovery : bool
+        Flag that set if the scripts parsed from the html of the landing pages are compared with the ones found by the
+        headless browser.
     headless_browser_is_instantiated : bool
         Boolean that indicates if the headless browser is instantiated in this wrapper object.
     headless_browser : FirefoxHeadlessWebDriver
         Instance of the FirefoxHeadlessWebDriver class.
+    browser_blocking_policy : BrowserBlockingPolicy
+        The policy of the resources that the headless browsers don't load.
     script_resolver : ScriptDependenciesResolver
         Instance of the ScriptDependenciesResolver class.
+    script_browser_pool : HeadlessBrowserPool or None
+        The pool of headless browsers (the first one is headless_browser) used by the script dependencies resolving
+        workers, or None if script dependencies are not resolved.
     rov_page_scraper : ROVPageScraper
-        Instance of the ROVPageScraper class.
+        Instance of the HttpROVPageScraper class (with a headless browser as fallback), or of the OfflineROVValidator
+        class if the offline ROV validation is enabled and a Validated ROA Payloads export is in the input folder.
+    rov_page_scrapers : List[ROVPageScraper]
+        The scrapers of the ROV scraping workers (the first one is rov_page_scraper): one for each worker, since each
+        scraper keeps the table of the last page loaded and its own fallback browser (started when first needed).
+    rov_task_timeout : float
+        Seconds the ROV scraping waits for the page of an autonomous system before logging it as timed out.
+    rov_tables_cache : ROVTablesCache or None
+        The persistent cache of the prefixes tables shared by the HttpROVPageScraper objects, or None if not used.
     dns_resolver : DnsResolver
         Instance of the DnsResolver class.
     landing_resolver : LandingResolver
@@ -80,11 +115,13 @@ class ApplicationResolversWrapper:
     total_rov_page_scraper_results : ASResolverResultForROVPageScraping
         Instance of ASResolverResultForROVPageScraping class for ROV page resolving result.
     """
-    def __init__(self, consider_tld: bool, execute_script_resolving: bool, execute_rov_scraping: bool, project_root_directory=Path.cwd(), take_snapshot=True):
+    def __init__(self, consider_tld: bool, execute_script_resolving: bool, execute_rov_scraping: bool, project_root_directory=Path.cwd(), take_snapshot=True, aggressive_negative_caching=False, ip_as_database_reload_interval=None, rov_tables_cache_ttl=ROVTablesCache.DEFAULT_TTL, rov_max_workers=4, rov_task_timeout=4*FirefoxHeadlessWebDriver.time_out_in_seconds, script_browser_pool_size=3, script_browser_max_pages=50, script_task_timeout=FirefoxHeadlessWebDriver.time_out_in_seconds, compare_script_discovery=False, browser_blocking_policy=None, capture_browser_requests=False, persistent_browser_profiles=False, script_dependencies_cache_ttl=ScriptDependenciesCache.DEFAULT_SCRIPTS_TTL, script_sites_landing_cache_ttl=ScriptDependenciesCache.DEFAULT_LANDING_TTL, offline_rov_validation=False):
         """
         Initialize all components from scratch.
         Here is checked the presence of the geckodriver executable and the presence of the .tsv database.
         If the latter is absent then automatically it will be downloaded and put in the input folder.
+        If ROV scraping should be executed and a Validated ROA Payloads export (vrps.csv or vrps.json) is in the input
+        folder, ROV states are computed offline and the headless browser is needed only for script resolving.
         Parameters include 3 flags set prior to the start of the execution: flag that set if TLDs are considered, flag
         that set if script dependencies resolving should be executed, flag that set if ROV scraping should be executed
         and a boolean that set if temporary files should be created.
@@ -105,40 +142,146 @@ class ApplicationResolversWrapper:
         :type project_root_directory: Path
         :param take_snapshot: Flag that sets if the DNS resolver should take temporary snapshots of its execution.
         :type take_snapshot: bool
+        :param aggressive_negative_caching: Flag that sets if the DNS resolver should keep the names answered with
+        NXDOMAIN (also across executions) and synthesize NXDOMAIN responses from the cached DNSSEC-validated NSEC/NSEC3
+        records (RFC 8198).
+        :type aggressive_negative_caching: bool
+        :param ip_as_database_reload_interval: Seconds between two background reloads (and refreshes from the site) of
+        the .tsv database, for long-running processes; None to load it only once.
+        :type ip_as_database_reload_interval: float or None
+        :param rov_tables_cache_ttl: Seconds the prefixes tables of the ROV pages saved in the output folder are used
+        for, without loading the pages again; None to load every page.
+        :type rov_tables_cache_ttl: float or None
+        :param rov_max_workers: Maximum number of ROV pages loaded concurrently (each worker has its own fallback
+        headless browser, started when first needed).
+        :type rov_max_workers: int
+        :param rov_task_timeout: Seconds the ROV scraping waits for the page of an autonomous system (HTTP requests and
+        fallback page load) before logging it as timed out.
+        :type rov_task_timeout: float
+        :param script_browser_pool_size: Number of headless browsers (started at once) that search script dependencies
+        concurrently.
+        :type script_browser_pool_size: int
+        :param script_browser_max_pages: Number of pages after which a headless browser of the pool is restarted.
+        :type script_browser_max_pages: int
+        :param script_task_timeout: Seconds before the page load of a script dependencies research is given up (and the
+        headless browser restarted).
+        :type script_task_timeout: float
+        :param compare_script_discovery: Flag that sets if every landing page is loaded in the headless browser to
+        report the differences with the scripts parsed from its html.
+        :type compare_script_discovery: bool
+        :param browser_blocking_policy: The policy of the resources that the headless browsers don't load; None to load
+        everything and wait for the load event (BrowserBlockingPolicy.disabled()), as without policy. Blocking the
+        analytics hosts and returning at DOMContentLoaded can change the scripts found, since the scripts those hosts
+        (or the load event) would inject are not.
+        :type browser_blocking_policy: BrowserBlockingPolicy or None
+        :param capture_browser_requests: Flag that sets if the requests of the headless browsers are captured (with the
+        selenium-wire driver and its intercepting proxy, keeping a bounded number of requests); otherwise the plain
+        Selenium driver is used.
+        :type capture_browser_requests: bool
+        :param persistent_browser_profiles: Flag that sets if the headless browsers use persistent profiles (one for
+        each browser, in the output folder) with disk cache, so that the assets shared by the pages are loaded from the
+        cache, also in the next executions.
+        :type persistent_browser_profiles: bool
+        :param script_dependencies_cache_ttl: Seconds the scripts found by the headless browsers in a landing page are
+        used for, without loading the page again if it didn't change (same ETag or html); None to load every page.
+        :type script_dependencies_cache_ttl: float or None
+        :param script_sites_landing_cache_ttl: Seconds the landings of the script sites saved in the output folder are
+        used for, without landing the sites again; None to land every script site.
+        :type script_sites_landing_cache_ttl: float or None
+        :param offline_rov_validation: Flag that sets if the ROV states are computed offline from the Validated ROA
+        Payloads export in the input folder (if present) instead of scraping the ROV pages. The states are approximate,
+        since the ranges of the .tsv database are not the announced prefixes (see OfflineROVValidator).
+        :type offline_rov_validation: bool
         """
         self.execute_rov_scraping = execute_rov_scraping
         self.consider_tld = consider_tld
         self.execute_script_resolving = execute_script_resolving
+        self.compare_script_discovery = compare_script_discovery
         self.headless_browser_is_instantiated = False
-        if execute_rov_scraping or execute_script_resolving:
+        self.script_browser_pool = None
+        self.script_dependencies_cache = None
+        self.rov_page_scrapers = list()
+        self.rov_tables_cache = None
+        self.rov_task_timeout = rov_task_timeout
+        self.browser_blocking_policy = BrowserBlockingPolicy.disabled() if browser_blocking_policy is None else browser_blocking_policy
+        vrps = None
+        if execute_rov_scraping and offline_rov_validation:
             try:
-                self.headless_browser = FirefoxHeadlessWebDriver(project_root_directory=project_root_directory)
+                vrps, vrps_filepath = ValidatedRoaPayloadsIndex.from_input_folder(project_root_directory=project_root_directory)
+                print(f"> ROV states will be computed offline from {len(vrps)} VRPs of '{vrps_filepath}': they are APPROXIMATE (the .tsv database ranges are not the announced prefixes).")
+            except FilenameNotFoundError:
+                print(f"> No Validated ROA Payloads export in the input folder: ROV pages will be scraped.")
+            except (OSError, ValueError) as exc:
+                print(f"!!! {str(exc)} !!!")
+        profiles_directory = None
+        if persistent_browser_profiles:
+            profiles_directory = str(file_utils.set_file_in_folder(OUTPUT_FOLDER_NAME, OUTPUT_BROWSER_PROFILES_FOLDER_NAME, project_root_directory))
+        if execute_script_resolving:
+            try:
+                self.headless_browser = FirefoxHeadlessWebDriver(project_root_directory=project_root_directory, blocking_policy=self.browser_blocking_policy, capture_requests=capture_browser_requests, profile_directory=None if profiles_directory is None else str(Path(profiles_directory) / 'slot_0'))
             except (FileWithExtensionNotFoundError, selenium.common.exceptions.WebDriverException) as e:
                 print(f"!!! {str(e)} !!!")
                 raise Exception
             self.headless_browser_is_instantiated = True
         if execute_script_resolving:
-            self.script_resolver = ScriptDependenciesResolver(self.headless_browser)
-        if execute_rov_scraping:
-            self.rov_page_scraper = ROVPageScraper(self.headless_browser)
-        self.dns_resolver = DnsResolver(self.consider_tld)
+            try:
+                self.script_browser_pool = HeadlessBrowserPool.of_firefox_browsers(max(1, script_browser_pool_size), max_pages_per_browser=script_browser_max_pages, task_timeout=script_task_timeout, browsers=[self.headless_browser], blocking_policy=self.browser_blocking_policy, capture_requests=capture_browser_requests, profiles_directory=profiles_directory, project_root_directory=project_root_directory)
+            except (FileWithExtensionNotFoundError, FilenameNotFoundError, selenium.common.exceptions.WebDriverException) as e:
+                print(f"!!! {str(e)} !!!")
+                self.headless_browser.close()
+                raise Exception
+            self.script_resolver = ScriptDependenciesResolver(self.headless_browser, browser_pool=self.script_browser_pool)
+            if script_dependencies_cache_ttl is not None or script_sites_landing_cache_ttl is not None:
+                try:
+                    self.script_dependencies_cache = ScriptDependenciesCache.from_output_folder(scripts_ttl=-1 if script_dependencies_cache_ttl is None else script_dependencies_cache_ttl, landing_ttl=-1 if script_sites_landing_cache_ttl is None else script_sites_landing_cache_ttl, project_root_directory=project_root_directory)
+                except sqlite3.Error as e:
+                    print(f"!!! {str(e)} !!!")
+        if execute_rov_scraping and vrps is None:
+            self.rov_tables_cache = None if rov_tables_cache_ttl is None else ROVTablesCache.from_output_folder(ttl=rov_tables_cache_ttl, project_root_directory=project_root_directory)
+
+            def rov_browser_factory() -> FirefoxHeadlessWebDriver:
+                return FirefoxHeadlessWebDriver(project_root_directory=project_root_directory, blocking_policy=self.browser_blocking_policy, capture_requests=capture_browser_requests)
+
+            self.rov_page_scrapers = [HttpROVPageScraper(None, cache=self.rov_tables_cache, browser_factory=rov_browser_factory) for _ in range(max(1, rov_max_workers))]
+            self.rov_page_scraper = self.rov_page_scrapers[0]
+        self.dns_resolver = DnsResolver(self.consider_tld, aggressive_negative_caching=aggressive_negative_caching)
         self.landing_resolver = LandingResolver(self.dns_resolver)
         try:
             self.dns_resolver.cache.load_csv_from_output_folder(take_snapshot=take_snapshot, project_root_directory=project_root_directory)
         except (ValueError, FilenameNotFoundError, OSError) as exc:
             print(f"!!! {str(exc)} !!!")
+        if aggressive_negative_caching:
+            try:
+                self.dns_resolver.cache.load_negative_csv_from_output_folder(project_root_directory=project_root_directory)
+            except (FilenameNotFoundError, OSError):
+                pass
+        try:
+            self.dns_resolver.latency_stats.load_csv_from_output_folder(project_root_directory=project_root_directory)
+        except (FilenameNotFoundError, OSError):
+            pass
         tsv_db_is_updated = file_utils.is_tsv_database_updated(project_root_directory=project_root_directory)
         if tsv_db_is_updated:
             print("> .tsv database file is up-to-date.")
         else:
             print("> Latest .tsv database (~25 MB) is downloading and extracting... ", end='')
-            requests_utils.download_latest_tsv_database(project_root_directory=project_root_directory)
-            print("DONE.")
+            index, diff = IpAsDatabase.download_latest_tsv_database(project_root_directory=project_root_directory)
+            if index is None:
+                print("NOT MODIFIED.")
+            elif diff is None:
+                print("DONE.")
+            else:
+                print(f"DONE ({str(diff)}).")
         try:
-            self.ip_as_database = IpAsDatabase(project_root_directory=project_root_directory)
+            if ip_as_database_reload_interval is None:
+                self.ip_as_database = IpAsDatabase(project_root_directory=project_root_directory)
+            else:
+                self.ip_as_database = HotSwappableIpAsDatabase(project_root_directory=project_root_directory, reload_interval=ip_as_database_reload_interval, download_url=IP_ASN_DATABASE_URL)
         except (FileWithExtensionNotFoundError, OSError) as e:
             print(f"!!! {str(e)} !!!")
             raise
+        if execute_rov_scraping and vrps is not None:
+            self.rov_page_scraper = OfflineROVValidator(self.ip_as_database, vrps)
+            self.rov_page_scrapers = [self.rov_page_scraper]      # computed locally: workers wouldn't help
         self.error_logger = ErrorLogger()
         # results
         self.landing_web_sites_results = dict()
@@ -202,14 +345,8 @@ class ApplicationResolversWrapper:
         :param domain_names: A list of domain names.
         :type domain_names: List[DomainName]
         """
-        new_domain_names = copy.deepcopy(domain_names)
-        for domain_name in domain_names:
-            for domain_name_in_total_results in self.total_dns_results.zone_dependencies_per_domain_name.keys():
-                if domain_name == domain_name_in_total_results:
-                    try:
-                        new_domain_names.remove(domain_name)
-                    except ValueError:
-                        pass        # should never happen
+        already_resolved = self.total_dns_results.zone_dependencies_per_domain_name.keys()
+        new_domain_names = list(filter(lambda domain_name: domain_name not in already_resolved, OrderedWorklist(domain_names).to_list()))
         current_dns_results = self.do_dns_resolving(new_domain_names)
         current_ip_as_db_results = self.do_ip_as_database_resolving(current_dns_results, self.landing_script_sites_results, False)
 
@@ -235,7 +372,7 @@ class ApplicationResolversWrapper:
         """
         print("\n\nSTART WEB SITE LANDING RESOLVER")
         start_execution_time = datetime.now()
-        results = self.landing_resolver.resolve_sites(web_sites)
+        results = self.landing_resolver.resolve_sites(web_sites, parse_main_frame_scripts=self.execute_script_resolving)
         for web_site in results.keys():
             self.error_logger.add_entries(results[web_site].error_logs)
         print(f"END WEB SITE LANDING RESOLVER ({datetime_utils.compute_delta_and_stamp(start_execution_time)})")
@@ -243,7 +380,8 @@ class ApplicationResolversWrapper:
 
     def do_script_site_landing_resolving(self, script_sites: Set[Url]) -> Dict[Url, LandingSiteResult]:
         """
-        This method executes landing resolving of a set of script sites.
+        This method executes landing resolving of a set of script sites. The landings saved in the cache (if present)
+        are used without any request.
 
         :param script_sites: A set of script sites.
         :type script_sites: Set[Url]
@@ -252,9 +390,11 @@ class ApplicationResolversWrapper:
         """
         print("\n\nSTART SCRIPT SITE LANDING RESOLVER")
         start_execution_time = datetime.now()
-        results = self.landing_resolver.resolve_sites(script_sites)
+        results = self.landing_resolver.resolve_sites(script_sites, landing_cache=self.script_dependencies_cache)
         for script_site in results.keys():
             self.error_logger.add_entries(results[script_site].error_logs)
+        if self.script_dependencies_cache is not None:
+            print(f"Script dependencies cache: {self.script_dependencies_cache.get_summary()}")
         print(f"END SCRIPT SITE LANDING RESOLVER ({datetime_utils.compute_delta_and_stamp(start_execution_time)})")
         return results
 
@@ -296,6 +436,9 @@ class ApplicationResolversWrapper:
         This method executes IP-AS resolving. It considers as input the results from DNS resolving (parameter
         dns_results), the landing resolving results (parameter landing_results) and the mail domain resolving (results
         saved in the self object) if flag do_mail_domains is set to True.
+        The resolving is done in three steps: all the distinct ip addresses of the input are collected, they are
+        resolved (IP-AS database and belonging network) once each with a single batch, and then the results are fanned
+        back out to every server, printing and logging errors per server.
 
         :param dns_results: The DNS resolving result.
         :type dns_results: MultipleDnsZoneDependenciesResult
@@ -309,6 +452,16 @@ class ApplicationResolversWrapper:
         print("\n\nSTART IP-AS RESOLVER")
         start_execution_time = datetime.now()
         results = AutonomousSystemResolutionResults()
+        ips = self._collect_ips_for_ip_as_database_resolving(dns_results, landing_results, do_mail_domains)
+        entries = self.ip_as_database.resolve_distinct_ranges(ips)
+        networks = dict()
+        for ip, entry in entries.items():
+            if entry is not None:
+                try:
+                    networks[ip] = entry.get_network_of_ip(ip)
+                except ValueError as exc:
+                    networks[ip] = exc
+        print(f"{len(entries)} distinct IP addresses resolved in batch")
         for index_domain, domain in enumerate(dns_results.zone_dependencies_per_domain_name.keys()):
             print(f"Handling domain[{index_domain+1}/{len(dns_results.zone_dependencies_per_domain_name.keys())}]: {domain}")
             for index_zone, zone in enumerate(dns_results.zone_dependencies_per_domain_name[domain]):
@@ -317,13 +470,13 @@ class ApplicationResolversWrapper:
                     nameserver = nameserver_path.get_qname()
                     for ip in nameserver_path.get_resolution().values:
                         try:
-                            entry = self.ip_as_database.resolve_range(ip)
+                            entry = self._get_batch_resolved_range(entries, ip)
                         except (AutonomousSystemNotFoundError, ValueError) as e:
                             results.add_no_as_result(ip, nameserver)
                             print(f"!!! {str(e)} !!!")
                             continue
                         try:
-                            ip_range_tsv, networks = entry.get_network_of_ip(ip)
+                            ip_range_tsv, all_networks = self._get_batch_resolved_network(networks, ip)
                             print(f"----> for {ip.compressed} ({nameserver}) found AS{str(entry.as_number)}: [{entry.start_ip_range.compressed} - {entry.end_ip_range.compressed}]. IP range tsv: {ip_range_tsv.compressed}")
                             results.add_complete_result(ip, nameserver, entry, ip_range_tsv)
                         except ValueError as exc:
@@ -338,9 +491,9 @@ class ApplicationResolversWrapper:
             if https_result is not None:
                 for ip in https_result.a_path.get_resolution().values:
                     try:
-                        entry = self.ip_as_database.resolve_range(ip)
+                        entry = self._get_batch_resolved_range(entries, ip)
                         try:
-                            ip_range_tsv, networks = entry.get_network_of_ip(ip)
+                            ip_range_tsv, all_networks = self._get_batch_resolved_network(networks, ip)
                             print(f"----> for {ip.compressed} [HTTPS] ({https_result.server}) found AS{str(entry.as_number)}: [{entry.start_ip_range.compressed} - {entry.end_ip_range.compressed}]. IP range tsv: {ip_range_tsv.compressed}")
                             results.add_complete_result(ip, https_result.server, entry, ip_range_tsv)
                         except ValueError as exc:
@@ -356,9 +509,9 @@ class ApplicationResolversWrapper:
             if http_result is not None:
                 for ip in http_result.a_path.get_resolution().values:
                     try:
-                        entry = self.ip_as_database.resolve_range(ip)
+                        entry = self._get_batch_resolved_range(entries, ip)
                         try:
-                            ip_range_tsv, networks = entry.get_network_of_ip(ip)
+                            ip_range_tsv, all_networks = self._get_batch_resolved_network(networks, ip)
                             print(f"----> for {ip.compressed} [HTTP] ({http_result.server}) found AS{str(entry.as_number)}: [{entry.start_ip_range.compressed} - {entry.end_ip_range.compressed}]. IP range tsv: {ip_range_tsv.compressed}")
                             results.add_complete_result(ip, http_result.server, entry, ip_range_tsv)
                         except ValueError as exc:
@@ -383,13 +536,13 @@ class ApplicationResolversWrapper:
                         else:
                             for ip in mail_domain_results.mail_servers_paths[mail_server].get_resolution().values:
                                 try:
-                                    entry = self.ip_as_database.resolve_range(ip)
+                                    entry = self._get_batch_resolved_range(entries, ip)
                                 except (AutonomousSystemNotFoundError, ValueError) as e:
                                     results.add_no_as_result(ip, mail_server)
                                     print(f"!!! {str(e)} !!!")
                                     continue
                                 try:
-                                    ip_range_tsv, networks = entry.get_network_of_ip(ip)
+                                    ip_range_tsv, all_networks = self._get_batch_resolved_network(networks, ip)
                                     print(
                                         f"----> for {ip.compressed} ({mail_server}) found AS{str(entry.as_number)}: [{entry.start_ip_range.compressed} - {entry.end_ip_range.compressed}]. IP range tsv: {ip_range_tsv.compressed}")
                                     results.add_complete_result(ip, mail_server, entry, ip_range_tsv)
@@ -405,6 +558,75 @@ class ApplicationResolversWrapper:
         print(f"END IP-AS RESOLVER ({datetime_utils.compute_delta_and_stamp(start_execution_time)})")
         return results
 
+    def _collect_ips_for_ip_as_database_resolving(self, dns_results: MultipleDnsZoneDependenciesResult, landing_results: Dict[Url, LandingSiteResult], do_mail_domains: bool) -> List[ipaddress.IPv4Address]:
+        """
+        This method collects all the distinct ip addresses to be resolved by the IP-AS resolving: the ones of the name
+        servers, of the landing web sites and (if flag do_mail_domains is set to True) of the mail servers.
+
+        :param dns_results: The DNS resolving result.
+        :type dns_results: MultipleDnsZoneDependenciesResult
+        :param landing_results: The landing resolving result.
+        :type landing_results: Dict[Url, LandingSiteResult]
+        :param do_mail_domains: Flag that tells if the mail servers are considered.
+        :type do_mail_domains: bool
+        :return: The distinct ip addresses, in order of first occurrence.
+        :rtype: List[ipaddress.IPv4Address]
+        """
+        ips = OrderedWorklist()
+        for zones in dns_results.zone_dependencies_per_domain_name.values():
+            for zone in zones:
+                for nameserver_path in zone.name_servers:
+                    ips.add_all(nameserver_path.get_resolution().values)
+        for landing_result in landing_results.values():
+            for scheme_result in (landing_result.https, landing_result.http):
+                if scheme_result is not None:
+                    ips.add_all(scheme_result.a_path.get_resolution().values)
+        if do_mail_domains:
+            for mail_domain_results in self.mail_domains_results.dependencies.values():
+                if mail_domain_results is not None:
+                    for mail_server_path in mail_domain_results.mail_servers_paths.values():
+                        if mail_server_path is not None:
+                            ips.add_all(mail_server_path.get_resolution().values)
+        return ips.to_list()
+
+    @staticmethod
+    def _get_batch_resolved_range(entries: Dict[ipaddress.IPv4Address, EntryIpAsDatabase or None], ip: ipaddress.IPv4Address) -> EntryIpAsDatabase:
+        """
+        This method returns the IP-AS database entry of an ip address from the batch results, as the resolve_range
+        method of IpAsDatabase does.
+
+        :param entries: The batch results.
+        :type entries: Dict[ipaddress.IPv4Address, EntryIpAsDatabase or None]
+        :param ip: The ip address.
+        :type ip: ipaddress.IPv4Address
+        :raise AutonomousSystemNotFoundError: If there is no Autonomous System that match the ip address.
+        :return: The entry.
+        :rtype: EntryIpAsDatabase
+        """
+        entry = entries.get(ip)
+        if entry is None:
+            raise AutonomousSystemNotFoundError(ip.exploded)
+        return entry
+
+    @staticmethod
+    def _get_batch_resolved_network(networks: Dict[ipaddress.IPv4Address, Tuple[ipaddress.IPv4Network, List[ipaddress.IPv4Network]] or ValueError], ip: ipaddress.IPv4Address) -> Tuple[ipaddress.IPv4Network, List[ipaddress.IPv4Network]]:
+        """
+        This method returns the belonging network of an ip address from the batch results, as the get_network_of_ip
+        method of EntryIpAsDatabase does.
+
+        :param networks: The batch results.
+        :type networks: Dict[ipaddress.IPv4Address, Tuple[ipaddress.IPv4Network, List[ipaddress.IPv4Network]] or ValueError]
+        :param ip: The ip address.
+        :type ip: ipaddress.IPv4Address
+        :raise ValueError: If the belonging network couldn't be computed.
+        :return: A tuple containing the belonging network first and then all the networks.
+        :rtype: Tuple[ipaddress.IPv4Network, List[ipaddress.IPv4Network]]
+        """
+        result = networks[ip]
+        if isinstance(result, ValueError):
+            raise result
+        return result
+
     def do_set_None_for_script_dependencies_resolving(self) -> Dict[Url, ScriptDependenciesResult]:
         """
         This method set every web site script dependencies values to None. It is used when the
@@ -421,7 +643,12 @@ class ApplicationResolversWrapper:
     def do_script_dependencies_resolving(self) -> Dict[Url, ScriptDependenciesResult]:
         """
         This method executes web sites script dependencies resolving.
-        It takes the landing web site resolution results saved in this object.
+        It takes the landing web site resolution results saved in this object: when the scripts of a landing page were
+        parsed from its html and the page doesn't appear to inject scripts dynamically, they are used as they are;
+        otherwise, if the cache has the scripts found by the headless browser in the same page (unchanged since then:
+        same ETag or html), they are used; otherwise the page is loaded in the headless browser (and its scripts are
+        saved in the cache). In comparison mode every page is loaded in the headless browser (whose scripts are the
+        result) and the differences with the scripts parsed from the html are reported.
 
         :return: The resolving results.
         :rtype: Dict[Url, ScriptDependenciesResult]
@@ -429,46 +656,141 @@ class ApplicationResolversWrapper:
         print("\n\nSTART SCRIPT DEPENDENCIES RESOLVER")
         start_execution_time = datetime.now()
         script_dependencies_result = dict()
-        for j, website in enumerate(self.landing_web_sites_results.keys()):
-            print(f"Searching script dependencies for website[{j+1}/{len(self.landing_web_sites_results.keys())}]: {website}")
-            https_result = self.landing_web_sites_results[website].https
-            http_result = self.landing_web_sites_results[website].http
-
-            print(f"******* via HTTPS *******")
-            if https_result is None:
-                print(f"--> No landing possible")
-                https_scripts = None
-            else:
-                try:
-                    https_scripts = self.script_resolver.search_script_application_dependencies(https_result.url)
-                    for i, script in enumerate(https_scripts):
-                        print(f"script[{i + 1}/{len(https_scripts)}]: integrity={script.integrity}, src={script.src}")
-                    script_dependencies_result[website] = ScriptDependenciesResult(https_scripts, None)
-                except selenium.common.exceptions.WebDriverException as e:
-                    print(f"!!! {str(e)} !!!")
-                    https_scripts = None
-                    self.error_logger.add_entry(ErrorLog(e, https_result.url.string, str(e)))
-            print(f"******* via HTTP *******")
-            if http_result is None:
-                print(f"--> No landing possible")
-                http_scripts = None
-            else:
-                try:
-                    http_scripts = self.script_resolver.search_script_application_dependencies(http_result.url)
-                    for i, script in enumerate(http_scripts):
-                        print(f"script[{i+1}/{len(http_scripts)}]: integrity={script.integrity}, src={script.src}")
-                except selenium.common.exceptions.WebDriverException as e:
-                    print(f"!!! {str(e)} !!!")
-                    http_scripts = None
-                    self.error_logger.add_entry(ErrorLog(e, http_result.url.string, str(e)))
-            script_dependencies_result[website] = ScriptDependenciesResult(https_scripts, http_scripts)
-            print('')
+        websites = list(self.landing_web_sites_results.keys())
+        static_pages_count = 0
+        cached_pages_count = 0
+        browser_pages_count = 0
+        compared_pages_count = 0
+        differing_pages_count = 0
+        max_workers = 1 if self.script_browser_pool is None else len(self.script_browser_pool)
+        with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='script-resolving') as executor:
+            futures = list()
+            cached_scripts = list()
+            for website in websites:
+                website_futures = list()
+                website_cached_scripts = list()
+                for landing_result in (self.landing_web_sites_results[website].https, self.landing_web_sites_results[website].http):
+                    scripts = None
+                    if landing_result is not None and self.script_dependencies_cache is not None and not self.compare_script_discovery and not self._is_static_scripts_discovery_enough(landing_result):
+                        scripts = self.script_dependencies_cache.get_landing_page_scripts(landing_result.url.string, landing_result.page_etag, landing_result.page_body_hash)
+                    if landing_result is None or (self._is_static_scripts_discovery_enough(landing_result) and not self.compare_script_discovery) or scripts is not None:
+                        website_futures.append(None)
+                    else:
+                        website_futures.append(executor.submit(self._search_script_dependencies, self.script_resolver, landing_result.url))
+                    website_cached_scripts.append(scripts)
+                futures.append(website_futures)
+                cached_scripts.append(website_cached_scripts)
+            for j, website in enumerate(websites):
+                print(f"Searching script dependencies for website[{j+1}/{len(websites)}]: {website}")
+                scheme_scripts = list()
+                for scheme, landing_result, future, cached in zip(('HTTPS', 'HTTP'), (self.landing_web_sites_results[website].https, self.landing_web_sites_results[website].http), futures[j], cached_scripts[j]):
+                    print(f"******* via {scheme} *******")
+                    if landing_result is None:
+                        print(f"--> No landing possible")
+                        scheme_scripts.append(None)
+                        continue
+                    if cached is not None:
+                        scripts = cached
+                        cached_pages_count = cached_pages_count + 1
+                        print(f"--> from the cache (landing page not changed)")
+                    elif future is None:
+                        scripts = landing_result.main_frame_scripts
+                        static_pages_count = static_pages_count + 1
+                        print(f"--> from the html of the landing page")
+                    else:
+                        scripts, e = future.result()
+                        browser_pages_count = browser_pages_count + 1
+                        if e is not None:
+                            print(f"!!! {str(e)} !!!")
+                            self.error_logger.add_entry(ErrorLog(e, landing_result.url.string, str(e)))
+                        elif scripts is not None and self.script_dependencies_cache is not None:
+                            self.script_dependencies_cache.put_landing_page_scripts(landing_result.url.string, landing_result.page_etag, landing_result.page_body_hash, scripts)
+                    if scripts is not None:
+                        for i, script in enumerate(scripts):
+                            print(f"script[{i+1}/{len(scripts)}]: integrity={script.integrity}, src={script.src}")
+                    if future is not None and self.compare_script_discovery and scripts is not None and landing_result.main_frame_scripts is not None:
+                        compared_pages_count = compared_pages_count + 1
+                        differences = ApplicationResolversWrapper.compare_script_discovery_results(landing_result.main_frame_scripts, scripts)
+                        if len(differences) > 0:
+                            differing_pages_count = differing_pages_count + 1
+                        print(f"--> html vs browser ({'dynamic injection suspected' if landing_result.dynamic_scripts_suspected else 'static'}): {len(differences)} differences")
+                        for difference in differences:
+                            print(f"----> {difference}")
+                    scheme_scripts.append(scripts)
+                script_dependencies_result[website] = ScriptDependenciesResult(scheme_scripts[0], scheme_scripts[1])
+                print('')
+        print(f"Landing pages: {static_pages_count} resolved from the html, {cached_pages_count} from the cache, {browser_pages_count} loaded in the headless browser")
+        if self.compare_script_discovery:
+            print(f"Comparison: {compared_pages_count} landing pages compared, {differing_pages_count} with differences")
+        if self.script_browser_pool is not None:
+            metrics = self.script_browser_pool.get_metrics()
+            print(f"Headless browsers pool: size={metrics['size']}, peak busy={metrics['peak_busy']}, tasks={metrics['tasks_count']} ({metrics['failed_tasks_count']} failed), recycles={metrics['recycles_count']}, utilisation={metrics['utilisation']:.0%}")
+            if metrics['median_startup_seconds'] is not None:
+                print(f"Headless browsers startup: median {metrics['median_startup_seconds']:.2f}s; pages: {metrics['fetched_bytes']} bytes fetched, {metrics['cached_resources_count']}/{metrics['resources_count']} resources from the cache")
         print(f"END SCRIPT DEPENDENCIES RESOLVER ({datetime_utils.compute_delta_and_stamp(start_execution_time)})")
         return script_dependencies_result
 
+    @staticmethod
+    def _is_static_scripts_discovery_enough(landing_result: LandingSiteSingleSchemeResult) -> bool:
+        """
+        Tells if the scripts parsed from the html of a landing page can be used without loading it in the browser.
+
+        :param landing_result: The landing result.
+        :type landing_result: LandingSiteSingleSchemeResult
+        :return: True if the html was parsed and the page doesn't appear to inject scripts dynamically.
+        :rtype: bool
+        """
+        return landing_result.main_frame_scripts is not None and not landing_result.dynamic_scripts_suspected
+
+    @staticmethod
+    def compare_script_discovery_results(static_scripts: Set[MainFrameScript], browser_scripts: Set[MainFrameScript]) -> List[str]:
+        """
+        Compares the scripts parsed from the html of a landing page with the ones found by the headless browser.
+
+        :param static_scripts: The scripts parsed from the html.
+        :type static_scripts: Set[MainFrameScript]
+        :param browser_scripts: The scripts found by the headless browser.
+        :type browser_scripts: Set[MainFrameScript]
+        :return: A description of each difference: scripts found only by one of the two and scripts with different
+        integrity.
+        :rtype: List[str]
+        """
+        differences = list()
+        integrity_of_static_script = {script.src: script.integrity for script in static_scripts}
+        for script in sorted(browser_scripts, key=lambda s: s.src):
+            if script.src not in integrity_of_static_script:
+                differences.append(f"only in browser: src={script.src}")
+            elif integrity_of_static_script[script.src] != script.integrity:
+                differences.append(f"different integrity: src={script.src}, html={integrity_of_static_script[script.src]}, browser={script.integrity}")
+        for script in sorted(static_scripts - browser_scripts, key=lambda s: s.src):
+            differences.append(f"only in html: src={script.src}")
+        return differences
+
+    @staticmethod
+    def _search_script_dependencies(script_resolver: ScriptDependenciesResolver, url: SchemeUrl) -> Tuple[Optional[Set[MainFrameScript]], Optional[Exception]]:
+        """
+        Task of a script dependencies resolving worker: searches the script dependencies of a landing url.
+
+        :param script_resolver: The script dependencies resolver.
+        :type script_resolver: ScriptDependenciesResolver
+        :param url: The landing url.
+        :type url: SchemeUrl
+        :return: A tuple with the scripts (None if the research failed) and the exception raised (or None): a WebDriver
+        error, or a NoAvailableBrowserError if no browser of the pool was available.
+        :rtype: Tuple[Optional[Set[MainFrameScript]], Optional[Exception]]
+        """
+        try:
+            return script_resolver.search_script_application_dependencies(url), None
+        except (selenium.common.exceptions.WebDriverException, NoAvailableBrowserError) as e:
+            return None, e
+
     def do_rov_page_scraping(self, reformat: ASResolverResultForROVPageScraping) -> ASResolverResultForROVPageScraping:
         """
         This method executes the ROVPage scraping from the IpAsDatabase resolution results (reformatted).
+        Pages of different autonomous systems are loaded concurrently (one worker for each scraper in
+        rov_page_scrapers), but prints, results and error logs follow the order of the autonomous systems as if they
+        were loaded sequentially. The page of an autonomous system is waited for at most rov_task_timeout seconds: then
+        it is logged as timed out, and the scraping goes on without waiting for the worker at the end.
 
         :param reformat: A ASResolverResultForROVPageScraping object.
         :type reformat: ASResolverResultForROVPageScraping
@@ -477,35 +799,79 @@ class ApplicationResolversWrapper:
         """
         print("\n\nSTART ROV PAGE SCRAPING")
         start_execution_time = datetime.now()
-        for i, as_number in enumerate(reformat.results.keys()):
-            print(f"Loading page [{i+1}/{len(reformat.results.keys())}] for AS{as_number}")
-            try:
-                self.rov_page_scraper.load_as_page(as_number)
-            except (selenium.common.exceptions.WebDriverException, selenium.common.exceptions.TimeoutException) as exc:
-                print(f"!!! {str(exc)} !!!")
-                for ip_address in reformat.results[as_number].keys():
-                    reformat.results[as_number][ip_address].insert_rov_entry(None)
-                self.error_logger.add_entry(ErrorLog(exc, "AS"+str(as_number), str(exc)))
-                continue
-            except (TableNotPresentError, ValueError, TableEmptyError, NotROVStateTypeError) as exc:
-                print(f"!!! {str(exc)} !!!")
-                for ip_address in reformat.results[as_number].keys():
-                    reformat.results[as_number][ip_address].insert_rov_entry(None)
-                self.error_logger.add_entry(ErrorLog(exc, "AS"+str(as_number), str(exc)))
-                continue
-            for ip_address in reformat.results[as_number].keys():
-                server = reformat.results[as_number][ip_address].server
+        as_numbers = list(reformat.results.keys())
+        free_scrapers = list(self.rov_page_scrapers)
+        free_scrapers_lock = threading.Lock()
+        timed_out = False
+        executor = ThreadPoolExecutor(max_workers=len(self.rov_page_scrapers), thread_name_prefix='rov-scraping')
+        try:
+            futures = [executor.submit(self._scrape_rov_page, as_number, list(reformat.results[as_number].keys()), free_scrapers, free_scrapers_lock) for as_number in as_numbers]
+            for i, as_number in enumerate(as_numbers):
+                print(f"Loading page [{i+1}/{len(as_numbers)}] for AS{as_number}")
                 try:
-                    row = self.rov_page_scraper.get_network_if_present(ipaddress.ip_address(ip_address))  # non gestisco ValueError perché non può accadere qua
-                    reformat.results[as_number][ip_address].insert_rov_entry(row)
-                    print(f"--> for {ip_address}: ({server}) found row: {str(row)}")
-                except (TableNotPresentError, TableEmptyError, NetworkNotFoundError) as exc:
-                    print(f"!!! {str(exc)} !!!")
-                    reformat.results[as_number][ip_address].insert_rov_entry(None)
-                    self.error_logger.add_entry(ErrorLog(exc, server, str(exc)))
+                    rows, load_exc, table_exc = futures[i].result(timeout=self.rov_task_timeout)
+                except concurrent.futures.TimeoutError:
+                    futures[i].cancel()
+                    timed_out = True
+                    rows, load_exc, table_exc = dict(), concurrent.futures.TimeoutError(f"ROV page of AS{as_number} not loaded in {self.rov_task_timeout} seconds"), None
+                if load_exc is not None:
+                    print(f"!!! {str(load_exc)} !!!")
+                    for ip_address in reformat.results[as_number].keys():
+                        reformat.results[as_number][ip_address].insert_rov_entry(None)
+                    self.error_logger.add_entry(ErrorLog(load_exc, "AS"+str(as_number), str(load_exc)))
+                    continue
+                for ip_address in reformat.results[as_number].keys():
+                    server = reformat.results[as_number][ip_address].server
+                    row = rows.get(ipaddress.ip_address(ip_address))
+                    if row is not None:
+                        reformat.results[as_number][ip_address].insert_rov_entry(row)
+                        print(f"--> for {ip_address}: ({server}) found row: {str(row)}")
+                    else:
+                        exc = table_exc if table_exc is not None else NetworkNotFoundError(ipaddress.ip_address(ip_address).compressed)
+                        print(f"!!! {str(exc)} !!!")
+                        reformat.results[as_number][ip_address].insert_rov_entry(None)
+                        self.error_logger.add_entry(ErrorLog(exc, server, str(exc)))
+        finally:
+            executor.shutdown(wait=not timed_out)       # a hung worker is not waited for
+        if self.rov_page_scraper.cache is not None:
+            print(f"ROV tables cache: {self.rov_page_scraper.cache.get_summary()}")
         print(f"END ROV PAGE SCRAPING ({datetime_utils.compute_delta_and_stamp(start_execution_time)})")
         return reformat
 
+    @staticmethod
+    def _scrape_rov_page(as_number: int, ip_addresses: List[str], free_scrapers: List[ROVPageScraper], free_scrapers_lock: threading.Lock) -> Tuple[Dict[ipaddress.IPv4Address, Optional[RowPrefixesTable]], Optional[Exception], Optional[Exception]]:
+        """
+        Auxiliary method of the ROVPage scraping, executed by a worker: it takes a free scraper, loads the page of the
+        autonomous system and matches the ip addresses in its table. Instead of raising, it returns the exception
+        occurred, so that the caller can print and log them in order.
+
+        :param as_number: The autonomous system number.
+        :type as_number: int
+        :param ip_addresses: The ip addresses (as strings) to match.
+        :type ip_addresses: List[str]
+        :param free_scrapers: The scrapers not used by other workers.
+        :type free_scrapers: List[ROVPageScraper]
+        :param free_scrapers_lock: The lock of free_scrapers.
+        :type free_scrapers_lock: threading.Lock
+        :return: A tuple containing the matched rows of the ip addresses (None if not matched), the exception occurred
+        loading the page and the one occurred reading its table (None if it went well).
+        :rtype: Tuple[Dict[ipaddress.IPv4Address, Optional[RowPrefixesTable]], Optional[Exception], Optional[Exception]]
+        """
+        with free_scrapers_lock:
+            scraper = free_scrapers.pop()
+        try:
+            try:
+                scraper.load_as_page(as_number)
+            except (selenium.common.exceptions.WebDriverException, selenium.common.exceptions.TimeoutException, requests.exceptions.RequestException, FilenameNotFoundError, TableNotPresentError, ValueError, TableEmptyError, NotROVStateTypeError) as exc:
+                return dict(), exc, None
+            try:
+                return scraper.get_networks_if_present([ipaddress.ip_address(ip_address) for ip_address in ip_addresses]), None, None  # non gestisco ValueError perché non può accadere qua
+            except (TableNotPresentError, TableEmptyError) as exc:
+                return dict(), None, exc
+        finally:
+            with free_scrapers_lock:
+                free_scrapers.append(scraper)
+
     def _extract_domain_names_from_preamble(self) -> List[DomainName]:
         """
         This method extract domain names from the PREAMBLE execution: this means it extract them from the landing web
@@ -515,7 +881,7 @@ class ApplicationResolversWrapper:
         :return: A list of extracted domain names.
         :rtype: List[DomainName]
         """
-        domain_names = set()
+        domain_names = OrderedWorklist()
         for website in self.landing_web_sites_results.keys():
             # adding domain names from web sites
             domain_names.add(website.domain_name())
@@ -544,7 +910,7 @@ class ApplicationResolversWrapper:
                     else:
                         for dn in mail_server_path.get_cname_chain(as_resource_records=False):
                             domain_names.add(dn)
-        return list(domain_names)
+        return domain_names.to_list()
 
     def _extract_domain_names_from_landing_script_sites_results(self) -> List[DomainName]:
         """
@@ -553,16 +919,16 @@ class ApplicationResolversWrapper:
         :return: A list of extracted domain names.
         :rtype: List[DomainName]
         """
-        domain_names = list()
+        domain_names = OrderedWorklist()
         for script_site in self.landing_script_sites_results.keys():
-            list_utils.append_with_no_duplicates(domain_names, script_site.domain_name())
+            domain_names.add(script_site.domain_name())
             https_result = self.landing_script_sites_results[script_site].https
             if https_result is not None:
-                list_utils.append_with_no_duplicates(domain_names, https_result.server)
+                domain_names.add(https_result.server)
             http_result = self.landing_script_sites_results[script_site].http
             if http_result is not None:
-                list_utils.append_with_no_duplicates(domain_names, http_result.server)
-        return domain_names
+                domain_names.add(http_result.server)
+        return domain_names.to_list()
 
     def extract_script_hosting_dependencies(self) -> Tuple[Dict[MainFrameScript, Set[Url]], Set[Url]]:
         """
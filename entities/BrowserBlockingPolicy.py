@@ -0,0 +1,189 @@
+import json
+import threading
+from typing import Iterable, Optional
+from urllib.parse import quote, urlsplit
+from selenium.webdriver.firefox.options import Options
+
+
+class BrowserBlockingPolicy:
+    """
+    This class represents the policy of the resources that the headless browser doesn't load, since neither the script
+    dependencies resolving nor the ROV page scraping need them: images, fonts, media and stylesheets, and every request
+    to the known analytics (and advertising) hosts. The policy is applied through the Firefox preferences (images,
+    fonts, stylesheets and media are not even requested) and, for the hosts, through a proxy auto-config that sends
+    their requests to a closed port, so that no intercepting proxy is needed. When the requests are captured with
+    selenium-wire (which needs its own proxy) the hosts are blocked by its request interceptor instead, that also
+    aborts what the preferences can't stop.
+    With the eager page load strategy the page load returns at DOMContentLoaded, without waiting for the subresources.
+    Notice that a blocked analytics script is still a script (html element) of the page, but the scripts it would
+    inject are not.
+
+    ...
+
+    Attributes
+    ----------
+    block_images : bool
+        Whether images are blocked.
+    block_fonts : bool
+        Whether fonts are blocked.
+    block_media : bool
+        Whether audio and video are blocked.
+    block_stylesheets : bool
+        Whether stylesheets are blocked.
+    blocked_hosts : tuple
+        The hosts (and their subdomains) whose requests are blocked.
+    eager_page_load : bool
+        Whether the page load returns at DOMContentLoaded.
+    blocked_requests_count : int
+        Number of requests aborted by the interceptor.
+    lock : threading.Lock
+        Lock that keeps the counter consistent (the interceptor runs in the threads of the selenium-wire proxy).
+    """
+    DEFAULT_BLOCKED_HOSTS = (
+        'google-analytics.com', 'analytics.google.com', 'googletagmanager.com', 'googlesyndication.com',
+        'googleadservices.com', 'doubleclick.net', 'connect.facebook.net',
+        'hotjar.com', 'hotjar.io', 'scorecardresearch.com', 'quantserve.com', 'chartbeat.com', 'chartbeat.net',
+        'newrelic.com', 'nr-data.net', 'segment.io', 'segment.com', 'mixpanel.com', 'amplitude.com', 'clarity.ms',
+        'bat.bing.com', 'criteo.com', 'criteo.net', 'taboola.com', 'outbrain.com', 'adnxs.com', 'matomo.cloud',
+        'mc.yandex.ru'
+    )
+    IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.webp', '.avif', '.svg', '.ico', '.bmp', '.tif', '.tiff')
+    FONT_EXTENSIONS = ('.woff', '.woff2', '.ttf', '.otf', '.eot')
+    MEDIA_EXTENSIONS = ('.mp4', '.webm', '.ogg', '.ogv', '.mp3', '.wav', '.m4a', '.m4v', '.mov', '.m3u8', '.flac')
+    STYLESHEET_EXTENSIONS = ('.css',)
+
+    def __init__(self, block_images=True, block_fonts=True, block_media=True, block_stylesheets=True, blocked_hosts: Optional[Iterable[str]] = DEFAULT_BLOCKED_HOSTS, eager_page_load=True):
+        """
+        Initialize the object.
+
+        :param block_images: Whether images are blocked.
+        :type block_images: bool
+        :param block_fonts: Whether fonts are blocked.
+        :type block_fonts: bool
+        :param block_media: Whether audio and video are blocked.
+        :type block_media: bool
+        :param block_stylesheets: Whether stylesheets are blocked.
+        :type block_stylesheets: bool
+        :param blocked_hosts: The hosts (and their subdomains) whose requests are blocked, or None for no host.
+        :type blocked_hosts: Optional[Iterable[str]]
+        :param eager_page_load: Whether the page load returns at DOMContentLoaded.
+        :type eager_page_load: bool
+        """
+        self.block_images = block_images
+        self.block_fonts = block_fonts
+        self.block_media = block_media
+        self.block_stylesheets = block_stylesheets
+        self.blocked_hosts = tuple() if blocked_hosts is None else tuple(host.lower() for host in blocked_hosts)
+        self.eager_page_load = eager_page_load
+        self.blocked_requests_count = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def disabled() -> 'BrowserBlockingPolicy':
+        """
+        Returns the policy that blocks nothing and waits for the load event, as a browser without policy.
+
+        :return: The policy.
+        :rtype: BrowserBlockingPolicy
+        """
+        return BrowserBlockingPolicy(block_images=False, block_fonts=False, block_media=False, block_stylesheets=False, blocked_hosts=None, eager_page_load=False)
+
+    def is_disabled(self) -> bool:
+        """
+        Tells if the policy blocks nothing.
+
+        :return: True if nothing is blocked.
+        :rtype: bool
+        """
+        return not (self.block_images or self.block_fonts or self.block_media or self.block_stylesheets or len(self.blocked_hosts) > 0)
+
+    def apply_to_options(self, options: Options, block_hosts_with_proxy_autoconfig=True) -> None:
+        """
+        Sets the Firefox preferences and the page load strategy of the policy in the options of the browser.
+
+        :param options: The options of the browser.
+        :type options: selenium.webdriver.firefox.options.Options
+        :param block_hosts_with_proxy_autoconfig: Whether the hosts are blocked with a proxy auto-config (not possible
+        if the browser uses the selenium-wire proxy).
+        :type block_hosts_with_proxy_autoconfig: bool
+        """
+        if self.block_images:
+            options.set_preference('permissions.default.image', 2)
+        if self.block_fonts:
+            options.set_preference('gfx.downloadable_fonts.enabled', False)
+        if self.block_stylesheets:
+            options.set_preference('permissions.default.stylesheet', 2)
+        if self.block_media:
+            options.set_preference('media.autoplay.default', 5)
+            options.set_preference('media.preload.default', 0)
+            options.set_preference('media.preload.auto', 0)
+        if not self.is_disabled():
+            options.set_preference('network.prefetch-next', False)
+            options.set_preference('network.dns.disablePrefetch', True)
+        if block_hosts_with_proxy_autoconfig and len(self.blocked_hosts) > 0:
+            options.set_preference('network.proxy.type', 2)
+            options.set_preference('network.proxy.autoconfig_url', 'data:application/x-ns-proxy-autoconfig,' + quote(self.proxy_autoconfig()))
+            options.set_preference('network.proxy.allow_hijacking_localhost', True)
+        options.page_load_strategy = 'eager' if self.eager_page_load else 'normal'
+
+    def proxy_autoconfig(self) -> str:
+        """
+        Returns the proxy auto-config (PAC) script that sends the requests to the blocked hosts to a closed port (so
+        they fail at once) and the others directly to the servers.
+
+        :return: The script.
+        :rtype: str
+        """
+        return (
+            "function FindProxyForURL(url, host) {\n"
+            f"    var blocked = {json.dumps(list(self.blocked_hosts))};\n"
+            "    host = host.toLowerCase();\n"
+            "    for (var i = 0; i < blocked.length; i++) {\n"
+            "        if (host == blocked[i] || dnsDomainIs(host, '.' + blocked[i])) {\n"
+            "            return 'PROXY 127.0.0.1:9';\n"
+            "        }\n"
+            "    }\n"
+            "    return 'DIRECT';\n"
+            "}\n"
+        )
+
+    def is_blocked(self, url: str, accept: Optional[str] = None) -> bool:
+        """
+        Tells if a request is blocked, from its url and from its Accept header (the type of resource the browser
+        expects).
+
+        :param url: The url of the request.
+        :type url: str
+        :param accept: The Accept header of the request, if present.
+        :type accept: Optional[str]
+        :return: True if the request is blocked.
+        :rtype: bool
+        """
+        parts = urlsplit(url)
+        host = (parts.hostname or '').lower()
+        for blocked_host in self.blocked_hosts:
+            if host == blocked_host or host.endswith('.' + blocked_host):
+                return True
+        path = parts.path.lower()
+        accept = '' if accept is None else accept.lower()
+        if self.block_images and (path.endswith(BrowserBlockingPolicy.IMAGE_EXTENSIONS) or accept.startswith('image/')):
+            return True
+        if self.block_fonts and (path.endswith(BrowserBlockingPolicy.FONT_EXTENSIONS) or accept.startswith(('font/', 'application/font'))):
+            return True
+        if self.block_media and (path.endswith(BrowserBlockingPolicy.MEDIA_EXTENSIONS) or accept.startswith(('video/', 'audio/'))):
+            return True
+        if self.block_stylesheets and (path.endswith(BrowserBlockingPolicy.STYLESHEET_EXTENSIONS) or accept.startswith('text/css')):
+            return True
+        return False
+
+    def request_interceptor(self, request) -> None:
+        """
+        The selenium-wire request interceptor of the policy: it aborts the blocked requests.
+
+        :param request: The selenium-wire request.
+        :type request: seleniumwire.request.Request
+        """
+        if self.is_blocked(request.url, request.headers.get('Accept')):
+            with self.lock:
+                self.blocked_requests_count = self.blocked_requests_count + 1
+            request.abort()
@@ -0,0 +1,137 @@
+import bisect
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class DenialRanges:
+    """
+    This class represents the denial ranges (NSEC or NSEC3 records) of a zone: each range goes from its owner to its
+    next owner, in the order of the keys (canonical order of the names for NSEC, order of the hashes for NSEC3), and
+    the names (or hashes) strictly between them don't exist. The last range of the chain wraps around, its next owner
+    is the first one.
+    Ranges are keyed by owner, so a range received again replaces the previous one, and the owners are kept sorted so
+    that the range covering a key is found with a binary search. Expired ranges are dropped when they are found and,
+    all together, when a range is added after the earliest expiration.
+
+    ...
+
+    Attributes
+    ----------
+    owners : List[Any]
+        The owners of the ranges, sorted.
+    ranges : Dict[Any, Tuple[Any, float, Any]]
+        Data structure that associates each owner to the next owner, the expiration time (seconds since epoch) and the
+        data of the range.
+    earliest_expiration : float
+        The earliest expiration time of the ranges (infinite if there are none).
+    """
+    def __init__(self):
+        """
+        Initialize the object.
+
+        """
+        self.owners = list()
+        self.ranges = dict()
+        self.earliest_expiration = float('inf')
+
+    def add(self, owner: Any, next_owner: Any, ttl: float, data: Any = None) -> None:
+        """
+        Adds (or replaces) the range of the owner, valid for ttl seconds.
+
+        :param owner: The owner.
+        :type owner: Any
+        :param next_owner: The next owner.
+        :type next_owner: Any
+        :param ttl: The TTL of the range (seconds).
+        :type ttl: float
+        :param data: The data of the range.
+        :type data: Any
+        """
+        now = time.time()
+        if now >= self.earliest_expiration:
+            self.drop_expired(now)
+        if owner not in self.ranges:
+            bisect.insort(self.owners, owner)
+        expiration = now + ttl
+        self.ranges[owner] = (next_owner, expiration, data)
+        self.earliest_expiration = min(self.earliest_expiration, expiration)
+
+    def find_covering(self, key: Any, now: Optional[float] = None) -> Optional[Tuple[Any, Any, Any]]:
+        """
+        Searches for the not expired range that covers the key: the range of the greatest owner before the key or, if
+        the key comes before every owner, the last range of the chain.
+
+        :param key: The key.
+        :type key: Any
+        :param now: The current time (seconds since epoch), None for now.
+        :type now: Optional[float]
+        :return: The covering (owner, next owner, data) tuple, or None if there is no such range.
+        :rtype: Optional[Tuple[Any, Any, Any]]
+        """
+        if len(self.owners) == 0:
+            return None
+        now = time.time() if now is None else now
+        index = bisect.bisect_right(self.owners, key) - 1      # -1: the last range, which wraps around
+        owner = self.owners[index]
+        next_owner, expiration, data = self.ranges[owner]
+        if expiration <= now:
+            self.remove(owner)
+            return None
+        if owner < next_owner:
+            covered = owner < key < next_owner
+        else:
+            covered = key > owner or key < next_owner
+        return (owner, next_owner, data) if covered else None
+
+    def find(self, owner: Any, now: Optional[float] = None) -> Optional[Tuple[Any, Any]]:
+        """
+        Searches for the not expired range of the owner.
+
+        :param owner: The owner.
+        :type owner: Any
+        :param now: The current time (seconds since epoch), None for now.
+        :type now: Optional[float]
+        :return: The (next owner, data) tuple, or None if there is no such range.
+        :rtype: Optional[Tuple[Any, Any]]
+        """
+        try:
+            next_owner, expiration, data = self.ranges[owner]
+        except KeyError:
+            return None
+        if expiration <= (time.time() if now is None else now):
+            self.remove(owner)
+            return None
+        return next_owner, data
+
+    def remove(self, owner: Any) -> None:
+        """
+        Removes the range of the owner, if present.
+
+        :param owner: The owner.
+        :type owner: Any
+        """
+        if self.ranges.pop(owner, None) is not None:
+            index = bisect.bisect_left(self.owners, owner)
+            if index < len(self.owners) and self.owners[index] == owner:
+                del self.owners[index]
+
+    def drop_expired(self, now: Optional[float] = None) -> None:
+        """
+        Removes all the expired ranges.
+
+        :param now: The current time (seconds since epoch), None for now.
+        :type now: Optional[float]
+        """
+        now = time.time() if now is None else now
+        self.ranges = {owner: r for owner, r in self.ranges.items() if r[1] > now}
+        self.owners = [owner for owner in self.owners if owner in self.ranges]
+        self.earliest_expiration = min((r[1] for r in self.ranges.values()), default=float('inf'))
+
+    def __len__(self) -> int:
+        """
+        Return the number of ranges (expired ones included, until they are dropped).
+
+        :return: Object length.
+        :rtype: int
+        """
+        return len(self.ranges)
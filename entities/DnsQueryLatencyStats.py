@@ -0,0 +1,171 @@
+import csv
+import threading
+from pathlib import Path
+from typing import Optional
+from entities.enums.TypesRR import TypesRR
+from exceptions.FilenameNotFoundError import FilenameNotFoundError
+from exceptions.NotResourceRecordTypeError import NotResourceRecordTypeError
+from static_variables import OUTPUT_FOLDER_NAME, OUTPUT_DNS_LATENCY_FILE_NAME
+from utils import file_utils, csv_utils
+
+
+class DnsQueryLatencyStats:
+    """
+    This class keeps track of the latency of the DNS queries actually sent on the network, per resource record type.
+    Measures are persisted in the output folder (as the DNS cache) so that every execution refines them and they can be
+    used to estimate the duration of a future execution.
+
+    ...
+
+    Attributes
+    ----------
+    measures : Dict[TypesRR, Tuple[int, float]]
+        Data structure that associates each resource record type to the number of queries measured and their total
+        duration (seconds).
+    separator : str
+        The character separator used when the measures are exported to file.
+    lock : threading.Lock
+        Lock that protects the measures when queries are sent concurrently.
+    """
+    DEFAULT_LATENCY = 0.05      # seconds, used when a resource record type was never measured
+
+    def __init__(self, separator=";"):
+        """
+        Initialize the object with no measures.
+
+        :param separator: The character separator used when exporting the file.
+        :type separator: str
+        """
+        self.measures = dict()
+        self.separator = separator
+        self.lock = threading.Lock()
+
+    def record(self, type_rr: TypesRR, seconds: float, count=1) -> None:
+        """
+        Adds the measure of one (or more) queries.
+
+        :param type_rr: The resource record type of the query.
+        :type type_rr: TypesRR
+        :param seconds: The total duration of the queries.
+        :type seconds: float
+        :param count: The number of queries measured.
+        :type count: int
+        """
+        with self.lock:
+            try:
+                previous_count, previous_seconds = self.measures[type_rr]
+            except KeyError:
+                previous_count, previous_seconds = 0, 0.0
+            self.measures[type_rr] = (previous_count + count, previous_seconds + seconds)
+
+    def count(self, type_rr: TypesRR) -> int:
+        """
+        Returns the number of queries measured for a resource record type.
+
+        :param type_rr: The resource record type.
+        :type type_rr: TypesRR
+        :return: The number of queries.
+        :rtype: int
+        """
+        with self.lock:
+            try:
+                return self.measures[type_rr][0]
+            except KeyError:
+                return 0
+
+    def mean(self, type_rr: TypesRR) -> Optional[float]:
+        """
+        Returns the mean latency of the queries of a resource record type.
+
+        :param type_rr: The resource record type.
+        :type type_rr: TypesRR
+        :return: The mean latency in seconds, or None if the type was never measured.
+        :rtype: Optional[float]
+        """
+        with self.lock:
+            try:
+                count, seconds = self.measures[type_rr]
+            except KeyError:
+                return None
+        if count == 0:
+            return None
+        return seconds / count
+
+    def mean_or_default(self, type_rr: TypesRR) -> float:
+        """
+        Returns the mean latency of the queries of a resource record type, or DEFAULT_LATENCY if it was never measured.
+
+        :param type_rr: The resource record type.
+        :type type_rr: TypesRR
+        :return: The latency in seconds.
+        :rtype: float
+        """
+        mean = self.mean(type_rr)
+        return self.DEFAULT_LATENCY if mean is None else mean
+
+    def load_csv(self, path: str) -> None:
+        """
+        Loads the measures from a .csv file, adding them to the current ones. Malformed lines are skipped.
+
+        :param path: Path of file to load, as absolute or relative path.
+        :type path: str
+        :raise PermissionError: If filepath points to a directory.
+        :raise FileNotFoundError: If it is impossible to open the file.
+        :raise OSError: If a general I/O error occurs.
+        """
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            for row in csv.reader(f, dialect=f'{csv_utils.return_personalized_dialect_name(self.separator)}'):
+                try:
+                    self.record(TypesRR.parse_from_string(row[0]), float(row[2]), count=int(row[1]))
+                except (IndexError, ValueError, NotResourceRecordTypeError):
+                    pass
+
+    def load_csv_from_output_folder(self, filename=OUTPUT_DNS_LATENCY_FILE_NAME, project_root_directory=Path.cwd()) -> None:
+        """
+        Loads the measures exported from the previous executions in the output folder of the project root directory.
+
+        :param filename: Name of the file with extension. Default is set in the OUTPUT_DNS_LATENCY_FILE_NAME variable.
+        :type filename: str
+        :param project_root_directory: The Path object pointing at the project root directory.
+        :type project_root_directory: Path
+        :raise FilenameNotFoundError: If file with such filename doesn't exist.
+        :raise OSError: If a general I/O error occurs.
+        """
+        try:
+            result = file_utils.search_for_filename_in_subdirectory(OUTPUT_FOLDER_NAME, filename, project_root_directory)
+        except FilenameNotFoundError:
+            raise
+        self.load_csv(str(result[0]))
+
+    def write_to_csv(self, filepath: str) -> None:
+        """
+        Exports the measures to a .csv file: one row for each resource record type (type, count, total seconds).
+
+        :param filepath: Path of file to write, as absolute or relative path.
+        :type filepath: str
+        :raise PermissionError: If filepath points to a directory.
+        :raise FileNotFoundError: If it is impossible to open the file.
+        :raise OSError: If a general I/O error occurs.
+        """
+        with self.lock:
+            rows = [[type_rr.to_string(), str(count), str(seconds)] for type_rr, (count, seconds) in self.measures.items()]
+        with open(filepath, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f, dialect=f'{csv_utils.return_personalized_dialect_name(self.separator)}')
+            for row in rows:
+                writer.writerow(row)
+
+    def write_to_csv_in_output_folder(self, filename=OUTPUT_DNS_LATENCY_FILE_NAME, project_root_directory=Path.cwd()) -> None:
+        """
+        Exports the measures to a .csv file in the output folder of the project root directory.
+
+        :param filename: The personalized filename with extension. Default is set in the OUTPUT_DNS_LATENCY_FILE_NAME
+        variable.
+        :type filename: str
+        :param project_root_directory: The Path object pointing at the project root directory.
+        :type project_root_directory: Path
+        :raise PermissionError: If filepath points to a directory.
+        :raise FileNotFoundError: If it is impossible to open the file.
+        :raise OSError: If a general I/O error occurs.
+        """
+        file = file_utils.set_file_in_folder(OUTPUT_FOLDER_NAME, filename, project_root_directory)
+        self.write_to_csv(str(file))
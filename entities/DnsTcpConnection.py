@@ -0,0 +1,249 @@
+import select
+import socket
+import struct
+import threading
+import time
+from typing import Optional
+import dns.exception
+import dns.inet
+import dns.message
+import dns.query
+
+
+class DnsTcpConnection:
+    """
+    This class represents a persistent DNS-over-TCP connection towards a single upstream nameserver. The connection is
+    kept open between queries and it is pipelined (RFC 7766): more threads can send their queries on the same
+    connection without waiting for the previous responses, then every response is dispatched to the thread that owns
+    the query through the message id.
+The bytes read are kept in a buffer until a whole message is there, so the thread reading the socket can give up
+waiting (its query timed out) in the middle of a response and another thread goes on reading it: the connection is
+closed only on a network error or a malformed message.
+
+    ...
+
+    Attributes
+    ----------
+    address : str
+        The IP address of the nameserver.
+    port : int
+        The port of the nameserver.
+    sock : Optional[socket.socket]
+        The connected (non-blocking) stream socket, None if the connection is closed.
+    write_lock : threading.Lock
+        Lock that serializes the writes of the queries on the socket.
+    condition : threading.Condition
+        Condition used to hand over the reading of the socket and to dispatch the responses.
+    reading : bool
+        Flag that tells if a thread is currently reading a response from the socket.
+    read_buffer : bytearray
+        The bytes read from the socket that don't make a whole response yet.
+    pending_responses : Dict[int, dns.message.Message]
+        Responses read from the socket that are not yet taken by the thread that sent the query.
+    awaited_ids : Set[int]
+        The message ids of the queries whose thread is still waiting for the response: the responses of the queries
+        that timed out are discarded when they arrive.
+    queries_sent : int
+        Number of queries sent on this connection (across reconnections).
+    connections_opened : int
+        Number of times the TCP connection has been (re)opened.
+    """
+    def __init__(self, address: str, port: int):
+        """
+        Initialize the object. The connection is opened lazily when the first query is sent.
+
+        :param address: The IP address of the nameserver.
+        :type address: str
+        :param port: The port of the nameserver.
+        :type port: int
+        """
+        self.address = address
+        self.port = port
+        self.sock = None
+        self.write_lock = threading.Lock()
+        self.condition = threading.Condition()
+        self.reading = False
+        self.read_buffer = bytearray()
+        self.pending_responses = dict()
+        self.awaited_ids = set()
+        self.queries_sent = 0
+        self.connections_opened = 0
+
+    def is_open(self) -> bool:
+        """
+        Tells if the underlying socket is currently connected.
+
+        :return: True or False.
+        :rtype: bool
+        """
+        return self.sock is not None
+
+    def query(self, request: dns.message.Message, timeout: Optional[float]) -> dns.message.Message:
+        """
+        Sends the request on the persistent connection (opening it if needed) and waits for the matching response.
+
+        :param request: The DNS query message.
+        :type request: dns.message.Message
+        :param timeout: Seconds to wait before the query times out. None means wait forever.
+        :type timeout: Optional[float]
+        :raise dns.exception.Timeout: If the response doesn't arrive in time.
+        :raise dns.query.BadResponse: If the response doesn't match the request.
+        :raise EOFError: If the nameserver closed the connection.
+        :raise OSError: If a network error occurs.
+        :return: The response message.
+        :rtype: dns.message.Message
+        """
+        expiration = None if timeout is None else time.time() + timeout
+        begin_time = time.time()
+        with self.condition:
+            self.awaited_ids.add(request.id)
+        try:
+            return self.__send_and_wait(request, expiration, begin_time)
+        finally:
+            with self.condition:
+                self.awaited_ids.discard(request.id)
+                self.pending_responses.pop(request.id, None)
+
+    def __send_and_wait(self, request: dns.message.Message, expiration: Optional[float], begin_time: float) -> dns.message.Message:
+        """
+        Sends the request and waits for its response, reading the socket when no other thread is doing it.
+
+        :param request: The DNS query message.
+        :type request: dns.message.Message
+        :param expiration: The absolute time at which the query is considered timed out.
+        :type expiration: Optional[float]
+        :param begin_time: The time the query started at.
+        :type begin_time: float
+        :return: The response message.
+        :rtype: dns.message.Message
+        """
+        with self.write_lock:
+            try:
+                if self.sock is None:
+                    self.__connect(expiration)
+                dns.query.send_tcp(self.sock, request, expiration)
+                self.queries_sent = self.queries_sent + 1
+            except (OSError, EOFError, dns.exception.Timeout):
+                self.close()
+                raise
+        while True:
+            with self.condition:
+                while request.id not in self.pending_responses and self.reading:
+                    if expiration is None:
+                        self.condition.wait()
+                    else:
+                        remaining = expiration - time.time()
+                        if remaining <= 0:
+                            raise dns.exception.Timeout
+                        self.condition.wait(remaining)
+                if request.id in self.pending_responses:
+                    response = self.pending_responses.pop(request.id)
+                    if not request.is_response(response):
+                        raise dns.query.BadResponse
+                    response.time = time.time() - begin_time
+                    return response
+                if self.sock is None:
+                    raise EOFError
+                self.reading = True
+                sock = self.sock
+            try:
+                response = self.__receive(sock, expiration)
+            except dns.exception.Timeout:
+                # the reading is handed over to the other threads, the connection stays open
+                with self.condition:
+                    self.reading = False
+                    self.condition.notify_all()
+                raise
+            except Exception:
+                with self.condition:
+                    self.reading = False
+                    self.close()
+                    self.condition.notify_all()
+                raise
+            with self.condition:
+                self.reading = False
+                if response.id in self.awaited_ids:
+                    self.pending_responses[response.id] = response
+                self.condition.notify_all()
+
+    def __receive(self, sock: socket.socket, expiration: Optional[float]) -> dns.message.Message:
+        """
+        Reads the socket until the read buffer holds a whole response (2 bytes of length, then the message), which is
+        removed from the buffer and returned. What is read before the timeout stays in the buffer for the next reader.
+
+        :param sock: The connected (non-blocking) stream socket.
+        :type sock: socket.socket
+        :param expiration: The absolute time at which the reading is given up.
+        :type expiration: Optional[float]
+        :raise dns.exception.Timeout: If the response is not complete in time.
+        :raise EOFError: If the nameserver closed the connection.
+        :raise OSError: If a network error occurs.
+        :raise dns.exception.DNSException: If the response is malformed.
+        :return: The response message.
+        :rtype: dns.message.Message
+        """
+        while True:
+            if len(self.read_buffer) >= 2:
+                (length,) = struct.unpack('!H', self.read_buffer[:2])
+                if len(self.read_buffer) >= 2 + length:
+                    wire = bytes(self.read_buffer[2:2 + length])
+                    del self.read_buffer[:2 + length]
+                    return dns.message.from_wire(wire)
+            if expiration is None:
+                readable, _, _ = select.select([sock], [], [])
+            else:
+                remaining = expiration - time.time()
+                if remaining <= 0:
+                    raise dns.exception.Timeout
+                readable, _, _ = select.select([sock], [], [], remaining)
+            if not readable:
+                raise dns.exception.Timeout
+            try:
+                data = sock.recv(65535)
+            except BlockingIOError:
+                continue
+            if data == b'':
+                raise EOFError
+            self.read_buffer.extend(data)
+
+    def close(self) -> None:
+        """
+        Closes the socket. Responses not yet dispatched are discarded.
+
+        """
+        sock = self.sock
+        self.sock = None
+        self.read_buffer = bytearray()
+        self.pending_responses.clear()
+        if sock is not None:
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+    def __connect(self, expiration: Optional[float]) -> None:
+        """
+        Opens the TCP connection and leaves the socket in non-blocking mode, as required by the dnspython TCP helpers.
+
+        :param expiration: The absolute time at which the connection attempt is considered timed out.
+        :type expiration: Optional[float]
+        :raise OSError: If the connection can't be established.
+        """
+        af = dns.inet.af_for_address(self.address)
+        sock = socket.socket(af, socket.SOCK_STREAM)
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            if expiration is None:
+                sock.settimeout(None)
+            else:
+                sock.settimeout(max(expiration - time.time(), 0.001))
+            if af == socket.AF_INET6:
+                sock.connect((self.address, self.port, 0, 0))
+            else:
+                sock.connect((self.address, self.port))
+            sock.setblocking(False)
+        except OSError:
+            sock.close()
+            raise
+        self.sock = sock
+        self.connections_opened = self.connections_opened + 1
@@ -0,0 +1,106 @@
+import threading
+from typing import Optional
+import dns.exception
+import dns.message
+from entities.DnsTcpConnection import DnsTcpConnection
+
+
+class DnsTcpConnectionPool:
+    """
+    This class keeps one persistent and pipelined DNS-over-TCP connection for each upstream nameserver, so that the
+    retries of truncated UDP responses don't pay a new TCP handshake every time.
+
+    ...
+
+    Attributes
+    ----------
+    connections : Dict[Tuple[str, int], DnsTcpConnection]
+        The connections, one for each (address, port) of the nameservers.
+    lock : threading.Lock
+        Lock that protects the creation of the connections.
+    """
+    def __init__(self):
+        """
+        Initialize the object.
+
+        """
+        self.connections = dict()
+        self.lock = threading.Lock()
+
+    def get_connection(self, address: str, port: int) -> DnsTcpConnection:
+        """
+        Returns the connection associated to the nameserver, creating it if needed.
+
+        :param address: The IP address of the nameserver.
+        :type address: str
+        :param port: The port of the nameserver.
+        :type port: int
+        :return: The connection.
+        :rtype: DnsTcpConnection
+        """
+        with self.lock:
+            try:
+                return self.connections[(address, port)]
+            except KeyError:
+                connection = DnsTcpConnection(address, port)
+                self.connections[(address, port)] = connection
+                return connection
+
+    def query(self, request: dns.message.Message, address: str, port: int, timeout: Optional[float]) -> dns.message.Message:
+        """
+        Sends the query through the persistent connection of the nameserver. If the connection was already open and it
+        turns out to be closed by the nameserver (idle timeout), the query is sent again once on a new connection.
+
+        :param request: The DNS query message.
+        :type request: dns.message.Message
+        :param address: The IP address of the nameserver.
+        :type address: str
+        :param port: The port of the nameserver.
+        :type port: int
+        :param timeout: Seconds to wait before the query times out.
+        :type timeout: Optional[float]
+        :raise dns.exception.Timeout: If the response doesn't arrive in time.
+        :raise dns.query.BadResponse: If the response doesn't match the request.
+        :raise EOFError: If the nameserver closed the connection.
+        :raise OSError: If a network error occurs.
+        :return: The response message.
+        :rtype: dns.message.Message
+        """
+        connection = self.get_connection(address, port)
+        was_open = connection.is_open()
+        try:
+            return connection.query(request, timeout)
+        except (EOFError, OSError):
+            if not was_open:
+                raise
+        return connection.query(request, timeout)
+
+    def connections_opened(self) -> int:
+        """
+        Returns the total number of TCP connections opened by the pool.
+
+        :return: The number of connections opened.
+        :rtype: int
+        """
+        with self.lock:
+            return sum(connection.connections_opened for connection in self.connections.values())
+
+    def queries_sent(self) -> int:
+        """
+        Returns the total number of queries sent over TCP by the pool.
+
+        :return: The number of queries sent.
+        :rtype: int
+        """
+        with self.lock:
+            return sum(connection.queries_sent for connection in self.connections.values())
+
+    def close(self) -> None:
+        """
+        Closes every connection of the pool.
+
+        """
+        with self.lock:
+            for connection in self.connections.values():
+                connection.close()
+            self.connections.clear()
@@ -1,5 +1,7 @@
+import bisect
 import ipaddress
 from typing import List, Tuple
+from utils import network_utils
 
 
 class EntryIpAsDatabase:
@@ -20,6 +22,10 @@ class EntryIpAsDatabase:
         Should be the country code.
     as_description : str
         Should be the Autonomous System brief description.
+    networks : List[ipaddress.IPv4Network] or None
+        The CIDR decomposition of the range, computed the first time it is needed.
+    network_addresses : List[int] or None
+        The network address (as integer) of each network of the decomposition, for binary searches.
     """
     def __init__(self, entries_inline: List[str]):
         """
@@ -58,43 +64,42 @@ class EntryIpAsDatabase:
             raise
         self.country_code = string_country_code
         self.as_description = string_as_description
+        self.networks = None
+        self.network_addresses = None
 
     def get_all_networks(self) -> List[ipaddress.IPv4Network]:
         """
         Returns a list of networks from the summarized network range given the first and last IP addresses of the range
-        in the entry (self object).
+        in the entry (self object). The decomposition is computed with integer arithmetic only the first time, then it
+        is memoized in the object.
 
-        :raise TypeError: If first or last are not IP addresses or are not of the same version.
-        :raise ValueError: If last is not greater than first or if first address version is not 4 or 6
+        :raise ValueError: If last is not greater than first.
         :returns: A list of valid ipaddress.IPv4Network.
         :rtype: List[ipaddress.IPv4Network]
         """
-        try:
-            return list(ipaddress.summarize_address_range(self.start_ip_range, self.end_ip_range))
-        except (TypeError, ValueError):
-            raise
+        if self.networks is None:
+            blocks = network_utils.decompose_range_in_cidr_blocks(int(self.start_ip_range), int(self.end_ip_range))
+            self.network_addresses = [network_address for network_address, prefix_length in blocks]
+            self.networks = [ipaddress.IPv4Network(block) for block in blocks]
+        return list(self.networks)
 
     def get_network_of_ip(self, ip: ipaddress.IPv4Address) -> Tuple[ipaddress.IPv4Network, List[ipaddress.IPv4Network]]:
         """
         Return the network from the summarized network range given the first and last IP addresses of the range in the
-        entry (self object), and all the networks associated with such range.
+        entry (self object), and all the networks associated with such range. Networks are sorted and contiguous, so
+        the belonging one is found with a binary search.
 
         :param ip: Ip address.
         :type ip: ipaddress.IPv4Address
-        :raise TypeError: If first or last are not IP addresses or are not of the same version.
-        :raise ValueError: If last is not greater than first or if first address version is not 4 or 6.
+        :raise ValueError: If last is not greater than first.
         If there's not a network in which is contained the ip address parameter.
         :returns: A tuple containing the belonging network first and then all the networks.
         :rtype: Tuple[ipaddress.IPv4Network, List[ipaddress.IPv4Network]]
         """
-        try:
-            networks = self.get_all_networks()
-        except (TypeError, ValueError):
-            raise
-        for network in networks:
-            if ip in network:
-                return network, networks
-        raise ValueError()
+        networks = self.get_all_networks()
+        if not self.start_ip_range <= ip <= self.end_ip_range:
+            raise ValueError()
+        return networks[bisect.bisect_right(self.network_addresses, int(ip)) - 1], networks
 
     def __str__(self) -> str:
         """
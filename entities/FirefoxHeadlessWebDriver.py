@@ -1,9 +1,13 @@
 import platform
+import time
 from pathlib import Path
+from typing import Optional
 import selenium
+from selenium import webdriver
 from selenium.webdriver.firefox.options import Options
 from selenium.webdriver.firefox.service import Service
-from seleniumwire import webdriver
+from seleniumwire import webdriver as seleniumwire_webdriver
+from entities.BrowserBlockingPolicy import BrowserBlockingPolicy
 from exceptions.FilenameNotFoundError import FilenameNotFoundError
 from static_variables import INPUT_FOLDER_NAME, GECKODRIVER_FILENAME
 from utils import file_utils
@@ -13,6 +17,13 @@ class FirefoxHeadlessWebDriver:
     """
     This class creates an instance of a headless firefox web driver using geckodriver and a valid installation of
     Firefox.
+    The driver is the plain Selenium one, unless the requests of the browser should be captured: then it is the
+    selenium-wire one, which routes the traffic through its intercepting proxy and keeps at most max_stored_requests
+    requests (and responses) in memory.
+    With a persistent profile directory, the browser keeps its disk cache there: the assets shared by the pages (e.g.
+    the bundles of the CDNs) are loaded from the cache, also after a restart of the browser and in the next executions.
+    A profile can be used by one browser at a time: if the profile is in use (e.g. by another execution), the browser
+    is started with a temporary profile.
 
     ...
 
@@ -24,12 +35,43 @@ class FirefoxHeadlessWebDriver:
         Instance of an object representing the options associated to the firefox headless browser.
     service : selenium.webdriver.firefox.service.Service
         Object needed to run the headless browser.
-    driver : seleniumwire.webdriver.Firefox
+    driver : selenium.webdriver.Firefox or seleniumwire.webdriver.Firefox
         Actual object of the web driver.
+    blocking_policy : BrowserBlockingPolicy
+        The policy of the resources that are not loaded.
+    capture_requests : bool
+        Whether the requests of the browser are captured (selenium-wire driver).
+    profile_directory : str or None
+        The persistent profile directory, or None for a temporary profile.
+    startup_times : List[float]
+        The seconds each start (and restart) of the browser took.
+    fetched_bytes : int
+        The bytes transferred over the network for the pages counted with count_page_transfer().
+    resources_count : int
+        Number of documents and resources of the pages counted with count_page_transfer().
+    cached_resources_count : int
+        Number of documents and resources of the pages counted with count_page_transfer() that came from the cache.
     """
     time_out_in_seconds = 30
+    max_stored_requests = 100
+    disk_cache_capacity_in_kilobytes = 256 * 1024
 
-    def __init__(self, project_root_directory=Path.cwd()):
+    # returns the bytes transferred for the document and the resources of the page, their number and how many came
+    # from the cache (nothing transferred but a body), as a single JSON response
+    PAGE_TRANSFER_SCRIPT = """
+        var entries = performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'));
+        var fetched = 0;
+        var cached = 0;
+        for (var i = 0; i < entries.length; i++) {
+            fetched += entries[i].transferSize || 0;
+            if (entries[i].transferSize === 0 && entries[i].decodedBodySize > 0) {
+                cached++;
+            }
+        }
+        return [fetched, entries.length, cached];
+    """
+
+    def __init__(self, project_root_directory=Path.cwd(), blocking_policy: Optional[BrowserBlockingPolicy] = None, capture_requests=False, profile_directory: Optional[str] = None):
         """
         Requires the project root directory (PRD) to find the geckodriver executable in the input sub-folder of the PRD.
         Path.cwd() returns the current working directory which depends upon the entry point of the application; in
@@ -41,6 +83,13 @@ class FirefoxHeadlessWebDriver:
 
         :param project_root_directory: The Path object pointing at the project root directory.
         :type project_root_directory: Path
+        :param blocking_policy: The policy of the resources that are not loaded, or None to load everything.
+        :type blocking_policy: Optional[BrowserBlockingPolicy]
+        :param capture_requests: Whether the requests of the browser are captured, using the selenium-wire driver.
+        :type capture_requests: bool
+        :param profile_directory: The persistent profile directory (created if absent), or None for a temporary
+        profile.
+        :type profile_directory: Optional[str]
         :raise FilenameNotFoundError: If the geckodriver executable is not found.
         :raise selenium.common.exceptions.WebDriverException: If there's a problem initializing the service object or
         the webdriver object.
@@ -51,29 +100,110 @@ class FirefoxHeadlessWebDriver:
             raise
         gecko_driver_file = result[0]
         self.gecko_driver_path = str(gecko_driver_file)     # abs path
-        options = Options()
-        options.headless = True
-        self.options = options
+        self.blocking_policy = BrowserBlockingPolicy.disabled() if blocking_policy is None else blocking_policy
+        self.capture_requests = capture_requests
+        self.profile_directory = profile_directory
+        self.startup_times = list()
+        self.fetched_bytes = 0
+        self.resources_count = 0
+        self.cached_resources_count = 0
+        if profile_directory is not None:
+            Path(profile_directory).mkdir(parents=True, exist_ok=True)
+        self.options = self.new_options()
         try:
             self.service = Service(self.gecko_driver_path)
         except selenium.common.exceptions.WebDriverException:
             raise
         try:
-            self.driver = webdriver.Firefox(service=self.service, options=self.options)
+            self.driver = self.new_driver()
         except selenium.common.exceptions.WebDriverException:
             raise
         self.driver.set_page_load_timeout(self.time_out_in_seconds)       # [s]
+        self.driver.set_script_timeout(self.time_out_in_seconds)       # [s]
+
+    def new_options(self) -> Options:
+        """
+        Creates the options of the browser: headless, with the preferences of the blocking policy and, if there is a
+        persistent profile directory, with its disk cache enabled.
+
+        :return: The options.
+        :rtype: selenium.webdriver.firefox.options.Options
+        """
+        options = Options()
+        options.headless = True
+        self.blocking_policy.apply_to_options(options, block_hosts_with_proxy_autoconfig=not self.capture_requests)
+        if self.profile_directory is not None:
+            options.add_argument('-profile')
+            options.add_argument(self.profile_directory)
+            options.set_preference('browser.cache.disk.enable', True)
+            options.set_preference('browser.cache.disk.smart_size.enabled', False)
+            options.set_preference('browser.cache.disk.capacity', self.disk_cache_capacity_in_kilobytes)
+        return options
+
+    def new_driver(self):
+        """
+        Starts a Firefox webdriver with the service and the options of this object: the plain Selenium one, or the
+        selenium-wire one (with bounded storage and the request interceptor of the blocking policy) if the requests
+        should be captured. If the persistent profile can't be used, the webdriver is started with a temporary profile
+        (and the profile directory is dropped). The time the start took is saved.
+
+        :raise selenium.common.exceptions.WebDriverException: If there's a problem initializing the webdriver object.
+        :return: The webdriver.
+        :rtype: selenium.webdriver.Firefox or seleniumwire.webdriver.Firefox
+        """
+        start = time.perf_counter()
+        try:
+            driver = self._start_driver()
+        except selenium.common.exceptions.WebDriverException as e:
+            if self.profile_directory is None:
+                raise
+            print(f"!!! profile '{self.profile_directory}' not usable, temporary profile used: {str(e)} !!!")
+            self.profile_directory = None
+            self.options = self.new_options()
+            self.service = Service(self.gecko_driver_path)
+            driver = self._start_driver()
+        self.startup_times.append(time.perf_counter() - start)
+        return driver
+
+    def _start_driver(self):
+        if not self.capture_requests:
+            return webdriver.Firefox(service=self.service, options=self.options)
+        seleniumwire_options = {
+            'request_storage': 'memory',
+            'request_storage_max_size': self.max_stored_requests
+        }
+        driver = seleniumwire_webdriver.Firefox(service=self.service, options=self.options, seleniumwire_options=seleniumwire_options)
+        if not self.blocking_policy.is_disabled():
+            driver.request_interceptor = self.blocking_policy.request_interceptor
+        return driver
+
+    def count_page_transfer(self) -> None:
+        """
+        Adds the bytes transferred for the page loaded (document and resources, as the Resource Timing of the page
+        reports them) to the counters of this object, with the number of resources and of the ones that came from the
+        cache. With a page load strategy that returns at DOMContentLoaded, the resources still loading are not
+        counted.
+
+        """
+        try:
+            fetched, resources, cached = self.driver.execute_script(FirefoxHeadlessWebDriver.PAGE_TRANSFER_SCRIPT)
+        except (selenium.common.exceptions.WebDriverException, TypeError, ValueError):
+            return
+        self.fetched_bytes = self.fetched_bytes + int(fetched)
+        self.resources_count = self.resources_count + int(resources)
+        self.cached_resources_count = self.cached_resources_count + int(cached)
 
     def close(self) -> None:
         """
-        Shutdown seleniumwire and then quit the webdriver.
+        Quit the webdriver (and shutdown seleniumwire, if used).
 
         """
-        self.driver.quit()      # shutdown selenium-wire and then quit the webdriver
+        self.driver.quit()      # shutdown selenium-wire (if used) and then quit the webdriver
 
     def close_and_reopen(self) -> None:
         """
-        Shutdown seleniumwire, quits the webdriver and then re-instantiate the option object and the Firefox webdriver.
+        Quits the webdriver (and shutdown seleniumwire, if used) and then re-instantiate the option object and the
+        Firefox webdriver.
 
         """
         self.close()
@@ -82,10 +212,11 @@ class FirefoxHeadlessWebDriver:
         except selenium.common.exceptions.WebDriverException:
             raise
         try:
-            self.driver = webdriver.Firefox(service=self.service, options=self.options)
+            self.driver = self.new_driver()
         except selenium.common.exceptions.WebDriverException:
             raise
         self.driver.set_page_load_timeout(self.time_out_in_seconds)  # [s]
+        self.driver.set_script_timeout(self.time_out_in_seconds)  # [s]
 
     @staticmethod
     def geckodriver_filename() -> str:
@@ -0,0 +1,276 @@
+import itertools
+import os
+import queue
+import statistics
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import selenium
+from entities.BrowserBlockingPolicy import BrowserBlockingPolicy
+from entities.FirefoxHeadlessWebDriver import FirefoxHeadlessWebDriver
+from exceptions.NoAvailableBrowserError import NoAvailableBrowserError
+
+
+class HeadlessBrowserPool:
+    """
+    This class represents a pool of warm headless browsers (all started when the pool is created) that can be used by
+    concurrent workers, one browser for each worker at a time.
+    The page load and the scripts executed by every task are bounded by the task timeout, and so is the wait for a
+    free browser. A browser is recycled (quit and started again) after a
+    configurable number of pages, to contain the memory growth of long sessions, and after a task that failed with a
+    WebDriver error, so that a hung or broken browser doesn't affect the next tasks; recycling a browser doesn't stall
+    the other workers.
+    Size and utilisation of the pool are exposed as metrics.
+
+    ...
+
+    Attributes
+    ----------
+    browsers : List[FirefoxHeadlessWebDriver]
+        All the browsers of the pool.
+    free_browsers : queue.Queue
+        The browsers not used by a worker.
+    browser_factory : Callable[[], FirefoxHeadlessWebDriver]
+        The function that starts a new browser, used when a browser can't be restarted.
+    max_pages_per_browser : int
+        Number of pages after which a browser is recycled.
+    task_timeout : float
+        Seconds before the page load (or a script executed) of a task, or the wait for a free browser, is given up.
+    pages_counts : Dict[int, int]
+        For each browser (by id), the number of pages loaded since it was (re)started.
+    metrics_lock : threading.Lock
+        Lock that keeps the metrics consistent.
+    created_at : float
+        When the pool was created (seconds, performance counter).
+    busy_count : int
+        Number of browsers used by a worker.
+    peak_busy_count : int
+        Maximum number of browsers used at the same time.
+    tasks_count : int
+        Number of tasks done.
+    failed_tasks_count : int
+        Number of tasks failed with a WebDriver error.
+    recycles_count : int
+        Number of browsers recycled.
+    busy_seconds : float
+        Total time the browsers were used by a worker.
+    acquired_at : Dict[int, float]
+        For each browser in use (by id), when it was taken.
+    """
+    def __init__(self, size: int, browser_factory: Callable[[], FirefoxHeadlessWebDriver], max_pages_per_browser: int = 50, task_timeout: float = FirefoxHeadlessWebDriver.time_out_in_seconds, browsers: Optional[List[FirefoxHeadlessWebDriver]] = None):
+        """
+        Initialize the object starting the browsers.
+
+        :param size: The number of browsers.
+        :type size: int
+        :param browser_factory: The function that starts a new browser.
+        :type browser_factory: Callable[[], FirefoxHeadlessWebDriver]
+        :param max_pages_per_browser: Number of pages after which a browser is recycled.
+        :type max_pages_per_browser: int
+        :param task_timeout: Seconds before the page load of a task is given up.
+        :type task_timeout: float
+        :param browsers: Browsers already started to be included in the pool (e.g. the one of the application).
+        :type browsers: Optional[List[FirefoxHeadlessWebDriver]]
+        :raise FilenameNotFoundError: If the geckodriver executable is not found.
+        :raise selenium.common.exceptions.WebDriverException: If a browser can't be started.
+        """
+        self.browser_factory = browser_factory
+        self.max_pages_per_browser = max_pages_per_browser
+        self.task_timeout = task_timeout
+        self.browsers = list() if browsers is None else list(browsers)
+        while len(self.browsers) < size:
+            self.browsers.append(browser_factory())
+        self.free_browsers = queue.Queue()
+        self.pages_counts = dict()
+        for browser in self.browsers:
+            self._set_task_timeout(browser)
+            self.pages_counts[id(browser)] = 0
+            self.free_browsers.put(browser)
+        self.metrics_lock = threading.Lock()
+        self.created_at = time.perf_counter()
+        self.busy_count = 0
+        self.peak_busy_count = 0
+        self.tasks_count = 0
+        self.failed_tasks_count = 0
+        self.recycles_count = 0
+        self.busy_seconds = 0.0
+        self.acquired_at = dict()
+
+    @staticmethod
+    def of_firefox_browsers(size: int, max_pages_per_browser: int = 50, task_timeout: float = FirefoxHeadlessWebDriver.time_out_in_seconds, browsers: Optional[List[FirefoxHeadlessWebDriver]] = None, blocking_policy: Optional[BrowserBlockingPolicy] = None, capture_requests=False, profiles_directory: Optional[str] = None, project_root_directory=Path.cwd()) -> 'HeadlessBrowserPool':
+        """
+        Creates a pool of Firefox headless browsers, using the geckodriver executable of the input folder.
+        With a profiles directory, every new browser has its own persistent profile (a profile can't be used by two
+        browsers at the same time) in the sub-directory of its slot: slot_0, slot_1, ... The slots of the browsers
+        already started are the first ones.
+
+        :param size: The number of browsers.
+        :type size: int
+        :param max_pages_per_browser: Number of pages after which a browser is recycled.
+        :type max_pages_per_browser: int
+        :param task_timeout: Seconds before the page load of a task is given up.
+        :type task_timeout: float
+        :param browsers: Browsers already started to be included in the pool.
+        :type browsers: Optional[List[FirefoxHeadlessWebDriver]]
+        :param blocking_policy: The policy of the resources that the new browsers don't load, or None to load
+        everything.
+        :type blocking_policy: Optional[BrowserBlockingPolicy]
+        :param capture_requests: Whether the requests of the new browsers are captured (selenium-wire driver).
+        :type capture_requests: bool
+        :param profiles_directory: The directory of the persistent profiles of the browsers, or None for temporary
+        profiles.
+        :type profiles_directory: Optional[str]
+        :param project_root_directory: The Path object pointing at the project root directory.
+        :type project_root_directory: Path
+        :raise FilenameNotFoundError: If the geckodriver executable is not found.
+        :raise selenium.common.exceptions.WebDriverException: If a browser can't be started.
+        :return: The pool.
+        :rtype: HeadlessBrowserPool
+        """
+        slots = itertools.count(0 if browsers is None else len(browsers))
+        slots_lock = threading.Lock()
+
+        def browser_factory() -> FirefoxHeadlessWebDriver:
+            profile_directory = None
+            if profiles_directory is not None:
+                with slots_lock:
+                    profile_directory = os.path.join(profiles_directory, f"slot_{next(slots)}")
+            return FirefoxHeadlessWebDriver(project_root_directory=project_root_directory, blocking_policy=blocking_policy, capture_requests=capture_requests, profile_directory=profile_directory)
+
+        return HeadlessBrowserPool(size, browser_factory, max_pages_per_browser=max_pages_per_browser, task_timeout=task_timeout, browsers=browsers)
+
+    def _set_task_timeout(self, browser: FirefoxHeadlessWebDriver) -> None:
+        """
+        Bounds the page loads and the scripts executed (e.g. by a WebDriverWait) of a browser with the task timeout.
+
+        :param browser: The browser.
+        :type browser: FirefoxHeadlessWebDriver
+        """
+        browser.driver.set_page_load_timeout(self.task_timeout)
+        browser.driver.set_script_timeout(self.task_timeout)
+
+    def acquire(self) -> FirefoxHeadlessWebDriver:
+        """
+        Takes a free browser, waiting for one (at most the task timeout) if they are all used.
+
+        :raise NoAvailableBrowserError: If the pool lost all its browsers or none became free in time.
+        :return: The browser.
+        :rtype: FirefoxHeadlessWebDriver
+        """
+        with self.metrics_lock:
+            if len(self.browsers) == 0:
+                raise NoAvailableBrowserError()
+        try:
+            browser = self.free_browsers.get(timeout=self.task_timeout)
+        except queue.Empty:
+            raise NoAvailableBrowserError(self.task_timeout)
+        with self.metrics_lock:
+            self.busy_count = self.busy_count + 1
+            self.peak_busy_count = max(self.peak_busy_count, self.busy_count)
+            self.acquired_at[id(browser)] = time.perf_counter()
+        return browser
+
+    def release(self, browser: FirefoxHeadlessWebDriver, failed: bool = False) -> None:
+        """
+        Gives back a browser taken with acquire() after loading a page, recycling it if it loaded the maximum number of
+        pages or if the task failed.
+
+        :param browser: The browser.
+        :type browser: FirefoxHeadlessWebDriver
+        :param failed: True if the task failed with a WebDriver error.
+        :type failed: bool
+        """
+        with self.metrics_lock:
+            acquired_at = self.acquired_at.pop(id(browser))
+        self.pages_counts[id(browser)] = self.pages_counts[id(browser)] + 1
+        recycle = failed or self.pages_counts[id(browser)] >= self.max_pages_per_browser
+        if recycle:
+            browser = self._recycle(browser)
+        with self.metrics_lock:
+            self.busy_count = self.busy_count - 1
+            self.busy_seconds = self.busy_seconds + time.perf_counter() - acquired_at
+            self.tasks_count = self.tasks_count + 1
+            if failed:
+                self.failed_tasks_count = self.failed_tasks_count + 1
+            if recycle:
+                self.recycles_count = self.recycles_count + 1
+        if browser is not None:
+            self.free_browsers.put(browser)
+
+    def _recycle(self, browser: FirefoxHeadlessWebDriver) -> Optional[FirefoxHeadlessWebDriver]:
+        """
+        Restarts a browser; if it can't be restarted, a new one replaces it. If neither can be started, the pool loses
+        the browser.
+
+        :param browser: The browser.
+        :type browser: FirefoxHeadlessWebDriver
+        :return: The restarted browser, or None if the pool lost it.
+        :rtype: Optional[FirefoxHeadlessWebDriver]
+        """
+        del self.pages_counts[id(browser)]
+        try:
+            browser.close_and_reopen()
+            restarted = browser
+        except selenium.common.exceptions.WebDriverException:
+            try:
+                restarted = self.browser_factory()
+            except Exception as e:
+                print(f"!!! headless browser lost: {str(e)} !!!")
+                restarted = None
+            with self.metrics_lock:
+                self.browsers.remove(browser)
+                if restarted is not None:
+                    self.browsers.append(restarted)
+        if restarted is not None:
+            self._set_task_timeout(restarted)
+            self.pages_counts[id(restarted)] = 0
+        return restarted
+
+    def get_metrics(self) -> Dict[str, object]:
+        """
+        Returns a consistent snapshot of the pool metrics.
+
+        :return: A dictionary with the size of the pool, the browsers in use (now and at most), the tasks done and
+        failed, the recycles, the utilisation (fraction of the time the browsers were in use since the pool was
+        created), the median time of the starts of the browsers and the bytes fetched for the pages (with the number
+        of resources and of the ones that came from the cache).
+        :rtype: Dict[str, object]
+        """
+        with self.metrics_lock:
+            elapsed = time.perf_counter() - self.created_at
+            size = len(self.browsers)
+            startup_times = [startup_time for browser in self.browsers for startup_time in browser.startup_times]
+            return {
+                'size': size,
+                'busy': self.busy_count,
+                'peak_busy': self.peak_busy_count,
+                'tasks_count': self.tasks_count,
+                'failed_tasks_count': self.failed_tasks_count,
+                'recycles_count': self.recycles_count,
+                'utilisation': 0.0 if size == 0 or elapsed <= 0 else min(1.0, self.busy_seconds / (size * elapsed)),
+                'median_startup_seconds': statistics.median(startup_times) if len(startup_times) > 0 else None,
+                'fetched_bytes': sum(browser.fetched_bytes for browser in self.browsers),
+                'resources_count': sum(browser.resources_count for browser in self.browsers),
+                'cached_resources_count': sum(browser.cached_resources_count for browser in self.browsers)
+            }
+
+    def close(self) -> None:
+        """
+        Quits all the browsers.
+
+        """
+        for browser in self.browsers:
+            try:
+                browser.close()
+            except selenium.common.exceptions.WebDriverException:
+                pass
+
+    def __len__(self) -> int:
+        """
+        Return the number of browsers.
+
+        :return: Object length.
+        :rtype: int
+        """
+        return len(self.browsers)
@@ -0,0 +1,557 @@
+import array
+import csv
+import hashlib
+import os
+import socket
+import struct
+from typing import Iterable, List, Optional, Tuple
+import numpy as np
+from entities.EntryIpAsDatabase import EntryIpAsDatabase
+from entities.IpAsColumnarIndexDiff import IpAsColumnarIndexDiff
+from entities.MappedStringTable import MappedStringTable
+
+
+class IpAsColumnarIndex:
+    """
+    This class represents the ip2asn database (https://iptoasn.com/) in columnar form: the start and end of the ranges
+    and the Autonomous System numbers are unsigned 32-bit integer arrays, while country codes and descriptions are
+    interned in side tables (every distinct string is stored once and the rows keep its index).
+    Ranges are sorted by start and don't overlap (as in the .tsv database), so lookups are binary searches over the
+    start array (numpy.searchsorted), for a single address or vectorized for a whole batch.
+    A secondary index groups the rows by Autonomous System number (as_order lists the rows sorted by Autonomous System
+    number, ties by start): the rows of an Autonomous System are a contiguous slice of it, found with a dictionary in
+    O(1) plus the size of the output, and per-AS aggregates are vectorized reductions over the slices.
+
+    ...
+
+    Attributes
+    ----------
+    starts : numpy.ndarray
+        The start of the ranges (uint32).
+    ends : numpy.ndarray
+        The end of the ranges (uint32).
+    as_numbers : numpy.ndarray
+        The Autonomous System numbers (uint32).
+    country_code_ids : numpy.ndarray
+        For each range, the index of its country code in the country_codes table (uint32).
+    description_ids : numpy.ndarray
+        For each range, the index of its description in the descriptions table (uint32).
+    country_codes : Union[List[str], MappedStringTable]
+        The distinct country codes.
+    descriptions : Union[List[str], MappedStringTable]
+        The distinct Autonomous System descriptions.
+    as_order : numpy.ndarray
+        The row indexes sorted by Autonomous System number, ties by start (uint32).
+    as_group_numbers : numpy.ndarray
+        The distinct Autonomous System numbers, sorted (uint32).
+    as_group_bounds : numpy.ndarray
+        The bounds of the slices of as_order (int64): the rows of the i-th Autonomous System are
+        as_order[as_group_bounds[i]:as_group_bounds[i+1]].
+    as_groups : Dict[int, int]
+        The position in as_group_numbers of every Autonomous System number.
+    materialized_entries : Dict[int, EntryIpAsDatabase]
+        The EntryIpAsDatabase objects already created, by row index, so that a row always returns the same object.
+    """
+    NOT_FOUND = -1
+    COMPILED_EXTENSION = '.idx'
+    COMPILED_MAGIC = b'IPASIDX\x02'
+    COMPILED_HEADER = struct.Struct('<8sqQ32sQQQQQ')   # magic, source mtime (ns), source size, source SHA-256, rows, country codes, country codes blob size, descriptions, descriptions blob size
+
+    def __init__(self, starts: np.ndarray, ends: np.ndarray, as_numbers: np.ndarray, country_code_ids: np.ndarray, description_ids: np.ndarray, country_codes: List[str], descriptions: List[str], as_order: Optional[np.ndarray] = None):
+        """
+        Initialize the object from the columns and build the Autonomous System number index. Rows must be sorted by
+        start.
+
+        :param starts: The start of the ranges.
+        :type starts: numpy.ndarray
+        :param ends: The end of the ranges.
+        :type ends: numpy.ndarray
+        :param as_numbers: The Autonomous System numbers.
+        :type as_numbers: numpy.ndarray
+        :param country_code_ids: The indexes in the country_codes table.
+        :type country_code_ids: numpy.ndarray
+        :param description_ids: The indexes in the descriptions table.
+        :type description_ids: numpy.ndarray
+        :param country_codes: The distinct country codes.
+        :type country_codes: List[str]
+        :param descriptions: The distinct descriptions.
+        :type descriptions: List[str]
+        :param as_order: The row indexes sorted by Autonomous System number (e.g. from a compiled file), or None to
+        compute them.
+        :type as_order: Optional[numpy.ndarray]
+        """
+        self.starts = starts
+        self.ends = ends
+        self.as_numbers = as_numbers
+        self.country_code_ids = country_code_ids
+        self.description_ids = description_ids
+        self.country_codes = country_codes
+        self.descriptions = descriptions
+        self.as_order = None
+        self.as_group_numbers = None
+        self.as_group_bounds = None
+        self.as_groups = dict()
+        self.build_as_number_index(as_order)
+        self.materialized_entries = dict()
+
+    def build_as_number_index(self, as_order: Optional[np.ndarray] = None) -> None:
+        """
+        Builds the Autonomous System number index: rows are (stably) sorted by Autonomous System number and the
+        boundaries of the runs of equal numbers are the slices of every Autonomous System.
+
+        :param as_order: The row indexes sorted by Autonomous System number, or None to compute them.
+        :type as_order: Optional[numpy.ndarray]
+        """
+        if as_order is None:
+            as_order = np.argsort(self.as_numbers, kind='stable').astype(np.uint32)
+        self.as_order = as_order
+        sorted_as_numbers = self.as_numbers[as_order]
+        if len(sorted_as_numbers) == 0:
+            self.as_group_bounds = np.zeros(1, dtype=np.int64)
+        else:
+            self.as_group_bounds = np.concatenate(([0], np.flatnonzero(sorted_as_numbers[1:] != sorted_as_numbers[:-1]) + 1, [len(sorted_as_numbers)])).astype(np.int64)
+        self.as_group_numbers = sorted_as_numbers[self.as_group_bounds[:-1]]
+        self.as_groups = {as_number: i for i, as_number in enumerate(self.as_group_numbers.tolist())}
+
+    @staticmethod
+    def from_rows(rows: Iterable[List[str]]) -> 'IpAsColumnarIndex':
+        """
+        Creates the index from the rows of the .tsv database. Rows that are not well-formatted (as described in
+        https://iptoasn.com/) are ignored, and rows are sorted by start if they aren't already. Rows are consumed one at
+        a time and the columns are accumulated in typed arrays (4 bytes per value), so rows can be streamed.
+
+        :param rows: The rows, each one as list of 5 strings.
+        :type rows: Iterable[List[str]]
+        :return: The index.
+        :rtype: IpAsColumnarIndex
+        """
+        starts = array.array('I')
+        ends = array.array('I')
+        as_numbers = array.array('I')
+        country_code_ids = array.array('I')
+        description_ids = array.array('I')
+        interned_country_codes = dict()
+        interned_descriptions = dict()
+        for row in rows:
+            if len(row) != 5:
+                continue
+            try:
+                start = IpAsColumnarIndex.parse_ip(row[0])
+                end = IpAsColumnarIndex.parse_ip(row[1])
+                as_number = int(row[2])
+            except ValueError:
+                continue
+            if as_number < 0 or as_number > 0xFFFFFFFF:
+                continue
+            starts.append(start)
+            ends.append(end)
+            as_numbers.append(as_number)
+            country_code_ids.append(interned_country_codes.setdefault(row[3], len(interned_country_codes)))
+            description_ids.append(interned_descriptions.setdefault(row[4], len(interned_descriptions)))
+        index = IpAsColumnarIndex(
+            np.frombuffer(starts, dtype=np.uint32) if len(starts) > 0 else np.empty(0, dtype=np.uint32),
+            np.frombuffer(ends, dtype=np.uint32) if len(ends) > 0 else np.empty(0, dtype=np.uint32),
+            np.frombuffer(as_numbers, dtype=np.uint32) if len(as_numbers) > 0 else np.empty(0, dtype=np.uint32),
+            np.frombuffer(country_code_ids, dtype=np.uint32) if len(country_code_ids) > 0 else np.empty(0, dtype=np.uint32),
+            np.frombuffer(description_ids, dtype=np.uint32) if len(description_ids) > 0 else np.empty(0, dtype=np.uint32),
+            list(interned_country_codes.keys()),
+            list(interned_descriptions.keys())
+        )
+        if len(index) > 1 and np.any(index.starts[1:] < index.starts[:-1]):
+            order = np.argsort(index.starts, kind='stable')
+            index.starts = index.starts[order]
+            index.ends = index.ends[order]
+            index.as_numbers = index.as_numbers[order]
+            index.country_code_ids = index.country_code_ids[order]
+            index.description_ids = index.description_ids[order]
+            index.build_as_number_index()
+        return index
+
+    @staticmethod
+    def from_tsv(filepath: str, column_separator='\t') -> 'IpAsColumnarIndex':
+        """
+        Creates the index reading the .tsv database file.
+
+        :param filepath: The path of the .tsv database.
+        :type filepath: str
+        :param column_separator: The character separator between every column-value of each entry.
+        :type column_separator: str
+        :raise OSError: If is there a problem opening the .tsv file.
+        :return: The index.
+        :rtype: IpAsColumnarIndex
+        """
+        with open(filepath, "r", encoding='utf-8') as f:
+            return IpAsColumnarIndex.from_rows(csv.reader(f, delimiter=column_separator, quotechar='"'))
+
+    @staticmethod
+    def from_tsv_with_compiled_cache(filepath: str, column_separator='\t') -> 'IpAsColumnarIndex':
+        """
+        Creates the index from the compiled (binary) file next to the .tsv database, which is memory-mapped: parsing is
+        avoided and processes that map the same file share its pages. The compiled file is keyed on the modification
+        time, size and SHA-256 hash of the .tsv file; if it is absent or stale it is rebuilt from the .tsv (the hash is
+        computed only if modification time or size changed, so a touched but identical .tsv doesn't cause a rebuild).
+
+        :param filepath: The path of the .tsv database.
+        :type filepath: str
+        :param column_separator: The character separator between every column-value of each entry.
+        :type column_separator: str
+        :raise OSError: If is there a problem opening the .tsv file.
+        :return: The index.
+        :rtype: IpAsColumnarIndex
+        """
+        compiled_filepath = filepath + IpAsColumnarIndex.COMPILED_EXTENSION
+        stat = os.stat(filepath)
+        key = IpAsColumnarIndex.read_compiled_key(compiled_filepath)
+        if key is not None:
+            mtime_ns, size, digest = key
+            if mtime_ns == stat.st_mtime_ns and size == stat.st_size:
+                return IpAsColumnarIndex.from_compiled(compiled_filepath)
+            if size == stat.st_size and digest == IpAsColumnarIndex.hash_file(filepath):
+                IpAsColumnarIndex.update_compiled_mtime(compiled_filepath, stat.st_mtime_ns)
+                return IpAsColumnarIndex.from_compiled(compiled_filepath)
+        digest = IpAsColumnarIndex.hash_file(filepath)
+        index = IpAsColumnarIndex.from_tsv(filepath, column_separator)
+        try:
+            index.write_compiled(compiled_filepath, stat.st_mtime_ns, stat.st_size, digest)
+        except OSError:
+            return index        # read-only folder: the parsed index is still valid
+        return IpAsColumnarIndex.from_compiled(compiled_filepath)
+
+    @staticmethod
+    def hash_file(filepath: str) -> bytes:
+        """
+        Computes the SHA-256 hash of a file.
+
+        :param filepath: The path of the file.
+        :type filepath: str
+        :raise OSError: If is there a problem opening the file.
+        :return: The digest.
+        :rtype: bytes
+        """
+        sha256 = hashlib.sha256()
+        with open(filepath, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                sha256.update(chunk)
+        return sha256.digest()
+
+    @staticmethod
+    def read_compiled_key(compiled_filepath: str) -> Optional[Tuple[int, int, bytes]]:
+        """
+        Reads the key of the .tsv file from which the compiled file was built.
+
+        :param compiled_filepath: The path of the compiled file.
+        :type compiled_filepath: str
+        :return: A tuple containing modification time (ns), size and SHA-256 hash of the .tsv file, or None if the
+        compiled file is absent or not valid.
+        :rtype: Optional[Tuple[int, int, bytes]]
+        """
+        try:
+            with open(compiled_filepath, 'rb') as f:
+                header = f.read(IpAsColumnarIndex.COMPILED_HEADER.size)
+        except OSError:
+            return None
+        if len(header) != IpAsColumnarIndex.COMPILED_HEADER.size:
+            return None
+        magic, mtime_ns, size, digest = IpAsColumnarIndex.COMPILED_HEADER.unpack(header)[0:4]
+        if magic != IpAsColumnarIndex.COMPILED_MAGIC:
+            return None
+        return mtime_ns, size, digest
+
+    @staticmethod
+    def update_compiled_mtime(compiled_filepath: str, mtime_ns: int) -> None:
+        """
+        Updates the modification time of the .tsv file saved in the compiled file (same content, touched .tsv file).
+
+        :param compiled_filepath: The path of the compiled file.
+        :type compiled_filepath: str
+        :param mtime_ns: The modification time in nanoseconds.
+        :type mtime_ns: int
+        """
+        try:
+            with open(compiled_filepath, 'r+b') as f:
+                f.seek(len(IpAsColumnarIndex.COMPILED_MAGIC))
+                f.write(struct.pack('<q', mtime_ns))
+        except OSError:
+            pass
+
+    def write_compiled(self, compiled_filepath: str, source_mtime_ns: int, source_size: int, source_digest: bytes) -> None:
+        """
+        Writes the index to a binary file that can be memory-mapped: a header followed by the columns (little-endian
+        uint32), the rows sorted by Autonomous System number and the string tables. The file is written aside and then renamed, so readers never see it partially
+        written.
+
+        :param compiled_filepath: The path of the compiled file.
+        :type compiled_filepath: str
+        :param source_mtime_ns: The modification time (ns) of the .tsv file.
+        :type source_mtime_ns: int
+        :param source_size: The size of the .tsv file.
+        :type source_size: int
+        :param source_digest: The SHA-256 hash of the .tsv file.
+        :type source_digest: bytes
+        :raise OSError: If the file can't be written.
+        """
+        country_code_offsets, country_codes_blob = MappedStringTable.encode(list(self.country_codes))
+        description_offsets, descriptions_blob = MappedStringTable.encode(list(self.descriptions))
+        header = IpAsColumnarIndex.COMPILED_HEADER.pack(IpAsColumnarIndex.COMPILED_MAGIC, source_mtime_ns, source_size, source_digest, len(self), len(country_code_offsets) - 1, len(country_codes_blob), len(description_offsets) - 1, len(descriptions_blob))
+        temporary_filepath = f"{compiled_filepath}.{os.getpid()}.tmp"
+        try:
+            with open(temporary_filepath, 'wb') as f:
+                f.write(header)
+                for column in (self.starts, self.ends, self.as_numbers, self.country_code_ids, self.description_ids, self.as_order, country_code_offsets, description_offsets):
+                    f.write(np.ascontiguousarray(column, dtype='<u4').tobytes())
+                f.write(country_codes_blob)
+                f.write(descriptions_blob)
+            os.replace(temporary_filepath, compiled_filepath)
+        except OSError:
+            try:
+                os.remove(temporary_filepath)
+            except OSError:
+                pass
+            raise
+
+    @staticmethod
+    def from_compiled(compiled_filepath: str) -> 'IpAsColumnarIndex':
+        """
+        Creates the index memory-mapping a compiled file (read-only): columns and string tables are views of the
+        mapping, nothing is parsed or sorted (only the boundaries of the Autonomous System slices are computed).
+
+        :param compiled_filepath: The path of the compiled file.
+        :type compiled_filepath: str
+        :raise OSError: If is there a problem opening the file.
+        :raise ValueError: If the file is not a valid compiled file.
+        :return: The index.
+        :rtype: IpAsColumnarIndex
+        """
+        mapping = np.memmap(compiled_filepath, dtype=np.uint8, mode='r')
+        header_size = IpAsColumnarIndex.COMPILED_HEADER.size
+        if len(mapping) < header_size:
+            raise ValueError(compiled_filepath)
+        magic, _, _, _, rows, country_codes, country_codes_blob_size, descriptions, descriptions_blob_size = IpAsColumnarIndex.COMPILED_HEADER.unpack(mapping[:header_size].tobytes())
+        if magic != IpAsColumnarIndex.COMPILED_MAGIC:
+            raise ValueError(compiled_filepath)
+        position = header_size
+
+        def take_uint32(count: int) -> np.ndarray:
+            nonlocal position
+            array = mapping[position:position + 4 * count].view('<u4')
+            position = position + 4 * count
+            return array
+
+        starts, ends, as_numbers, country_code_ids, description_ids, as_order = [take_uint32(rows) for _ in range(6)]
+        country_code_offsets = take_uint32(country_codes + 1)
+        description_offsets = take_uint32(descriptions + 1)
+        country_codes_blob = mapping[position:position + country_codes_blob_size]
+        position = position + country_codes_blob_size
+        descriptions_blob = mapping[position:position + descriptions_blob_size]
+        if position + descriptions_blob_size != len(mapping):
+            raise ValueError(compiled_filepath)
+        return IpAsColumnarIndex(starts, ends, as_numbers, country_code_ids, description_ids, MappedStringTable(country_code_offsets, country_codes_blob), MappedStringTable(description_offsets, descriptions_blob), as_order)
+
+    @staticmethod
+    def parse_ip(string: str) -> int:
+        """
+        Parses a dotted-quad IPv4 address to its integer value.
+
+        :param string: The IPv4 address.
+        :type string: str
+        :raise ValueError: If the string is not a valid IPv4 address.
+        :return: The integer value.
+        :rtype: int
+        """
+        if string.count('.') != 3:
+            raise ValueError(string)
+        try:
+            return struct.unpack('!I', socket.inet_aton(string))[0]
+        except OSError:
+            raise ValueError(string)
+
+    def lookup(self, ip: int) -> int:
+        """
+        Searches for the range containing the ip address.
+
+        :param ip: The ip address as integer.
+        :type ip: int
+        :return: The row index of the range, or NOT_FOUND.
+        :rtype: int
+        """
+        position = int(np.searchsorted(self.starts, np.uint32(ip), side='right')) - 1
+        if position >= 0 and ip <= int(self.ends[position]):
+            return position
+        return self.NOT_FOUND
+
+    def lookup_batch(self, ips: np.ndarray) -> np.ndarray:
+        """
+        Searches for the ranges containing every ip address of the array, with a single vectorized binary search.
+
+        :param ips: The ip addresses as integers.
+        :type ips: numpy.ndarray
+        :return: The row indexes of the ranges (NOT_FOUND where there is no range), one for each ip address.
+        :rtype: numpy.ndarray
+        """
+        ips = np.asarray(ips, dtype=np.uint32)
+        if len(self) == 0:
+            return np.full(len(ips), self.NOT_FOUND, dtype=np.int64)
+        positions = np.searchsorted(self.starts, ips, side='right').astype(np.int64) - 1
+        found = (positions >= 0) & (ips <= self.ends[np.clip(positions, 0, None)])
+        return np.where(found, positions, self.NOT_FOUND)
+
+    def rows_of_as_number(self, as_number: int) -> np.ndarray:
+        """
+        Returns the row indexes of the ranges announced by an Autonomous System.
+
+        :param as_number: The Autonomous System number.
+        :type as_number: int
+        :return: The row indexes.
+        :rtype: numpy.ndarray
+        """
+        try:
+            group = self.as_groups[as_number]
+        except KeyError:
+            return np.empty(0, dtype=np.uint32)
+        return self.as_order[self.as_group_bounds[group]:self.as_group_bounds[group + 1]]
+
+    def ranges_counts(self) -> np.ndarray:
+        """
+        Returns the number of ranges of every Autonomous System, aligned with as_group_numbers.
+
+        :return: The counts (int64).
+        :rtype: numpy.ndarray
+        """
+        return np.diff(self.as_group_bounds)
+
+    def address_spaces(self) -> np.ndarray:
+        """
+        Returns the number of addresses covered by the ranges of every Autonomous System, aligned with
+        as_group_numbers.
+
+        :return: The number of addresses (int64).
+        :rtype: numpy.ndarray
+        """
+        return self.reduce_by_as_number(self.ends.astype(np.int64) - self.starts.astype(np.int64) + 1)
+
+    def prefixes_counts(self) -> np.ndarray:
+        """
+        Returns the number of CIDR prefixes needed to cover the ranges of every Autonomous System, aligned with
+        as_group_numbers.
+
+        :return: The number of prefixes (int64).
+        :rtype: numpy.ndarray
+        """
+        return self.reduce_by_as_number(IpAsColumnarIndex.count_prefixes(self.starts, self.ends))
+
+    def reduce_by_as_number(self, values: np.ndarray) -> np.ndarray:
+        """
+        Sums a per-row column over the rows of every Autonomous System.
+
+        :param values: The values, one for each row.
+        :type values: numpy.ndarray
+        :return: The sums, aligned with as_group_numbers.
+        :rtype: numpy.ndarray
+        """
+        if len(self.as_group_numbers) == 0:
+            return np.empty(0, dtype=values.dtype)
+        return np.add.reduceat(values[self.as_order], self.as_group_bounds[:-1])
+
+    @staticmethod
+    def count_prefixes(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        """
+        Computes, for every range, the number of CIDR prefixes of its minimal decomposition (the one of
+        ipaddress.summarize_address_range), vectorized: at every step each range not fully covered yet consumes its
+        largest aligned block.
+
+        :param starts: The start of the ranges.
+        :type starts: numpy.ndarray
+        :param ends: The end of the ranges.
+        :type ends: numpy.ndarray
+        :return: The number of prefixes (int64), one for each range.
+        :rtype: numpy.ndarray
+        """
+        current = starts.astype(np.int64)
+        last = ends.astype(np.int64)
+        counts = np.zeros(len(current), dtype=np.int64)
+        active = current <= last
+        while np.any(active):
+            current_active = current[active]
+            alignment = current_active & -current_active
+            alignment[alignment == 0] = 1 << 32
+            remaining = last[active] - current_active + 1
+            largest_fitting = np.left_shift(1, np.frexp(remaining.astype(np.float64))[1].astype(np.int64) - 1)
+            current[active] = current_active + np.minimum(alignment, largest_fitting)
+            counts[active] = counts[active] + 1
+            active = current <= last
+        return counts
+
+    def diff(self, current: 'IpAsColumnarIndex') -> IpAsColumnarIndexDiff:
+        """
+        Compares this (previous) version of the database with the current one, vectorized: every row is matched with
+        the row of the current version with the same start (ranges don't overlap), and the two are the same if also
+        end, Autonomous System number, country code and description are equal.
+
+        :param current: The current version.
+        :type current: IpAsColumnarIndex
+        :return: The differences.
+        :rtype: IpAsColumnarIndexDiff
+        """
+        if len(current) == 0 or len(self) == 0:
+            return IpAsColumnarIndexDiff(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.arange(len(self), dtype=np.int64), np.arange(len(current), dtype=np.int64))
+        current_country_codes = {country_code: i for i, country_code in enumerate(current.country_codes)}
+        current_descriptions = {description: i for i, description in enumerate(current.descriptions)}
+        country_code_translation = np.array([current_country_codes.get(country_code, -1) for country_code in self.country_codes], dtype=np.int64)
+        description_translation = np.array([current_descriptions.get(description, -1) for description in self.descriptions], dtype=np.int64)
+        positions = np.minimum(np.searchsorted(current.starts, self.starts), len(current) - 1)
+        same = (current.starts[positions] == self.starts) & (current.ends[positions] == self.ends) & (current.as_numbers[positions] == self.as_numbers) & (country_code_translation[self.country_code_ids] == current.country_code_ids[positions]) & (description_translation[self.description_ids] == current.description_ids[positions])
+        unchanged_current_rows = positions[same].astype(np.int64)
+        added = np.ones(len(current), dtype=bool)
+        added[unchanged_current_rows] = False
+        return IpAsColumnarIndexDiff(np.flatnonzero(same), unchanged_current_rows, np.flatnonzero(~same), np.flatnonzero(added))
+
+    def inherit_entries(self, previous: 'IpAsColumnarIndex', diff: IpAsColumnarIndexDiff) -> None:
+        """
+        Takes the EntryIpAsDatabase objects already created by the previous version for its unchanged rows, so that
+        the same range keeps returning the same object across versions.
+
+        :param previous: The previous version.
+        :type previous: IpAsColumnarIndex
+        :param diff: The differences from the previous version to this one.
+        :type diff: IpAsColumnarIndexDiff
+        """
+        for previous_position, entry in list(previous.materialized_entries.items()):      # copy: lookups may add entries meanwhile
+            i = int(np.searchsorted(diff.unchanged_previous_rows, previous_position))
+            if i < len(diff.unchanged_previous_rows) and diff.unchanged_previous_rows[i] == previous_position:
+                self.materialized_entries.setdefault(int(diff.unchanged_current_rows[i]), entry)
+
+    def entry(self, position: int) -> EntryIpAsDatabase:
+        """
+        Returns the row as EntryIpAsDatabase object. Objects are created on demand and kept, so the same row returns
+        always the same object.
+
+        :param position: The row index.
+        :type position: int
+        :raise IndexError: If there is no such row.
+        :return: The entry.
+        :rtype: EntryIpAsDatabase
+        """
+        try:
+            return self.materialized_entries[position]
+        except KeyError:
+            pass
+        if position < 0 or position >= len(self):
+            raise IndexError(position)
+        entry = EntryIpAsDatabase([
+            socket.inet_ntoa(struct.pack('!I', int(self.starts[position]))),
+            socket.inet_ntoa(struct.pack('!I', int(self.ends[position]))),
+            str(int(self.as_numbers[position])),
+            self.country_codes[int(self.country_code_ids[position])],
+            self.descriptions[int(self.description_ids[position])]
+        ])
+        self.materialized_entries[position] = entry
+        return entry
+
+    def __len__(self) -> int:
+        """
+        Return the number of ranges.
+
+        :return: Object length.
+        :rtype: int
+        """
+        return len(self.starts)
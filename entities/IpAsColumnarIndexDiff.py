@@ -0,0 +1,57 @@
+import numpy as np
+
+
+class IpAsColumnarIndexDiff:
+    """
+    This class represents the differences between two versions of the columnar ip2asn database: which rows of the
+    previous version are still present (same range, Autonomous System number, country code and description) and where
+    they are in the current version, which rows were removed and which were added.
+
+    ...
+
+    Attributes
+    ----------
+    unchanged_previous_rows : numpy.ndarray
+        The row indexes, in the previous version, of the unchanged rows (sorted).
+    unchanged_current_rows : numpy.ndarray
+        The row indexes, in the current version, of the unchanged rows (aligned with unchanged_previous_rows).
+    removed_rows : numpy.ndarray
+        The row indexes, in the previous version, of the rows that are not in the current version.
+    added_rows : numpy.ndarray
+        The row indexes, in the current version, of the rows that were not in the previous version.
+    """
+    def __init__(self, unchanged_previous_rows: np.ndarray, unchanged_current_rows: np.ndarray, removed_rows: np.ndarray, added_rows: np.ndarray):
+        """
+        Initialize the object.
+
+        :param unchanged_previous_rows: The row indexes, in the previous version, of the unchanged rows.
+        :type unchanged_previous_rows: numpy.ndarray
+        :param unchanged_current_rows: The row indexes, in the current version, of the unchanged rows.
+        :type unchanged_current_rows: numpy.ndarray
+        :param removed_rows: The row indexes, in the previous version, of the removed rows.
+        :type removed_rows: numpy.ndarray
+        :param added_rows: The row indexes, in the current version, of the added rows.
+        :type added_rows: numpy.ndarray
+        """
+        self.unchanged_previous_rows = unchanged_previous_rows
+        self.unchanged_current_rows = unchanged_current_rows
+        self.removed_rows = removed_rows
+        self.added_rows = added_rows
+
+    def is_empty(self) -> bool:
+        """
+        Tells if the two versions have the same rows.
+
+        :return: True or False.
+        :rtype: bool
+        """
+        return len(self.removed_rows) == 0 and len(self.added_rows) == 0
+
+    def __str__(self) -> str:
+        """
+        Returns the string representation of the object.
+
+        :return: The string.
+        :rtype: str
+        """
+        return f"{len(self.unchanged_previous_rows)} unchanged, {len(self.added_rows)} added, {len(self.removed_rows)} removed"
@@ -1,13 +1,19 @@
 import csv
+import threading
+import time
 from pathlib import Path as PPath
 from typing import Iterable
+import dns.dnssec
+import dns.name
+from entities.DenialRanges import DenialRanges
 from entities.DomainName import DomainName
 from entities.paths.PathBuilder import PathBuilder
 from exceptions.FilenameNotFoundError import FilenameNotFoundError
 from exceptions.NoAvailablePathError import NoAvailablePathError
 from exceptions.NotResourceRecordTypeError import NotResourceRecordTypeError
 from exceptions.ReachedMaximumRecursivePathThresholdError import ReachedMaximumRecursivePathThresholdError
-from static_variables import OUTPUT_FOLDER_NAME, SNAPSHOTS_FOLDER_NAME, TEMP_DNS_CACHE, OUTPUT_DNS_CACHE_FILE_NAME
+from static_variables import OUTPUT_FOLDER_NAME, SNAPSHOTS_FOLDER_NAME, TEMP_DNS_CACHE, OUTPUT_DNS_CACHE_FILE_NAME, \
+    OUTPUT_DNS_NEGATIVE_CACHE_FILE_NAME
 from utils import file_utils, csv_utils, resource_records_utils
 from entities.RRecord import RRecord
 from entities.enums.TypesRR import TypesRR
@@ -36,19 +42,40 @@ class LocalDnsResolverCache:
     separator : str
         The character separator between all the attributes of a Resource Record object, used when logs are exported to
         file.
+    aggressive_negative_caching : bool
+        Flag that enables the aggressive use of DNSSEC-validated NSEC/NSEC3 records (RFC 8198) in the negative path:
+        when set, a name covered by a cached denial range is considered non-existent without querying.
+    nonexistent_dict : Dict[DomainName, float]
+        Data structure containing the names answered with NXDOMAIN, associated to their expiration time (seconds since
+        epoch). They are saved only with aggressive negative caching.
+    nsec_dict : Dict[dns.name.Name, DenialRanges]
+        Data structure that associates each zone to its cached NSEC ranges (keyed by owner name).
+    nsec3_dict : Dict[dns.name.Name, Dict[Tuple[bytes, int, int], DenialRanges]]
+        Data structure that associates each zone to its cached NSEC3 ranges (keyed by owner hash, data is the opt-out
+        flag), one chain for each hash parameters (salt, iterations, hash algorithm).
+    negative_lock : threading.Lock
+        Lock that serializes the use of the negative data structures above between the resolving threads.
     """
-    def __init__(self, separator=";"):
+    def __init__(self, separator=";", aggressive_negative_caching=False):
         """
         Instantiate the object initializing all the attributes defined above. You can set a personalized separator.
 
         :param separator: The character separator used when exporting the file. Default is a comma (;).
         :type separator: str
+        :param aggressive_negative_caching: Flag that enables the synthesis of non-existent names from cached NSEC/NSEC3
+        ranges.
+        :type aggressive_negative_caching: bool
         """
         self.cname_dict = dict()
         self.a_dict = dict()
         self.ns_dict = dict()
         self.mx_dict = dict()
         self.separator = separator
+        self.aggressive_negative_caching = aggressive_negative_caching
+        self.nonexistent_dict = dict()
+        self.nsec_dict = dict()
+        self.nsec3_dict = dict()
+        self.negative_lock = threading.Lock()
 
     def add_entry(self, entry: RRecord) -> None:
         """
@@ -106,6 +133,216 @@ class LocalDnsResolverCache:
         self.a_dict.clear()
         self.ns_dict.clear()
         self.mx_dict.clear()
+        self.nonexistent_dict.clear()
+        self.nsec_dict.clear()
+        self.nsec3_dict.clear()
+
+    def add_nonexistent_name(self, domain_name: DomainName, ttl: int) -> None:
+        """
+        Adds a name answered with NXDOMAIN, valid for ttl seconds.
+
+        :param domain_name: The non-existent domain name.
+        :type domain_name: DomainName
+        :param ttl: The negative TTL (seconds).
+        :type ttl: int
+        """
+        if ttl > 0:
+            with self.negative_lock:
+                self.nonexistent_dict[domain_name] = time.time() + ttl
+
+    def add_nsec_range(self, zone_name: DomainName, owner: dns.name.Name, next_name: dns.name.Name, ttl: int) -> None:
+        """
+        Adds (or replaces, if the owner is the same) a DNSSEC-validated NSEC range of a zone, valid for ttl seconds.
+        Names between owner and next name (in the DNSSEC canonical order) don't exist.
+
+        :param zone_name: The zone (signer) name.
+        :type zone_name: DomainName
+        :param owner: The owner name of the NSEC record.
+        :type owner: dns.name.Name
+        :param next_name: The next domain name field of the NSEC record.
+        :type next_name: dns.name.Name
+        :param ttl: The TTL of the range (seconds).
+        :type ttl: int
+        """
+        if ttl <= 0:
+            return
+        zone = dns.name.from_text(zone_name.string)
+        with self.negative_lock:
+            try:
+                ranges = self.nsec_dict[zone]
+            except KeyError:
+                ranges = DenialRanges()
+                self.nsec_dict[zone] = ranges
+            ranges.add(owner, next_name, ttl)
+
+    def add_nsec3_range(self, zone_name: DomainName, owner_hash: str, next_hash: str, salt: bytes, iterations: int, algorithm: int, opt_out: bool, ttl: int) -> None:
+        """
+        Adds (or replaces, if the owner is the same) a DNSSEC-validated NSEC3 range of a zone, valid for ttl seconds.
+        Hashes are in base32hex form.
+
+        :param zone_name: The zone (signer) name.
+        :type zone_name: DomainName
+        :param owner_hash: The hashed owner name (first label of the NSEC3 owner).
+        :type owner_hash: str
+        :param next_hash: The next hashed owner name.
+        :type next_hash: str
+        :param salt: The salt of the hash.
+        :type salt: bytes
+        :param iterations: The number of additional hash iterations.
+        :type iterations: int
+        :param algorithm: The hash algorithm.
+        :type algorithm: int
+        :param opt_out: The opt-out flag of the record.
+        :type opt_out: bool
+        :param ttl: The TTL of the range (seconds).
+        :type ttl: int
+        """
+        if ttl <= 0:
+            return
+        zone = dns.name.from_text(zone_name.string)
+        with self.negative_lock:
+            try:
+                chains = self.nsec3_dict[zone]
+            except KeyError:
+                chains = dict()
+                self.nsec3_dict[zone] = chains
+            try:
+                ranges = chains[(salt, iterations, algorithm)]
+            except KeyError:
+                ranges = DenialRanges()
+                chains[(salt, iterations, algorithm)] = ranges
+            ranges.add(owner_hash.upper(), next_hash.upper(), ttl, opt_out)
+
+    def is_known_nonexistent(self, domain_name: DomainName) -> bool:
+        """
+        Tells if the domain name is known to be non-existent: it was answered with NXDOMAIN and the negative TTL is not
+        expired (RFC 2308). If aggressive negative caching is enabled, it is also non-existent when an
+        ancestor was answered with NXDOMAIN (RFC 8020) or when it is covered by a cached NSEC/NSEC3 range together with
+        the wildcard of its closest encloser (RFC 8198). Only the zones that are suffixes of the name are looked up.
+
+        :param domain_name: The domain name.
+        :type domain_name: DomainName
+        :return: True or False.
+        :rtype: bool
+        """
+        now = time.time()
+        with self.negative_lock:
+            if self.__is_answered_nonexistent(domain_name, now):
+                return True
+            if not self.aggressive_negative_caching:
+                return False
+            for ancestor in domain_name.parse_subdomains(False, True, False):
+                if self.__is_answered_nonexistent(ancestor, now):
+                    return True
+            if len(self.nsec_dict) == 0 and len(self.nsec3_dict) == 0:
+                return False
+            name = dns.name.from_text(domain_name.string)
+            zone = name
+            while True:
+                if zone in self.nsec_dict and self.__is_denied_by_nsec(name, zone, self.nsec_dict[zone], now):
+                    return True
+                if zone in self.nsec3_dict:
+                    for (salt, iterations, algorithm), ranges in self.nsec3_dict[zone].items():
+                        if self.__is_denied_by_nsec3(name, zone, ranges, salt, iterations, algorithm, now):
+                            return True
+                if zone == dns.name.root:
+                    return False
+                zone = zone.parent()
+
+    def __is_answered_nonexistent(self, domain_name: DomainName, now: float) -> bool:
+        """
+        Tells if the domain name was answered with NXDOMAIN and the negative TTL is not expired; an expired name is
+        removed.
+
+        :param domain_name: The domain name.
+        :type domain_name: DomainName
+        :param now: The current time (seconds since epoch).
+        :type now: float
+        :return: True or False.
+        :rtype: bool
+        """
+        try:
+            expiration = self.nonexistent_dict[domain_name]
+        except KeyError:
+            return False
+        if expiration > now:
+            return True
+        del self.nonexistent_dict[domain_name]
+        return False
+
+    @staticmethod
+    def __is_denied_by_nsec(name: dns.name.Name, zone: dns.name.Name, ranges: DenialRanges, now: float) -> bool:
+        """
+        Tells if the name is proven non-existent by cached NSEC ranges: the name must be covered by a range and so must
+        be the wildcard at its closest encloser. A covered name whose range ends below it is an empty non-terminal: it
+        exists, without records (RFC 4035 section 3.1.3.2, RFC 8198 section 5.1).
+
+        :param name: The name.
+        :type name: dns.name.Name
+        :param zone: The zone name.
+        :type zone: dns.name.Name
+        :param ranges: The NSEC ranges of the zone.
+        :type ranges: DenialRanges
+        :param now: The current time (seconds since epoch).
+        :type now: float
+        :return: True or False.
+        :rtype: bool
+        """
+        covering = ranges.find_covering(name, now)
+        if covering is None or covering[1].is_subdomain(name):
+            return False
+        common_labels = max(name.fullcompare(covering[0])[2], name.fullcompare(covering[1])[2])
+        closest_encloser = name.split(common_labels)[1]
+        if not closest_encloser.is_subdomain(zone):
+            closest_encloser = zone
+        wildcard = dns.name.Name((b'*',) + closest_encloser.labels)
+        return ranges.find_covering(wildcard, now) is not None
+
+    @staticmethod
+    def __is_denied_by_nsec3(name: dns.name.Name, zone: dns.name.Name, ranges: DenialRanges, salt: bytes, iterations: int, algorithm: int, now: float) -> bool:
+        """
+        Tells if the name is proven non-existent by cached NSEC3 ranges of a hash chain (closest encloser proof of RFC
+        5155): an ancestor must match an NSEC3 owner, the next closer name must be covered by a range without opt-out
+        and the wildcard at the closest encloser must be covered too. Every name is hashed once.
+
+        :param name: The name.
+        :type name: dns.name.Name
+        :param zone: The zone name.
+        :type zone: dns.name.Name
+        :param ranges: The NSEC3 ranges of the zone with the hash parameters below.
+        :type ranges: DenialRanges
+        :param salt: The salt of the hash.
+        :type salt: bytes
+        :param iterations: The number of additional hash iterations.
+        :type iterations: int
+        :param algorithm: The hash algorithm.
+        :type algorithm: int
+        :param now: The current time (seconds since epoch).
+        :type now: float
+        :return: True or False.
+        :rtype: bool
+        """
+        def hash_of(n: dns.name.Name) -> str:
+            return dns.dnssec.nsec3_hash(n, salt, iterations, algorithm).upper()
+
+        def is_covered(n: dns.name.Name, allow_opt_out: bool) -> bool:
+            covering = ranges.find_covering(hash_of(n), now)
+            return covering is not None and (allow_opt_out or not covering[2])
+
+        if len(ranges) == 0:
+            return False
+        next_closer = name
+        candidate = name
+        while True:
+            if ranges.find(hash_of(candidate), now) is not None:
+                if candidate == name:
+                    return False        # the name exists
+                wildcard = dns.name.Name((b'*',) + candidate.labels)
+                return is_covered(next_closer, False) and is_covered(wildcard, True)
+            if candidate == zone:
+                return False
+            next_closer = candidate
+            candidate = candidate.parent()
 
     def lookup(self, domain_name: DomainName, type_rr: TypesRR) -> RRecord:
         """
@@ -324,6 +561,70 @@ class LocalDnsResolverCache:
         except (PermissionError, FileNotFoundError, OSError):
             raise
 
+    def load_negative_csv(self, path: str) -> None:
+        """
+        Method that loads from a .csv the names known to be non-existent (name and expiration time, seconds since
+        epoch). Expired and malformed lines are skipped.
+
+        :param path: Path of file to load, as absolute or relative path.
+        :type path: str
+        :raise PermissionError: If filepath points to a directory.
+        :raise FileNotFoundError: If it is impossible to open the file.
+        :raise OSError: If a general I/O error occurs.
+        """
+        now = time.time()
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            for row in csv.reader(f, dialect=f'{csv_utils.return_personalized_dialect_name(self.separator)}'):
+                try:
+                    expiration = float(row[1])
+                    if expiration > now:
+                        self.nonexistent_dict[DomainName(row[0])] = expiration
+                except (IndexError, ValueError):
+                    pass
+
+    def load_negative_csv_from_output_folder(self, filename=OUTPUT_DNS_NEGATIVE_CACHE_FILE_NAME, project_root_directory=PPath.cwd()) -> None:
+        """
+        Method that loads the names known to be non-existent exported from the previous execution in the output folder
+        of the project root directory (PRD).
+
+        :param filename: Name of the file with extension. Default is set in the OUTPUT_DNS_NEGATIVE_CACHE_FILE_NAME
+        variable.
+        :type filename: str
+        :param project_root_directory: Path of the project root.
+        :type project_root_directory: Path
+        :raise FilenameNotFoundError: If file with such filename doesn't exist.
+        :raise OSError: If a general I/O error occurs.
+        """
+        try:
+            result = file_utils.search_for_filename_in_subdirectory(OUTPUT_FOLDER_NAME, filename, project_root_directory)
+        except FilenameNotFoundError:
+            raise
+        self.load_negative_csv(str(result[0]))
+
+    def write_negative_to_csv_in_output_folder(self, filename=OUTPUT_DNS_NEGATIVE_CACHE_FILE_NAME, project_root_directory=PPath.cwd()) -> None:
+        """
+        Export the names known to be non-existent (not expired) to a .csv file in the output folder of the project
+        directory, together with their expiration time. NSEC/NSEC3 ranges are not exported.
+
+        :param filename: The personalized filename with extension. Default is set in the
+        OUTPUT_DNS_NEGATIVE_CACHE_FILE_NAME variable.
+        :type filename: str
+        :param project_root_directory: The Path object pointing at the project root directory.
+        :type project_root_directory: Path
+        :raises PermissionError: If filepath points to a directory.
+        :raises FileNotFoundError: If it is impossible to open the file.
+        :raises OSError: If a general I/O error occurs.
+        """
+        file = file_utils.set_file_in_folder(OUTPUT_FOLDER_NAME, filename, project_root_directory)
+        now = time.time()
+        with file.open('w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f, dialect=f'{csv_utils.return_personalized_dialect_name(self.separator)}')
+            with self.negative_lock:
+                nonexistent_names = list(self.nonexistent_dict.items())
+            for domain_name, expiration in nonexistent_names:
+                if expiration > now:
+                    writer.writerow([domain_name.string, str(expiration)])
+
     def take_temp_snapshot(self, project_root_directory=PPath.cwd()) -> None:
         """
         Method that copies the current state of the cache in the SNAPSHOTS folder.
@@ -0,0 +1,182 @@
+import hashlib
+import re
+import time
+from html.parser import HTMLParser
+from typing import List, Set, Tuple
+from urllib.parse import urljoin
+import requests
+from entities.MainFrameScript import MainFrameScript
+from static_variables import MAX_LANDING_HTML_CHARACTERS, MAX_LANDING_HTML_READ_SECONDS
+
+
+class MainFrameScriptsHtmlParser(HTMLParser):
+    """
+    This class represents a streaming parser (the html can be fed in chunks, as it is downloaded) of the html of a page
+    that extracts the script (html element) of the main frame as the browser finds them in the initial html: the
+    scripts in iframe, template and noscript (html elements) are excluded and the src attributes are resolved as
+    absolute urls against the url of the page (or its base html element).
+    It also tells if the page appears to inject scripts dynamically, so that the scripts found in the initial html may
+    not be all the scripts of the page: an inline script that creates script elements, writes in the document or
+    imports modules, or a meta refresh (the browser would land somewhere else).
+
+    ...
+
+    Attributes
+    ----------
+    scripts : List[Tuple[str, Optional[str]]]
+        The src (as written) and integrity attributes of the scripts with a src, in document order.
+    inline_scripts_count : int
+        Number of scripts without a src.
+    dynamic_scripts_suspected : bool
+        Whether the page appears to inject scripts dynamically.
+    base_href : str or None
+        The href of the first base (html element), if present.
+    excluded_depth : int
+        The depth of the nested iframe, template and noscript (html elements) while they are parsed, 0 outside them.
+    inline_script : List[str] or None
+        The text pieces of the inline script being parsed.
+    truncated : bool
+        Whether the html was not fed completely (e.g. because too long or the download failed).
+    etag : str or None
+        The ETag header of the response of the html, if present.
+    body_hash : str or None
+        The SHA-256 hash (hex) of the html, if it was fed completely.
+    """
+    EXCLUDED_TAGS = ('iframe', 'template', 'noscript')
+    DYNAMIC_INJECTION_PATTERN = re.compile(r"createElement\s*\(\s*['\"`]script['\"`]|document\s*\.\s*write(?:ln)?\s*\(|\bimport\s*\(|\.getScript\s*\(|\brequire\s*\(\s*\[", re.IGNORECASE)
+
+    def __init__(self):
+        """
+        Initialize the object.
+
+        """
+        super().__init__(convert_charrefs=True)
+        self.scripts = list()
+        self.inline_scripts_count = 0
+        self.dynamic_scripts_suspected = False
+        self.base_href = None
+        self.excluded_depth = 0
+        self.inline_script = None
+        self.truncated = False
+        self.etag = None
+        self.body_hash = None
+
+    def handle_starttag(self, tag: str, attrs: List[tuple]) -> None:
+        if tag in MainFrameScriptsHtmlParser.EXCLUDED_TAGS:
+            self.excluded_depth = self.excluded_depth + 1
+            return
+        if self.excluded_depth > 0:
+            return
+        attributes = dict(attrs)
+        if tag == 'script':
+            src = attributes.get('src')
+            if src is None or src.strip() == '':
+                self.inline_scripts_count = self.inline_scripts_count + 1
+                self.inline_script = list()
+            else:
+                integrity = attributes.get('integrity')
+                self.scripts.append((src.strip(), None if integrity is None or integrity == '' else integrity))
+        elif tag == 'base' and self.base_href is None and attributes.get('href') is not None:
+            self.base_href = attributes.get('href').strip()
+        elif tag == 'meta' and (attributes.get('http-equiv') or '').lower() == 'refresh':
+            self.dynamic_scripts_suspected = True
+
+    def handle_startendtag(self, tag: str, attrs: List[tuple]) -> None:
+        self.handle_starttag(tag, attrs)        # as the browser, a '/>' doesn't close non-void elements
+        if tag == 'script':
+            self._close_inline_script()
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in MainFrameScriptsHtmlParser.EXCLUDED_TAGS:
+            if self.excluded_depth > 0:
+                self.excluded_depth = self.excluded_depth - 1
+        elif tag == 'script':
+            self._close_inline_script()
+
+    def handle_data(self, data: str) -> None:
+        if self.inline_script is not None:
+            self.inline_script.append(data)
+
+    def _close_inline_script(self) -> None:
+        if self.inline_script is not None and MainFrameScriptsHtmlParser.DYNAMIC_INJECTION_PATTERN.search(''.join(self.inline_script)):
+            self.dynamic_scripts_suspected = True
+        self.inline_script = None
+
+    def close(self) -> None:
+        super().close()
+        self._close_inline_script()
+
+    def feed_response(self, response: requests.Response, max_html_characters=MAX_LANDING_HTML_CHARACTERS, max_read_seconds=MAX_LANDING_HTML_READ_SECONDS, chunk_size=1 << 14) -> None:
+        """
+        Feeds the html body of a streamed response, chunk by chunk, then closes the parser and the response. If the
+        response is not html, nothing is fed; if the body is longer than max_html_characters characters, its download
+        lasts more than max_read_seconds seconds (checked after every chunk, each read of the socket is bounded by the
+        read timeout of the request) or it fails, the truncated attribute is set. The validators of the html are set
+        too: the ETag header of the response and, if the body is read completely, its hash.
+
+        :param response: The streamed response.
+        :type response: requests.Response
+        :param max_html_characters: Maximum number of characters fed.
+        :type max_html_characters: int
+        :param max_read_seconds: Maximum number of seconds spent reading the body.
+        :type max_read_seconds: float
+        :param chunk_size: Size of the chunks read.
+        :type chunk_size: int
+        """
+        content_type = response.headers.get('content-type', '')
+        if 'html' not in content_type.lower():
+            self.truncated = True
+            response.close()
+            return
+        self.etag = response.headers.get('etag')
+        if response.encoding is None:
+            response.encoding = 'utf-8'
+        fed = 0
+        body_hash = hashlib.sha256()
+        deadline = time.monotonic() + max_read_seconds
+        try:
+            for chunk in response.iter_content(chunk_size=chunk_size, decode_unicode=True):
+                self.feed(chunk)
+                body_hash.update(chunk.encode('utf-8', errors='surrogatepass'))
+                fed = fed + len(chunk)
+                if fed > max_html_characters or time.monotonic() > deadline:
+                    self.truncated = True
+                    break
+            self.close()
+            if not self.truncated:
+                self.body_hash = body_hash.hexdigest()
+        except requests.exceptions.RequestException:
+            self.truncated = True
+        finally:
+            response.close()
+
+    def get_main_frame_scripts(self, page_url: str) -> Set[MainFrameScript]:
+        """
+        Returns the scripts of the main frame, with the src attributes resolved as the browser does (against the base
+        html element, if present, or against the url of the page).
+
+        :param page_url: The url of the page.
+        :type page_url: str
+        :return: A set of scripts.
+        :rtype: Set[MainFrameScript]
+        """
+        base_url = page_url if self.base_href is None else urljoin(page_url, self.base_href)
+        return set(MainFrameScript(urljoin(base_url, src), integrity) for src, integrity in self.scripts)
+
+    @staticmethod
+    def parse(html: str, page_url: str) -> Tuple[Set[MainFrameScript], bool]:
+        """
+        Parses the html of a page.
+
+        :param html: The html.
+        :type html: str
+        :param page_url: The url of the page.
+        :type page_url: str
+        :return: A tuple with the scripts of the main frame and whether the page appears to inject scripts
+        dynamically.
+        :rtype: Tuple[Set[MainFrameScript], bool]
+        """
+        parser = MainFrameScriptsHtmlParser()
+        parser.feed(html)
+        parser.close()
+        return parser.get_main_frame_scripts(page_url), parser.dynamic_scripts_suspected
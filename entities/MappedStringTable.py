@@ -0,0 +1,68 @@
+import numpy as np
+
+
+class MappedStringTable:
+    """
+    This class represents a read-only table of strings stored as a single UTF-8 blob plus the offsets of every string
+    (offsets[i] is the start of the i-th string, offsets[i+1] its end). Both can be views of a memory-mapped file:
+    strings are decoded only when they are accessed.
+
+    ...
+
+    Attributes
+    ----------
+    offsets : numpy.ndarray
+        The offsets of the strings in the blob (uint32), one more than the number of strings.
+    blob : numpy.ndarray
+        The UTF-8 encoded strings, one after the other (uint8).
+    """
+    def __init__(self, offsets: np.ndarray, blob: np.ndarray):
+        """
+        Initialize the object.
+
+        :param offsets: The offsets of the strings in the blob.
+        :type offsets: numpy.ndarray
+        :param blob: The UTF-8 encoded strings.
+        :type blob: numpy.ndarray
+        """
+        self.offsets = offsets
+        self.blob = blob
+
+    @staticmethod
+    def encode(strings: list) -> tuple:
+        """
+        Encodes a list of strings as offsets and blob.
+
+        :param strings: The strings.
+        :type strings: List[str]
+        :return: A tuple containing the offsets (uint32 array) and the blob (bytes).
+        :rtype: Tuple[numpy.ndarray, bytes]
+        """
+        encoded = [string.encode('utf-8') for string in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.uint32)
+        if len(encoded) > 0:
+            np.cumsum([len(e) for e in encoded], out=offsets[1:])
+        return offsets, b''.join(encoded)
+
+    def __getitem__(self, index: int) -> str:
+        """
+        Returns the string at the index.
+
+        :param index: The index.
+        :type index: int
+        :raise IndexError: If there is no such string.
+        :return: The string.
+        :rtype: str
+        """
+        if index < 0 or index >= len(self):
+            raise IndexError(index)
+        return self.blob[int(self.offsets[index]):int(self.offsets[index + 1])].tobytes().decode('utf-8')
+
+    def __len__(self) -> int:
+        """
+        Return the number of strings.
+
+        :return: Object length.
+        :rtype: int
+        """
+        return len(self.offsets) - 1
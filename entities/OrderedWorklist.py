@@ -0,0 +1,143 @@
+import heapq
+import itertools
+from collections import deque
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+
+class OrderedWorklist:
+    """
+    This class represents a worklist of elements to be elaborated (e.g. the domain names of a zone dependencies
+    resolving): an element can be added only once (membership check is O(1) thanks to an insertion-ordered dictionary)
+    and elements can be added while the worklist is being iterated; iteration consumes the pending elements.
+    Without a priority function the pending elements are elaborated in insertion order (FIFO); with a priority function
+    the pending element with the lowest priority value is elaborated first, ties in insertion order. For domain names,
+    using the number of labels as priority elaborates parents before children, so more lookups hit the cache.
+    Elements must be hashable.
+
+    ...
+
+    Attributes
+    ----------
+    elements : Dict[Any, None]
+        Every element ever added, in insertion order.
+    priority : Optional[Callable[[Any], int]]
+        Function that computes the priority of an element (lower first), or None for FIFO order.
+    pending : Union[deque, List[Tuple[int, int, Any]]]
+        The elements not elaborated yet: a deque (FIFO order) or a heap of (priority, insertion counter, element).
+    counter : itertools.count
+        Counter of insertions, used to break ties in the heap.
+    """
+    def __init__(self, elements: Iterable = (), priority: Optional[Callable[[Any], int]] = None):
+        """
+        Initialize the worklist adding the elements in the given order.
+
+        :param elements: The initial elements.
+        :type elements: Iterable
+        :param priority: Function that computes the priority of an element (lower first), or None for FIFO order.
+        :type priority: Optional[Callable[[Any], int]]
+        """
+        self.elements = dict()
+        self.priority = priority
+        self.pending = deque() if priority is None else list()
+        self.counter = itertools.count()
+        self.add_all(elements)
+
+    @staticmethod
+    def by_labels_count(domain_names: Iterable = ()) -> 'OrderedWorklist':
+        """
+        Creates a worklist of domain names where parents are elaborated before their children (fewer labels first).
+
+        :param domain_names: The initial domain names.
+        :type domain_names: Iterable[DomainName]
+        :return: The worklist.
+        :rtype: OrderedWorklist
+        """
+        return OrderedWorklist(domain_names, priority=lambda domain_name: domain_name.string.count('.'))
+
+    def add(self, element) -> bool:
+        """
+        Adds an element if it was never added before.
+
+        :param element: The element.
+        :type element: Any
+        :return: True if the element was added, False if it was already present.
+        :rtype: bool
+        """
+        if element in self.elements:
+            return False
+        self.elements[element] = None
+        if self.priority is None:
+            self.pending.append(element)
+        else:
+            heapq.heappush(self.pending, (self.priority(element), next(self.counter), element))
+        return True
+
+    def add_all(self, elements: Iterable) -> None:
+        """
+        Adds every element of the iterable that was never added before.
+
+        :param elements: The elements.
+        :type elements: Iterable
+        """
+        for element in elements:
+            self.add(element)
+
+    def pop(self):
+        """
+        Removes and returns the next pending element.
+
+        :raise IndexError: If there is no pending element.
+        :return: The element.
+        :rtype: Any
+        """
+        if self.priority is None:
+            return self.pending.popleft()
+        return heapq.heappop(self.pending)[2]
+
+    def has_pending(self) -> bool:
+        """
+        Tells if there are elements not elaborated yet.
+
+        :return: True or False.
+        :rtype: bool
+        """
+        return len(self.pending) > 0
+
+    def to_list(self) -> List:
+        """
+        Returns every element ever added, in insertion order.
+
+        :return: The list of elements.
+        :rtype: List
+        """
+        return list(self.elements.keys())
+
+    def __contains__(self, element) -> bool:
+        """
+        Tells if the element was ever added, in O(1).
+
+        :param element: The element.
+        :type element: Any
+        :return: True or False.
+        :rtype: bool
+        """
+        return element in self.elements
+
+    def __iter__(self) -> Iterator:
+        """
+        Iterates over the pending elements, consuming them; elements added during the iteration are elaborated too.
+
+        :return: The iterator.
+        :rtype: Iterator
+        """
+        while self.has_pending():
+            yield self.pop()
+
+    def __len__(self) -> int:
+        """
+        Return the number of elements ever added.
+
+        :return: Object length.
+        :rtype: int
+        """
+        return len(self.elements)
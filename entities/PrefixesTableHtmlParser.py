@@ -0,0 +1,149 @@
+from html.parser import HTMLParser
+from typing import List, Optional
+
+
+class PrefixesTableHtmlParser(HTMLParser):
+    """
+    This class represents a streaming parser of the html of the ROV page that extracts the text of the cells of the
+    pfx_table_div (id of html element) table: the rows of its tbody (or, if the html has no tbody, the rows outside
+    thead and tfoot), each as the list of the texts of its td cells. The text of a cell is normalized as the one read
+    by the browser (whitespaces collapsed and stripped). Cells and rows whose closing tag is omitted are closed as the
+    browser would do.
+
+    ...
+
+    Attributes
+    ----------
+    div_found : bool
+        Whether the pfx_table_div (id of html element) was found.
+    table_found : bool
+        Whether a table (html element) was found in the div.
+    tbody_found : bool
+        Whether the table has a tbody (html element).
+    rows : List[List[str]]
+        The texts of the cells of the tbody rows.
+    headless_rows : List[List[str]]
+        The texts of the cells of the rows outside thead, tbody and tfoot.
+    div_depth : int
+        The depth of the nested divs in the pfx_table_div while it is parsed, 0 outside it.
+    table_depth : int
+        The depth of the nested tables in the table while it is parsed, 0 outside it.
+    section : str or None
+        The table section (thead, tbody, tfoot) being parsed.
+    row : List[str] or None
+        The row being parsed.
+    cell : List[str] or None
+        The text pieces of the cell being parsed.
+    """
+    def __init__(self):
+        """
+        Initialize the object.
+
+        """
+        super().__init__(convert_charrefs=True)
+        self.div_found = False
+        self.table_found = False
+        self.tbody_found = False
+        self.rows = list()
+        self.headless_rows = list()
+        self.div_depth = 0
+        self.table_depth = 0
+        self.section = None
+        self.row = None
+        self.cell = None
+
+    def handle_starttag(self, tag: str, attrs: List[tuple]) -> None:
+        if self.div_depth == 0:
+            if tag == 'div' and not self.div_found and ('id', 'pfx_table_div') in attrs:
+                self.div_found = True
+                self.div_depth = 1
+            return
+        if tag == 'div':
+            self.div_depth = self.div_depth + 1
+        elif tag == 'table':
+            if self.table_depth == 0 and self.table_found:
+                return      # only the first table is read, as find_element does
+            self.table_found = True
+            self.table_depth = self.table_depth + 1
+        elif self.table_depth != 1:
+            return
+        elif tag in ('thead', 'tbody', 'tfoot'):
+            self._close_row()
+            self.section = tag
+            if tag == 'tbody':
+                self.tbody_found = True
+        elif tag == 'tr':
+            self._close_row()
+            self.row = list()
+        elif tag in ('td', 'th'):
+            self._close_cell()
+            if self.row is None:
+                self.row = list()
+            self.cell = list() if tag == 'td' else None
+
+    def handle_endtag(self, tag: str) -> None:
+        if self.div_depth == 0:
+            return
+        if tag == 'div':
+            self.div_depth = self.div_depth - 1
+        elif tag == 'table' and self.table_depth > 0:
+            if self.table_depth == 1:
+                self._close_row()
+                self.section = None
+            self.table_depth = self.table_depth - 1
+        elif self.table_depth != 1:
+            return
+        elif tag in ('thead', 'tbody', 'tfoot'):
+            self._close_row()
+            self.section = None
+        elif tag == 'tr':
+            self._close_row()
+        elif tag in ('td', 'th'):
+            self._close_cell()
+
+    def handle_data(self, data: str) -> None:
+        if self.cell is not None and self.table_depth == 1:
+            self.cell.append(data)
+
+    def _close_cell(self) -> None:
+        if self.cell is not None:
+            self.row.append(' '.join(''.join(self.cell).split()))
+        self.cell = None
+
+    def _close_row(self) -> None:
+        self._close_cell()
+        if self.row is not None:
+            if self.section == 'tbody':
+                self.rows.append(self.row)
+            elif self.section is None:
+                self.headless_rows.append(self.row)
+        self.row = None
+
+    def get_rows(self) -> Optional[List[List[str]]]:
+        """
+        Returns the rows of the table, or None if the div or the table are not present.
+
+        :return: The texts of the td cells of every row of the table body.
+        :rtype: Optional[List[List[str]]]
+        """
+        if not self.div_found or not self.table_found:
+            return None
+        if self.tbody_found:
+            return self.rows
+        return self.headless_rows
+
+    @staticmethod
+    def parse(html: str) -> Optional[List[List[str]]]:
+        """
+        Parses the html of a page.
+
+        :param html: The html.
+        :type html: str
+        :return: The texts of the td cells of every row of the table body, or None if the div or the table are not
+        present.
+        :rtype: Optional[List[List[str]]]
+        """
+        parser = PrefixesTableHtmlParser()
+        parser.feed(html)
+        parser.close()
+        return parser.get_rows()
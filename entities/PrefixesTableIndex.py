@@ -0,0 +1,117 @@
+import ipaddress
+from typing import List, Optional
+import numpy as np
+from entities.RowPrefixesTable import RowPrefixesTable
+
+
+class PrefixesTableIndex:
+    """
+    This class represents an index of the rows of a prefixes table (ROV page) for longest-prefix match: the IPv4
+    prefixes are grouped by prefix length and, for each length, stored in a hash table (network address -> row) and as
+    a sorted array of network addresses. An address is matched probing its masked value from the longest length to the
+    shortest one, so the most specific prefix is returned in at most 33 probes; a batch of addresses is matched with one
+    vectorized binary search per length.
+    If the same prefix appears in more rows, the first one is kept.
+
+    ...
+
+    Attributes
+    ----------
+    rows : List[RowPrefixesTable]
+        The indexed rows.
+    lengths : List[int]
+        The prefix lengths present in the table, from the longest to the shortest.
+    networks_per_length : Dict[int, Dict[int, RowPrefixesTable]]
+        For each prefix length, the rows by network address (as integer).
+    sorted_networks_per_length : Dict[int, numpy.ndarray]
+        For each prefix length, the sorted network addresses (uint32).
+    sorted_rows_per_length : Dict[int, List[RowPrefixesTable]]
+        For each prefix length, the rows aligned with sorted_networks_per_length.
+    """
+    def __init__(self, rows: List[RowPrefixesTable]):
+        """
+        Initialize the object indexing the rows. Rows with IPv6 prefixes are ignored.
+
+        :param rows: The rows of the prefixes table.
+        :type rows: List[RowPrefixesTable]
+        """
+        self.rows = rows
+        self.networks_per_length = dict()
+        for row in rows:
+            if row.prefix.version != 4:
+                continue
+            self.networks_per_length.setdefault(row.prefix.prefixlen, dict()).setdefault(int(row.prefix.network_address), row)
+        self.lengths = sorted(self.networks_per_length.keys(), reverse=True)
+        self.sorted_networks_per_length = dict()
+        self.sorted_rows_per_length = dict()
+        for length in self.lengths:
+            networks = sorted(self.networks_per_length[length].keys())
+            self.sorted_networks_per_length[length] = np.array(networks, dtype=np.uint32)
+            self.sorted_rows_per_length[length] = [self.networks_per_length[length][network] for network in networks]
+
+    @staticmethod
+    def netmask(length: int) -> int:
+        """
+        Returns the netmask of a prefix length as integer.
+
+        :param length: The prefix length.
+        :type length: int
+        :return: The netmask.
+        :rtype: int
+        """
+        return (0xFFFFFFFF << (32 - length)) & 0xFFFFFFFF
+
+    def longest_prefix_match(self, ip: ipaddress.IPv4Address) -> Optional[RowPrefixesTable]:
+        """
+        Returns the row with the most specific prefix containing the address.
+
+        :param ip: The ip address.
+        :type ip: ipaddress.IPv4Address
+        :return: The row, or None if no prefix contains the address (or it is not an IPv4 address).
+        :rtype: Optional[RowPrefixesTable]
+        """
+        if ip.version != 4:
+            return None
+        ip_int = int(ip)
+        for length in self.lengths:
+            row = self.networks_per_length[length].get(ip_int & PrefixesTableIndex.netmask(length))
+            if row is not None:
+                return row
+        return None
+
+    def longest_prefix_matches(self, ips: List[ipaddress.IPv4Address]) -> List[Optional[RowPrefixesTable]]:
+        """
+        Returns, for every address, the row with the most specific prefix containing it: for each prefix length (from
+        the longest) the addresses not matched yet are masked and searched among the networks with a single vectorized
+        binary search.
+
+        :param ips: The ip addresses.
+        :type ips: List[ipaddress.IPv4Address]
+        :return: For each ip address (same order) the row, or None if no prefix contains the address (or it is not an
+        IPv4 address).
+        :rtype: List[Optional[RowPrefixesTable]]
+        """
+        result = [None] * len(ips)
+        pending = np.array([i for i, ip in enumerate(ips) if ip.version == 4], dtype=np.int64)
+        ip_ints = np.fromiter((int(ip) if ip.version == 4 else 0 for ip in ips), dtype=np.uint32, count=len(ips))
+        for length in self.lengths:
+            if len(pending) == 0:
+                break
+            networks = self.sorted_networks_per_length[length]
+            masked = ip_ints[pending] & np.uint32(PrefixesTableIndex.netmask(length))
+            positions = np.minimum(np.searchsorted(networks, masked), len(networks) - 1)
+            found = networks[positions] == masked
+            rows = self.sorted_rows_per_length[length]
+            for i, position in zip(pending[found].tolist(), positions[found].tolist()):
+                result[i] = rows[position]
+            pending = pending[~found]
+        return result
+
+    def __len__(self) -> int:
+        """
+        Return the number of indexed prefixes.
+
+        :return: Object length.
+        :rtype: int
+        """
+        return sum(len(networks) for networks in self.networks_per_length.values())
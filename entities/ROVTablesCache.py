@@ -0,0 +1,173 @@
+import json
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+from entities.RowPrefixesTable import RowPrefixesTable
+from entities.SqliteCache import SqliteCache
+from static_variables import OUTPUT_FOLDER_NAME, OUTPUT_ROV_TABLES_CACHE_FILE_NAME
+from utils import file_utils
+
+
+class ROVTablesCache(SqliteCache):
+    """
+    This class represents a persistent cache (SQLite file) of the prefixes tables of the ROV pages, one for each
+    autonomous system, so that later executions don't load again the pages seen in the previous ones.
+    A table is fresh for ttl seconds since it was fetched: a fresh table is used as is. A stale table is kept with the
+    validators (ETag and Last-Modified headers) of the response it came from, so that it can be revalidated with a
+    conditional request instead of being downloaded and parsed again. The file is discarded when its format version is
+    not the current one (see SqliteCache).
+
+    ...
+
+    Attributes
+    ----------
+    ttl : float
+        Seconds a table is fresh for.
+    hits_count : int
+        Number of fresh tables returned.
+    misses_count : int
+        Number of lookups of tables absent or stale.
+    revalidations_count : int
+        Number of stale tables confirmed by the site (and made fresh again).
+    """
+    FORMAT_VERSION = 1
+    TABLES = {'rov_tables': 'as_number INTEGER PRIMARY KEY, fetched_at REAL NOT NULL, etag TEXT, last_modified TEXT, rows TEXT NOT NULL'}
+    DEFAULT_TTL = 24 * 60 * 60
+
+    def __init__(self, filepath: str, ttl: float = DEFAULT_TTL):
+        """
+        Initialize the object opening (or creating) the SQLite file.
+
+        :param filepath: The path of the SQLite file.
+        :type filepath: str
+        :param ttl: Seconds a table is fresh for.
+        :type ttl: float
+        :raise sqlite3.Error: If the file can't be opened or it's not a SQLite file.
+        """
+        self.ttl = ttl
+        self.hits_count = 0
+        self.misses_count = 0
+        self.revalidations_count = 0
+        super().__init__(filepath)
+
+    @staticmethod
+    def from_output_folder(ttl: float = DEFAULT_TTL, project_root_directory=Path.cwd()) -> 'ROVTablesCache':
+        """
+        Opens (or creates) the cache file in the output folder of the project root directory.
+
+        :param ttl: Seconds a table is fresh for.
+        :type ttl: float
+        :param project_root_directory: The Path object pointing at the project root directory.
+        :type project_root_directory: Path
+        :raise sqlite3.Error: If the file can't be opened or it's not a SQLite file.
+        :return: The cache.
+        :rtype: ROVTablesCache
+        """
+        file = file_utils.set_file_in_folder(OUTPUT_FOLDER_NAME, OUTPUT_ROV_TABLES_CACHE_FILE_NAME, project_root_directory)
+        return ROVTablesCache(str(file), ttl)
+
+    @staticmethod
+    def serialize(rows: List[RowPrefixesTable]) -> str:
+        """
+        Returns the rows as JSON string: a list of the string representations of the cells of each row, as they are
+        read in the page.
+
+        :param rows: The rows.
+        :type rows: List[RowPrefixesTable]
+        :return: The JSON string.
+        :rtype: str
+        """
+        return json.dumps([['AS'+str(row.as_number), row.prefix.compressed, str(row.span), row.cc, str(row.visibility), row.rov_state.to_string(), row.roas] for row in rows])
+
+    @staticmethod
+    def deserialize(string: str) -> List[RowPrefixesTable]:
+        """
+        Returns the rows of a JSON string written by serialize().
+
+        :param string: The JSON string.
+        :type string: str
+        :raise ValueError: If the string is not well-formatted.
+        :return: The rows.
+        :rtype: List[RowPrefixesTable]
+        """
+        return [RowPrefixesTable(*cells) for cells in json.loads(string)]
+
+    def get(self, as_number: int) -> Optional[List[RowPrefixesTable]]:
+        """
+        Returns the table of the autonomous system if it is fresh. Hits and misses are counted.
+
+        :param as_number: The autonomous system number.
+        :type as_number: int
+        :return: The rows, or None if the table is absent or stale.
+        :rtype: Optional[List[RowPrefixesTable]]
+        """
+        with self.lock:
+            record = self.connection.execute('SELECT fetched_at, rows FROM rov_tables WHERE as_number = ?', (as_number,)).fetchone()
+            if record is None or time.time() - record[0] > self.ttl:
+                self.misses_count = self.misses_count + 1
+                return None
+            try:
+                rows = ROVTablesCache.deserialize(record[1])
+            except ValueError:
+                self.misses_count = self.misses_count + 1
+                return None
+            self.hits_count = self.hits_count + 1
+            return rows
+
+    def get_validators(self, as_number: int) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Returns the validators of the response the (fresh or stale) table of the autonomous system came from.
+
+        :param as_number: The autonomous system number.
+        :type as_number: int
+        :return: The ETag and Last-Modified headers (None if absent).
+        :rtype: Tuple[Optional[str], Optional[str]]
+        """
+        with self.lock:
+            record = self.connection.execute('SELECT etag, last_modified FROM rov_tables WHERE as_number = ?', (as_number,)).fetchone()
+        if record is None:
+            return None, None
+        return record[0], record[1]
+
+    def revalidate(self, as_number: int) -> Optional[List[RowPrefixesTable]]:
+        """
+        Makes the table of the autonomous system fresh again, after the site confirmed it didn't change.
+
+        :param as_number: The autonomous system number.
+        :type as_number: int
+        :return: The rows, or None if the table is absent (or not well-formatted).
+        :rtype: Optional[List[RowPrefixesTable]]
+        """
+        with self.lock:
+            record = self.connection.execute('SELECT rows FROM rov_tables WHERE as_number = ?', (as_number,)).fetchone()
+            if record is None:
+                return None
+            try:
+                rows = ROVTablesCache.deserialize(record[0])
+            except ValueError:
+                return None
+            self.connection.execute('UPDATE rov_tables SET fetched_at = ? WHERE as_number = ?', (time.time(), as_number))
+            self.connection.commit()
+            self.revalidations_count = self.revalidations_count + 1
+            return rows
+
+    def put(self, as_number: int, rows: List[RowPrefixesTable], etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """
+        Saves the table of the autonomous system, fresh from now.
+
+        :param as_number: The autonomous system number.
+        :type as_number: int
+        :param rows: The rows.
+        :type rows: List[RowPrefixesTable]
+        :param etag: The ETag header of the response the table came from.
+        :type etag: Optional[str]
+        :param last_modified: The Last-Modified header of the response the table came from.
+        :type last_modified: Optional[str]
+        """
+        string = ROVTablesCache.serialize(rows)
+        with self.lock:
+            self.connection.execute('INSERT OR REPLACE INTO rov_tables (as_number, fetched_at, etag, last_modified, rows) VALUES (?, ?, ?, ?, ?)', (as_number, time.time(), etag, last_modified, string))
+            self.connection.commit()
+
+    def _summary(self) -> str:
+        return f"{self.hits_count} hits, {self.misses_count} misses, {self.revalidations_count} revalidated"
@@ -0,0 +1,196 @@
+import json
+import time
+from pathlib import Path
+from typing import List, Optional, Set, Tuple
+from entities.MainFrameScript import MainFrameScript
+from entities.SqliteCache import SqliteCache
+from static_variables import OUTPUT_FOLDER_NAME, OUTPUT_SCRIPT_DEPENDENCIES_CACHE_FILE_NAME
+from utils import file_utils
+
+
+class ScriptDependenciesCache(SqliteCache):
+    """
+    This class represents a persistent cache (SQLite file) of the script dependencies resolving, so that later
+    executions don't repeat the work done for what didn't change:
+    - the scripts found by the headless browser in a landing page, keyed by the landing url: they are used only if the
+    page didn't change, that is if the html of the landing (downloaded anyway) has the same ETag header or the same
+    SHA-256 hash of the one the scripts came from;
+    - the landing (landing url, redirection path and HSTS) of a script site through a scheme, keyed by the url of the
+    script site with the scheme, since the script sites are repeated across the web sites (CDNs, analytics).
+    An entry is used for at most its ttl seconds since it was saved (never, with a negative ttl). The file is discarded
+    when its format version is not the current one (see SqliteCache).
+
+    ...
+
+    Attributes
+    ----------
+    scripts_ttl : float
+        Seconds the scripts of a landing page are used for (if the page didn't change).
+    landing_ttl : float
+        Seconds the landing of a script site is used for.
+    scripts_hits_count : int
+        Number of scripts of unchanged landing pages returned.
+    scripts_misses_count : int
+        Number of lookups of scripts absent, stale or of changed landing pages.
+    landing_hits_count : int
+        Number of landings of script sites returned.
+    landing_misses_count : int
+        Number of lookups of landings of script sites absent or stale.
+    """
+    FORMAT_VERSION = 1
+    TABLES = {
+        'landing_page_scripts': 'landing_url TEXT PRIMARY KEY, saved_at REAL NOT NULL, etag TEXT, body_hash TEXT, scripts TEXT NOT NULL',
+        'script_site_landings': 'site_url TEXT PRIMARY KEY, saved_at REAL NOT NULL, landing_url TEXT NOT NULL, redirection_path TEXT NOT NULL, hsts INTEGER NOT NULL'
+    }
+    DEFAULT_SCRIPTS_TTL = 7 * 24 * 60 * 60
+    DEFAULT_LANDING_TTL = 24 * 60 * 60
+
+    def __init__(self, filepath: str, scripts_ttl: float = DEFAULT_SCRIPTS_TTL, landing_ttl: float = DEFAULT_LANDING_TTL):
+        """
+        Initialize the object opening (or creating) the SQLite file.
+
+        :param filepath: The path of the SQLite file.
+        :type filepath: str
+        :param scripts_ttl: Seconds the scripts of a landing page are used for (if the page didn't change).
+        :type scripts_ttl: float
+        :param landing_ttl: Seconds the landing of a script site is used for.
+        :type landing_ttl: float
+        :raise sqlite3.Error: If the file can't be opened or it's not a SQLite file.
+        """
+        self.scripts_ttl = scripts_ttl
+        self.landing_ttl = landing_ttl
+        self.scripts_hits_count = 0
+        self.scripts_misses_count = 0
+        self.landing_hits_count = 0
+        self.landing_misses_count = 0
+        super().__init__(filepath)
+
+    @staticmethod
+    def from_output_folder(scripts_ttl: float = DEFAULT_SCRIPTS_TTL, landing_ttl: float = DEFAULT_LANDING_TTL, project_root_directory=Path.cwd()) -> 'ScriptDependenciesCache':
+        """
+        Opens (or creates) the cache file in the output folder of the project root directory.
+
+        :param scripts_ttl: Seconds the scripts of a landing page are used for (if the page didn't change).
+        :type scripts_ttl: float
+        :param landing_ttl: Seconds the landing of a script site is used for.
+        :type landing_ttl: float
+        :param project_root_directory: The Path object pointing at the project root directory.
+        :type project_root_directory: Path
+        :raise sqlite3.Error: If the file can't be opened or it's not a SQLite file.
+        :return: The cache.
+        :rtype: ScriptDependenciesCache
+        """
+        file = file_utils.set_file_in_folder(OUTPUT_FOLDER_NAME, OUTPUT_SCRIPT_DEPENDENCIES_CACHE_FILE_NAME, project_root_directory)
+        return ScriptDependenciesCache(str(file), scripts_ttl, landing_ttl)
+
+    def get_landing_page_scripts(self, landing_url: str, etag: Optional[str], body_hash: Optional[str]) -> Optional[Set[MainFrameScript]]:
+        """
+        Returns the scripts of the landing page if they are not stale and the page didn't change: the ETag header (or,
+        if the validators of the two responses are not comparable, the hash of the html) of the current landing must
+        be the one the scripts came from. Hits and misses are counted.
+
+        :param landing_url: The landing url.
+        :type landing_url: str
+        :param etag: The ETag header of the current landing, if present.
+        :type etag: Optional[str]
+        :param body_hash: The hash of the html of the current landing, if the html was read completely.
+        :type body_hash: Optional[str]
+        :return: The scripts, or None if they are absent, stale or the page changed.
+        :rtype: Optional[Set[MainFrameScript]]
+        """
+        with self.lock:
+            record = self.connection.execute('SELECT saved_at, etag, body_hash, scripts FROM landing_page_scripts WHERE landing_url = ?', (landing_url,)).fetchone()
+            if record is None or time.time() - record[0] > self.scripts_ttl or not ScriptDependenciesCache.is_unchanged(record[1], record[2], etag, body_hash):
+                self.scripts_misses_count = self.scripts_misses_count + 1
+                return None
+            try:
+                scripts = set(MainFrameScript(src, integrity) for src, integrity in json.loads(record[3]))
+            except (ValueError, TypeError):
+                self.scripts_misses_count = self.scripts_misses_count + 1
+                return None
+            self.scripts_hits_count = self.scripts_hits_count + 1
+            return scripts
+
+    @staticmethod
+    def is_unchanged(saved_etag: Optional[str], saved_body_hash: Optional[str], etag: Optional[str], body_hash: Optional[str]) -> bool:
+        """
+        Tells if a page is the same it was, from the validators of the saved response and of the current one: the
+        ETag headers are compared if both are present, otherwise the hashes of the html.
+
+        :param saved_etag: The ETag header of the saved response.
+        :type saved_etag: Optional[str]
+        :param saved_body_hash: The hash of the html of the saved response.
+        :type saved_body_hash: Optional[str]
+        :param etag: The ETag header of the current response.
+        :type etag: Optional[str]
+        :param body_hash: The hash of the html of the current response.
+        :type body_hash: Optional[str]
+        :return: True if the page didn't change; False if it changed or it can't be told.
+        :rtype: bool
+        """
+        if saved_etag is not None and etag is not None:
+            return saved_etag == etag
+        return saved_body_hash is not None and saved_body_hash == body_hash
+
+    def put_landing_page_scripts(self, landing_url: str, etag: Optional[str], body_hash: Optional[str], scripts: Set[MainFrameScript]) -> None:
+        """
+        Saves the scripts of the landing page with the validators of the landing they came from; nothing is saved if
+        there is no validator (the page could never be told unchanged).
+
+        :param landing_url: The landing url.
+        :type landing_url: str
+        :param etag: The ETag header of the landing, if present.
+        :type etag: Optional[str]
+        :param body_hash: The hash of the html of the landing, if the html was read completely.
+        :type body_hash: Optional[str]
+        :param scripts: The scripts.
+        :type scripts: Set[MainFrameScript]
+        """
+        if etag is None and body_hash is None:
+            return
+        string = json.dumps(sorted([script.src, script.integrity] for script in scripts))
+        with self.lock:
+            self.connection.execute('INSERT OR REPLACE INTO landing_page_scripts (landing_url, saved_at, etag, body_hash, scripts) VALUES (?, ?, ?, ?, ?)', (landing_url, time.time(), etag, body_hash, string))
+            self.connection.commit()
+
+    def get_script_site_landing(self, site_url: str) -> Optional[Tuple[str, List[str], bool]]:
+        """
+        Returns the landing of the script site through a scheme if it is not stale. Hits and misses are counted.
+
+        :param site_url: The url of the script site, with the scheme.
+        :type site_url: str
+        :return: A tuple with the landing url, the redirection path and the HSTS validity, or None if absent or stale.
+        :rtype: Optional[Tuple[str, List[str], bool]]
+        """
+        with self.lock:
+            record = self.connection.execute('SELECT saved_at, landing_url, redirection_path, hsts FROM script_site_landings WHERE site_url = ?', (site_url,)).fetchone()
+            if record is None or time.time() - record[0] > self.landing_ttl:
+                self.landing_misses_count = self.landing_misses_count + 1
+                return None
+            try:
+                redirection_path = json.loads(record[2])
+            except ValueError:
+                self.landing_misses_count = self.landing_misses_count + 1
+                return None
+            self.landing_hits_count = self.landing_hits_count + 1
+            return record[1], redirection_path, bool(record[3])
+
+    def put_script_site_landing(self, site_url: str, landing_url: str, redirection_path: List[str], hsts: bool) -> None:
+        """
+        Saves the landing of the script site through a scheme.
+
+        :param site_url: The url of the script site, with the scheme.
+        :type site_url: str
+        :param landing_url: The landing url.
+        :type landing_url: str
+        :param redirection_path: The redirection path.
+        :type redirection_path: List[str]
+        :param hsts: The HSTS validity.
+        :type hsts: bool
+        """
+        with self.lock:
+            self.connection.execute('INSERT OR REPLACE INTO script_site_landings (site_url, saved_at, landing_url, redirection_path, hsts) VALUES (?, ?, ?, ?, ?)', (site_url, time.time(), landing_url, json.dumps(redirection_path), 1 if hsts else 0))
+            self.connection.commit()
+
+    def _summary(self) -> str:
+        return f"landing pages scripts: {self.scripts_hits_count} hits, {self.scripts_misses_count} misses; script sites landings: {self.landing_hits_count} hits, {self.landing_misses_count} misses"
@@ -0,0 +1,86 @@
+import abc
+import sqlite3
+import threading
+from abc import ABC
+from typing import Dict
+
+
+class SqliteCache(ABC):
+    """
+    This class represents a persistent cache kept in a SQLite file, shared by the caches of the application: it opens
+    (or creates) the file, discards its tables when the format version of the file (PRAGMA user_version) is not the
+    current one and creates the missing ones. The subclasses declare their tables and format version, and keep their
+    own hits and misses counters.
+    The object can be shared between threads: every use of the connection (and of the counters) must hold the lock.
+
+    ...
+
+    Attributes
+    ----------
+    filepath : str
+        The path of the SQLite file.
+    connection : sqlite3.Connection
+        The connection to the SQLite file.
+    lock : threading.Lock
+        Lock that serializes the use of the connection and of the counters.
+    """
+    FORMAT_VERSION = 1
+    TABLES: Dict[str, str] = dict()     # table name -> column definitions
+
+    def __init__(self, filepath: str):
+        """
+        Initialize the object opening (or creating) the SQLite file.
+
+        :param filepath: The path of the SQLite file.
+        :type filepath: str
+        :raise sqlite3.Error: If the file can't be opened or it's not a SQLite file.
+        """
+        self.filepath = filepath
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(filepath, check_same_thread=False)
+        version = self.connection.execute('PRAGMA user_version').fetchone()[0]
+        if version != self.FORMAT_VERSION:
+            for table in self.TABLES:
+                self.connection.execute(f'DROP TABLE IF EXISTS {table}')
+            self.connection.execute(f'PRAGMA user_version = {self.FORMAT_VERSION}')
+        for table, columns in self.TABLES.items():
+            self.connection.execute(f'CREATE TABLE IF NOT EXISTS {table} ({columns})')
+        self.connection.commit()
+
+    @abc.abstractmethod
+    def _summary(self) -> str:
+        """
+        Returns a human-readable summary of the counters, while the lock is held.
+
+        :return: The summary.
+        :rtype: str
+        """
+        raise NotImplementedError
+
+    def get_summary(self) -> str:
+        """
+        Returns a human-readable summary of the counters.
+
+        :return: The summary.
+        :rtype: str
+        """
+        with self.lock:
+            return self._summary()
+
+    def close(self) -> None:
+        """
+        Closes the connection to the SQLite file.
+
+        """
+        with self.lock:
+            self.connection.close()
+
+    def __len__(self) -> int:
+        """
+        Return the number of entries saved in all the tables, stale or not.
+
+        :return: Object length.
+        :rtype: int
+        """
+        with self.lock:
+            return sum(self.connection.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0] for table in self.TABLES)
@@ -0,0 +1,214 @@
+import csv
+import ipaddress
+import json
+from pathlib import Path
+from typing import Iterable, List, Tuple
+from entities.PrefixesTableIndex import PrefixesTableIndex
+from entities.enums.ROVStates import ROVStates
+from exceptions.FilenameNotFoundError import FilenameNotFoundError
+from static_variables import INPUT_FOLDER_NAME, RPKI_VRPS_CSV_FILE_NAME, RPKI_VRPS_JSON_FILE_NAME
+from utils import file_utils
+
+
+class ValidatedRoaPayloadsIndex:
+    """
+    This class represents an index of the Validated ROA Payloads (VRPs) exported by a RPKI relying party (Routinator,
+    rpki-client, ...) as CSV or JSON, used to compute the Route Origin Validation state of a (prefix, origin Autonomous
+    System) pair locally, as described in RFC 6811:
+        - UNK (NotFound) if no VRP covers the prefix;
+        - VLD (Valid) if a covering VRP has the origin Autonomous System and a max length not shorter than the prefix;
+        - INV (Invalid) otherwise.
+    The VRPs are grouped by prefix length in hash tables (network address -> VRPs), so the covering VRPs of a prefix are
+    found probing its masked network address once per length. Only IPv4 VRPs are kept.
+
+    ...
+
+    Attributes
+    ----------
+    vrps_per_length : Dict[int, Dict[int, List[Tuple[int, int]]]]
+        For each prefix length, the (Autonomous System number, max length) pairs of the VRPs by network address (as
+        integer).
+    lengths : List[int]
+        The prefix lengths present, from the shortest to the longest.
+    vrps_count : int
+        The number of indexed VRPs.
+    """
+    def __init__(self, vrps: Iterable[Tuple[int, ipaddress.IPv4Network, int]]):
+        """
+        Initialize the object indexing the VRPs.
+
+        :param vrps: The VRPs as (Autonomous System number, prefix, max length) tuples; IPv6 prefixes are ignored.
+        :type vrps: Iterable[Tuple[int, ipaddress.IPv4Network, int]]
+        """
+        self.vrps_per_length = dict()
+        self.vrps_count = 0
+        for as_number, prefix, max_length in vrps:
+            if prefix.version != 4:
+                continue
+            self.vrps_per_length.setdefault(prefix.prefixlen, dict()).setdefault(int(prefix.network_address), list()).append((as_number, max_length))
+            self.vrps_count = self.vrps_count + 1
+        self.lengths = sorted(self.vrps_per_length.keys())
+
+    @staticmethod
+    def parse_vrp(as_number: str or int, prefix: str, max_length: str or int) -> Tuple[int, ipaddress.IPv4Network or ipaddress.IPv6Network, int]:
+        """
+        Parses a VRP from the values of an export: the Autonomous System number can have the 'AS' prefix and the max
+        length can be empty (meaning the prefix length).
+
+        :param as_number: The Autonomous System number.
+        :type as_number: str or int
+        :param prefix: The prefix.
+        :type prefix: str
+        :param max_length: The max length.
+        :type max_length: str or int
+        :raise ValueError: If a value is not well-formatted or the max length is shorter than the prefix length.
+        :return: The (Autonomous System number, prefix, max length) tuple.
+        :rtype: Tuple[int, ipaddress.IPv4Network or ipaddress.IPv6Network, int]
+        """
+        int_as_number = int(str(as_number).strip().upper().lstrip('AS'))
+        network = ipaddress.ip_network(prefix.strip())
+        int_max_length = network.prefixlen if str(max_length).strip() == '' else int(max_length)
+        if int_as_number < 0 or int_max_length < network.prefixlen or int_max_length > network.max_prefixlen:
+            raise ValueError(f"Not a valid VRP: {as_number}, {prefix}, {max_length}")
+        return int_as_number, network, int_max_length
+
+    @staticmethod
+    def from_csv(filepath: str) -> 'ValidatedRoaPayloadsIndex':
+        """
+        Reads a CSV export: the header has (at least) the 'ASN', 'IP Prefix' and 'Max Length' columns, as the ones of
+        Routinator and rpki-client.
+
+        :param filepath: The path of the .csv file.
+        :type filepath: str
+        :raise OSError: If is there a problem opening the file.
+        :raise ValueError: If the header misses a column or a row is not well-formatted.
+        :return: The index.
+        :rtype: ValidatedRoaPayloadsIndex
+        """
+        with open(filepath, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
+            header = [column.strip().lower() for column in next(reader, list())]
+            try:
+                as_number_column = next(i for i, column in enumerate(header) if column in ('asn', 'as', 'origin'))
+                prefix_column = next(i for i, column in enumerate(header) if 'prefix' in column)
+                max_length_column = next(i for i, column in enumerate(header) if column.replace(' ', '').replace('_', '') in ('maxlength', 'maxlen'))
+            except StopIteration:
+                raise ValueError(f"Not a VRP .csv header: {header}")
+            return ValidatedRoaPayloadsIndex(ValidatedRoaPayloadsIndex.parse_vrp(row[as_number_column], row[prefix_column], row[max_length_column]) for row in reader if len(row) > 0)
+
+    @staticmethod
+    def from_json(filepath: str) -> 'ValidatedRoaPayloadsIndex':
+        """
+        Reads a JSON export: an object with the 'roas' list of objects with the 'asn', 'prefix' and 'maxLength' keys, as
+        the ones of Routinator and rpki-client.
+
+        :param filepath: The path of the .json file.
+        :type filepath: str
+        :raise OSError: If is there a problem opening the file.
+        :raise ValueError: If the file is not well-formatted.
+        :return: The index.
+        :rtype: ValidatedRoaPayloadsIndex
+        """
+        with open(filepath, 'r', encoding='utf-8') as f:
+            document = json.load(f)
+        try:
+            roas = document['roas']
+            return ValidatedRoaPayloadsIndex([ValidatedRoaPayloadsIndex.parse_vrp(roa['asn'], roa['prefix'], roa.get('maxLength', '')) for roa in roas])
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Not a VRP .json file: {str(e)}")
+
+    @staticmethod
+    def from_input_folder(project_root_directory=Path.cwd()) -> Tuple['ValidatedRoaPayloadsIndex', str]:
+        """
+        Reads the VRPs export in the 'input' folder of the project root directory: the .csv file first, then the .json
+        one.
+
+        :param project_root_directory: The Path object pointing at the project root directory.
+        :type project_root_directory: Path
+        :raise FilenameNotFoundError: If there is no export.
+        :raise OSError: If is there a problem opening the file.
+        :raise ValueError: If the file is not well-formatted.
+        :return: The index and the path of the file read.
+        :rtype: Tuple[ValidatedRoaPayloadsIndex, str]
+        """
+        try:
+            filepath = str(file_utils.search_for_filename_in_subdirectory(INPUT_FOLDER_NAME, RPKI_VRPS_CSV_FILE_NAME, project_root_directory)[0])
+            return ValidatedRoaPayloadsIndex.from_csv(filepath), filepath
+        except FilenameNotFoundError:
+            pass
+        try:
+            filepath = str(file_utils.search_for_filename_in_subdirectory(INPUT_FOLDER_NAME, RPKI_VRPS_JSON_FILE_NAME, project_root_directory)[0])
+        except FilenameNotFoundError:
+            raise
+        return ValidatedRoaPayloadsIndex.from_json(filepath), filepath
+
+    def covering_vrps(self, prefix: ipaddress.IPv4Network) -> List[Tuple[int, ipaddress.IPv4Network, int]]:
+        """
+        Returns the VRPs whose prefix covers (contains or equals) the prefix parameter.
+
+        :param prefix: The prefix.
+        :type prefix: ipaddress.IPv4Network
+        :return: The covering VRPs as (Autonomous System number, prefix, max length) tuples, from the least specific.
+        :rtype: List[Tuple[int, ipaddress.IPv4Network, int]]
+        """
+        result = list()
+        if prefix.version != 4:
+            return result
+        network_address = int(prefix.network_address)
+        for length in self.lengths:
+            if length > prefix.prefixlen:
+                break
+            masked = network_address & PrefixesTableIndex.netmask(length)
+            for as_number, max_length in self.vrps_per_length[length].get(masked, tuple()):
+                result.append((as_number, ipaddress.IPv4Network((masked, length)), max_length))
+        return result
+
+    def validate(self, prefix: ipaddress.IPv4Network, as_number: int) -> Tuple[ROVStates, List[Tuple[int, ipaddress.IPv4Network, int]]]:
+        """
+        Computes the Route Origin Validation state of the prefix announced by the Autonomous System (RFC 6811).
+
+        :param prefix: The announced prefix.
+        :type prefix: ipaddress.IPv4Network
+        :param as_number: The origin Autonomous System number.
+        :type as_number: int
+        :return: The state and the VRPs that match the announcement (the covering ones if the state is INV).
+        :rtype: Tuple[ROVStates, List[Tuple[int, ipaddress.IPv4Network, int]]]
+        """
+        covering = self.covering_vrps(prefix)
+        if len(covering) == 0:
+            return ROVStates.UNK, covering
+        matching = [vrp for vrp in covering if vrp[0] == as_number and as_number != 0 and prefix.prefixlen <= vrp[2]]
+        if len(matching) > 0:
+            return ROVStates.VLD, matching
+        return ROVStates.INV, covering
+
+    def validate_origin(self, prefix: ipaddress.IPv4Network, as_number: int) -> Tuple[ROVStates, List[Tuple[int, ipaddress.IPv4Network, int]]]:
+        """
+        Computes an approximate Route Origin Validation state of an address (or block of addresses) originated by the
+        Autonomous System, when the announced prefix is not known: as in RFC 6811, but the max length of the VRPs is
+        not checked, since the length of the announcement is unknown. So an announcement too specific for its VRPs is
+        reported as VLD, and VRPs that don't cover the real announcement may be taken into account.
+
+        :param prefix: The address (as /32 prefix) or block of addresses.
+        :type prefix: ipaddress.IPv4Network
+        :param as_number: The origin Autonomous System number.
+        :type as_number: int
+        :return: The state and the VRPs that authorize the origin (the covering ones if the state is INV).
+        :rtype: Tuple[ROVStates, List[Tuple[int, ipaddress.IPv4Network, int]]]
+        """
+        covering = self.covering_vrps(prefix)
+        if len(covering) == 0:
+            return ROVStates.UNK, covering
+        matching = [vrp for vrp in covering if vrp[0] == as_number and as_number != 0]
+        if len(matching) > 0:
+            return ROVStates.VLD, matching
+        return ROVStates.INV, covering
+
+    def __len__(self) -> int:
+        """
+        Return the number of indexed VRPs.
+
+        :return: Object length.
+        :rtype: int
+        """
+        return self.vrps_count
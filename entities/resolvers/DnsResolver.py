@@ -1,8 +1,17 @@
+import base64
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Tuple, Dict, Set, Optional, Union
+import dns.flags
+import dns.message
+import dns.rdatatype
 import dns.resolver
 from dns.name import Name
+from dns.rdtypes.ANY.NSEC3 import b32_normal_to_hex
+from entities.DnsQueryLatencyStats import DnsQueryLatencyStats
 from entities.DomainName import DomainName
 from entities.LocalDnsResolverCache import LocalDnsResolverCache
+from entities.OrderedWorklist import OrderedWorklist
 from entities.paths.APath import APath
 from entities.paths.CNAMEPath import CNAMEPath
 from entities.paths.Path import Path
@@ -15,6 +24,7 @@ from entities.resolvers.results.MailDomainResolvingResult import MailDomainResol
 from entities.resolvers.results.DnsZoneDependenciesResult import DnsZoneDependenciesResult
 from entities.resolvers.results.MultipleMailDomainResolvingResult import MultipleMailDomainResolvingResult
 from entities.resolvers.results.MultipleDnsZoneDependenciesResult import MultipleDnsZoneDependenciesResult
+from entities.resolvers.TcpFallbackResolver import TcpFallbackResolver
 from exceptions.DomainNonExistentError import DomainNonExistentError
 from exceptions.NoAnswerError import NoAnswerError
 from exceptions.NoAvailablePathError import NoAvailablePathError
@@ -22,7 +32,6 @@ from exceptions.NoRecordInCacheError import NoRecordInCacheError
 from exceptions.NotWantedTLDError import NotWantedTLDError
 from exceptions.ReachedMaximumRecursivePathThresholdError import ReachedMaximumRecursivePathThresholdError
 from exceptions.UnknownReasonError import UnknownReasonError
-from utils import list_utils
 
 
 class DnsResolver:
@@ -34,24 +43,51 @@ class DnsResolver:
 
     Attributes
     ----------
-    resolver : DnsResolver
-        The real and complete DNS resolver from the dnspython module.
+    resolver : TcpFallbackResolver
+        The real and complete DNS resolver from the dnspython module, extended to retry truncated responses over
+        persistent TCP connections.
     cache : LocalDnsResolverCache
         The cache used to handle requests.
     consider_tld : bool
         Flag that tells if the resolver has to consider TLDs. This means that when a TLD is encountered in the
         elaboration, it is avoided and from its name servers it is not deducted any other domain name to elaborate.
+    latency_stats : DnsQueryLatencyStats
+        The latency measures of the queries sent on the network.
+    max_workers : int
+        Maximum number of mail domains resolved concurrently, and maximum number of concurrent A queries towards the
+        mail servers of the MX sets.
+    fan_out_executor : ThreadPoolExecutor
+        The pool of threads that resolves the A paths of the mail servers of a MX set concurrently.
     """
-    def __init__(self, consider_tld: bool):
+    def __init__(self, consider_tld: bool, aggressive_negative_caching=False, max_workers=8):
         """
         Instantiate this DnsResolver object.
 
         :param consider_tld: Flag that tells if the resolver has to consider TLDs.
         :type consider_tld: bool
-        """
-        self.resolver = dns.resolver.Resolver()
-        self.cache = LocalDnsResolverCache()
+        :param aggressive_negative_caching: Flag that enables the aggressive use of DNSSEC-validated NSEC/NSEC3 records
+        (RFC 8198) to answer non-existent names from the cache. The DO bit is set in the queries so that the upstream
+        (validating) resolver returns the denial records.
+        :type aggressive_negative_caching: bool
+        :param max_workers: Maximum number of concurrent resolutions of mail domains and of mail servers.
+        :type max_workers: int
+        """
+        self.resolver = TcpFallbackResolver()
+        self.cache = LocalDnsResolverCache(aggressive_negative_caching=aggressive_negative_caching)
         self.consider_tld = consider_tld
+        self.latency_stats = DnsQueryLatencyStats()
+        self.max_workers = max_workers
+        self.fan_out_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='mail-servers')
+        if aggressive_negative_caching:
+            self.resolver.use_edns(0, dns.flags.DO, TcpFallbackResolver.EDNS_PAYLOAD)
+
+    def close(self) -> None:
+        """
+        Closes the persistent TCP connections opened towards the nameservers and stops the threads of the pool.
+
+        """
+        self.resolver.close()
+        self.fan_out_executor.shutdown(wait=True)
 
     def do_query(self, name: str, type_rr: TypesRR) -> Path:
         """
@@ -61,16 +97,23 @@ class DnsResolver:
         :type name: str
         :param type_rr: Type of the query.
         :type type_rr: TypesRR
-        :raise DomainNonExistentError: If the name refers to a non existent domain.
+        :raise DomainNonExistentError: If the name refers to a non existent domain (even if it is already known from the
+        negative cache, in which case no query is sent).
         :raise NoAnswerError: If the query has no answer.
         :raise UnknownReasonError: If no non-broken nameservers are available to answer the question, or if the query
         name is too long after DNAME substitution.
         :return: A tuple containing the RR result and a list of RR containing the alias path.
         :rtype: Tuple[RRecord, List[RRecord]]
         """
+        if self.cache.is_known_nonexistent(DomainName(name)):
+            raise DomainNonExistentError(name)
         path_builder = PathBuilder()
         try:
-            answer = self.resolver.resolve(name, type_rr.to_string())
+            start = time.perf_counter()
+            try:
+                answer = self.resolver.resolve(name, type_rr.to_string())
+            finally:
+                self.latency_stats.record(type_rr, time.perf_counter() - start)
             canonical_name = None
             for cname in answer.chaining_result.cnames:
                 for key in cname.items.keys():
@@ -88,7 +131,9 @@ class DnsResolver:
             response_rr = RRecord(DomainName(canonical_name), type_rr, rr_values)
             path_builder.complete_resolution(response_rr)
             return path_builder.build()
-        except dns.resolver.NXDOMAIN:  # name is a domain that does not exist
+        except dns.resolver.NXDOMAIN as e:  # name is a domain that does not exist
+            for response in e.responses().values():
+                self.cache_negative_response(response)
             raise DomainNonExistentError(name)
         except dns.resolver.NoAnswer:  # there is no answer
             raise NoAnswerError(name, type_rr)
@@ -97,6 +142,52 @@ class DnsResolver:
         except Exception as e:  # fail because of another reason...
             raise UnknownReasonError(message=str(e))
 
+    def cache_negative_response(self, response: dns.message.Message) -> None:
+        """
+        This method saves in the cache the negative information of a NXDOMAIN response, if aggressive negative caching
+        is enabled (otherwise nothing is saved): the query name (or, if the answer is a CNAME chain, its last target,
+        the name the NXDOMAIN refers to), valid for the negative TTL (minimum between the SOA TTL and the SOA minimum
+        field, RFC 2308), and, if the response is DNSSEC-validated (AD flag set by the upstream resolver), the
+        NSEC/NSEC3 ranges contained in the authority section.
+
+        :param response: A NXDOMAIN response.
+        :type response: dns.message.Message
+        """
+        if not self.cache.aggressive_negative_caching:
+            return
+        zone = None
+        negative_ttl = 0
+        for rrset in response.authority:
+            if rrset.rdtype == dns.rdatatype.SOA:
+                zone = rrset.name
+                negative_ttl = min(rrset.ttl, rrset[0].minimum)
+        if zone is None:
+            return
+        cname_targets = dict()
+        for rrset in response.answer:
+            if rrset.rdtype == dns.rdatatype.CNAME:
+                cname_targets[rrset.name] = rrset[0].target
+        for question in response.question:
+            name = question.name
+            followed = set()
+            while name in cname_targets and name not in followed:
+                followed.add(name)
+                name = cname_targets[name]
+            self.cache.add_nonexistent_name(DomainName(name.to_text()), negative_ttl)
+        if not response.flags & dns.flags.AD:
+            return
+        zone_name = DomainName(zone.to_text())
+        for rrset in response.authority:
+            ttl = min(rrset.ttl, negative_ttl)
+            if rrset.rdtype == dns.rdatatype.NSEC:
+                for rdata in rrset:
+                    self.cache.add_nsec_range(zone_name, rrset.name, rdata.next, ttl)
+            elif rrset.rdtype == dns.rdatatype.NSEC3:
+                owner_hash = rrset.name.labels[0].decode('ascii')
+                for rdata in rrset:
+                    next_hash = base64.b32encode(rdata.next).translate(b32_normal_to_hex).decode('ascii')
+                    self.cache.add_nsec3_range(zone_name, owner_hash, next_hash, rdata.salt, rdata.iterations, rdata.algorithm, bool(rdata.flags & 1), ttl)
+
     def resolve_a_path(self, domain_name: DomainName) -> APath:
         """
         This method resolves the domain name parameter A type query.
@@ -122,6 +213,8 @@ class DnsResolver:
     def resolve_multiple_mail_domains(self, mail_domains: List[DomainName]) -> MultipleMailDomainResolvingResult:
         """
         This method resolves the mail servers dependencies of multiple mail domains.
+        Mail domains are resolved concurrently (at most max_workers at a time), but prints, results and error logs follow
+        the order of the mail_domains parameter as if they were resolved sequentially.
         If something goes wrong, exceptions are not raised but the error_logs of the result will be populated with what
         went wrong and the respective results will be set to None.
 
@@ -131,29 +224,34 @@ class DnsResolver:
         :rtype: MultipleMailDomainResolvingResult
         """
         final_results = MultipleMailDomainResolvingResult()
-        for i, mail_domain in enumerate(mail_domains):
-            print(f"Resolving mail domain[{i+1}/{len(mail_domains)}]: {mail_domain}")
-            try:
-                resolver_result = self.resolve_mail_domain(mail_domain)
-                final_results.add_dependency(mail_domain, resolver_result)
-                # prints
-                print(f"{resolver_result.mail_domain_path.stamp()}")
-                for j, mail_server in enumerate(resolver_result.mail_servers_paths.keys()):
-                    if resolver_result.mail_servers_paths[mail_server] is not None:
-                        print(f"--> mailserver[{j+1}/{len(resolver_result.mail_servers_paths.keys())}]: {resolver_result.mail_servers_paths[mail_server].stamp()}")
-                    else:
-                        print(
-                            f"--> mailserver[{j + 1}/{len(resolver_result.mail_servers_paths.keys())}]: Unresolved A path")
-            except (NoAnswerError, DomainNonExistentError, UnknownReasonError) as e:
-                print(f"!!! {str(e)} !!!")
-                final_results.add_dependency(mail_domain, None)
-                final_results.append_error_log(ErrorLog(e, mail_domain.string, str(e)))
-            print()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='mail-domains') as executor:
+            futures = [executor.submit(self.__resolve_mail_domain_deferring_prints, mail_domain) for mail_domain in mail_domains]
+            for i, mail_domain in enumerate(mail_domains):
+                print(f"Resolving mail domain[{i+1}/{len(mail_domains)}]: {mail_domain}")
+                resolver_result, messages, exception = futures[i].result()
+                for message in messages:
+                    print(message)
+                if exception is None:
+                    final_results.add_dependency(mail_domain, resolver_result)
+                    # prints
+                    print(f"{resolver_result.mail_domain_path.stamp()}")
+                    for j, mail_server in enumerate(resolver_result.mail_servers_paths.keys()):
+                        if resolver_result.mail_servers_paths[mail_server] is not None:
+                            print(f"--> mailserver[{j+1}/{len(resolver_result.mail_servers_paths.keys())}]: {resolver_result.mail_servers_paths[mail_server].stamp()}")
+                        else:
+                            print(
+                                f"--> mailserver[{j + 1}/{len(resolver_result.mail_servers_paths.keys())}]: Unresolved A path")
+                else:
+                    print(f"!!! {str(exception)} !!!")
+                    final_results.add_dependency(mail_domain, None)
+                    final_results.append_error_log(ErrorLog(exception, mail_domain.string, str(exception)))
+                print()
         return final_results
 
     def resolve_mail_domain(self, mail_domain: DomainName) -> MailDomainResolvingResult:
         """
-        This method resolves the mail servers dependencies of a mail domain.
+        This method resolves the mail servers dependencies of a mail domain. The A paths of the mail servers are resolved
+        concurrently.
 
         :param mail_domain: A mail domain.
         :type mail_domain: DomainName
@@ -163,6 +261,26 @@ class DnsResolver:
         :return: A DnsMailServersDependenciesResult object.
         :rtype: MailDomainResolvingResult
         """
+        result, messages, exception = self.__resolve_mail_domain_deferring_prints(mail_domain)
+        for message in messages:
+            print(message)
+        if exception is not None:
+            raise exception
+        return result
+
+    def __resolve_mail_domain_deferring_prints(self, mail_domain: DomainName) -> Tuple[Optional[MailDomainResolvingResult], List[str], Optional[Exception]]:
+        """
+        Auxiliary method of the mail domain resolving, that can be executed concurrently: instead of printing and
+        raising, it returns the messages to be printed and the exception occurred (if any), so that the caller can
+        print them in order.
+
+        :param mail_domain: A mail domain.
+        :type mail_domain: DomainName
+        :return: A tuple containing the result (None if an exception occurred), the messages to be printed and the
+        exception occurred (None if the resolving went well).
+        :rtype: Tuple[Optional[MailDomainResolvingResult], List[str], Optional[Exception]]
+        """
+        messages = list()
         try:
             mx_path = self.cache.resolve_path(mail_domain, TypesRR.MX)
         except NoAvailablePathError:
@@ -170,21 +288,21 @@ class DnsResolver:
                 mx_path = self.do_query(mail_domain.string, TypesRR.MX)
                 self.cache.add_path(mx_path)
             except (DomainNonExistentError, NoAnswerError, UnknownReasonError) as e:
-                print(f"!!! {str(e)} !!!")
-                raise
+                messages.append(f"!!! {str(e)} !!!")
+                return None, messages, e
         result = MailDomainResolvingResult(mx_path)
-        for value in mx_path.get_resolution().values:
-            if isinstance(value, DomainName):
-                mail_server = value
-                try:
-                    a_path = self.resolve_a_path(mail_server)
-                except (NoAnswerError, UnknownReasonError, DomainNonExistentError) as e:
-                    print(f"!!! {str(e)} ==> mail domain {mail_domain} is unresolved.!!!")
-                    # result does not require to set None in the inner dictionary, it is set by default.
-                    # result.add_unresolved_mail_server_access(mail_server)
-                    continue
-                result.add_mail_server_access(a_path)
-        return result
+        mail_servers = list(filter(lambda value: isinstance(value, DomainName), mx_path.get_resolution().values))
+        futures = [self.fan_out_executor.submit(self.resolve_a_path, mail_server) for mail_server in mail_servers]
+        for future in futures:
+            try:
+                a_path = future.result()
+            except (NoAnswerError, UnknownReasonError, DomainNonExistentError) as e:
+                messages.append(f"!!! {str(e)} ==> mail domain {mail_domain} is unresolved.!!!")
+                # result does not require to set None in the inner dictionary, it is set by default.
+                # result.add_unresolved_mail_server_access(mail_server)
+                continue
+            result.add_mail_server_access(a_path)
+        return result, messages, None
 
     def resolve_multiple_domains_dependencies(self, domain_list: List[DomainName], reset_cache_per_elaboration=False) -> MultipleDnsZoneDependenciesResult:
         """
@@ -222,7 +340,7 @@ class DnsResolver:
         """
         error_logs = list()
         start_cache_length = len(self.cache)
-        elaboration_domains = domain.parse_subdomains(self.consider_tld, self.consider_tld, True)
+        elaboration_domains = OrderedWorklist.by_labels_count(domain.parse_subdomains(self.consider_tld, self.consider_tld, True))
         zone_dependencies = set()
         cname_exception = False
         for_direct_zones = {domain}
@@ -231,7 +349,7 @@ class DnsResolver:
             try:
                 cname_path = self.resolve_cname(current_domain)
                 for subdomain in cname_path.get_resolution().get_first_value().parse_subdomains(self.consider_tld, self.consider_tld, False):
-                    list_utils.append_with_no_duplicates(elaboration_domains, subdomain)
+                    elaboration_domains.add(subdomain)
                 for rr in cname_path.get_cname_chain():
                     for_direct_zones.add(rr.name)
                 for_direct_zones.add(cname_path.get_resolution().name)
@@ -252,8 +370,7 @@ class DnsResolver:
                     error_logs.append(ErrorLog(e, current_domain.string, str(e)))
                 continue
 
-            for name in names_to_be_elaborated:
-                list_utils.append_with_no_duplicates(elaboration_domains, name)
+            elaboration_domains.add_all(names_to_be_elaborated)
             zone_dependencies.add(zone)
 
         zone_dependencies_per_nameserver, zone_dependencies_per_zone = self.extract_zone_dependencies(zone_dependencies)
@@ -505,13 +622,12 @@ class DnsResolver:
         :return: The zone dependencies of the zone.
         :rtype: Set[Zone]
         """
-        zones_to_be_elaborated = [zones_param]
+        zones_to_be_elaborated = OrderedWorklist([zones_param])
         result = set()
         for zone in zones_to_be_elaborated:
             temp = self.__parse_zones_of_domain_names(zone.parse_every_domain_name(True, self.consider_tld, self.consider_tld), zone_set)
             result = result.union(temp)
-            for z in result:
-                list_utils.append_with_no_duplicates(zones_to_be_elaborated, z)
+            zones_to_be_elaborated.add_all(temp)
         return result
 
     def __parse_zones_of_domain_names(self, domain_names: Set[DomainName], zones_set: Set[Zone]) -> Set[Zone]:
@@ -0,0 +1,200 @@
+import os
+import threading
+import time
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+import requests
+from entities.IpAsColumnarIndex import IpAsColumnarIndex
+from entities.resolvers.IpAsDatabase import IpAsDatabase
+from utils import file_utils
+
+
+class HotSwappableIpAsDatabase(IpAsDatabase):
+    """
+    This class represents an IpAsDatabase for long-running processes: the database can be reloaded (and, optionally,
+    refreshed from the site when it is no longer up-to-date) in a background thread, periodically or on demand.
+    Reloading uses double buffering: the new index is built aside while lookups keep using the active one, then the
+    index attribute is replaced with a single (atomic) assignment. Lookups never wait for a reload and, since every
+    lookup reads the index attribute once, never see a half-loaded table; the previous index is released when the
+    last lookup using it ends. Entries of the ranges that didn't change are carried over to the new index.
+    The .tsv file must be replaced atomically (written aside and renamed), as IpAsDatabase.download_latest_tsv_database does.
+    Timing and version of the reloads are exposed as metrics.
+
+    ...
+
+    Attributes
+    ----------
+    project_root_directory : Path
+        The Path object pointing at the project root directory.
+    download_url : str or None
+        The url of the .gz archive to download when the database is no longer up-to-date, or None to only reload the
+        .tsv file.
+    reload_lock : threading.Lock
+        Lock that lets one reload at a time run.
+    metrics_lock : threading.Lock
+        Lock that keeps the metrics consistent.
+    stop_event : threading.Event
+        Event that stops the periodic reload.
+    reload_thread : threading.Thread or None
+        The thread of the last background reload.
+    periodic_thread : threading.Thread or None
+        The thread of the periodic reload.
+    version : int
+        The number of indexes loaded so far (1 after the first load): the version of the active index.
+    version_key : Tuple[int, int, bytes] or None
+        Modification time, size and SHA-256 hash of the .tsv file of the active index.
+    loaded_at : datetime or None
+        When the active index was swapped in.
+    last_reload_seconds : float or None
+        Duration of the last reload (refresh from the site included).
+    reloads_count : int
+        Number of reloads done, swapping or not.
+    failed_reloads_count : int
+        Number of reloads failed: the active index is kept.
+    last_error : Exception or None
+        The error of the last failed reload.
+    """
+    def __init__(self, project_root_directory=Path.cwd(), column_separator='\t', reload_interval: Optional[float] = None, download_url: Optional[str] = None):
+        """
+        Instantiate the object loading the database (in the calling thread) and, if an interval is set, starts the
+        periodic reload.
+
+        :param project_root_directory: The Path object pointing at the project root directory.
+        :type project_root_directory: Path
+        :param column_separator: The character separator between every column-value of each entry
+        :type column_separator: str
+        :param reload_interval: Seconds between two reloads, or None for no periodic reload.
+        :type reload_interval: Optional[float]
+        :param download_url: The url of the .gz archive to download when the database is no longer up-to-date, or
+        None to only reload the .tsv file.
+        :type download_url: Optional[str]
+        :raise FileWithExtensionNotFoundError: If the database .tsv file is not found.
+        :raise OSError: If is there a problem opening the .tsv file.
+        """
+        self.project_root_directory = project_root_directory
+        self.download_url = download_url
+        self.reload_lock = threading.Lock()
+        self.metrics_lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.reload_thread = None
+        self.periodic_thread = None
+        self.version = 0
+        self.version_key = None
+        self.loaded_at = None
+        self.last_reload_seconds = None
+        self.reloads_count = 0
+        self.failed_reloads_count = 0
+        self.last_error = None
+        super().__init__(project_root_directory=project_root_directory, column_separator=column_separator)
+        if reload_interval is not None:
+            self.start_periodic_reload(reload_interval)
+
+    def load(self) -> None:
+        """
+        Builds the new index aside and swaps it in. If the .tsv file didn't change since the active index was loaded,
+        nothing is swapped.
+
+        :raise OSError: If is there a problem opening the .tsv file.
+        """
+        stat = os.stat(self.filepath)
+        if self.index is not None and self.version_key is not None and self.version_key[0:2] == (stat.st_mtime_ns, stat.st_size):
+            return
+        standby = IpAsColumnarIndex.from_tsv_with_compiled_cache(self.filepath, self.column_separator)
+        active = self.index
+        if active is not None and len(active.materialized_entries) > 0:
+            standby.inherit_entries(active, active.diff(standby))
+        key = IpAsColumnarIndex.read_compiled_key(self.filepath + IpAsColumnarIndex.COMPILED_EXTENSION)
+        with self.metrics_lock:
+            self.index = standby
+            self.version = self.version + 1
+            self.version_key = key
+            self.loaded_at = datetime.now()
+
+    def reload(self) -> bool:
+        """
+        Reloads the database in the calling thread: first the .tsv file is refreshed from the site (if a download url
+        is set and the file is no longer up-to-date), then the new index is swapped in. Errors are not raised: the
+        active index is kept and the error is counted in the metrics.
+
+        :return: True if a new index was swapped in, False otherwise.
+        :rtype: bool
+        """
+        with self.reload_lock:
+            start = time.perf_counter()
+            version = self.version
+            try:
+                if self.download_url is not None and not file_utils.is_tsv_database_updated(project_root_directory=self.project_root_directory):
+                    IpAsDatabase.download_latest_tsv_database(project_root_directory=self.project_root_directory, url=self.download_url)
+                self.load()
+                error = None
+            except (requests.exceptions.RequestException, zlib.error, OSError, ValueError) as e:
+                error = e
+            with self.metrics_lock:
+                self.reloads_count = self.reloads_count + 1
+                self.last_reload_seconds = time.perf_counter() - start
+                if error is not None:
+                    self.failed_reloads_count = self.failed_reloads_count + 1
+                    self.last_error = error
+            return self.version != version
+
+    def reload_in_background(self) -> threading.Thread:
+        """
+        Starts a reload in a background thread, unless one is already running.
+
+        :return: The thread of the reload.
+        :rtype: threading.Thread
+        """
+        if self.reload_thread is None or not self.reload_thread.is_alive():
+            self.reload_thread = threading.Thread(target=self.reload, name='ip-as-database-reload', daemon=True)
+            self.reload_thread.start()
+        return self.reload_thread
+
+    def start_periodic_reload(self, interval: float) -> None:
+        """
+        Starts a background thread that reloads the database every interval seconds, until stop() is called.
+
+        :param interval: Seconds between two reloads.
+        :type interval: float
+        """
+        if self.periodic_thread is not None and self.periodic_thread.is_alive():
+            return
+        self.stop_event.clear()
+
+        def reload_periodically():
+            while not self.stop_event.wait(interval):
+                self.reload()
+
+        self.periodic_thread = threading.Thread(target=reload_periodically, name='ip-as-database-periodic-reload', daemon=True)
+        self.periodic_thread.start()
+
+    def stop(self) -> None:
+        """
+        Stops the periodic reload and waits for the running reloads to finish.
+
+        """
+        self.stop_event.set()
+        for thread in (self.periodic_thread, self.reload_thread):
+            if thread is not None:
+                thread.join()
+
+    def get_metrics(self) -> Dict[str, object]:
+        """
+        Returns a consistent snapshot of the reload metrics.
+
+        :return: A dictionary with the version of the active index (counter and SHA-256 hash of the .tsv file), its
+        number of ranges and load time, the duration of the last reload, and the number of reloads done and failed.
+        :rtype: Dict[str, object]
+        """
+        with self.metrics_lock:
+            return {
+                'version': self.version,
+                'version_sha256': None if self.version_key is None else self.version_key[2].hex(),
+                'ranges': len(self.index),
+                'loaded_at': None if self.loaded_at is None else self.loaded_at.isoformat(),
+                'last_reload_seconds': self.last_reload_seconds,
+                'reloads_count': self.reloads_count,
+                'failed_reloads_count': self.failed_reloads_count,
+                'last_error': None if self.last_error is None else str(self.last_error)
+            }
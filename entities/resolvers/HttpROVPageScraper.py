@@ -0,0 +1,236 @@
+from typing import Callable, List, Optional
+import requests
+import selenium
+from requests.adapters import HTTPAdapter
+from entities.FirefoxHeadlessWebDriver import FirefoxHeadlessWebDriver
+from entities.PrefixesTableHtmlParser import PrefixesTableHtmlParser
+from entities.ROVTablesCache import ROVTablesCache
+from entities.RowPrefixesTable import RowPrefixesTable
+from entities.resolvers.ROVPageScraper import ROVPageScraper
+from exceptions.NotROVStateTypeError import NotROVStateTypeError
+from exceptions.TableEmptyError import TableEmptyError
+from exceptions.TableNotPresentError import TableNotPresentError
+
+
+class HttpROVPageScraper(ROVPageScraper):
+    """
+    This class represents a ROVPageScraper that doesn't drive the browser: the ROV page is fetched with a pooled HTTP
+    session (connections are kept alive between the Autonomous Systems) and the pfx_table_div (id of html element) table
+    is parsed directly from the html, in one pass, instead of reading every cell with a WebDriver round-trip.
+    The headless browser is only a fallback: it loads the page when the HTTP request fails or when the table is not in
+    the html (e.g. because it is built by a script).
+    Every scraper has its own fallback browser, started at the first fallback if a browser factory is given, so that
+    scrapers in concurrent workers never wait for each other's browser and a broken browser is recycled alone.
+    When the cache has a stale table of the autonomous system, the request is conditional (If-None-Match and
+    If-Modified-Since headers): if the page didn't change, the cached table is used without downloading it again.
+
+    ...
+
+    Attributes
+    ----------
+    session : requests.Session
+        The HTTP session.
+    url_of_as_number : Callable[[int], str]
+        The function that returns the url of the page of an autonomous system number.
+    timeout : float
+        Seconds before an HTTP request is given up.
+    http_pages_count : int
+        Number of pages whose table was read from the HTTP response.
+    fallback_pages_count : int
+        Number of pages loaded in the headless browser.
+    browser_factory : Callable[[], FirefoxHeadlessWebDriver] or None
+        The function that starts the fallback browser when it is needed (and no browser was given or it was lost), or
+        None.
+    """
+    def __init__(self, headless_browser: Optional[FirefoxHeadlessWebDriver], url_of_as_number: Callable[[int], str] = ROVPageScraper.base_url, timeout: float = FirefoxHeadlessWebDriver.time_out_in_seconds, pool_size: int = 4, cache: Optional[ROVTablesCache] = None, browser_factory: Optional[Callable[[], FirefoxHeadlessWebDriver]] = None):
+        """
+        Initialize the object.
+
+        :param headless_browser: The instance of a Firefox headless browser used as fallback, or None for no fallback.
+        :type headless_browser: Optional[FirefoxHeadlessWebDriver]
+        :param url_of_as_number: The function that returns the url of the page of an autonomous system number.
+        :type url_of_as_number: Callable[[int], str]
+        :param timeout: Seconds before an HTTP request is given up.
+        :type timeout: float
+        :param pool_size: Maximum number of connections kept alive for each host.
+        :type pool_size: int
+        :param cache: The persistent cache of the tables, or None to load every page.
+        :type cache: Optional[ROVTablesCache]
+        :param browser_factory: The function that starts the fallback browser when it is needed, if headless_browser
+        is None (or when it is lost).
+        :type browser_factory: Optional[Callable[[], FirefoxHeadlessWebDriver]]
+        """
+        super().__init__(headless_browser, cache=cache)
+        self.browser_factory = browser_factory
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.url_of_as_number = url_of_as_number
+        self.timeout = timeout
+        self.http_pages_count = 0
+        self.fallback_pages_count = 0
+
+    def scrape_as_page(self, as_number: int) -> None:
+        """
+        Fetches the page of the autonomous system number and parses its prefixes table, which is saved in the state of
+        this object. If the request fails or the table is not in the html, the page is loaded in the headless browser.
+
+        :param as_number: The autonomous system number.
+        :type as_number: int
+        :raise requests.exceptions.RequestException: If the request fails and there is no headless browser.
+        :raise selenium.common.exceptions.WebDriverException: If something goes wrong with the request of the fallback
+        (or the fallback browser can't be started).
+        :raise FilenameNotFoundError: If the fallback browser can't be started because the geckodriver executable is not
+        found.
+        :raise TableNotPresentError: If the pfx_table_div (id html element) or the table (html element) are not found.
+        :raise ValueError: If the data found for a row are not formatted as expected. See __init__() of class
+        RowPrefixesTable.
+        :raise TableEmptyError: If there's a problem while parsing the html page.
+        :raise NotROVStateTypeError: If the data found for a row are not formatted as expected. See __init__() of class
+        RowPrefixesTable.
+        """
+        etag, last_modified = (None, None) if self.cache is None else self.cache.get_validators(as_number)
+        url_page = self.url_of_as_number(as_number)
+        response = self.fetch_page_unless_fallback(url_page, etag, last_modified)
+        self.current_as_number = as_number
+        if response is not None and response.status_code == 304:
+            rows = self.cache.revalidate(as_number)
+            if rows is not None:
+                self.set_prefixes_table(as_number, rows)
+                self.last_validators = (etag, last_modified)
+                self.http_pages_count = self.http_pages_count + 1
+                return
+            response = self.fetch_page_unless_fallback(url_page)       # the cached table is gone: unconditional
+        if response is not None:
+            try:
+                self.parse_prefixes_table(response.text)
+                self.last_validators = (response.headers.get('ETag'), response.headers.get('Last-Modified'))
+                self.http_pages_count = self.http_pages_count + 1
+                return
+            except TableNotPresentError:
+                if not self.has_fallback():
+                    raise
+        self.fallback_pages_count = self.fallback_pages_count + 1
+        if self.headless_browser is None:
+            self.headless_browser = self.browser_factory()
+        try:
+            super().scrape_as_page(as_number)
+        except selenium.common.exceptions.TimeoutException:
+            raise       # the page load timeout already restarted the browser
+        except selenium.common.exceptions.WebDriverException:
+            self.recycle_headless_browser()
+            raise
+        except (TableNotPresentError, ValueError, TableEmptyError, NotROVStateTypeError):
+            raise
+
+    def has_fallback(self) -> bool:
+        """
+        Tells if the pages can be loaded in a headless browser, already started or to be started with the factory.
+
+        :return: True or False.
+        :rtype: bool
+        """
+        return self.headless_browser is not None or self.browser_factory is not None
+
+    def recycle_headless_browser(self) -> None:
+        """
+        Restarts the fallback browser of this scraper after a WebDriver error. If it can't be restarted and there is a
+        browser factory, the browser is dropped and a new one is started at the next fallback.
+
+        """
+        try:
+            self.headless_browser.close_and_reopen()
+        except selenium.common.exceptions.WebDriverException:
+            if self.browser_factory is not None:
+                self.close_headless_browser()
+
+    def fetch_page_unless_fallback(self, url_page: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> Optional[requests.Response]:
+        """
+        Executes fetch_page() of the url; if the request fails, the page is left to the headless browser fallback.
+
+        :param url_page: The url.
+        :type url_page: str
+        :param etag: The ETag of the cached page, for the If-None-Match header.
+        :type etag: Optional[str]
+        :param last_modified: The Last-Modified of the cached page, for the If-Modified-Since header.
+        :type last_modified: Optional[str]
+        :raise requests.exceptions.RequestException: If the request fails and there is no headless browser.
+        :return: The response, or None if the request failed and the page has to be loaded in the headless browser.
+        :rtype: Optional[requests.Response]
+        """
+        try:
+            return self.fetch_page(url_page, etag, last_modified)
+        except requests.exceptions.RequestException:
+            if not self.has_fallback():
+                self.prefixes_table = list()
+                self.current_as_number = -1
+                raise
+            return None
+
+    def fetch_page(self, url_page: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> requests.Response:
+        """
+        Executes a GET of the url with the HTTP session, conditional if validators are given.
+
+        :param url_page: The url.
+        :type url_page: str
+        :param etag: The ETag of the cached page, for the If-None-Match header.
+        :type etag: Optional[str]
+        :param last_modified: The Last-Modified of the cached page, for the If-Modified-Since header.
+        :type last_modified: Optional[str]
+        :raise requests.exceptions.RequestException: If the request fails or the response status is an error.
+        :return: The response (status 200, or 304 if the page didn't change).
+        :rtype: requests.Response
+        """
+        headers = dict()
+        if etag is not None:
+            headers['If-None-Match'] = etag
+        if last_modified is not None:
+            headers['If-Modified-Since'] = last_modified
+        response = self.session.get(url_page, headers=headers, timeout=self.timeout)
+        response.raise_for_status()
+        return response
+
+    def parse_prefixes_table(self, html: str) -> List[RowPrefixesTable]:
+        """
+        Parses the pfx_table_div (id html element) table from the html of a ROV page, as
+        scrape_prefixes_table_from_page() does with the page loaded in the browser.
+
+        :param html: The html.
+        :type html: str
+        :raise TableNotPresentError: If the pfx_table_div (id html element) or the table (html element) are not found.
+        :raise ValueError: If the data found for a row are not formatted as expected. See __init__() of class
+        RowPrefixesTable.
+        :raise NotROVStateTypeError: If the data found for a row are not formatted as expected. See __init__() of class
+        RowPrefixesTable.
+        :return: A list of RowPrefixesTable objects to represent the pfx_table_div (id html element) table.
+        :rtype: List[RowPrefixesTable]
+        """
+        rows = PrefixesTableHtmlParser.parse(html)
+        if rows is None:
+            self.prefixes_table = None
+            raise TableNotPresentError(self.current_as_number)
+        return self.set_prefixes_table_from_cells(rows)
+
+    def close_headless_browser(self) -> None:
+        """
+        Quits the fallback browser, if started.
+
+        """
+        headless_browser = self.headless_browser
+        self.headless_browser = None
+        if headless_browser is not None:
+            try:
+                headless_browser.close()
+            except selenium.common.exceptions.WebDriverException:
+                pass
+
+    def close(self) -> None:
+        """
+        Closes the connections of the HTTP session and, if there is a browser factory (the scraper owns its fallback
+        browsers), the fallback browser.
+
+        """
+        self.session.close()
+        if self.browser_factory is not None:
+            self.close_headless_browser()
@@ -1,12 +1,17 @@
 import csv
 import ipaddress
+import os
 from pathlib import Path
-from typing import List, Set
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import numpy as np
 from entities.EntryIpAsDatabase import EntryIpAsDatabase
+from entities.IpAsColumnarIndex import IpAsColumnarIndex
+from entities.IpAsColumnarIndexDiff import IpAsColumnarIndexDiff
+from entities.resolvers.results.AutonomousSystemAggregate import AutonomousSystemAggregate
 from exceptions.AutonomousSystemNotFoundError import AutonomousSystemNotFoundError
 from exceptions.FileWithExtensionNotFoundError import FileWithExtensionNotFoundError
-from static_variables import INPUT_FOLDER_NAME
-from utils import file_utils
+from static_variables import INPUT_FOLDER_NAME, IP_ASN_ARCHIVE_NAME, IP_ASN_DATABASE_URL
+from utils import file_utils, requests_utils
 
 
 class IpAsDatabase:
@@ -21,8 +26,9 @@ class IpAsDatabase:
         The absolute filepath of the .tsv database.
     column_separator : str
         The character separator between every column-value of each entry
-    entries : List[EntryIpAsDatabase]
-        All the entries of the database.
+    index : IpAsColumnarIndex
+        All the entries of the database, in columnar form. It is never modified, only replaced: every method reads it
+        once, so a concurrent replacement (see HotSwappableIpAsDatabase) is never seen halfway through a lookup.
     """
 
     def __init__(self, project_root_directory=Path.cwd(), column_separator='\t'):      # '\t' = TAB
@@ -55,79 +61,61 @@ class IpAsDatabase:
                 f.close()
             self.filepath = filepath
             self.column_separator = column_separator
-            self.entries = list()
+            self.index = None
             self.load()
         except OSError:
             raise
 
     def resolve_range(self, ip: ipaddress.IPv4Address) -> EntryIpAsDatabase:
         """
-        Method which concern is to resolve the ip parameter using the database. It uses a binary search approach
-        considering that the .tsv database is ordered (following attribute start_ip_range) to gain performance.
+        Method which concern is to resolve the ip parameter using the database. It uses a binary search over the
+        columnar index, considering that the .tsv database is ordered (following attribute start_ip_range).
+        Entries that are not well-formatted, as described in https://iptoasn.com/, are discarded when the database is
+        loaded.
 
         :param ip: The ip address parameter.
         :type ip: ipaddress.IPv4Address
-        :raises ValueError: If the binary search auxiliary method raises a ValueError exception. In particular it is
-        impossible to instantiate a valid Ipv4Address from an entry of the .tsv database.
-        If the matched entry is formatted wrongly, not as described in https://iptoasn.com/. In particular one of 3
-        errors occurred:
-            - the start_ip_range is not a valid ip address
-            - the end_ip_range is not a valid ip address
-            - the as_number is not a valid integer number
         :raise AutonomousSystemNotFoundError: If there is no Autonomous System that match the ip parameter.
-        :raise ValueError: An entry of the database is not well-formatted as described in https://iptoasn.com/.
         :returns: An EntryIpAsDatabase object of the matched entry in the database.
         :rtype: EntryIpAsDatabase
         """
-        try:
-            index = IpAsDatabase.__binary_search(self.entries, ip)
-        except ValueError:
-            raise ValueError(f"!!! Database is file is not well-formatted !!!")
-        if index == -1:
+        index = self.index
+        position = index.lookup(int(ip))
+        if position == IpAsColumnarIndex.NOT_FOUND:
             raise AutonomousSystemNotFoundError(ip.exploded)
-        else:
-            try:
-                return self.entries[index]
-            except ValueError:
-                raise
+        return index.entry(position)
 
-    @staticmethod
-    def __binary_search(array_entries: List[EntryIpAsDatabase], ip_param: ipaddress.IPv4Address) -> int:
+    def resolve_ranges(self, ips: List[ipaddress.IPv4Address]) -> List[Optional[EntryIpAsDatabase]]:
         """
-        Auxiliary method that is concerned to implement binary search approach in the resolve method above.
+        Method that resolves multiple ip addresses with a single vectorized binary search.
 
-        :param array_entries: All the entries.
-        :type array_entries: List[EntryIpAsDatabase]
-        :param ip_param: The ip parameter.
-        :type ip_param: ipaddress.IPv4Address
-        :raises ValueError: An entry of the database is not well-formatted as described in https://iptoasn.com/.
-        :returns: The corresponding index of the entry matched in array_entries. It returns -1 if nothing is found.
-        :rtype: int
+        :param ips: The ip addresses.
+        :type ips: List[ipaddress.IPv4Address]
+        :returns: For each ip address (same order) the matched entry, or None if no Autonomous System matches it.
+        :rtype: List[Optional[EntryIpAsDatabase]]
         """
-        inf = 0
-        sup = len(array_entries) - 1
-        while inf <= sup:
-            if sup - inf <= 2:
-                print('', end='')
-                pass
-            med = (inf + sup) // 2
-            try:
-                start = array_entries[med].start_ip_range
-                end = array_entries[med].end_ip_range
-                if end < ip_param:
-                    inf = med + 1
-                elif start > ip_param:
-                    sup = med - 1
-                else:
-                    return med
-            except ValueError:
-                raise
-        return -1
+        index = self.index
+        positions = index.lookup_batch(np.fromiter((int(ip) for ip in ips), dtype=np.uint32, count=len(ips)))
+        return [None if position == IpAsColumnarIndex.NOT_FOUND else index.entry(int(position)) for position in positions]
+
+    def resolve_distinct_ranges(self, ips: Iterable[ipaddress.IPv4Address]) -> Dict[ipaddress.IPv4Address, Optional[EntryIpAsDatabase]]:
+        """
+        Method that resolves every distinct ip address of the parameter (duplicates are looked up once) with a single
+        vectorized binary search.
+
+        :param ips: The ip addresses, possibly repeated.
+        :type ips: Iterable[ipaddress.IPv4Address]
+        :returns: A dictionary from every distinct ip address (in order of first occurrence) to the matched entry, or
+        None if no Autonomous System matches it.
+        :rtype: Dict[ipaddress.IPv4Address, Optional[EntryIpAsDatabase]]
+        """
+        distinct_ips = list(dict.fromkeys(ips))
+        return dict(zip(distinct_ips, self.resolve_ranges(distinct_ips)))
 
     def get_entries_from_as_number(self, as_number: int) -> Set[EntryIpAsDatabase]:
         """
         This method returns the database entry that matches the autonomous system associated with the parameter.
-        The method needs to control every single entry, so it is pretty slow.
+        The entries are found through the Autonomous System number index, in O(1) plus the number of entries.
 
         :param as_number: The autonomous system number.
         :type as_number: int
@@ -136,31 +124,195 @@ class IpAsDatabase:
         :returns: An EntryIpAsDatabase object of the matched entry in the database.
         :rtype: EntryIpAsDatabase
         """
-        entries = set()
-        for entry in self.entries:
-            if entry.as_number == as_number:
-                entries.add(entry)
+        index = self.index
+        entries = set(index.entry(int(position)) for position in index.rows_of_as_number(as_number))
         if len(entries) == 0:
             raise AutonomousSystemNotFoundError(as_number)
         else:
             return entries
 
-    def load(self) -> None:
+    def get_as_numbers(self) -> List[int]:
         """
-        Auxiliary method that is concerned to populate the entries attribute from the .tsv file database. When called it
-        clears all the entries currently saved in the object. If an entry is not well-formatted, the error is ignored.
+        This method returns all the distinct Autonomous System numbers of the database, sorted.
 
+        :returns: The Autonomous System numbers.
+        :rtype: List[int]
+        """
+        return self.index.as_group_numbers.tolist()
+
+    def get_ranges_count_of_as_number(self, as_number: int) -> int:
+        """
+        This method returns the number of database entries of an Autonomous System.
+
+        :param as_number: The autonomous system number.
+        :type as_number: int
+        :raise AutonomousSystemNotFoundError: If no entry is found.
+        :returns: The number of entries.
+        :rtype: int
+        """
+        rows = self.index.rows_of_as_number(as_number)
+        if len(rows) == 0:
+            raise AutonomousSystemNotFoundError(as_number)
+        return len(rows)
+
+    def get_address_space_of_as_number(self, as_number: int) -> int:
+        """
+        This method returns the number of ip addresses covered by the database entries of an Autonomous System.
+
+        :param as_number: The autonomous system number.
+        :type as_number: int
+        :raise AutonomousSystemNotFoundError: If no entry is found.
+        :returns: The number of ip addresses.
+        :rtype: int
+        """
+        index = self.index
+        rows = index.rows_of_as_number(as_number)
+        if len(rows) == 0:
+            raise AutonomousSystemNotFoundError(as_number)
+        return int(np.sum(index.ends[rows].astype(np.int64) - index.starts[rows].astype(np.int64) + 1))
+
+    def get_prefixes_count_of_as_number(self, as_number: int) -> int:
+        """
+        This method returns the number of CIDR prefixes needed to cover the database entries of an Autonomous System.
+
+        :param as_number: The autonomous system number.
+        :type as_number: int
+        :raise AutonomousSystemNotFoundError: If no entry is found.
+        :returns: The number of prefixes.
+        :rtype: int
         """
-        if len(self.entries) == 0:
-            pass
+        index = self.index
+        rows = index.rows_of_as_number(as_number)
+        if len(rows) == 0:
+            raise AutonomousSystemNotFoundError(as_number)
+        return int(np.sum(IpAsColumnarIndex.count_prefixes(index.starts[rows], index.ends[rows])))
+
+    def get_as_aggregates(self, as_numbers: Optional[Iterable[int]] = None) -> Dict[int, AutonomousSystemAggregate]:
+        """
+        This method returns the summary (ranges, prefixes and address space) of many Autonomous Systems at once: the
+        aggregates of the whole database are computed with vectorized reductions over the Autonomous System number
+        index.
+
+        :param as_numbers: The autonomous system numbers, or None for all of them. Numbers without entries are ignored.
+        :type as_numbers: Optional[Iterable[int]]
+        :returns: A dictionary from Autonomous System number to its summary.
+        :rtype: Dict[int, AutonomousSystemAggregate]
+        """
+        index = self.index
+        if as_numbers is None:
+            groups = range(len(index.as_group_numbers))
         else:
-            self.entries.clear()
-        with open(self.filepath, "r", encoding='utf-8') as f:        # FileNotFoundError
-            rd = csv.reader(f, delimiter=self.column_separator, quotechar='"')
-            for row in rd:
-                try:
-                    entry = EntryIpAsDatabase(row)
-                    self.entries.append(entry)
-                except ValueError:
-                    pass
-            f.close()
+            groups = [index.as_groups[as_number] for as_number in as_numbers if as_number in index.as_groups]
+        ranges_counts = index.ranges_counts()
+        prefixes_counts = index.prefixes_counts()
+        address_spaces = index.address_spaces()
+        result = dict()
+        for group in groups:
+            as_number = int(index.as_group_numbers[group])
+            result[as_number] = AutonomousSystemAggregate(as_number, int(ranges_counts[group]), int(prefixes_counts[group]), int(address_spaces[group]))
+        return result
+
+    def load(self) -> None:
+        """
+        Auxiliary method that is concerned to populate the index attribute from the .tsv file database. When called it
+        replaces all the entries currently saved in the object. If an entry is not well-formatted, the error is ignored.
+        The .tsv file is parsed only if its compiled (memory-mapped) version is absent or stale.
+
+        """
+        self.index = IpAsColumnarIndex.from_tsv_with_compiled_cache(self.filepath, self.column_separator)
+
+    @staticmethod
+    def download_latest_tsv_database(project_root_directory=Path.cwd(), url=IP_ASN_DATABASE_URL, chunk_size=1 << 16) -> Tuple[Optional[IpAsColumnarIndex], Optional[IpAsColumnarIndexDiff]]:
+        """
+        Downloads the .tsv database in the input folder (see requests_utils.download_tsv_database) parsing its lines
+        straight into the columnar index while they are streamed, then saves the index as compiled file next to the
+        .tsv (so the IpAsDatabase doesn't parse it again). If the database didn't change (304), the .tsv is only marked
+        as up-to-date. If it changed, the new version is compared with the previous compiled one: if they have the
+        same rows the compiled file is kept, otherwise it is rewritten, and the entries of the unchanged rows are
+        carried over.
+
+        :param project_root_directory: The Path object pointing at the project root directory.
+        :type project_root_directory: Path
+        :param url: The url of the .gz archive.
+        :type url: str
+        :param chunk_size: The size of the chunks read from the HTTP body.
+        :type chunk_size: int
+        :raise requests.exceptions.RequestException: If the download fails.
+        :raise zlib.error: If the archive is not valid.
+        :raise OSError: If the .tsv file can't be written.
+        :return: A tuple containing the index of the downloaded database (None if not modified) and its differences
+        from the previous version (None if not modified or there was no previous version).
+        :rtype: Tuple[Optional[IpAsColumnarIndex], Optional[IpAsColumnarIndexDiff]]
+        """
+        filepath = f"{str(project_root_directory)}{os.sep}{INPUT_FOLDER_NAME}{os.sep}{IP_ASN_ARCHIVE_NAME.replace('.gz', '')}"
+        compiled_filepath = filepath + IpAsColumnarIndex.COMPILED_EXTENSION
+        previous_indexes = list()
+
+        def index_lines(lines: Iterator[str]) -> IpAsColumnarIndex:
+            previous_indexes.append(IpAsDatabase.load_compiled_index(filepath, compiled_filepath))     # the .tsv is not yet replaced
+            return IpAsColumnarIndex.from_rows(csv.reader(lines, delimiter='\t', quotechar='"'))
+
+        downloaded = requests_utils.download_tsv_database(index_lines, project_root_directory=project_root_directory, url=url, chunk_size=chunk_size)
+        if downloaded is None:
+            IpAsDatabase.mark_tsv_database_as_updated(filepath, compiled_filepath)
+            return None, None
+        index, digest = downloaded
+        previous_index = previous_indexes.pop()
+        stat = os.stat(filepath)
+        diff = None
+        previous_key = None
+        if previous_index is not None:
+            diff = previous_index.diff(index)
+            index.inherit_entries(previous_index, diff)
+            previous_key = IpAsColumnarIndex.read_compiled_key(compiled_filepath)
+            previous_index = None       # releases the mapping of the previous compiled file
+        try:
+            if diff is not None and diff.is_empty() and previous_key is not None and previous_key[1:] == (stat.st_size, digest):
+                IpAsColumnarIndex.update_compiled_mtime(compiled_filepath, stat.st_mtime_ns)
+            else:
+                index.write_compiled(compiled_filepath, stat.st_mtime_ns, stat.st_size, digest)
+        except OSError:
+            pass        # the .tsv is parsed again when loaded
+        return index, diff
+
+    @staticmethod
+    def load_compiled_index(filepath: str, compiled_filepath: str) -> Optional[IpAsColumnarIndex]:
+        """
+        Loads the compiled file of the current .tsv database, if it is valid and up-to-date with the .tsv file.
+
+        :param filepath: The path of the .tsv database.
+        :type filepath: str
+        :param compiled_filepath: The path of the compiled file.
+        :type compiled_filepath: str
+        :return: The index, or None.
+        :rtype: Optional[IpAsColumnarIndex]
+        """
+        key = IpAsColumnarIndex.read_compiled_key(compiled_filepath)
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            return None
+        if key is None or key[0:2] != (stat.st_mtime_ns, stat.st_size):
+            return None
+        try:
+            return IpAsColumnarIndex.from_compiled(compiled_filepath)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def mark_tsv_database_as_updated(filepath: str, compiled_filepath: str) -> None:
+        """
+        Sets the modification time of the .tsv database to now (it is considered up-to-date for the next hour) keeping
+        its compiled file valid.
+
+        :param filepath: The path of the .tsv database.
+        :type filepath: str
+        :param compiled_filepath: The path of the compiled file.
+        :type compiled_filepath: str
+        :raise OSError: If the modification time can't be set.
+        """
+        stat = os.stat(filepath)
+        key = IpAsColumnarIndex.read_compiled_key(compiled_filepath)
+        os.utime(filepath)
+        if key is not None and key[0:2] == (stat.st_mtime_ns, stat.st_size):
+            IpAsColumnarIndex.update_compiled_mtime(compiled_filepath, os.stat(filepath).st_mtime_ns)
@@ -1,5 +1,8 @@
-from typing import Dict, Set
+from typing import Dict, Optional, Set
 import requests
+from entities.MainFrameScriptsHtmlParser import MainFrameScriptsHtmlParser
+from entities.SchemeUrl import SchemeUrl
+from entities.ScriptDependenciesCache import ScriptDependenciesCache
 from entities.Url import Url
 from entities.error_log.ErrorLog import ErrorLog
 from entities.resolvers.DnsResolver import DnsResolver
@@ -31,19 +34,24 @@ class LandingResolver:
         """
         self.dns_resolver = dns_resolver
 
-    def resolve_sites(self, sites: Set[Url]) -> Dict[Url, LandingSiteResult]:
+    def resolve_sites(self, sites: Set[Url], parse_main_frame_scripts=False, landing_cache: Optional[ScriptDependenciesCache] = None) -> Dict[Url, LandingSiteResult]:
         """
         This methods resolves landing of all sites (web sites or script sites) parameters.
 
         :param sites: A set of sites, that are URLs.
         :type sites: Set[Url]
+        :param parse_main_frame_scripts: A flag that sets if the scripts of the main frame are parsed from the html of
+        the landing pages.
+        :type parse_main_frame_scripts: bool
+        :param landing_cache: The cache of the landings of the script sites, or None to land every site.
+        :type landing_cache: Optional[ScriptDependenciesCache]
         :return: A dictionary with sites as keys and for each of them the corresponding landing result.
         :rtype: Dict[Url, LandingSiteResult]
         """
         final_results = dict()
         for i, site in enumerate(sites):
             print(f"Trying to resolve landing page of site[{i+1}/{len(sites)}]: {site}")
-            resolver_result = self.resolve_site(site)
+            resolver_result = self.resolve_site(site, parse_main_frame_scripts=parse_main_frame_scripts, landing_cache=landing_cache)
             final_results[site] = resolver_result
 
             # HTTPS
@@ -74,7 +82,7 @@ class LandingResolver:
             print()
         return final_results
 
-    def resolve_site(self, url: Url) -> LandingSiteResult:
+    def resolve_site(self, url: Url, parse_main_frame_scripts=False, landing_cache: Optional[ScriptDependenciesCache] = None) -> LandingSiteResult:
         """
         This methods resolves landing of a site, using HTTPS and HTTP as schemes.
         If an error occurs, it will be added in the error_logs attribute of the result and the result is set to None,
@@ -82,12 +90,17 @@ class LandingResolver:
 
         :param url: A site, that is an URL.
         :type url: Url
+        :param parse_main_frame_scripts: A flag that sets if the scripts of the main frame are parsed from the html of
+        the landing pages.
+        :type parse_main_frame_scripts: bool
+        :param landing_cache: The cache of the landings of the script sites, or None to land the site.
+        :type landing_cache: Optional[ScriptDependenciesCache]
         :return: A LandingSiteResult object.
         :rtype: LandingSiteResult
         """
         error_logs = list()
         try:
-            https_result = self.do_single_request(url, https=True)
+            https_result = self.do_single_request(url, https=True, parse_main_frame_scripts=parse_main_frame_scripts, landing_cache=landing_cache)
         except (NoAnswerError, DomainNonExistentError, UnknownReasonError) as e:
             https_result = None
             error_logs.append(ErrorLog(e, url.https().string, str(e)))
@@ -98,7 +111,7 @@ class LandingResolver:
             https_result = None
             error_logs.append(ErrorLog(exc, url.https().string, str(exc)))
         try:
-            http_result = self.do_single_request(url, https=False)
+            http_result = self.do_single_request(url, https=False, parse_main_frame_scripts=parse_main_frame_scripts, landing_cache=landing_cache)
         except (NoAnswerError, DomainNonExistentError, UnknownReasonError) as e:
             http_result = None
             error_logs.append(ErrorLog(e, url.http().string, str(e)))
@@ -110,15 +123,25 @@ class LandingResolver:
             error_logs.append(ErrorLog(exc, url.http().string, str(exc)))
         return LandingSiteResult(https_result, http_result, error_logs)
 
-    def do_single_request(self, site: Url, https: bool) -> LandingSiteSingleSchemeResult:
+    def do_single_request(self, site: Url, https: bool, parse_main_frame_scripts=False, landing_cache: Optional[ScriptDependenciesCache] = None) -> LandingSiteSingleSchemeResult:
         """
         This methods actually executes a HTTP GET request; it constructs a HTTP URL from the site parameter using HTTPS
         or HTTP scheme according to the https parameter.
+        If the scripts of the main frame should be parsed, the html of the landing page is parsed while it is
+        downloaded (see MainFrameScriptsHtmlParser), so that the scripts can be found without loading the page in the
+        headless browser.
+        If there is a landing cache and the html is not parsed, a landing saved in the cache (landing url, redirection
+        path and HSTS) is used without any request, and a new one is saved; the access path is resolved anyway.
 
         :param site: An URL.
         :type site: Url
         :param https: A flag to set the scheme used: HTTPS or HTTP.
         :type https: bool
+        :param parse_main_frame_scripts: A flag that sets if the scripts of the main frame are parsed from the html of
+        the landing page.
+        :type parse_main_frame_scripts: bool
+        :param landing_cache: The cache of the landings of the script sites, or None to request the landing.
+        :type landing_cache: Optional[ScriptDependenciesCache]
         :raise requests.exceptions.ConnectTimeout: The request timed out while trying to connect to the remote server.
         Requests that produced this error are safe to retry.
         :raise requests.exceptions.ConnectionError: A Connection error occurred. This occurs if https is not supported
@@ -132,37 +155,51 @@ class LandingResolver:
         :return: A InnerLandingSiteSingleSchemeResult object.
         :rtype: LandingSiteSingleSchemeResult
         """
-        try:
-            landing_url, redirection_path, hsts, ip = requests_utils.resolve_landing_page(site, as_https=https)
-        except requests.exceptions.ConnectTimeout:
-            # The request timed out while trying to connect to the remote server.
-            # Requests that produced this error are safe to retry.
-            raise
-        except requests.exceptions.ConnectionError:
-            # A Connection error occurred. This occurs if https is not supported by the server
-            raise
-        except requests.exceptions.HTTPError:
-            # An HTTP error occurred.
-            raise
-        except requests.exceptions.URLRequired:
-            # A valid URL is required to make a request.
-            raise
-        except requests.exceptions.InvalidURL:
-            raise
-        except requests.exceptions.TooManyRedirects:
-            # Too many redirects.
-            raise
-        except requests.exceptions.ReadTimeout:
-            # The server did not send any data in the allotted amount of time.
-            raise
-        except requests.exceptions.Timeout:
-            # The request timed out. Catching this error will catch both ConnectTimeout and ReadTimeout errors.
-            raise
-        except requests.exceptions.RequestException:
-            # There was an ambiguous exception that occurred while handling your request.
-            raise
+        html_parser = MainFrameScriptsHtmlParser() if parse_main_frame_scripts else None
+        if html_parser is not None:
+            landing_cache = None        # the html is needed
+        site_url = site.https().string if https else site.http().string
+        cached_landing = None if landing_cache is None else landing_cache.get_script_site_landing(site_url)
+        if cached_landing is not None:
+            landing_url, redirection_path, hsts = SchemeUrl(cached_landing[0]), cached_landing[1], cached_landing[2]
+        else:
+            try:
+                landing_url, redirection_path, hsts, ip = requests_utils.resolve_landing_page(site, as_https=https, read_body=None if html_parser is None else html_parser.feed_response)
+            except requests.exceptions.ConnectTimeout:
+                # The request timed out while trying to connect to the remote server.
+                # Requests that produced this error are safe to retry.
+                raise
+            except requests.exceptions.ConnectionError:
+                # A Connection error occurred. This occurs if https is not supported by the server
+                raise
+            except requests.exceptions.HTTPError:
+                # An HTTP error occurred.
+                raise
+            except requests.exceptions.URLRequired:
+                # A valid URL is required to make a request.
+                raise
+            except requests.exceptions.InvalidURL:
+                raise
+            except requests.exceptions.TooManyRedirects:
+                # Too many redirects.
+                raise
+            except requests.exceptions.ReadTimeout:
+                # The server did not send any data in the allotted amount of time.
+                raise
+            except requests.exceptions.Timeout:
+                # The request timed out. Catching this error will catch both ConnectTimeout and ReadTimeout errors.
+                raise
+            except requests.exceptions.RequestException:
+                # There was an ambiguous exception that occurred while handling your request.
+                raise
+            if landing_cache is not None:
+                landing_cache.put_script_site_landing(site_url, landing_url.string, redirection_path, hsts)
         try:
             a_path = self.dns_resolver.resolve_a_path(landing_url.domain_name())
         except (NoAnswerError, DomainNonExistentError, UnknownReasonError):
             raise
-        return LandingSiteSingleSchemeResult(landing_url, redirection_path, hsts, a_path)
+        if html_parser is None:
+            return LandingSiteSingleSchemeResult(landing_url, redirection_path, hsts, a_path)
+        if html_parser.truncated:
+            return LandingSiteSingleSchemeResult(landing_url, redirection_path, hsts, a_path, page_etag=html_parser.etag)
+        return LandingSiteSingleSchemeResult(landing_url, redirection_path, hsts, a_path, html_parser.get_main_frame_scripts(landing_url.string), html_parser.dynamic_scripts_suspected, html_parser.etag, html_parser.body_hash)
@@ -0,0 +1,148 @@
+import ipaddress
+from typing import Dict, List
+from entities.PrefixesTableIndex import PrefixesTableIndex
+from entities.RowPrefixesTable import RowPrefixesTable
+from entities.ValidatedRoaPayloadsIndex import ValidatedRoaPayloadsIndex
+from entities.resolvers.IpAsDatabase import IpAsDatabase
+from entities.resolvers.ROVPageScraper import ROVPageScraper
+from exceptions.TableNotPresentError import TableNotPresentError
+from utils import network_utils
+
+
+class OfflineROVValidator(ROVPageScraper):
+    """
+    This class represents an alternative to the ROVPageScraper that needs no browser: the prefixes table of an
+    Autonomous System is computed locally instead of being scraped from the ROV page, from its ranges in the .tsv
+    database and a local export of the Validated ROA Payloads (RPKI).
+    The ROV states are approximate: the ranges of the .tsv database are not BGP announcements, so the CIDR blocks of a
+    range are only used to find the row of an address, and the state of an address is computed from the VRPs that
+    cover the address itself, without checking their max length (the length of the real announcement is unknown, see
+    ValidatedRoaPayloadsIndex.validate_origin).
+    The computed rows have the same form of the scraped ones, except for the visibility (not known offline, always 0)
+    and the ROAS column, which lists the matching VRPs as 'prefix-max_length ASXXXX'.
+
+    ...
+
+    Attributes
+    ----------
+    ip_as_database : IpAsDatabase
+        The .tsv database which the announced prefixes are taken from.
+    vrps : ValidatedRoaPayloadsIndex
+        The index of the Validated ROA Payloads.
+    """
+    def __init__(self, ip_as_database: IpAsDatabase, vrps: ValidatedRoaPayloadsIndex):
+        """
+        Initialize the object.
+
+        :param ip_as_database: The .tsv database which the announced prefixes are taken from.
+        :type ip_as_database: IpAsDatabase
+        :param vrps: The index of the Validated ROA Payloads.
+        :type vrps: ValidatedRoaPayloadsIndex
+        """
+        super().__init__(None)
+        self.ip_as_database = ip_as_database
+        self.vrps = vrps
+
+    def load_as_page(self, as_number: int) -> None:
+        """
+        Computes the prefixes table of the autonomous system number and saves it in the state of this object.
+
+        :param as_number: The autonomous system number.
+        :type as_number: int
+        :raise ValueError: If the autonomous system number is < 0.
+        :raise TableNotPresentError: If the autonomous system has no range in the .tsv database.
+        """
+        if as_number < 0:
+            raise ValueError
+        self.current_as_number = as_number
+        self.scrape_prefixes_table_from_page()
+
+    def scrape_prefixes_table_from_page(self) -> List[RowPrefixesTable]:
+        """
+        Computes the prefixes table of the current autonomous system: a row for each CIDR block of its ranges in the
+        .tsv database, with the approximate ROV state of the whole block (the VRPs more specific than the block are not
+        considered: the rows returned for an address take them into account).
+
+        :raise TableNotPresentError: If the autonomous system has no range in the .tsv database.
+        :return: A list of RowPrefixesTable objects.
+        :rtype: List[RowPrefixesTable]
+        """
+        index = self.ip_as_database.index
+        rows = index.rows_of_as_number(self.current_as_number)
+        if len(rows) == 0:
+            self.prefixes_table = None
+            raise TableNotPresentError(self.current_as_number)
+        self.prefixes_table = list()
+        for position in sorted(rows.tolist()):
+            cc = index.country_codes[int(index.country_code_ids[position])]
+            if len(cc) != 2:
+                cc = 'ZZ'       # 'None' in the .tsv database
+            for network_address, length in network_utils.decompose_range_in_cidr_blocks(int(index.starts[position]), int(index.ends[position])):
+                prefix = ipaddress.IPv4Network((network_address, length))
+                self.prefixes_table.append(self.__validated_row(prefix, prefix, str(prefix.num_addresses), cc))
+        self.prefixes_index = PrefixesTableIndex(self.prefixes_table)
+        return self.prefixes_table
+
+    def get_network_if_present(self, ip: ipaddress.IPv4Address) -> RowPrefixesTable:
+        """
+        Searches the row of the prefixes table containing the address (see ROVPageScraper.get_network_if_present) and
+        returns it with the approximate ROV state of the address.
+
+        :param ip: An ip v4 address.
+        :type ip: ipaddress.IPv4Address
+        :raise TableEmptyError: If the table is empty.
+        :raise TableNotPresentError: If the table is not present.
+        :raise NetworkNotFoundError: If a network that contains the ip parameter is not found in the table.
+        :return: The matched row, validated for the address.
+        :rtype: RowPrefixesTable
+        """
+        row = super().get_network_if_present(ip)
+        return self.__validated_row_for_ip(row, ip)
+
+    def get_networks_if_present(self, ips: List[ipaddress.IPv4Address]) -> Dict[ipaddress.IPv4Address, RowPrefixesTable or None]:
+        """
+        Searches the row of the prefixes table containing every address (see ROVPageScraper.get_networks_if_present)
+        and returns them with the approximate ROV state of each address.
+
+        :param ips: The ip v4 addresses.
+        :type ips: List[ipaddress.IPv4Address]
+        :raise TableEmptyError: If the table is empty.
+        :raise TableNotPresentError: If the table is not present.
+        :return: A dictionary from every ip address to its matched row validated for the address, or None if no
+        network contains it.
+        :rtype: Dict[ipaddress.IPv4Address, RowPrefixesTable or None]
+        """
+        rows = super().get_networks_if_present(ips)
+        return {ip: None if row is None else self.__validated_row_for_ip(row, ip) for ip, row in rows.items()}
+
+    def __validated_row_for_ip(self, row: RowPrefixesTable, ip: ipaddress.IPv4Address) -> RowPrefixesTable:
+        """
+        Returns a copy of the row with the approximate ROV state of the address.
+
+        :param row: The row containing the address.
+        :type row: RowPrefixesTable
+        :param ip: The ip v4 address.
+        :type ip: ipaddress.IPv4Address
+        :return: The row.
+        :rtype: RowPrefixesTable
+        """
+        return self.__validated_row(row.prefix, ipaddress.IPv4Network((int(ip), 32)), str(row.span), row.cc)
+
+    def __validated_row(self, prefix: ipaddress.IPv4Network, validated_prefix: ipaddress.IPv4Network, span: str, cc: str) -> RowPrefixesTable:
+        """
+        Creates a row of the current autonomous system with the approximate ROV state of the validated prefix.
+
+        :param prefix: The prefix of the row.
+        :type prefix: ipaddress.IPv4Network
+        :param validated_prefix: The prefix (or address, as /32 prefix) validated.
+        :type validated_prefix: ipaddress.IPv4Network
+        :param span: The span of the row.
+        :type span: str
+        :param cc: The country code of the row.
+        :type cc: str
+        :return: The row.
+        :rtype: RowPrefixesTable
+        """
+        rov_state, vrps = self.vrps.validate_origin(validated_prefix, self.current_as_number)
+        roas = ', '.join(f"{vrp_prefix.compressed}-{max_length} AS{vrp_as_number}" for vrp_as_number, vrp_prefix, max_length in vrps)
+        return RowPrefixesTable('AS'+str(self.current_as_number), prefix.compressed, span, cc, '0', rov_state.to_string(), roas)
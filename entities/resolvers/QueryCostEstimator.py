@@ -0,0 +1,208 @@
+from typing import List, Optional
+from entities.DnsQueryLatencyStats import DnsQueryLatencyStats
+from entities.DomainName import DomainName
+from entities.LocalDnsResolverCache import LocalDnsResolverCache
+from entities.OrderedWorklist import OrderedWorklist
+from entities.RRecord import RRecord
+from entities.Url import Url
+from entities.enums.TypesRR import TypesRR
+from entities.resolvers.results.QueryCostEstimate import QueryCostEstimate
+from exceptions.NoAvailablePathError import NoAvailablePathError
+from exceptions.NoRecordInCacheError import NoRecordInCacheError
+from exceptions.ReachedMaximumRecursivePathThresholdError import ReachedMaximumRecursivePathThresholdError
+
+
+class QueryCostEstimator:
+    """
+    This class estimates the cost of the DNS resolving of an input (web sites and mail domains) before executing it
+    ("explain"): it repeats the lookups of the DnsResolver (landing A path, MX and mail servers A paths, CNAME and NS
+    of every subdomain and A paths of the name servers) only against the cache, and it never sends anything on the
+    network.
+    Positive resource records of the cache have no TTL (the .csv file does not save it) so they are always considered
+    valid, as the application does; negative entries are considered only until their TTL expires.
+
+    ...
+
+    Attributes
+    ----------
+    cache : LocalDnsResolverCache
+        The cache to check.
+    latency_stats : DnsQueryLatencyStats
+        The measured latencies used to estimate the duration of the live queries.
+    consider_tld : bool
+        Flag that tells if the resolving considers TLDs.
+    """
+    def __init__(self, cache: LocalDnsResolverCache, latency_stats: DnsQueryLatencyStats, consider_tld: bool):
+        """
+        Instantiate the object.
+
+        :param cache: The cache to check.
+        :type cache: LocalDnsResolverCache
+        :param latency_stats: The measured latencies.
+        :type latency_stats: DnsQueryLatencyStats
+        :param consider_tld: Flag that tells if the resolving considers TLDs.
+        :type consider_tld: bool
+        """
+        self.cache = cache
+        self.latency_stats = latency_stats
+        self.consider_tld = consider_tld
+        self.estimate = QueryCostEstimate()
+        self.lookups_done = set()
+
+    def estimate_input(self, web_sites: List[Url], mail_domains: List[DomainName]) -> QueryCostEstimate:
+        """
+        Estimates the cost of the DNS resolving of the input. Every (name, type) lookup is counted once: after a live
+        query the application saves the answer in the cache.
+
+        :param web_sites: The input web sites.
+        :type web_sites: List[Url]
+        :param mail_domains: The input mail domains.
+        :type mail_domains: List[DomainName]
+        :return: The estimate.
+        :rtype: QueryCostEstimate
+        """
+        self.estimate = QueryCostEstimate()
+        self.lookups_done = set()
+        domain_names = OrderedWorklist()
+        for web_site in web_sites:
+            self.__estimate_a_path(web_site.domain_name())
+            domain_names.add(web_site.domain_name())
+        for mail_domain in mail_domains:
+            domain_names.add(mail_domain)
+            domain_names.add_all(self.__estimate_mail_domain(mail_domain))
+        for domain_name in domain_names:
+            self.__estimate_domain_dependencies(domain_name)
+        for type_rr in TypesRR:
+            self.estimate.estimated_seconds = self.estimate.estimated_seconds + self.estimate.live_queries[type_rr] * self.latency_stats.mean_or_default(type_rr)
+        return self.estimate
+
+    def __is_first_lookup(self, domain_name: DomainName, type_rr: TypesRR) -> bool:
+        """
+        Tells if the lookup was not already counted, and marks it as counted.
+
+        :param domain_name: The domain name.
+        :type domain_name: DomainName
+        :param type_rr: The resource record type.
+        :type type_rr: TypesRR
+        :return: True or False.
+        :rtype: bool
+        """
+        if (domain_name, type_rr) in self.lookups_done:
+            return False
+        self.lookups_done.add((domain_name, type_rr))
+        return True
+
+    def __count_miss(self, domain_name: DomainName, type_rr: TypesRR) -> None:
+        """
+        Counts a lookup not answered by the positive cache: a negative hit or a live query.
+
+        :param domain_name: The domain name.
+        :type domain_name: DomainName
+        :param type_rr: The resource record type.
+        :type type_rr: TypesRR
+        """
+        if self.cache.is_known_nonexistent(domain_name):
+            self.estimate.negative_hits = self.estimate.negative_hits + 1
+        else:
+            self.estimate.live_queries[type_rr] = self.estimate.live_queries[type_rr] + 1
+            if type_rr == TypesRR.NS or type_rr == TypesRR.MX:
+                self.estimate.unexpanded_lookups = self.estimate.unexpanded_lookups + 1
+
+    def __lookup(self, domain_name: DomainName, type_rr: TypesRR) -> Optional[RRecord]:
+        """
+        Looks up the single resource record in the cache and counts the result.
+
+        :param domain_name: The domain name.
+        :type domain_name: DomainName
+        :param type_rr: The resource record type.
+        :type type_rr: TypesRR
+        :return: The cached resource record, or None if a query is needed.
+        :rtype: Optional[RRecord]
+        """
+        first = self.__is_first_lookup(domain_name, type_rr)
+        try:
+            rr = self.cache.lookup(domain_name, type_rr)
+        except NoRecordInCacheError:
+            if first:
+                self.__count_miss(domain_name, type_rr)
+            return None
+        if first:
+            self.estimate.cache_hits[type_rr] = self.estimate.cache_hits[type_rr] + 1
+        return rr
+
+    def __estimate_path(self, domain_name: DomainName, type_rr: TypesRR) -> Optional[RRecord]:
+        """
+        Estimates the resolving of a path (CNAME chain followed by the resource record type) as the resolve_a_path
+        method of DnsResolver does: cache first, then a single query.
+
+        :param domain_name: The domain name.
+        :type domain_name: DomainName
+        :param type_rr: The resource record type.
+        :type type_rr: TypesRR
+        :return: The resolution of the cached path, or None if a query is needed.
+        :rtype: Optional[RRecord]
+        """
+        first = self.__is_first_lookup(domain_name, type_rr)
+        try:
+            path = self.cache.resolve_path(domain_name, type_rr)
+        except (NoAvailablePathError, ReachedMaximumRecursivePathThresholdError):
+            if first:
+                self.__count_miss(domain_name, type_rr)
+            return None
+        if first:
+            self.estimate.cache_hits[type_rr] = self.estimate.cache_hits[type_rr] + 1
+        return path.get_resolution()
+
+    def __estimate_a_path(self, domain_name: DomainName) -> None:
+        """
+        Estimates the resolving of an A path.
+
+        :param domain_name: The domain name.
+        :type domain_name: DomainName
+        """
+        self.__estimate_path(domain_name, TypesRR.A)
+
+    def __estimate_mail_domain(self, mail_domain: DomainName) -> List[DomainName]:
+        """
+        Estimates the resolving of a mail domain: MX path and the A path of every mail server.
+
+        :param mail_domain: The mail domain.
+        :type mail_domain: DomainName
+        :return: The mail servers known from the cache.
+        :rtype: List[DomainName]
+        """
+        rr_mx = self.__estimate_path(mail_domain, TypesRR.MX)
+        if rr_mx is None:
+            return list()
+        mail_servers = list()
+        for value in rr_mx.values:
+            if isinstance(value, DomainName):
+                self.__estimate_a_path(value)
+                mail_servers.append(value)
+        return mail_servers
+
+    def __estimate_domain_dependencies(self, domain_name: DomainName) -> None:
+        """
+        Estimates the resolving of the zone dependencies of a domain name, following the elaboration list of the
+        resolve_domain_dependencies method of DnsResolver.
+
+        :param domain_name: The domain name.
+        :type domain_name: DomainName
+        """
+        elaboration_domains = OrderedWorklist.by_labels_count(domain_name.parse_subdomains(self.consider_tld, self.consider_tld, True))
+        for current_domain in elaboration_domains:
+            last_domain_name = current_domain
+            for i in range(50):
+                rr_cname = self.__lookup(last_domain_name, TypesRR.CNAME)
+                if rr_cname is None:
+                    break
+                last_domain_name = rr_cname.get_first_value()
+                for subdomain in last_domain_name.parse_subdomains(self.consider_tld, self.consider_tld, False):
+                    elaboration_domains.add(subdomain)
+            rr_ns = self.__lookup(last_domain_name, TypesRR.NS)
+            if rr_ns is None or (not self.consider_tld and last_domain_name.is_tld()):
+                continue
+            for name_server in rr_ns.values:
+                for subdomain in name_server.parse_subdomains(self.consider_tld, self.consider_tld, True):
+                    elaboration_domains.add(subdomain)
+                self.__estimate_a_path(name_server)
@@ -1,8 +1,10 @@
 import ipaddress
-from typing import List
+from typing import Dict, List, Optional
 import selenium
-from selenium.webdriver.common.by import By
+from selenium.webdriver.support.wait import WebDriverWait
 from entities.FirefoxHeadlessWebDriver import FirefoxHeadlessWebDriver
+from entities.PrefixesTableIndex import PrefixesTableIndex
+from entities.ROVTablesCache import ROVTablesCache
 from entities.RowPrefixesTable import RowPrefixesTable
 from exceptions.NetworkNotFoundError import NetworkNotFoundError
 from exceptions.NotROVStateTypeError import NotROVStateTypeError
@@ -27,20 +29,54 @@ class ROVPageScraper:
         A list that represents the pfx_table_div (id of html element) table in the page (ROV page) saved state of this
         object to save computational time when asked to see if an ip address is contained in one of the prefixes in
         such table. We wanna avoid traversing the DOM for each address query.
+    prefixes_index : PrefixesTableIndex or None
+        The longest-prefix match index of the prefixes_table, built when the table is scraped.
     current_as_number : int
         An integer that saves the current as page loaded.
+    cache : ROVTablesCache or None
+        The persistent cache of the tables, or None to load every page.
+    last_validators : Tuple[str or None, str or None]
+        The ETag and Last-Modified headers of the last page loaded (None if not known), saved in the cache with its
+        table.
     """
 
-    def __init__(self, headless_browser: FirefoxHeadlessWebDriver):
+    # returns the texts of the td cells of every row of the table body, or null if the div, the table or the tbody are
+    # not present: the result is sent back as a single JSON response
+    PREFIXES_TABLE_SCRIPT = """
+        var div = document.getElementById('pfx_table_div');
+        var table = div === null ? null : div.querySelector('table');
+        var tbody = table === null ? null : table.querySelector('tbody');
+        if (tbody === null) {
+            return null;
+        }
+        var rows = [];
+        var trs = tbody.getElementsByTagName('tr');
+        for (var i = 0; i < trs.length; i++) {
+            var cells = [];
+            var tds = trs[i].getElementsByTagName('td');
+            for (var j = 0; j < tds.length; j++) {
+                cells.push(tds[j].innerText === undefined ? tds[j].textContent : tds[j].innerText);
+            }
+            rows.push(cells);
+        }
+        return rows;
+    """
+
+    def __init__(self, headless_browser: FirefoxHeadlessWebDriver, cache: Optional[ROVTablesCache] = None):
         """
         Initialize the object.
 
         :param headless_browser: The instance of a Firefox headless browser.
         :type headless_browser: FirefoxHeadlessWebDriver
+        :param cache: The persistent cache of the tables, or None to load every page.
+        :type cache: Optional[ROVTablesCache]
         """
         self.headless_browser = headless_browser
         self.prefixes_table = list()
+        self.prefixes_index = None
         self.current_as_number = -1
+        self.cache = cache
+        self.last_validators = (None, None)
 
     def load_page(self, url_page: str) -> None:
         """
@@ -63,11 +99,13 @@ class ROVPageScraper:
             self.prefixes_table = list()
             self.current_as_number = -1
             raise
+        self.headless_browser.count_page_transfer()
 
     def load_as_page(self, as_number: int) -> None:
         """
         Execute a GET of the url that is associated with the autonomous system number parameter. The result is in the
-        state of the headless browser.
+        state of the headless browser. If the cache has a fresh table of the autonomous system, the page is not loaded
+        and the cached table is used; otherwise the scraped table is saved in the cache.
 
         :param as_number: The autonomous system number.
         :type as_number: int
@@ -83,22 +121,66 @@ class ROVPageScraper:
         """
         if as_number < 0:
             raise ValueError
-        else:
-            try:
-                self.load_page(ROVPageScraper.base_url(as_number))
-            except (selenium.common.exceptions.WebDriverException, selenium.common.exceptions.TimeoutException):
-                raise
-            self.current_as_number = as_number
-            try:
-                self.scrape_prefixes_table_from_page()
-            except (TableNotPresentError, ValueError, TableEmptyError, NotROVStateTypeError):
-                raise
+        if self.cache is not None:
+            rows = self.cache.get(as_number)
+            if rows is not None:
+                self.set_prefixes_table(as_number, rows)
+                return
+        self.last_validators = (None, None)
+        try:
+            self.scrape_as_page(as_number)
+        except (selenium.common.exceptions.WebDriverException, selenium.common.exceptions.TimeoutException, TableNotPresentError, ValueError, TableEmptyError, NotROVStateTypeError):
+            raise
+        if self.cache is not None:
+            self.cache.put(as_number, self.prefixes_table, *self.last_validators)
+
+    def scrape_as_page(self, as_number: int) -> None:
+        """
+        Loads the page of the autonomous system number in the headless browser and scrapes its prefixes table, without
+        using the cache.
+
+        :param as_number: The autonomous system number.
+        :type as_number: int
+        :raise selenium.common.exceptions.WebDriverException: If something goes wrong with the request.
+        :raise TableNotPresentError: If there's a problem while parsing the html page.
+        :raise ValueError: If the data found for a row are not formatted as expected. See __init__() of class
+        RowPrefixesTable.
+        :raise TableEmptyError: If there's a problem while parsing the html page.
+        :raise NotROVStateTypeError: If the data found for a row are not formatted as expected. See __init__() of class
+        RowPrefixesTable.
+        """
+        try:
+            self.load_page(ROVPageScraper.base_url(as_number))
+        except (selenium.common.exceptions.WebDriverException, selenium.common.exceptions.TimeoutException):
+            raise
+        self.current_as_number = as_number
+        try:
+            self.scrape_prefixes_table_from_page()
+        except (TableNotPresentError, ValueError, TableEmptyError, NotROVStateTypeError):
+            raise
+
+    def set_prefixes_table(self, as_number: int, rows: List[RowPrefixesTable]) -> None:
+        """
+        Sets the prefixes table of the autonomous system number (e.g. from the cache) as if its page was scraped.
+
+        :param as_number: The autonomous system number.
+        :type as_number: int
+        :param rows: The rows of the table.
+        :type rows: List[RowPrefixesTable]
+        """
+        self.current_as_number = as_number
+        self.prefixes_table = rows
+        self.prefixes_index = PrefixesTableIndex(rows)
 
     def scrape_prefixes_table_from_page(self) -> List[RowPrefixesTable]:
         """
         This method scrape the current page in the headless browser to find the pfx_table_div (id html element) table
         constructed (normally) in the ROV page. Obviously it needs a previous load of a valid autonomous system page.
         See method: load_as_page().
+        The whole table is read with a single script executed in the page (see PREFIXES_TABLE_SCRIPT), instead of a
+        WebDriver request for every element and cell. If the table is not present yet and the page is still loading
+        (the page load strategy of the browser can return at DOMContentLoaded, see BrowserBlockingPolicy), the load of
+        the page is waited for before reading it again.
 
         :raise TableNotPresentError: If the pfx_table_div (id html element) or the table (html element) or the tbody
         (html element) are not found.
@@ -110,47 +192,73 @@ class ROVPageScraper:
         :return: A list of RowPrefixesTable objects to represent the pfx_table_div (id html element) table.
         :rtype: List[RowPrefixesTable]
         """
-        try:
-            div = self.headless_browser.driver.find_element(By.ID, 'pfx_table_div')
-        except selenium.common.exceptions.NoSuchElementException:
-            self.prefixes_table = None
-            raise TableNotPresentError(self.current_as_number)
-        try:
-            table = div.find_element(By.TAG_NAME, 'table')
-        except selenium.common.exceptions.NoSuchElementException:
-            self.prefixes_table = None
-            raise TableNotPresentError(self.current_as_number)
-        try:
-            tbody = table.find_element(By.TAG_NAME, "tbody")
-        except selenium.common.exceptions.NoSuchElementException:
+        rows = self.headless_browser.driver.execute_script(ROVPageScraper.PREFIXES_TABLE_SCRIPT)
+        if rows is None and self.headless_browser.driver.execute_script('return document.readyState') != 'complete':
+            try:
+                WebDriverWait(self.headless_browser.driver, FirefoxHeadlessWebDriver.time_out_in_seconds).until(
+                    lambda driver: driver.execute_script('return document.readyState') == 'complete'
+                )
+            except selenium.common.exceptions.TimeoutException:
+                pass
+            rows = self.headless_browser.driver.execute_script(ROVPageScraper.PREFIXES_TABLE_SCRIPT)
+        if rows is None:
             self.prefixes_table = None
             raise TableNotPresentError(self.current_as_number)
-        try:
-            trs = tbody.find_elements(By.TAG_NAME, "tr")
-        except selenium.common.exceptions.NoSuchElementException:
-            self.prefixes_table = list()
-            raise TableEmptyError(self.current_as_number)
+        return self.set_prefixes_table_from_cells([[' '.join(cell.split()) for cell in row] for row in rows])
+
+    def set_prefixes_table_from_cells(self, rows: List[List[str]]) -> List[RowPrefixesTable]:
+        """
+        Sets the prefixes table of the current autonomous system from the texts of the td cells of every row of the
+        table body. Rows without td cells (headers) are skipped.
+
+        :param rows: The texts of the cells of every row.
+        :type rows: List[List[str]]
+        :raise ValueError: If the data found for a row are not formatted as expected. See __init__() of class
+        RowPrefixesTable.
+        :raise NotROVStateTypeError: If the data found for a row are not formatted as expected. See __init__() of class
+        RowPrefixesTable.
+        :return: A list of RowPrefixesTable objects to represent the pfx_table_div (id html element) table.
+        :rtype: List[RowPrefixesTable]
+        """
         self.prefixes_table = list()
-        for tr in trs:
+        for tds in rows:
+            if len(tds) == 0:
+                continue
             try:
-                tds = tr.find_elements(By.TAG_NAME, 'td')
-            except selenium.common.exceptions.NoSuchElementException:
-                self.prefixes_table = list()
-                raise TableEmptyError(self.current_as_number)
-            try:
-                # tds[0].text is the index number
-                tmp = RowPrefixesTable(tds[1].text, tds[2].text, tds[3].text, tds[4].text, tds[5].text, tds[6].text, tds[7].text)
+                if len(tds) < 8:
+                    raise ValueError(f"Row of {len(tds)} cells: {tds}")
+                # tds[0] is the index number
+                tmp = RowPrefixesTable(tds[1], tds[2], tds[3], tds[4], tds[5], tds[6], tds[7])
                 self.prefixes_table.append(tmp)
             except (ValueError, NotROVStateTypeError):
                 self.prefixes_table = None
                 raise
+        self.prefixes_index = PrefixesTableIndex(self.prefixes_table)
         return self.prefixes_table
 
+    def get_prefixes_index(self) -> PrefixesTableIndex:
+        """
+        Returns the longest-prefix match index of the table saved in the state of this object, building it if the table
+        was replaced after the last scraping.
+
+        :raise TableEmptyError: If the pfx_table_div (id html element) table is empty.
+        :raise TableNotPresentError: If the table (html element) is not present.
+        :return: The index.
+        :rtype: PrefixesTableIndex
+        """
+        if self.prefixes_table is None:
+            raise TableNotPresentError(self.current_as_number)
+        if len(self.prefixes_table) == 0:
+            raise TableEmptyError(self.current_as_number)
+        if self.prefixes_index is None or self.prefixes_index.rows is not self.prefixes_table:
+            self.prefixes_index = PrefixesTableIndex(self.prefixes_table)
+        return self.prefixes_index
+
     def get_network_if_present(self, ip: ipaddress.IPv4Address) -> RowPrefixesTable:
         """
-        This method search in the table saved in the state of this ROVPageScraper object a row containing a prefix which
-        contains the address parameter. In other words, before this method you have to invoke load_as_page(as_number)
-        method.
+        This method search in the table saved in the state of this ROVPageScraper object the row containing the most
+        specific prefix (longest-prefix match) which contains the address parameter. In other words, before this method
+        you have to invoke load_as_page(as_number) method.
 
 
         :param ip: An ip v4 address.
@@ -161,14 +269,28 @@ class ROVPageScraper:
         :return: The matched row (from the prefix) in the table.
         :rtype: RowPrefixesTable
         """
-        if self.prefixes_table is None:
-            raise TableNotPresentError(self.current_as_number)
-        if len(self.prefixes_table) == 0:
+        if self.prefixes_table is not None and len(self.prefixes_table) == 0:
             raise TableEmptyError(self.current_as_number, ip)
-        for row in self.prefixes_table:
-            if ip in row.prefix:
-                return row
-        raise NetworkNotFoundError(ip.compressed)
+        row = self.get_prefixes_index().longest_prefix_match(ip)
+        if row is None:
+            raise NetworkNotFoundError(ip.compressed)
+        return row
+
+    def get_networks_if_present(self, ips: List[ipaddress.IPv4Address]) -> Dict[ipaddress.IPv4Address, RowPrefixesTable or None]:
+        """
+        This method search in the table saved in the state of this ROVPageScraper object the row containing the most
+        specific prefix for every address of the parameter, with a single batch. Before this method you have to invoke
+        load_as_page(as_number) method.
+
+        :param ips: The ip v4 addresses.
+        :type ips: List[ipaddress.IPv4Address]
+        :raise TableEmptyError: If the pfx_table_div (id html element) table is empty.
+        :raise TableNotPresentError: If the table (html element) is not present.
+        :return: A dictionary from every ip address to its matched row, or None if no network contains it.
+        :rtype: Dict[ipaddress.IPv4Address, RowPrefixesTable or None]
+        """
+        index = self.get_prefixes_index()
+        return dict(zip(ips, index.longest_prefix_matches(ips)))
 
     @staticmethod
     def base_url(as_number: int) -> str:
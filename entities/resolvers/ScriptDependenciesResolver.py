@@ -1,9 +1,8 @@
-from typing import Set
+from typing import Optional, Set
 import selenium
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions
 from selenium.webdriver.support.wait import WebDriverWait
 from entities.FirefoxHeadlessWebDriver import FirefoxHeadlessWebDriver
+from entities.HeadlessBrowserPool import HeadlessBrowserPool
 from entities.MainFrameScript import MainFrameScript
 from entities.SchemeUrl import SchemeUrl
 
@@ -11,6 +10,8 @@ from entities.SchemeUrl import SchemeUrl
 class ScriptDependenciesResolver:
     """
     The class represents an object that provides tools to resolve script dependencies given a HTTP URL.
+    If a pool of headless browsers is set, every research takes a browser from the pool, so that more researches can
+    be executed concurrently.
 
     ...
 
@@ -18,39 +19,108 @@ class ScriptDependenciesResolver:
     ----------
     headless_browser : FirefoxHeadlessWebDriver
         An instance of a FirefoxHeadlessWebDriver object to use for resolving.
-
+    browser_pool : HeadlessBrowserPool or None
+        The pool of headless browsers to use for resolving, or None to use headless_browser.
+    wait_timeout : float
+        Seconds the presence of a script in the page is waited for.
+    """
+    # returns the src and integrity attributes (as the WebDriver get_attribute() returns them: src as absolute url) of
+    # the scripts of the main frame, as a single JSON response
+    SCRIPTS_ATTRIBUTES_SCRIPT = """
+        var snapshot = document.evaluate('//script[not(ancestor::iframe)]', document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        var scripts = [];
+        for (var i = 0; i < snapshot.snapshotLength; i++) {
+            var script = snapshot.snapshotItem(i);
+            scripts.push([script.src, script.integrity === undefined ? script.getAttribute('integrity') : script.integrity]);
+        }
+        return scripts;
     """
-    def __init__(self, headless_browser: FirefoxHeadlessWebDriver):
+
+    def __init__(self, headless_browser: FirefoxHeadlessWebDriver, browser_pool: Optional[HeadlessBrowserPool] = None, wait_timeout: float = 10):
         """
         Instantiate the object.
 
         :param headless_browser: An instance of a Firefox headless browser.
         :type headless_browser: FirefoxHeadlessWebDriver
+        :param browser_pool: The pool of headless browsers to use instead of headless_browser.
+        :type browser_pool: Optional[HeadlessBrowserPool]
+        :param wait_timeout: Seconds the presence of a script in the page is waited for.
+        :type wait_timeout: float
         """
         self.headless_browser = headless_browser
+        self.browser_pool = browser_pool
+        self.wait_timeout = wait_timeout
 
     def search_script_application_dependencies(self, url: SchemeUrl) -> Set[MainFrameScript]:
         """
         The method is the actual research of main frame script dependencies from a HTTP URL.
+        The attributes of all the scripts are read with a single script executed in the page (see
+        SCRIPTS_ATTRIBUTES_SCRIPT), that is repeated until at least a script is present (at most wait_timeout seconds).
+        If a pool of headless browsers is set, a browser is taken from the pool for the research; if the page can't be
+        loaded (e.g. it takes more than the task timeout of the pool), the browser is recycled.
+
+        :param url: An HTTP URL.
+        :type url: SchemeUrl
+        :raise selenium.common.exceptions.WebDriverException: There was a problem getting the response form the request.
+        :raise selenium.common.exceptions.TimeoutException: If no script is present in the page after wait_timeout
+        seconds.
+        :raise NoAvailableBrowserError: If no browser of the pool is available.
+        :returns: A set of scripts.
+        :rtype: Set[MainFrameScript]
+        """
+        if self.browser_pool is None:
+            return self.search_script_application_dependencies_with_browser(self.headless_browser, url)
+        headless_browser = self.browser_pool.acquire()
+        failed = False
+        try:
+            try:
+                headless_browser.driver.get(url.string)
+            except selenium.common.exceptions.WebDriverException:
+                failed = True
+                raise
+            headless_browser.count_page_transfer()
+            return self.read_main_frame_scripts(headless_browser)
+        finally:
+            self.browser_pool.release(headless_browser, failed=failed)
 
+    def search_script_application_dependencies_with_browser(self, headless_browser: FirefoxHeadlessWebDriver, url: SchemeUrl) -> Set[MainFrameScript]:
+        """
+        The research of search_script_application_dependencies() executed with a given headless browser.
 
+        :param headless_browser: The headless browser.
+        :type headless_browser: FirefoxHeadlessWebDriver
         :param url: An HTTP URL.
         :type url: SchemeUrl
         :raise selenium.common.exceptions.WebDriverException: There was a problem getting the response form the request.
+        :raise selenium.common.exceptions.TimeoutException: If no script is present in the page after wait_timeout
+        seconds.
         :returns: A set of scripts.
         :rtype: Set[MainFrameScript]
         """
         try:
-            self.headless_browser.driver.get(url.string)
+            headless_browser.driver.get(url.string)
         except selenium.common.exceptions.WebDriverException:
             raise
+        headless_browser.count_page_transfer()
+        return self.read_main_frame_scripts(headless_browser)
+
+    def read_main_frame_scripts(self, headless_browser: FirefoxHeadlessWebDriver) -> Set[MainFrameScript]:
+        """
+        Reads the scripts of the main frame of the page loaded in the headless browser.
+
+        :param headless_browser: The headless browser.
+        :type headless_browser: FirefoxHeadlessWebDriver
+        :raise selenium.common.exceptions.WebDriverException: If the script can't be executed in the page.
+        :raise selenium.common.exceptions.TimeoutException: If no script is present in the page after wait_timeout
+        seconds.
+        :returns: A set of scripts.
+        :rtype: Set[MainFrameScript]
+        """
         main_page_scripts = set()
-        awaiter_scripts = WebDriverWait(self.headless_browser.driver, 10).until(
-            expected_conditions.presence_of_all_elements_located((By.XPATH, '//script[not(ancestor::iframe)]'))
+        scripts_attributes = WebDriverWait(headless_browser.driver, self.wait_timeout).until(
+            lambda driver: driver.execute_script(ScriptDependenciesResolver.SCRIPTS_ATTRIBUTES_SCRIPT) or False
         )
-        for script in awaiter_scripts:
-            src = script.get_attribute('src')
-            integrity = script.get_attribute('integrity')
+        for src, integrity in scripts_attributes:
             if integrity == '':
                 integrity = None
             if src == '' or src is None:
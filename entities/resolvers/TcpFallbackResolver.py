@@ -0,0 +1,122 @@
+import threading
+import time
+from urllib.parse import urlparse
+import dns.inet
+import dns.message
+import dns.query
+import dns.rdataclass
+import dns.rdatatype
+import dns.resolver
+import dns.version
+from entities.DnsTcpConnectionPool import DnsTcpConnectionPool
+
+
+class TcpFallbackResolver(dns.resolver.Resolver):
+    """
+    This class is a dnspython resolver that retries the truncated (TC=1) UDP responses over persistent and pipelined
+    TCP connections, one for each upstream nameserver, instead of opening a new TCP connection for every retry.
+    Queries are sent with EDNS0 and an UDP payload size that avoids IP fragmentation (see EDNS_PAYLOAD).
+    The resolution loop drives the private resolution object of dnspython, whose interface is known only for the
+    versions in POOLED_RESOLUTION_VERSIONS: with other versions the plain dnspython resolution is used (truncated
+    responses retried on new TCP connections).
+
+    ...
+
+    Attributes
+    ----------
+    tcp_pool : DnsTcpConnectionPool
+        The pool of persistent TCP connections.
+    truncated_responses : int
+        Number of UDP responses received truncated and then retried over TCP.
+    lock : threading.Lock
+        Lock that keeps the counter consistent between the threads that share the resolver.
+    """
+    EDNS_PAYLOAD = 1232     # DNS Flag Day 2020 recommended value
+    POOLED_RESOLUTION_VERSIONS = ((2, 0), (2, 3))       # first and last (major, minor) with the known _Resolution
+
+    def __init__(self, filename='/etc/resolv.conf', configure=True):
+        """
+        Initialize the resolver reading the system configuration (as the dnspython one) and enabling EDNS0.
+
+        :param filename: The resolv.conf file to read when configure is True.
+        :type filename: str
+        :param configure: Flag that tells if the system configuration should be read.
+        :type configure: bool
+        """
+        super().__init__(filename=filename, configure=configure)
+        self.use_edns(0, 0, self.EDNS_PAYLOAD)
+        self.tcp_pool = DnsTcpConnectionPool()
+        self.truncated_responses = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def is_pooled_resolution_supported() -> bool:
+        """
+        Tells if the installed dnspython has the private resolution interface the pooled resolution relies on.
+
+        :return: True if the version is in POOLED_RESOLUTION_VERSIONS.
+        :rtype: bool
+        """
+        first, last = TcpFallbackResolver.POOLED_RESOLUTION_VERSIONS
+        return first <= (dns.version.MAJOR, dns.version.MINOR) <= last and hasattr(dns.resolver, '_Resolution')
+
+    def resolve(self, qname, rdtype=dns.rdatatype.A, rdclass=dns.rdataclass.IN, tcp=False, source=None,
+                raise_on_no_answer=True, source_port=0, lifetime=None, search=None) -> dns.resolver.Answer:
+        """
+        Same semantic of the dnspython resolve method; the only difference is that TCP queries (TC=1 retries or tcp
+        parameter set) go through the persistent connections of the pool. The source and source_port parameters are
+        ignored for TCP queries because the connections are shared. If the installed dnspython is not supported, it is
+        the plain dnspython resolution.
+
+        :raise dns.resolver.NXDOMAIN: If the query name does not exist.
+        :raise dns.resolver.YXDOMAIN: If the query name is too long after DNAME substitution.
+        :raise dns.resolver.NoAnswer: If raise_on_no_answer is True and the query name exists but has no RRset of the
+        desired type and class.
+        :raise dns.resolver.NoNameservers: If no non-broken nameservers are available to answer the question.
+        :raise dns.exception.Timeout: If no answers could be found in the specified lifetime.
+        :return: The answer.
+        :rtype: dns.resolver.Answer
+        """
+        if not TcpFallbackResolver.is_pooled_resolution_supported():
+            return super().resolve(qname, rdtype=rdtype, rdclass=rdclass, tcp=tcp, source=source, raise_on_no_answer=raise_on_no_answer, source_port=source_port, lifetime=lifetime, search=search)
+        resolution = dns.resolver._Resolution(self, qname, rdtype, rdclass, tcp, raise_on_no_answer, search)
+        start = time.time()
+        while True:
+            (request, answer) = resolution.next_request()
+            if answer is not None:
+                return answer
+            done = False
+            while not done:
+                (nameserver, port, tcp_attempt, backoff) = resolution.next_nameserver()
+                if backoff:
+                    time.sleep(backoff)
+                timeout = self._compute_timeout(start, lifetime)
+                try:
+                    if dns.inet.is_address(nameserver):
+                        if tcp_attempt:
+                            response = self.tcp_pool.query(request, nameserver, port, timeout)
+                        else:
+                            response = dns.query.udp(request, nameserver, timeout=timeout, port=port, source=source,
+                                                     source_port=source_port, raise_on_truncation=True)
+                    else:
+                        if urlparse(nameserver).scheme != 'https':
+                            raise NotImplementedError
+                        response = dns.query.https(request, nameserver, timeout=timeout)
+                except dns.message.Truncated as ex:
+                    with self.lock:
+                        self.truncated_responses = self.truncated_responses + 1
+                    (_, done) = resolution.query_result(None, ex)
+                    continue
+                except Exception as ex:
+                    (_, done) = resolution.query_result(None, ex)
+                    continue
+                (answer, done) = resolution.query_result(response, None)
+                if answer is not None:
+                    return answer
+
+    def close(self) -> None:
+        """
+        Closes all the persistent TCP connections.
+
+        """
+        self.tcp_pool.close()
@@ -0,0 +1,43 @@
+class AutonomousSystemAggregate:
+    """
+    This class represents the summary of the ranges of the IpAsDatabase associated to an Autonomous System.
+
+    ...
+
+    Attributes
+    ----------
+    as_number : int
+        The Autonomous System number.
+    ranges_count : int
+        The number of ranges (entries of the database).
+    prefixes_count : int
+        The number of CIDR prefixes needed to cover the ranges.
+    address_space : int
+        The number of ip addresses covered by the ranges.
+    """
+    def __init__(self, as_number: int, ranges_count: int, prefixes_count: int, address_space: int):
+        """
+        Initialize object.
+
+        :param as_number: The Autonomous System number.
+        :type as_number: int
+        :param ranges_count: The number of ranges.
+        :type ranges_count: int
+        :param prefixes_count: The number of CIDR prefixes.
+        :type prefixes_count: int
+        :param address_space: The number of ip addresses.
+        :type address_space: int
+        """
+        self.as_number = as_number
+        self.ranges_count = ranges_count
+        self.prefixes_count = prefixes_count
+        self.address_space = address_space
+
+    def __str__(self) -> str:
+        """
+        Returns the string representation of the object.
+
+        :return: The string.
+        :rtype: str
+        """
+        return f"AS{self.as_number}: {self.ranges_count} ranges, {self.prefixes_count} prefixes, {self.address_space} addresses"
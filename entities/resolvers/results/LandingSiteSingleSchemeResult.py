@@ -1,4 +1,5 @@
-from typing import List
+from typing import List, Optional, Set
+from entities.MainFrameScript import MainFrameScript
 from entities.SchemeUrl import SchemeUrl
 from entities.paths.APath import APath
 
@@ -22,10 +23,23 @@ class LandingSiteSingleSchemeResult:
         The Path object that represents the domain name associated with the landing url.
     server : DomainName
         The domain name associated with the landing url.
+    main_frame_scripts : Set[MainFrameScript] or None
+        The scripts of the main frame found in the html of the landing page, or None if the html was not parsed
+        (completely).
+    dynamic_scripts_suspected : bool
+        Whether the landing page appears to inject scripts dynamically.
+    page_etag : str or None
+        The ETag header of the html of the landing page, if present.
+    page_body_hash : str or None
+        The hash of the html of the landing page, if it was read completely.
     """
-    def __init__(self, url: SchemeUrl, redirection_path: List[str], hsts: bool, a_path: APath):
+    def __init__(self, url: SchemeUrl, redirection_path: List[str], hsts: bool, a_path: APath, main_frame_scripts: Optional[Set[MainFrameScript]] = None, dynamic_scripts_suspected: bool = False, page_etag: Optional[str] = None, page_body_hash: Optional[str] = None):
         self.url = url
         self.redirection_path = redirection_path
         self.hsts = hsts
         self.a_path = a_path
         self.server = url.domain_name()
+        self.main_frame_scripts = main_frame_scripts
+        self.dynamic_scripts_suspected = dynamic_scripts_suspected
+        self.page_etag = page_etag
+        self.page_body_hash = page_body_hash
@@ -0,0 +1,76 @@
+from entities.enums.TypesRR import TypesRR
+
+
+class QueryCostEstimate:
+    """
+    This class represents the result of a dry run of the DNS resolving: how many lookups are answered by the cache and
+    how many queries would be sent on the network, per resource record type.
+
+    ...
+
+    Attributes
+    ----------
+    cache_hits : Dict[TypesRR, int]
+        Number of lookups answered by the cached resource records, per type.
+    live_queries : Dict[TypesRR, int]
+        Number of queries that would be sent on the network, per type.
+    negative_hits : int
+        Number of lookups answered by the negative cache (names known to be non-existent, TTL not expired).
+    unexpanded_lookups : int
+        Number of NS and MX queries whose answer is unknown: the name servers and mail servers they return (and their
+        own lookups) cannot be counted, so the live queries are a lower bound.
+    estimated_seconds : float
+        Estimated duration of the live queries sent sequentially, from the measured latencies.
+    """
+    def __init__(self):
+        """
+        Initialize object.
+
+        """
+        self.cache_hits = {type_rr: 0 for type_rr in TypesRR}
+        self.live_queries = {type_rr: 0 for type_rr in TypesRR}
+        self.negative_hits = 0
+        self.unexpanded_lookups = 0
+        self.estimated_seconds = 0.0
+
+    def total_cache_hits(self) -> int:
+        """
+        Returns the number of lookups answered without querying (positive and negative cache).
+
+        :return: The number of lookups.
+        :rtype: int
+        """
+        return sum(self.cache_hits.values()) + self.negative_hits
+
+    def total_live_queries(self) -> int:
+        """
+        Returns the number of queries that would be sent on the network.
+
+        :return: The number of queries.
+        :rtype: int
+        """
+        return sum(self.live_queries.values())
+
+    def hit_rate(self) -> float:
+        """
+        Returns the predicted cache hit rate, between 0 and 1 (0 when there are no lookups at all).
+
+        :return: The hit rate.
+        :rtype: float
+        """
+        total = self.total_cache_hits() + self.total_live_queries()
+        if total == 0:
+            return 0.0
+        return self.total_cache_hits() / total
+
+    def print_report(self) -> None:
+        """
+        Prints the estimate.
+
+        """
+        for type_rr in TypesRR:
+            print(f"> {type_rr.to_string()}: {self.live_queries[type_rr]} live queries, {self.cache_hits[type_rr]} cache hits")
+        print(f"> Names known to be non-existent: {self.negative_hits}")
+        print(f"> Predicted cache hit rate: {self.hit_rate() * 100:.1f}%")
+        print(f"> Expected live queries: {'at least ' if self.unexpanded_lookups > 0 else ''}{self.total_live_queries()} ({self.unexpanded_lookups} NS/MX answers not in cache, their name servers and mail servers are not counted)")
+        print(f"> Estimated time of the live queries: {self.estimated_seconds:.1f} seconds")
@@ -0,0 +1,12 @@
+class NoAvailableBrowserError(Exception):
+    def __init__(self, timeout: float or None = None):
+        if timeout is None:
+            temp = f"No headless browser left in the pool."
+        else:
+            temp = f"No headless browser of the pool became free in {timeout} seconds."
+        self.timeout = timeout
+        self.message = temp
+        BaseException.__init__(self, temp)
+
+    def __str__(self):
+        return f'{self.message}'
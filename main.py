@@ -3,17 +3,25 @@ from datetime import datetime
 from typing import List, Tuple
 from peewee import SqliteDatabase
 from entities.DatabaseEntitiesCompleter import DatabaseEntitiesCompleter
+from entities.DnsQueryLatencyStats import DnsQueryLatencyStats
+from entities.LocalDnsResolverCache import LocalDnsResolverCache
 from entities.ApplicationResolversWrapper import ApplicationResolversWrapper
+from entities.BrowserBlockingPolicy import BrowserBlockingPolicy
 from SNAPSHOTS.take_snapshot import take_snapshot
 from pathlib import Path
 from entities.DomainName import DomainName
 from entities.Url import Url
+from entities.resolvers.HotSwappableIpAsDatabase import HotSwappableIpAsDatabase
+from entities.resolvers.HttpROVPageScraper import HttpROVPageScraper
+from entities.resolvers.QueryCostEstimator import QueryCostEstimator
 from exceptions.FilenameNotFoundError import FilenameNotFoundError
 from exceptions.InvalidUrlError import InvalidUrlError
 from persistence import helper_application_results, alias_fix
 from persistence.BaseModel import db, close_database_connection, db_file
 from static_variables import INPUT_FOLDER_NAME, INPUT_MAIL_DOMAINS_FILE_NAME, INPUT_WEB_SITES_FILE_NAME, \
-    ARGUMENT_COMPLETE_DATABASE, ARGUMENT_CONSIDER_TLD, ARGUMENT_SCRAPE_ROV, ARGUMENT_RESOLVE_SCRIPT
+    ARGUMENT_COMPLETE_DATABASE, ARGUMENT_CONSIDER_TLD, ARGUMENT_SCRAPE_ROV, ARGUMENT_RESOLVE_SCRIPT, ARGUMENT_AGGRESSIVE_NSEC, \
+    ARGUMENT_EXPLAIN, ARGUMENT_COMPARE_SCRIPT_DISCOVERY, ARGUMENT_PERSISTENT_BROWSER_PROFILES, ARGUMENT_OFFLINE_ROV, \
+    ARGUMENT_BLOCK_BROWSER_RESOURCES
 from utils import network_utils, list_utils, file_utils, snapshot_utils, datetime_utils, database_driver_utils
 
 
@@ -167,6 +175,65 @@ def get_input_application_flags(default_complete_unresolved_database=False, defa
     return default_complete_unresolved_database, default_consider_tld, default_execute_script_resolving, default_execute_rov_scraping
 
 
+def get_input_optional_flag(argument: str, flag_name: str, default_value=False) -> bool:
+    """
+    Getting an optional flag (a property that can be set or not set) that personalizes the elaboration of the
+    application, but that is not saved in the snapshots of the input flags.
+
+    :param argument: The command line argument that sets the flag.
+    :type argument: str
+    :param flag_name: The name of the flag that is printed.
+    :type flag_name: str
+    :param default_value: The default value of the flag.
+    :type default_value: bool
+    :return: The value of the flag.
+    :rtype: bool
+    """
+    if argument in sys.argv[1:]:
+        default_value = True
+    print(f"> {flag_name} flag: {str(default_value)}")
+    return default_value
+
+
+def explain_input(web_sites: List[Url], mail_domains: List[DomainName], consider_tld: bool, aggressive_negative_caching=False, project_root_directory=Path.cwd()) -> None:
+    """
+    Dry run of the application: it prints how many DNS queries the input would cost and how much of the work is
+    already covered by the cache exported from the previous executions. Nothing is sent on the network; the time
+    estimate is based on the query latencies measured in the previous executions.
+
+    :param web_sites: The input web sites.
+    :type web_sites: List[Url]
+    :param mail_domains: The input mail domains.
+    :type mail_domains: List[DomainName]
+    :param consider_tld: The consider_tld flag.
+    :type consider_tld: bool
+    :param aggressive_negative_caching: The aggressive negative caching flag: the names answered with NXDOMAIN in the
+    previous executions are considered only if set.
+    :type aggressive_negative_caching: bool
+    :param project_root_directory: The Path object pointing at the project root directory.
+    :type project_root_directory: Path
+    """
+    print(f"******* EXPLAINING INPUT QUERY COST *******")
+    cache = LocalDnsResolverCache(aggressive_negative_caching=aggressive_negative_caching)
+    latency_stats = DnsQueryLatencyStats()
+    try:
+        cache.load_csv_from_output_folder(take_snapshot=False, project_root_directory=project_root_directory)
+    except (ValueError, FilenameNotFoundError, OSError) as exc:
+        print(f"!!! {str(exc)} !!!")
+    if aggressive_negative_caching:
+        try:
+            cache.load_negative_csv_from_output_folder(project_root_directory=project_root_directory)
+        except (FilenameNotFoundError, OSError):
+            pass
+    try:
+        latency_stats.load_csv_from_output_folder(project_root_directory=project_root_directory)
+    except (FilenameNotFoundError, OSError):
+        print(f"> No latency measured yet: {DnsQueryLatencyStats.DEFAULT_LATENCY} seconds per query is assumed.")
+    print(f"> Cache has {len(cache)} entries.")
+    estimate = QueryCostEstimator(cache, latency_stats, consider_tld).estimate_input(web_sites, mail_domains)
+    estimate.print_report()
+
+
 if __name__ == "__main__":
     print("********** START APPLICATION **********")
     resolvers = None
@@ -183,40 +250,52 @@ if __name__ == "__main__":
         input_websites = get_input_websites()
         input_mail_domains = get_input_mail_domains()
         complete_unresolved_database, consider_tld, execute_script_resolving, execute_rov_resolving = get_input_application_flags()
-        # entities
-        print("********** START APPLICATION **********")
-        resolvers = ApplicationResolversWrapper(consider_tld, execute_script_resolving, execute_rov_resolving)
-        are_there_new_domain_name_from_db_completion = False
-        new_domain_names_from_db_completion = set()
-        if complete_unresolved_database:
-            completer = DatabaseEntitiesCompleter(resolvers)
-            unresolved_entities = helper_application_results.get_unresolved_entities(execute_script_resolving, execute_rov_resolving)
-            new_domain_names_from_db_completion = completer.do_complete_unresolved_entities(unresolved_entities)
-            if len(new_domain_names_from_db_completion) > 0:
-                print(f"From DB completion {len(new_domain_names_from_db_completion)} new domain names will be elaborated from MIDST part onwards.")
-                are_there_new_domain_name_from_db_completion = True
-        # auxiliary elaborations
-        print("********** START ACTUAL APPLICATION ELABORATION **********")
-        resolvers.dns_resolver.cache.take_temp_snapshot()  # for future error reproducibility
-        snapshot_utils.take_temporary_snapshot(input_websites, input_mail_domains, complete_unresolved_database, consider_tld, execute_script_resolving, execute_rov_resolving)    # for future error reproducibility
-        # actual elaboration of all resolvers
-        start_execution_time = datetime.now()
-        preamble_domain_names = resolvers.do_preamble_execution(input_websites, input_mail_domains)
-        if are_there_new_domain_name_from_db_completion:
-            list_utils.merge_set_in_list(preamble_domain_names, new_domain_names_from_db_completion)
-        midst_domain_names = resolvers.do_midst_execution(preamble_domain_names)
-        resolvers.do_epilogue_execution(midst_domain_names)
-        # insertion in the database
-        print("\nInsertion into database started... ")
-        helper_application_results.insert_all_application_results(resolvers)
-        df = alias_fix.construct_alias_chained(str(db_file))                # ALIAS CHAINED simplification
-        alias_fix.insert_table_in_db(df, str(db_file), 'alias_chained')     # ALIAS CHAINED simplification
-        print("Insertion into database finished.")
-        # export dns cache, error_logs and unresolved entities
-        resolvers.dns_resolver.cache.write_to_csv_in_output_folder()
-        resolvers.error_logger.write_to_csv_in_output_folder()
-        helper_application_results.dump_all_unresolved_entities(execute_rov_scraping=execute_rov_resolving)
-        print(f"Total application execution time is: {datetime_utils.compute_delta_and_stamp(start_execution_time)}")
+        aggressive_negative_caching = get_input_optional_flag(ARGUMENT_AGGRESSIVE_NSEC, 'AGGRESSIVE NSEC/NSEC3 CACHING')
+        explain = get_input_optional_flag(ARGUMENT_EXPLAIN, 'EXPLAIN (DRY RUN)')
+        compare_script_discovery = get_input_optional_flag(ARGUMENT_COMPARE_SCRIPT_DISCOVERY, 'COMPARE SCRIPT DISCOVERY')
+        persistent_browser_profiles = get_input_optional_flag(ARGUMENT_PERSISTENT_BROWSER_PROFILES, 'PERSISTENT BROWSER PROFILES')
+        offline_rov_validation = get_input_optional_flag(ARGUMENT_OFFLINE_ROV, 'OFFLINE (APPROXIMATE) ROV VALIDATION')
+        block_browser_resources = get_input_optional_flag(ARGUMENT_BLOCK_BROWSER_RESOURCES, 'BLOCK BROWSER RESOURCES')
+        if explain:
+            explain_input(input_websites, input_mail_domains, consider_tld, aggressive_negative_caching=aggressive_negative_caching)
+        else:
+            # entities
+            print("********** START APPLICATION **********")
+            resolvers = ApplicationResolversWrapper(consider_tld, execute_script_resolving, execute_rov_resolving, aggressive_negative_caching=aggressive_negative_caching, compare_script_discovery=compare_script_discovery, persistent_browser_profiles=persistent_browser_profiles, offline_rov_validation=offline_rov_validation, browser_blocking_policy=BrowserBlockingPolicy() if block_browser_resources else None)
+            are_there_new_domain_name_from_db_completion = False
+            new_domain_names_from_db_completion = set()
+            if complete_unresolved_database:
+                completer = DatabaseEntitiesCompleter(resolvers)
+                unresolved_entities = helper_application_results.get_unresolved_entities(execute_script_resolving, execute_rov_resolving)
+                new_domain_names_from_db_completion = completer.do_complete_unresolved_entities(unresolved_entities)
+                if len(new_domain_names_from_db_completion) > 0:
+                    print(f"From DB completion {len(new_domain_names_from_db_completion)} new domain names will be elaborated from MIDST part onwards.")
+                    are_there_new_domain_name_from_db_completion = True
+            # auxiliary elaborations
+            print("********** START ACTUAL APPLICATION ELABORATION **********")
+            resolvers.dns_resolver.cache.take_temp_snapshot()  # for future error reproducibility
+            snapshot_utils.take_temporary_snapshot(input_websites, input_mail_domains, complete_unresolved_database, consider_tld, execute_script_resolving, execute_rov_resolving)    # for future error reproducibility
+            # actual elaboration of all resolvers
+            start_execution_time = datetime.now()
+            preamble_domain_names = resolvers.do_preamble_execution(input_websites, input_mail_domains)
+            if are_there_new_domain_name_from_db_completion:
+                list_utils.merge_set_in_list(preamble_domain_names, new_domain_names_from_db_completion)
+            midst_domain_names = resolvers.do_midst_execution(preamble_domain_names)
+            resolvers.do_epilogue_execution(midst_domain_names)
+            # insertion in the database
+            print("\nInsertion into database started... ")
+            helper_application_results.insert_all_application_results(resolvers)
+            df = alias_fix.construct_alias_chained(str(db_file))                # ALIAS CHAINED simplification
+            alias_fix.insert_table_in_db(df, str(db_file), 'alias_chained')     # ALIAS CHAINED simplification
+            print("Insertion into database finished.")
+            # export dns cache, error_logs and unresolved entities
+            resolvers.dns_resolver.cache.write_to_csv_in_output_folder()
+            if aggressive_negative_caching:
+                resolvers.dns_resolver.cache.write_negative_to_csv_in_output_folder()
+            resolvers.dns_resolver.latency_stats.write_to_csv_in_output_folder()
+            resolvers.error_logger.write_to_csv_in_output_folder()
+            helper_application_results.dump_all_unresolved_entities(execute_rov_scraping=execute_rov_resolving)
+            print(f"Total application execution time is: {datetime_utils.compute_delta_and_stamp(start_execution_time)}")
     except Exception as e:
         take_snapshot(e)
         print(f"!!! Unexpected exception occurred. SNAPSHOT taken. !!!")
@@ -225,7 +304,19 @@ if __name__ == "__main__":
     finally:
         # closing
         if resolvers is not None:
-            if resolvers.headless_browser_is_instantiated:
+            if resolvers.script_browser_pool is not None:
+                resolvers.script_browser_pool.close()       # headless_browser included
+            elif resolvers.headless_browser_is_instantiated:
                 resolvers.headless_browser.close()
+            resolvers.dns_resolver.close()
+            if resolvers.script_dependencies_cache is not None:
+                resolvers.script_dependencies_cache.close()
+            for rov_page_scraper in resolvers.rov_page_scrapers:
+                if isinstance(rov_page_scraper, HttpROVPageScraper):
+                    rov_page_scraper.close()        # HTTP session and fallback browser
+            if resolvers.rov_tables_cache is not None:
+                resolvers.rov_tables_cache.close()
+            if isinstance(resolvers.ip_as_database, HotSwappableIpAsDatabase):
+                resolvers.ip_as_database.stop()
         close_database_connection()
     print("********** APPLICATION END **********")
@@ -27,6 +27,19 @@ ARGUMENT_CONSIDER_TLD = '-tld'
 ARGUMENT_COMPLETE_DATABASE = '-continue'
 ARGUMENT_RESOLVE_SCRIPT = '-script'
 ARGUMENT_SCRAPE_ROV = '-rov'
+ARGUMENT_AGGRESSIVE_NSEC = '-nsec'
+ARGUMENT_EXPLAIN = '-explain'
+ARGUMENT_COMPARE_SCRIPT_DISCOVERY = '-comparescripts'
+ARGUMENT_PERSISTENT_BROWSER_PROFILES = '-profiles'
+ARGUMENT_OFFLINE_ROV = '-offlinerov'
+ARGUMENT_BLOCK_BROWSER_RESOURCES = '-blockresources'
+# ip2asn database
+IP_ASN_DATABASE_URL = 'https://iptoasn.com/data/ip2asn-v4.tsv.gz'
+IP_ASN_DATABASE_REQUEST_TIMEOUT = (10, 60)      # (connect, read) seconds
+# landing pages
+LANDING_REQUEST_TIMEOUT = (10, 30)      # (connect, read) seconds
+MAX_LANDING_HTML_CHARACTERS = 5 * (1 << 20)
+MAX_LANDING_HTML_READ_SECONDS = 60
 # project folders
 OUTPUT_FOLDER_NAME = 'output'
 INPUT_FOLDER_NAME = 'input'
@@ -35,11 +48,19 @@ SNAPSHOTS_FOLDER_NAME = 'SNAPSHOTS'
 INPUT_MAIL_DOMAINS_FILE_NAME = 'mail_domains.txt'
 INPUT_WEB_SITES_FILE_NAME = 'web_pages.txt'
 IP_ASN_ARCHIVE_NAME = 'ip2asn-v4.tsv.gz'
+IP_ASN_VALIDATORS_FILE_NAME = 'ip2asn-v4.validators.json'
+RPKI_VRPS_CSV_FILE_NAME = 'vrps.csv'
+RPKI_VRPS_JSON_FILE_NAME = 'vrps.json'
 GECKODRIVER_FILENAME = get_geckodriver_filename()
 # output file names
 OUTPUT_DNS_CACHE_FILE_NAME = 'dns_cache.csv'
 OUTPUT_ERROR_LOGS_FILE_NAME = 'error_logs.csv'
 OUTPUT_UNRESOLVED_ENTITIES_FILE_NAME = 'unresolved_entities.csv'
+OUTPUT_DNS_LATENCY_FILE_NAME = 'dns_latency.csv'
+OUTPUT_DNS_NEGATIVE_CACHE_FILE_NAME = 'dns_negative_cache.csv'
+OUTPUT_ROV_TABLES_CACHE_FILE_NAME = 'rov_tables_cache.sqlite'
+OUTPUT_SCRIPT_DEPENDENCIES_CACHE_FILE_NAME = 'script_dependencies_cache.sqlite'
+OUTPUT_BROWSER_PROFILES_FOLDER_NAME = 'browser_profiles'
 # temp file names
 TEMP_DNS_CACHE = 'temp_dns_cache.csv'
 TEMP_FLAGS = 'temp_flags.txt'
@@ -0,0 +1,185 @@
+import time
+import unittest
+import dns.dnssec
+import dns.flags
+import dns.message
+import dns.name
+import dns.rcode
+import dns.rdatatype
+import dns.rrset
+from entities.DenialRanges import DenialRanges
+from entities.DomainName import DomainName
+from entities.enums.TypesRR import TypesRR
+from entities.resolvers.DnsResolver import DnsResolver
+from exceptions.DomainNonExistentError import DomainNonExistentError
+from testing.LocalDnsStandInServer import LocalDnsStandInServer
+
+
+class AggressiveNegativeCachingTestCase(unittest.TestCase):
+    """
+    Offline test of the aggressive use of DNSSEC-validated NSEC/NSEC3 records (RFC 8198). A local stand-in resolver
+    serves a tiny signed zone (only the apex, 'a' and 'm' exist) and answers every other name with a validated (AD=1)
+    NXDOMAIN containing the SOA and the whole NSEC (or NSEC3) chain of the zone.
+
+    """
+    server = None
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        # PARAMETERS
+        cls.zone = 'example.test.'
+        cls.existing_names = [cls.zone, 'a.' + cls.zone, 'm.' + cls.zone]
+        cls.salt = b'\xab\xcd'
+        cls.use_nsec3 = False
+        # ELABORATION
+        cls.server = LocalDnsStandInServer(cls.answer_from_signed_zone).start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.stop()
+
+    @classmethod
+    def answer_from_signed_zone(cls, request: dns.message.Message) -> dns.message.Message:
+        response = dns.message.make_response(request)
+        response.flags |= dns.flags.AD
+        question = request.question[0]
+        if question.name.to_text() in cls.existing_names:
+            response.answer.append(dns.rrset.from_text(question.name, 300, 'IN', 'A', '192.0.2.1'))
+            return response
+        response.set_rcode(dns.rcode.NXDOMAIN)
+        response.authority.append(dns.rrset.from_text(cls.zone, 300, 'IN', 'SOA', f"ns.{cls.zone} admin.{cls.zone} 1 3600 600 86400 300"))
+        if cls.use_nsec3:
+            hashes = sorted(dns.dnssec.nsec3_hash(name, cls.salt, 0, 1) for name in cls.existing_names)
+            for i, owner_hash in enumerate(hashes):
+                next_hash = hashes[(i + 1) % len(hashes)]
+                response.authority.append(dns.rrset.from_text(f"{owner_hash}.{cls.zone}", 300, 'IN', 'NSEC3', f"1 0 0 {cls.salt.hex()} {next_hash} A RRSIG"))
+        else:
+            for i, owner in enumerate(cls.existing_names):
+                next_name = cls.existing_names[(i + 1) % len(cls.existing_names)]
+                response.authority.append(dns.rrset.from_text(owner, 300, 'IN', 'NSEC', f"{next_name} A RRSIG NSEC"))
+        return response
+
+    def get_resolver(self, aggressive_negative_caching: bool) -> DnsResolver:
+        dns_resolver = DnsResolver(False, aggressive_negative_caching=aggressive_negative_caching)
+        dns_resolver.resolver.nameservers = ['127.0.0.1']
+        dns_resolver.resolver.port = self.server.port
+        dns_resolver.resolver.lifetime = 5
+        return dns_resolver
+
+    def count_queries_for_nonexistent_names(self, dns_resolver: DnsResolver, names: list) -> int:
+        queries_before = self.server.udp_queries
+        for name in names:
+            with self.assertRaises(DomainNonExistentError):
+                dns_resolver.do_query(name, TypesRR.A)
+        return self.server.udp_queries - queries_before
+
+    def test_01_nsec_ranges_synthesize_nxdomain(self):
+        print(f"\n------- START TEST 1 -------")
+        AggressiveNegativeCachingTestCase.use_nsec3 = False
+        dns_resolver = self.get_resolver(True)
+        queries = self.count_queries_for_nonexistent_names(dns_resolver, ['b.' + self.zone, 'c.' + self.zone, 'z.' + self.zone, 'x.y.' + self.zone])
+        print(f"queries sent for 4 non-existent names: {queries}")
+        self.assertEqual(1, queries)
+        dns_resolver.do_query('m.' + self.zone, TypesRR.A)
+        self.assertFalse(dns_resolver.cache.is_known_nonexistent(DomainName('a.' + self.zone)))
+        dns_resolver.close()
+        print(f"------- END TEST 1 -------")
+
+    def test_02_nsec3_ranges_synthesize_nxdomain(self):
+        print(f"\n------- START TEST 2 -------")
+        AggressiveNegativeCachingTestCase.use_nsec3 = True
+        dns_resolver = self.get_resolver(True)
+        queries = self.count_queries_for_nonexistent_names(dns_resolver, ['b.' + self.zone, 'c.' + self.zone, 'z.' + self.zone, 'x.y.' + self.zone])
+        print(f"queries sent for 4 non-existent names: {queries}")
+        self.assertEqual(1, queries)
+        self.assertFalse(dns_resolver.cache.is_known_nonexistent(DomainName('a.' + self.zone)))
+        dns_resolver.close()
+        print(f"------- END TEST 2 -------")
+
+    def test_03_without_aggressive_caching_nothing_is_cached(self):
+        print(f"\n------- START TEST 3 -------")
+        AggressiveNegativeCachingTestCase.use_nsec3 = False
+        dns_resolver = self.get_resolver(False)
+        queries = self.count_queries_for_nonexistent_names(dns_resolver, ['b.' + self.zone, 'c.' + self.zone, 'b.' + self.zone])
+        print(f"queries sent for 3 non-existent names (one repeated): {queries}")
+        self.assertEqual(3, queries)
+        self.assertDictEqual(dict(), dns_resolver.cache.nonexistent_dict)
+        dns_resolver.close()
+        print(f"------- END TEST 3 -------")
+
+    def test_04_repeated_ranges_are_replaced(self):
+        print(f"\n------- START TEST 4 -------")
+        zone = dns.name.from_text(self.zone)
+        for use_nsec3 in (False, True):
+            AggressiveNegativeCachingTestCase.use_nsec3 = use_nsec3
+            dns_resolver = self.get_resolver(True)
+            for name in ('b.', 'c.', 'z.', 'x.y.'):
+                response = self.answer_from_signed_zone(dns.message.make_query(name + self.zone, 'A'))
+                dns_resolver.cache_negative_response(response)
+            if use_nsec3:
+                self.assertEqual(1, len(dns_resolver.cache.nsec3_dict[zone]))
+                self.assertEqual(len(self.existing_names), len(next(iter(dns_resolver.cache.nsec3_dict[zone].values()))))
+            else:
+                self.assertEqual(len(self.existing_names), len(dns_resolver.cache.nsec_dict[zone]))
+            self.assertTrue(dns_resolver.cache.is_known_nonexistent(DomainName('q.' + self.zone)))
+            dns_resolver.close()
+        print(f"------- END TEST 4 -------")
+
+    def test_05_denial_ranges(self):
+        print(f"\n------- START TEST 5 -------")
+        ranges = DenialRanges()
+        ranges.add('D', 'H', 300)
+        ranges.add('H', 'P', 0.05)
+        ranges.add('P', 'D', 300)       # last range of the chain, wraps around
+        self.assertTupleEqual(('D', 'H', None), ranges.find_covering('F'))
+        self.assertTupleEqual(('P', 'D', None), ranges.find_covering('A'))
+        self.assertTupleEqual(('P', 'D', None), ranges.find_covering('Z'))
+        self.assertIsNone(ranges.find_covering('D'))        # an owner exists
+        self.assertIsNotNone(ranges.find_covering('K'))
+        time.sleep(0.1)
+        self.assertIsNone(ranges.find_covering('K'))        # expired: dropped
+        self.assertEqual(2, len(ranges))
+        ranges.add('H', 'P', 0.05)
+        time.sleep(0.1)
+        ranges.add('D', 'H', 300)                           # after the earliest expiration: expired ranges dropped
+        self.assertListEqual(['D', 'P'], ranges.owners)
+        print(f"------- END TEST 5 -------")
+
+    def test_06_empty_non_terminals_exist(self):
+        print(f"\n------- START TEST 6 -------")
+        # PARAMETERS
+        zone = DomainName('example.com.')
+        chain = [dns.name.from_text('example.com.'), dns.name.from_text('a.b.example.com.')]
+        # ELABORATION
+        dns_resolver = self.get_resolver(True)
+        for i, owner in enumerate(chain):
+            dns_resolver.cache.add_nsec_range(zone, owner, chain[(i + 1) % len(chain)], 300)
+        self.assertFalse(dns_resolver.cache.is_known_nonexistent(DomainName('b.example.com.')))     # a.b.example.com is below it
+        self.assertTrue(dns_resolver.cache.is_known_nonexistent(DomainName('c.example.com.')))
+        self.assertTrue(dns_resolver.cache.is_known_nonexistent(DomainName('x.b.example.com.')))
+        dns_resolver.close()
+        print(f"------- END TEST 6 -------")
+
+    def test_07_nxdomain_after_cname_chain(self):
+        print(f"\n------- START TEST 7 -------")
+        # PARAMETERS
+        alias = 'www.' + self.zone
+        target = 'gone.other.test.'
+        # ELABORATION
+        dns_resolver = self.get_resolver(True)
+        response = dns.message.make_response(dns.message.make_query(alias, 'A'))
+        response.set_rcode(dns.rcode.NXDOMAIN)
+        response.answer.append(dns.rrset.from_text(alias, 300, 'IN', 'CNAME', 'cdn.other.test.'))
+        response.answer.append(dns.rrset.from_text('cdn.other.test.', 300, 'IN', 'CNAME', target))
+        response.authority.append(dns.rrset.from_text('other.test.', 300, 'IN', 'SOA', 'ns.other.test. admin.other.test. 1 3600 600 86400 300'))
+        dns_resolver.cache_negative_response(response)
+        self.assertTrue(dns_resolver.cache.is_known_nonexistent(DomainName(target)))
+        self.assertTrue(dns_resolver.cache.is_known_nonexistent(DomainName('x.' + target)))
+        self.assertFalse(dns_resolver.cache.is_known_nonexistent(DomainName(alias)))
+        self.assertFalse(dns_resolver.cache.is_known_nonexistent(DomainName('x.' + alias)))       # below an existing alias
+        dns_resolver.close()
+        print(f"------- END TEST 7 -------")
+
+
+if __name__ == '__main__':
+    unittest.main()
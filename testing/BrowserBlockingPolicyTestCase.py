@@ -0,0 +1,173 @@
+import statistics
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from selenium.webdriver.firefox.options import Options
+from entities.BrowserBlockingPolicy import BrowserBlockingPolicy
+from entities.FirefoxHeadlessWebDriver import FirefoxHeadlessWebDriver
+from exceptions.FilenameNotFoundError import FilenameNotFoundError
+from static_variables import INPUT_FOLDER_NAME, GECKODRIVER_FILENAME
+from utils import file_utils
+
+
+def is_geckodriver_present() -> bool:
+    try:
+        file_utils.search_for_filename_in_subdirectory(INPUT_FOLDER_NAME, GECKODRIVER_FILENAME, file_utils.get_project_root_directory())
+        return True
+    except FilenameNotFoundError:
+        return False
+
+
+class BrowserBlockingPolicyTestCase(unittest.TestCase):
+    """
+    Offline test of the decisions of the blocking policy and of the options it sets.
+
+    """
+    def test_01_blocked_requests(self):
+        print(f"\n------- START TEST 1 -------")
+        # PARAMETERS
+        policy = BrowserBlockingPolicy()
+        blocked = [
+            ('https://www.example.com/logo.PNG', None),
+            ('https://www.example.com/pixel?id=1', 'image/avif,image/webp,*/*'),
+            ('https://www.example.com/style.css?v=2', None),
+            ('https://www.example.com/theme', 'text/css,*/*;q=0.1'),
+            ('https://fonts.example.com/roboto.woff2', None),
+            ('https://www.example.com/intro.mp4', None),
+            ('https://www.google-analytics.com/analytics.js', '*/*'),
+            ('https://region1.google-analytics.com/g/collect?v=2', '*/*'),
+            ('https://www.googletagmanager.com/gtm.js?id=GTM-XXXX', '*/*')
+        ]
+        allowed = [
+            ('https://www.example.com/', 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8'),
+            ('https://www.example.com/app.js', '*/*'),
+            ('https://cdn.example.net/lib.min.js?v=css', '*/*'),
+            ('https://notgoogle-analytics.com/script.js', '*/*'),
+            ('https://stats.labs.apnic.net/roa/AS3333', None)
+        ]
+        # ELABORATION
+        for url, accept in blocked:
+            self.assertTrue(policy.is_blocked(url, accept), url)
+        for url, accept in allowed:
+            self.assertFalse(policy.is_blocked(url, accept), url)
+        for url, accept in blocked:
+            self.assertFalse(BrowserBlockingPolicy.disabled().is_blocked(url, accept), url)
+        print(f"------- END TEST 1 -------")
+
+    def test_02_options(self):
+        print(f"\n------- START TEST 2 -------")
+        options = Options()
+        BrowserBlockingPolicy().apply_to_options(options)
+        self.assertEqual('eager', options.page_load_strategy)
+        self.assertEqual(2, options.preferences.get('permissions.default.image'))
+        self.assertEqual(2, options.preferences.get('permissions.default.stylesheet'))
+        self.assertFalse(options.preferences.get('gfx.downloadable_fonts.enabled'))
+        self.assertEqual(2, options.preferences.get('network.proxy.type'))
+        self.assertTrue(options.preferences.get('network.proxy.autoconfig_url').startswith('data:application/x-ns-proxy-autoconfig,'))
+        # with the selenium-wire proxy the hosts are blocked by the interceptor
+        options = Options()
+        BrowserBlockingPolicy().apply_to_options(options, block_hosts_with_proxy_autoconfig=False)
+        self.assertIsNone(options.preferences.get('network.proxy.type'))
+        options = Options()
+        BrowserBlockingPolicy.disabled().apply_to_options(options)
+        self.assertEqual('normal', options.page_load_strategy)
+        self.assertDictEqual(dict(), options.preferences)
+        print(f"------- END TEST 2 -------")
+
+
+@unittest.skipUnless(is_geckodriver_present(), 'geckodriver is not in the input folder')
+class BrowserBlockingPolicyBenchmarkCase(unittest.TestCase):
+    """
+    Median page load time of a fixture site set with and without the blocking policy: a local HTTP stand-in serves
+    pages with slow images, stylesheets, fonts and an analytics beacon (served as 'localhost', which the policy of the
+    test blocks as analytics host), while the pages are loaded as '127.0.0.1'. The plain Selenium driver is compared
+    with the selenium-wire one too.
+
+    """
+    server = None
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        # PARAMETERS
+        cls.pages_count = 5
+        cls.loads_per_page = 3
+        cls.delay = 0.3
+        # ELABORATION
+        delay = cls.delay
+
+        class FixtureSiteHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                port = self.server.server_address[1]
+                if self.path.startswith('/page'):
+                    body = (
+                        '<!DOCTYPE html><html><head>'
+                        '<link rel="stylesheet" href="/style.css">'
+                        '<style>@font-face { font-family: f; src: url(/font.woff2); } body { font-family: f; }</style>'
+                        '<script src="/app.js"></script>'
+                        f'<script src="http://localhost:{port}/beacon.js"></script>'
+                        '</head><body><p>text</p>'
+                        + ''.join(f'<img src="/image{i}.png">' for i in range(8)) +
+                        '</body></html>'
+                    ).encode()
+                    content_type = 'text/html; charset=utf-8'
+                elif self.path == '/app.js':
+                    body = b'var app = 1;'
+                    content_type = 'application/javascript'
+                else:
+                    time.sleep(delay)
+                    body = b''
+                    content_type = 'text/css' if self.path.endswith('.css') else 'application/octet-stream'
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('Cache-Control', 'no-store')
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), FixtureSiteHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.urls = [f"http://127.0.0.1:{cls.server.server_address[1]}/page{i}" for i in range(cls.pages_count)]
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def median_page_load_time(self, blocking_policy: BrowserBlockingPolicy, capture_requests=False) -> float:
+        headless_browser = FirefoxHeadlessWebDriver(file_utils.get_project_root_directory(), blocking_policy=blocking_policy, capture_requests=capture_requests)
+        try:
+            times = list()
+            for _ in range(self.loads_per_page):
+                for url in self.urls:
+                    start = time.perf_counter()
+                    headless_browser.driver.get(url)
+                    times.append(time.perf_counter() - start)
+                    self.assertIsNotNone(headless_browser.driver.execute_script("return document.querySelector('script[src=\"/app.js\"]')"))
+            return statistics.median(times)
+        finally:
+            headless_browser.close()
+
+    def test_01_median_page_load_time(self):
+        print(f"\n------- START TEST 1 -------")
+        before = self.median_page_load_time(BrowserBlockingPolicy.disabled())
+        after = self.median_page_load_time(BrowserBlockingPolicy(blocked_hosts=BrowserBlockingPolicy.DEFAULT_BLOCKED_HOSTS + ('localhost',)))
+        print(f"median page load time of {len(self.urls)} pages: {before:.3f}s without blocking, {after:.3f}s with blocking")
+        self.assertLess(after, before)
+        print(f"------- END TEST 1 -------")
+
+    def test_02_median_page_load_time_with_capture(self):
+        print(f"\n------- START TEST 2 -------")
+        policy = BrowserBlockingPolicy(blocked_hosts=BrowserBlockingPolicy.DEFAULT_BLOCKED_HOSTS + ('localhost',))
+        plain = self.median_page_load_time(policy)
+        captured = self.median_page_load_time(policy, capture_requests=True)
+        print(f"median page load time of {len(self.urls)} pages: {plain:.3f}s with plain Selenium, {captured:.3f}s with selenium-wire")
+        self.assertGreater(policy.blocked_requests_count, 0)
+        print(f"------- END TEST 2 -------")
+
+
+if __name__ == '__main__':
+    unittest.main()
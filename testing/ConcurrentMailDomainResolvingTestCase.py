@@ -0,0 +1,81 @@
+import time
+import unittest
+import dns.message
+import dns.rcode
+import dns.rdatatype
+import dns.rrset
+from entities.DomainName import DomainName
+from entities.resolvers.DnsResolver import DnsResolver
+from entities.resolvers.results.MultipleMailDomainResolvingResult import MultipleMailDomainResolvingResult
+from testing.LocalDnsStandInServer import LocalDnsStandInServer
+
+
+class ConcurrentMailDomainResolvingTestCase(unittest.TestCase):
+    """
+    Offline test (and small benchmark) of the concurrent mail domains resolving. A local stand-in nameserver answers
+    every query after 'response_delay' seconds: every mail domain has 'mail_servers' MX hosts, one of them has no A
+    record, and one mail domain does not exist.
+    The same input is resolved sequentially (max_workers=1) and concurrently: results, error logs and their order must
+    be the same.
+
+    """
+    server = None
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        # PARAMETERS
+        cls.response_delay = 0.03
+        cls.mail_servers = 6
+        cls.mail_domains = [DomainName(f"provider{i}.test.") for i in range(5)] + [DomainName('missing.test.')]
+        # ELABORATION
+        cls.server = LocalDnsStandInServer(cls.answer_mail_zone, udp_response_delay=cls.response_delay).start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.stop()
+
+    @classmethod
+    def answer_mail_zone(cls, request: dns.message.Message) -> dns.message.Message:
+        response = dns.message.make_response(request)
+        question = request.question[0]
+        name = question.name.to_text()
+        if name.startswith('missing.'):
+            response.set_rcode(dns.rcode.NXDOMAIN)
+        elif question.rdtype == dns.rdatatype.MX:
+            response.answer.append(dns.rrset.from_text_list(question.name, 300, 'IN', 'MX', [f"{j} mx{j}.{name}" for j in range(cls.mail_servers)]))
+        elif question.rdtype == dns.rdatatype.A and not name.startswith('mx0.'):
+            response.answer.append(dns.rrset.from_text(question.name, 300, 'IN', 'A', '192.0.2.25'))
+        return response
+
+    def resolve(self, max_workers: int) -> (MultipleMailDomainResolvingResult, float):
+        dns_resolver = DnsResolver(False, max_workers=max_workers)
+        dns_resolver.resolver.nameservers = ['127.0.0.1']
+        dns_resolver.resolver.port = self.server.port
+        dns_resolver.resolver.lifetime = 5
+        start = time.perf_counter()
+        results = dns_resolver.resolve_multiple_mail_domains(self.mail_domains)
+        elapsed = time.perf_counter() - start
+        dns_resolver.close()
+        return results, elapsed
+
+    def test_01_same_results_as_sequential_and_faster(self):
+        print(f"\n------- START TEST 1 -------")
+        sequential_results, sequential_elapsed = self.resolve(1)
+        concurrent_results, concurrent_elapsed = self.resolve(8)
+        print(f"{len(self.mail_domains)} mail domains: sequential {sequential_elapsed:.3f}s, concurrent {concurrent_elapsed:.3f}s")
+        self.assertListEqual(self.mail_domains, list(concurrent_results.dependencies.keys()))
+        self.assertListEqual(list(sequential_results.dependencies.keys()), list(concurrent_results.dependencies.keys()))
+        for mail_domain in self.mail_domains[:-1]:
+            sequential_paths = sequential_results.dependencies[mail_domain].mail_servers_paths
+            concurrent_paths = concurrent_results.dependencies[mail_domain].mail_servers_paths
+            self.assertSetEqual(set(sequential_paths.keys()), set(concurrent_paths.keys()))
+            self.assertEqual(self.mail_servers - 1, len(list(filter(lambda path: path is not None, concurrent_paths.values()))))
+        self.assertIsNone(concurrent_results.dependencies[DomainName('missing.test.')])
+        self.assertListEqual([log.entity_cause for log in sequential_results.error_logs], [log.entity_cause for log in concurrent_results.error_logs])
+        self.assertEqual(1, len(concurrent_results.error_logs))
+        self.assertLess(concurrent_elapsed, sequential_elapsed)
+        print(f"------- END TEST 1 -------")
+
+
+if __name__ == '__main__':
+    unittest.main()
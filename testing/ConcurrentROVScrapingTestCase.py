@@ -0,0 +1,121 @@
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from entities.ApplicationResolversWrapper import ApplicationResolversWrapper
+from entities.error_log.ErrorLogger import ErrorLogger
+from entities.resolvers.HttpROVPageScraper import HttpROVPageScraper
+from entities.resolvers.results.ASResolverResultForROVPageScraping import ASResolverResultForROVPageScraping
+from entities.resolvers.results.ASResolverValueForROVPageScraping import ASResolverValueForROVPageScraping
+from exceptions.FilenameNotFoundError import FilenameNotFoundError
+
+
+class ConcurrentROVScrapingTestCase(unittest.TestCase):
+    """
+    Offline test of the concurrent ROV scraping: a local HTTP stand-in serves the saved page in the 'fixtures' folder
+    slowly (every AS but AS64599, which is not found, and AS64598, which hangs), and the scraping of the wrapper is run
+    with one and with more workers, comparing results and error logs.
+
+    """
+    server = None
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        # PARAMETERS
+        cls.as_numbers = [64500 + i for i in range(12)] + [64599]
+        cls.delay = 0.2
+        cls.hang = 3
+        # ELABORATION
+        body = (Path(__file__).parent / 'fixtures' / 'rov_page_AS64500.html').read_bytes()
+        delay = cls.delay
+        hang = cls.hang
+
+        class SlowFixtureHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                time.sleep(hang if self.path.endswith('AS64598') else delay)
+                if self.path.endswith('AS64599'):
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), SlowFixtureHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}/roa/AS"
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def scrape(self, workers: int, as_numbers=None, rov_task_timeout=60, browser_factory=None):
+        wrapper = ApplicationResolversWrapper.__new__(ApplicationResolversWrapper)
+        wrapper.rov_page_scrapers = [HttpROVPageScraper(None, url_of_as_number=lambda as_number: self.base_url + str(as_number), browser_factory=browser_factory) for _ in range(workers)]
+        wrapper.rov_page_scraper = wrapper.rov_page_scrapers[0]
+        wrapper.rov_task_timeout = rov_task_timeout
+        wrapper.error_logger = ErrorLogger()
+        reformat = ASResolverResultForROVPageScraping.__new__(ASResolverResultForROVPageScraping)
+        reformat.results = dict()
+        for as_number in (self.as_numbers if as_numbers is None else as_numbers):
+            reformat.results[as_number] = {
+                '10.0.128.1': ASResolverValueForROVPageScraping(f"ns1.as{as_number}.example", None, None),
+                '11.0.0.1': ASResolverValueForROVPageScraping(f"ns2.as{as_number}.example", None, None)
+            }
+        start = time.perf_counter()
+        wrapper.do_rov_page_scraping(reformat)
+        elapsed = time.perf_counter() - start
+        results = [(as_number, ip_address, str(value.entry_rov_page)) for as_number in reformat.results.keys() for ip_address, value in reformat.results[as_number].items()]
+        logs = [(log.error_type, log.entity_cause) for log in wrapper.error_logger.logs]
+        return results, logs, elapsed
+
+    def test_01_same_results_and_logs_in_less_time(self):
+        print(f"\n------- START TEST 1 -------")
+        sequential_results, sequential_logs, sequential_elapsed = self.scrape(1)
+        concurrent_results, concurrent_logs, concurrent_elapsed = self.scrape(4)
+        print(f"{len(self.as_numbers)} pages: 1 worker {sequential_elapsed:.2f}s, 4 workers {concurrent_elapsed:.2f}s")
+        self.assertListEqual(sequential_results, concurrent_results)
+        self.assertListEqual(sequential_logs, concurrent_logs)
+        self.assertEqual(len(self.as_numbers), len(concurrent_logs))      # one not found network for AS + the 404 page
+        self.assertTupleEqual(('HTTPError', 'AS64599'), concurrent_logs[-1])
+        self.assertLess(concurrent_elapsed, sequential_elapsed / 2)
+        print(f"------- END TEST 1 -------")
+
+
+    def test_02_hung_page_is_logged_and_not_waited(self):
+        print(f"\n------- START TEST 2 -------")
+        # PARAMETERS
+        as_numbers = [64500, 64598, 64501]
+        rov_task_timeout = 1
+        # ELABORATION
+        results, logs, elapsed = self.scrape(2, as_numbers=as_numbers, rov_task_timeout=rov_task_timeout)
+        print(f"{len(as_numbers)} pages, one hung: {elapsed:.2f}s")
+        self.assertTupleEqual(('TimeoutError', 'AS64598'), logs[1])
+        self.assertListEqual([(64598, '10.0.128.1', 'None'), (64598, '11.0.0.1', 'None')], [result for result in results if result[0] == 64598])
+        self.assertEqual(2, len([result for result in results if result[2] != 'None']))      # 10.0.128.1 of the others
+        self.assertLess(elapsed, self.hang)
+        print(f"------- END TEST 2 -------")
+
+    def test_03_fallback_browser_not_started_is_logged(self):
+        print(f"\n------- START TEST 3 -------")
+        # PARAMETERS
+        as_numbers = [64500, 64599]
+
+        def browser_factory():
+            raise FilenameNotFoundError('geckodriver', 'input')
+        # ELABORATION
+        results, logs, elapsed = self.scrape(2, as_numbers=as_numbers, browser_factory=browser_factory)
+        self.assertTupleEqual(('FilenameNotFoundError', 'AS64599'), logs[-1])
+        self.assertListEqual([(64599, '10.0.128.1', 'None'), (64599, '11.0.0.1', 'None')], [result for result in results if result[0] == 64599])
+        self.assertEqual(1, len([result for result in results if result[2] != 'None']))      # 10.0.128.1 of AS64500
+        print(f"------- END TEST 3 -------")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+import selenium
+from entities.HeadlessBrowserPool import HeadlessBrowserPool
+from exceptions.NoAvailableBrowserError import NoAvailableBrowserError
+
+
+class HeadlessBrowserPoolTestCase(unittest.TestCase):
+    """
+    Offline test of the pool of headless browsers: the browsers are stand-ins that record the page load and script
+    timeouts and how many times they are restarted, so the pool logic is tested without starting Firefox.
+
+    """
+    class StandInDriver:
+        def __init__(self):
+            self.page_load_timeout = None
+            self.script_timeout = None
+
+        def set_page_load_timeout(self, seconds):
+            self.page_load_timeout = seconds
+
+        def set_script_timeout(self, seconds):
+            self.script_timeout = seconds
+
+    class StandInBrowser:
+        def __init__(self, broken=False):
+            self.driver = HeadlessBrowserPoolTestCase.StandInDriver()
+            self.reopens_count = 0
+            self.closes_count = 0
+            self.broken = broken
+            self.startup_times = [0.5]
+            self.fetched_bytes = 100
+            self.resources_count = 4
+            self.cached_resources_count = 1
+
+        def close(self):
+            self.closes_count = self.closes_count + 1
+
+        def close_and_reopen(self):
+            if self.broken:
+                raise selenium.common.exceptions.WebDriverException('broken')
+            self.reopens_count = self.reopens_count + 1
+            self.driver = HeadlessBrowserPoolTestCase.StandInDriver()
+
+    def test_01_warm_browsers_and_recycling(self):
+        print(f"\n------- START TEST 1 -------")
+        # PARAMETERS
+        application_browser = HeadlessBrowserPoolTestCase.StandInBrowser()
+        # ELABORATION
+        pool = HeadlessBrowserPool(3, HeadlessBrowserPoolTestCase.StandInBrowser, max_pages_per_browser=2, task_timeout=5, browsers=[application_browser])
+        self.assertEqual(3, len(pool))
+        self.assertIs(application_browser, pool.browsers[0])
+        for browser in pool.browsers:
+            self.assertEqual(5, browser.driver.page_load_timeout)
+            self.assertEqual(5, browser.driver.script_timeout)
+        browser = pool.acquire()
+        pool.release(browser)
+        self.assertEqual(0, browser.reopens_count)
+        browser = pool.acquire()
+        pool.release(browser, failed=True)
+        self.assertEqual(1, browser.reopens_count)
+        self.assertEqual(5, browser.driver.page_load_timeout)
+        self.assertEqual(5, browser.driver.script_timeout)
+        metrics = pool.get_metrics()
+        print(f"metrics: {metrics}")
+        self.assertEqual(2, metrics['tasks_count'])
+        self.assertEqual(1, metrics['failed_tasks_count'])
+        self.assertEqual(1, metrics['recycles_count'])
+        self.assertEqual(0.5, metrics['median_startup_seconds'])
+        self.assertEqual(300, metrics['fetched_bytes'])
+        self.assertEqual(3, metrics['cached_resources_count'])
+        pool.close()
+        self.assertEqual(1, application_browser.closes_count)
+        print(f"------- END TEST 1 -------")
+
+    def test_02_broken_browser_is_replaced(self):
+        print(f"\n------- START TEST 2 -------")
+        broken = HeadlessBrowserPoolTestCase.StandInBrowser(broken=True)
+        pool = HeadlessBrowserPool(1, HeadlessBrowserPoolTestCase.StandInBrowser, browsers=[broken])
+        browser = pool.acquire()
+        pool.release(browser, failed=True)
+        self.assertEqual(1, len(pool))
+        self.assertIsNot(broken, pool.browsers[0])
+        self.assertIs(pool.browsers[0], pool.acquire())
+        print(f"------- END TEST 2 -------")
+
+    def test_03_concurrent_tasks(self):
+        print(f"\n------- START TEST 3 -------")
+        # PARAMETERS
+        size = 3
+        tasks = 12
+        delay = 0.05
+        # ELABORATION
+        pool = HeadlessBrowserPool(size, HeadlessBrowserPoolTestCase.StandInBrowser, max_pages_per_browser=3)
+        in_use = set()
+        in_use_lock = threading.Lock()
+
+        def task(_):
+            browser = pool.acquire()
+            with in_use_lock:
+                self.assertNotIn(id(browser), in_use)
+                in_use.add(id(browser))
+            time.sleep(delay)
+            with in_use_lock:
+                in_use.remove(id(browser))
+            pool.release(browser)
+
+        with ThreadPoolExecutor(max_workers=2*size) as executor:
+            list(executor.map(task, range(tasks)))
+        metrics = pool.get_metrics()
+        print(f"metrics: {metrics}")
+        self.assertEqual(tasks, metrics['tasks_count'])
+        self.assertEqual(size, metrics['peak_busy'])
+        self.assertEqual(0, metrics['busy'])
+        self.assertEqual(sum(browser.reopens_count for browser in pool.browsers), metrics['recycles_count'])
+        self.assertGreaterEqual(metrics['recycles_count'], tasks // 3 - size)
+        self.assertGreater(metrics['utilisation'], 0)
+        print(f"------- END TEST 3 -------")
+
+
+    def test_04_acquire_does_not_block_forever(self):
+        print(f"\n------- START TEST 4 -------")
+        # PARAMETERS
+        task_timeout = 0.2
+        # ELABORATION
+        pool = HeadlessBrowserPool(1, HeadlessBrowserPoolTestCase.StandInBrowser, task_timeout=task_timeout)
+        browser = pool.acquire()
+        start = time.perf_counter()
+        with self.assertRaises(NoAvailableBrowserError):
+            pool.acquire()          # the only browser is busy
+        self.assertGreaterEqual(time.perf_counter() - start, task_timeout)
+
+        def failing_browser_factory():
+            raise selenium.common.exceptions.WebDriverException('geckodriver crashed')
+
+        pool.browser_factory = failing_browser_factory      # the browser can't be started again
+        browser.broken = True
+        pool.release(browser, failed=True)
+        self.assertEqual(0, len(pool))
+        start = time.perf_counter()
+        with self.assertRaises(NoAvailableBrowserError):
+            pool.acquire()          # every browser is lost
+        self.assertLess(time.perf_counter() - start, task_timeout)
+        print(f"------- END TEST 4 -------")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import ipaddress
+import os
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from entities.resolvers.HotSwappableIpAsDatabase import HotSwappableIpAsDatabase
+from static_variables import INPUT_FOLDER_NAME
+
+
+class HotSwappableIpAsDatabaseTestCase(unittest.TestCase):
+    """
+    Offline test of the background reload of the ip2asn database: while reader threads keep resolving addresses, the
+    .tsv file of a temporary project root directory is replaced with a new version (every range moves to another
+    Autonomous System) and reloaded in background.
+
+    """
+    temporary_directory = None
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        # PARAMETERS
+        cls.ranges = 50000
+        cls.readers = 4
+        # ELABORATION
+        cls.temporary_directory = tempfile.TemporaryDirectory()
+        cls.project_root_directory = Path(cls.temporary_directory.name)
+        (cls.project_root_directory / INPUT_FOLDER_NAME).mkdir()
+        cls.tsv_filepath = cls.project_root_directory / INPUT_FOLDER_NAME / 'ip2asn-v4.tsv'
+        cls.write_version(0)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.temporary_directory.cleanup()
+
+    @classmethod
+    def write_version(cls, version: int) -> None:
+        temporary_filepath = str(cls.tsv_filepath) + '.tmp'
+        with open(temporary_filepath, 'w', encoding='utf-8') as f:
+            for i in range(cls.ranges):
+                start = ipaddress.IPv4Address(0x01000000 + i * 512)
+                f.write(f"{start}\t{start + 255}\t{version * 100000 + i % 1000}\tIT\tAS-NUMBER-{i % 1000}\n")
+        os.utime(temporary_filepath, ns=(time.time_ns(), time.time_ns() + version * 10**9))
+        os.replace(temporary_filepath, cls.tsv_filepath)        # as the download does
+
+    def test_01_readers_never_block_nor_see_mixed_versions(self):
+        print(f"\n------- START TEST 1 -------")
+        database = HotSwappableIpAsDatabase(project_root_directory=self.project_root_directory)
+        self.assertEqual(1, database.get_metrics()['version'])
+        kept_entry = database.resolve_range(ipaddress.IPv4Address('1.0.0.1'))
+        stop = threading.Event()
+        errors = list()
+        seen_versions = set()
+        max_latencies = list()
+
+        def read():
+            max_latency = 0.0
+            i = 0
+            while not stop.is_set():
+                i = (i + 7919) % self.ranges
+                ips = [ipaddress.IPv4Address(0x01000000 + ((i + j * 101) % self.ranges) * 512 + 1) for j in range(50)]
+                start = time.perf_counter()
+                entries = database.resolve_ranges(ips)
+                aggregates = database.get_as_aggregates()
+                max_latency = max(max_latency, time.perf_counter() - start)
+                if any(entry is None for entry in entries):
+                    errors.append(ValueError(f"not found in batch {i}"))
+                    continue
+                # every call sees a single version (two calls may see two versions)
+                for versions in (set(entry.as_number // 100000 for entry in entries), set(as_number // 100000 for as_number in aggregates.keys())):
+                    if len(versions) != 1:
+                        errors.append(ValueError(f"mixed versions: {versions}"))
+                    seen_versions.update(versions)
+            max_latencies.append(max_latency)
+
+        readers = [threading.Thread(target=read) for _ in range(self.readers)]
+        for reader in readers:
+            reader.start()
+        time.sleep(0.2)
+        self.write_version(1)
+        database.reload_in_background().join()
+        time.sleep(0.2)
+        stop.set()
+        for reader in readers:
+            reader.join()
+        metrics = database.get_metrics()
+        print(f"metrics: {metrics}")
+        print(f"max lookup latency during the reload: {max(max_latencies):.4f}s")
+        self.assertListEqual([], errors)
+        self.assertSetEqual({0, 1}, seen_versions)
+        self.assertEqual(2, metrics['version'])
+        self.assertEqual(0, metrics['failed_reloads_count'])
+        self.assertEqual(self.ranges, metrics['ranges'])
+        self.assertEqual(100000, database.resolve_range(ipaddress.IPv4Address('1.0.0.1')).as_number)
+        self.assertIsNot(kept_entry, database.resolve_range(ipaddress.IPv4Address('1.0.0.1')))
+        # same .tsv: nothing to swap
+        self.assertFalse(database.reload())
+        self.assertEqual(2, database.get_metrics()['reloads_count'])
+        print(f"------- END TEST 1 -------")
+
+    def test_02_periodic_reload_and_failures(self):
+        print(f"\n------- START TEST 2 -------")
+        database = HotSwappableIpAsDatabase(project_root_directory=self.project_root_directory, reload_interval=0.05)
+        version = database.get_metrics()['version']
+        self.write_version(2)
+        deadline = time.time() + 10
+        while database.get_metrics()['version'] == version and time.time() < deadline:
+            time.sleep(0.02)
+        database.stop()
+        self.assertEqual(version + 1, database.get_metrics()['version'])
+        self.assertEqual(200000, database.resolve_range(ipaddress.IPv4Address('1.0.0.1')).as_number)
+        # a failed reload keeps the active index
+        os.rename(self.tsv_filepath, str(self.tsv_filepath) + '.moved')
+        try:
+            self.assertFalse(database.reload())
+        finally:
+            os.rename(str(self.tsv_filepath) + '.moved', self.tsv_filepath)
+        self.assertEqual(1, database.get_metrics()['failed_reloads_count'])
+        self.assertEqual(200000, database.resolve_range(ipaddress.IPv4Address('1.0.0.1')).as_number)
+        print(f"------- END TEST 2 -------")
+
+
+if __name__ == '__main__':
+    unittest.main()
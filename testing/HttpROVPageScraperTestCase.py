@@ -0,0 +1,152 @@
+import ipaddress
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import requests
+import selenium
+from entities.PrefixesTableHtmlParser import PrefixesTableHtmlParser
+from entities.enums.ROVStates import ROVStates
+from entities.resolvers.HttpROVPageScraper import HttpROVPageScraper
+from exceptions.TableNotPresentError import TableNotPresentError
+
+
+class StandInBrowser:
+    """
+    Stand-in of the headless browser whose driver fails every page load, counting restarts and closes.
+
+    """
+    class FailingDriver:
+        def get(self, url):
+            raise selenium.common.exceptions.WebDriverException('browser crashed')
+
+    def __init__(self):
+        self.driver = StandInBrowser.FailingDriver()
+        self.reopens_count = 0
+        self.closed = False
+
+    def close_and_reopen(self):
+        self.reopens_count = self.reopens_count + 1
+
+    def close(self):
+        self.closed = True
+
+
+class HttpROVPageScraperTestCase(unittest.TestCase):
+    """
+    Offline test of the browser-free scraping of the ROV pages: a local HTTP stand-in serves the saved pages in the
+    'fixtures' folder (/roa/ASXXXX is the rov_page_ASXXXX.html file) and counts the connections opened.
+
+    """
+    server = None
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        fixtures_folder = Path(__file__).parent / 'fixtures'
+        cls.connections = list()
+
+        class FixturesHandler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'       # keep-alive
+
+            def setup(self):
+                super().setup()
+                cls.connections.append(self.client_address)
+
+            def do_GET(self):
+                filepath = fixtures_folder / ('rov_page_' + self.path.split('/')[-1] + '.html')
+                if not self.path.startswith('/roa/') or not filepath.exists():
+                    self.send_error(404)
+                    return
+                body = filepath.read_bytes()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), FixturesHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}/roa/AS"
+        cls.fixture_html = (fixtures_folder / 'rov_page_AS64500.html').read_text(encoding='utf-8')
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_01_parse_fixture(self):
+        print(f"\n------- START TEST 1 -------")
+        rows = PrefixesTableHtmlParser.parse(self.fixture_html)
+        for row in rows:
+            print(row)
+        self.assertEqual(4, len(rows))
+        self.assertListEqual(['1', 'AS64500', '10.0.0.0/16', '65,536', 'IT', '100', 'VLD', '10.0.0.0/16-24 AS64500'], rows[0])
+        self.assertEqual('97', rows[1][5])
+        self.assertListEqual(['3', 'AS64500', '192.0.2.0/24', '256', 'IT', '12', 'UNK', ''], rows[2])      # cells not closed
+        self.assertIsNone(PrefixesTableHtmlParser.parse('<html><body><div id="pfx_table_div"></div></body></html>'))
+        self.assertIsNone(PrefixesTableHtmlParser.parse('<html><body><table><tr><td>1</td></tr></table></body></html>'))
+        self.assertListEqual([['1', 'a']], PrefixesTableHtmlParser.parse('<div id="pfx_table_div"><table><tr><th>x</th></tr><tr><td>1</td><td> a </td></tr></table></div>')[1:])
+        print(f"------- END TEST 1 -------")
+
+    def test_02_load_as_page_over_pooled_connection(self):
+        print(f"\n------- START TEST 2 -------")
+        scraper = HttpROVPageScraper(None, url_of_as_number=lambda as_number: self.base_url + str(as_number))
+        connections_before = len(self.connections)
+        for i in range(3):
+            scraper.load_as_page(64500)
+        self.assertEqual(1, len(self.connections) - connections_before)
+        self.assertEqual(3, scraper.http_pages_count)
+        self.assertEqual(0, scraper.fallback_pages_count)
+        self.assertEqual(64500, scraper.current_as_number)
+        self.assertListEqual([65536, 256, 256, 16777216], [row.span for row in scraper.prefixes_table])
+        self.assertListEqual([ROVStates.VLD, ROVStates.INV, ROVStates.UNK, ROVStates.UNK], [row.rov_state for row in scraper.prefixes_table])
+        self.assertEqual(ipaddress.IPv4Network('10.0.128.0/24'), scraper.get_network_if_present(ipaddress.IPv4Address('10.0.128.1')).prefix)
+        self.assertEqual(ipaddress.IPv4Network('10.0.0.0/16'), scraper.get_network_if_present(ipaddress.IPv4Address('10.0.1.1')).prefix)
+        scraper.close()
+        print(f"------- END TEST 2 -------")
+
+    def test_03_without_fallback(self):
+        print(f"\n------- START TEST 3 -------")
+        scraper = HttpROVPageScraper(None, url_of_as_number=lambda as_number: self.base_url + str(as_number))
+        with self.assertRaises(TableNotPresentError):
+            scraper.load_as_page(64501)         # table built by a script
+        self.assertIsNone(scraper.prefixes_table)
+        with self.assertRaises(requests.exceptions.HTTPError):
+            scraper.load_as_page(64599)
+        self.assertEqual(-1, scraper.current_as_number)
+        with self.assertRaises(ValueError):
+            scraper.load_as_page(-1)
+        scraper.close()
+        print(f"------- END TEST 3 -------")
+
+
+    def test_04_fallback_browser_of_each_scraper(self):
+        print(f"\n------- START TEST 4 -------")
+        browsers = list()
+
+        def browser_factory():
+            browsers.append(StandInBrowser())
+            return browsers[-1]
+
+        scrapers = [HttpROVPageScraper(None, url_of_as_number=lambda as_number: self.base_url + str(as_number), browser_factory=browser_factory) for _ in range(2)]
+        scrapers[0].load_as_page(64500)
+        self.assertEqual(0, len(browsers))          # started only when needed
+        with self.assertRaises(selenium.common.exceptions.WebDriverException):
+            scrapers[0].load_as_page(64501)         # table built by a script
+        self.assertEqual(1, len(browsers))
+        self.assertEqual(1, browsers[0].reopens_count)
+        with self.assertRaises(selenium.common.exceptions.WebDriverException):
+            scrapers[1].load_as_page(64599)         # not found over HTTP
+        self.assertEqual(2, len(browsers))
+        self.assertListEqual([1, 1], [browser.reopens_count for browser in browsers])      # only the failed one
+        self.assertEqual(2, scrapers[0].fallback_pages_count + scrapers[1].fallback_pages_count)
+        for scraper in scrapers:
+            scraper.close()
+        self.assertListEqual([True, True], [browser.closed for browser in browsers])
+        print(f"------- END TEST 4 -------")
+
+if __name__ == '__main__':
+    unittest.main()
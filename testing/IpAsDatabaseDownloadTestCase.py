@@ -0,0 +1,105 @@
+import gzip
+import ipaddress
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+import unittest
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from entities.IpAsColumnarIndex import IpAsColumnarIndex
+from entities.resolvers.IpAsDatabase import IpAsDatabase
+from static_variables import INPUT_FOLDER_NAME
+
+
+class IpAsDatabaseDownloadTestCase(unittest.TestCase):
+    """
+    Offline test of the streaming download of the ip2asn database: a local HTTP stand-in serves a synthetic .gz
+    archive (made of two gzip members, as concatenated archives are valid too) in small chunks.
+
+    """
+    temporary_directory = None
+    server = None
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        # PARAMETERS
+        cls.ranges = 100000
+        # ELABORATION
+        lines = list()
+        for i in range(cls.ranges):
+            start = ipaddress.IPv4Address(0x01000000 + i * 512)
+            lines.append(f"{start}\t{start + 255}\t{64512 + i % 1000}\t{'IT' if i % 2 == 0 else 'US'}\tAS-NUMBER-{i % 1000} Società di telecomunicazioni\n")
+        cls.tsv_content = ''.join(lines).encode('utf-8')
+        half = len(lines) // 2
+        archive = gzip.compress(''.join(lines[:half]).encode('utf-8')) + gzip.compress(''.join(lines[half:]).encode('utf-8'))
+        cls.temporary_directory = tempfile.TemporaryDirectory()
+        (Path(cls.temporary_directory.name) / INPUT_FOLDER_NAME).mkdir()
+
+        class ArchiveHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/ip2asn-v4.tsv.gz':
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'application/gzip')
+                    self.send_header('Content-Length', str(len(archive)))
+                    self.end_headers()
+                    for i in range(0, len(archive), 4096):
+                        self.wfile.write(archive[i:i + 4096])
+                elif self.path == '/truncated.gz':
+                    self.send_response(200)
+                    self.send_header('Content-Length', str(len(archive) // 3))
+                    self.end_headers()
+                    self.wfile.write(archive[:len(archive) // 3])
+                else:
+                    self.send_error(404)
+
+            def log_message(self, format, *args):
+                pass
+
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), ArchiveHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.temporary_directory.cleanup()
+
+    def test_01_streaming_download(self):
+        print(f"\n------- START TEST 1 -------")
+        project_root_directory = Path(self.temporary_directory.name)
+        tracemalloc.start()
+        start = time.perf_counter()
+        index, diff = IpAsDatabase.download_latest_tsv_database(project_root_directory=project_root_directory, url=f"{self.base_url}/ip2asn-v4.tsv.gz")
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{len(self.tsv_content)} bytes database downloaded and indexed in {elapsed:.3f}s, peak memory {peak} bytes")
+        self.assertEqual(self.ranges, len(index))
+        self.assertIsNone(diff)
+        self.assertLess(peak, len(self.tsv_content))
+        tsv_filepath = project_root_directory / INPUT_FOLDER_NAME / 'ip2asn-v4.tsv'
+        self.assertEqual(self.tsv_content, tsv_filepath.read_bytes())
+        compiled_filepath = str(tsv_filepath) + IpAsColumnarIndex.COMPILED_EXTENSION
+        compiled_inode = os.stat(compiled_filepath).st_ino
+        database = IpAsDatabase(project_root_directory=project_root_directory)
+        self.assertEqual(compiled_inode, os.stat(compiled_filepath).st_ino)        # not rebuilt
+        entry = database.resolve_range(ipaddress.IPv4Address('1.0.2.17'))
+        self.assertEqual(64513, entry.as_number)
+        self.assertEqual('AS-NUMBER-1 Società di telecomunicazioni', entry.as_description)
+        print(f"------- END TEST 1 -------")
+
+    def test_02_truncated_archive(self):
+        print(f"\n------- START TEST 2 -------")
+        project_root_directory = Path(self.temporary_directory.name)
+        with self.assertRaises(zlib.error):
+            IpAsDatabase.download_latest_tsv_database(project_root_directory=project_root_directory, url=f"{self.base_url}/truncated.gz")
+        self.assertListEqual([], [file.name for file in (project_root_directory / INPUT_FOLDER_NAME).iterdir() if file.name.endswith('.tmp')])
+        print(f"------- END TEST 2 -------")
+
+
+if __name__ == '__main__':
+    unittest.main()
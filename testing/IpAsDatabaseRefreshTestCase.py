@@ -0,0 +1,146 @@
+import gzip
+import ipaddress
+import os
+import tempfile
+import threading
+import unittest
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from entities.IpAsColumnarIndex import IpAsColumnarIndex
+from entities.resolvers.IpAsDatabase import IpAsDatabase
+from static_variables import INPUT_FOLDER_NAME
+from utils import file_utils
+
+
+class IpAsDatabaseRefreshTestCase(unittest.TestCase):
+    """
+    Offline test of the conditional refresh of the ip2asn database: a local HTTP stand-in serves the current version of
+    a synthetic .gz archive with ETag and Last-Modified validators, and answers 304 (Not Modified) to conditional
+    requests that match them. Tests share the stand-in and the project root directory, so they run in order.
+
+    """
+    temporary_directory = None
+    server = None
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        # PARAMETERS
+        cls.ranges = 5000
+        # ELABORATION
+        cls.versions = dict()
+        first_lines = [IpAsDatabaseRefreshTestCase.line(i, 64512 + i % 100) for i in range(cls.ranges)]
+        second_lines = list(first_lines)
+        second_lines[10] = IpAsDatabaseRefreshTestCase.line(10, 65000)        # changed AS
+        del second_lines[20]                                                    # removed
+        second_lines.append(IpAsDatabaseRefreshTestCase.line(cls.ranges, 65001))  # added
+        cls.versions['v1'] = gzip.compress(''.join(first_lines).encode('utf-8'))
+        cls.versions['v2'] = gzip.compress(''.join(second_lines).encode('utf-8'))
+        cls.versions['v2-recompressed'] = gzip.compress(''.join(second_lines).encode('utf-8'), compresslevel=1)
+        cls.current_version = 'v1'
+        cls.requests = list()
+        cls.temporary_directory = tempfile.TemporaryDirectory()
+        cls.project_root_directory = Path(cls.temporary_directory.name)
+        (cls.project_root_directory / INPUT_FOLDER_NAME).mkdir()
+
+        class VersionedArchiveHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                etag = f'"{cls.current_version}"'
+                last_modified = formatdate(1600000000 + len(cls.current_version), usegmt=True)
+                not_modified = self.headers.get('If-None-Match') == etag
+                cls.requests.append((self.headers.get('If-None-Match'), self.headers.get('If-Modified-Since'), 304 if not_modified else 200))
+                if not_modified:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+                archive = cls.versions[cls.current_version]
+                self.send_response(200)
+                self.send_header('ETag', etag)
+                self.send_header('Last-Modified', last_modified)
+                self.send_header('Content-Length', str(len(archive)))
+                self.end_headers()
+                self.wfile.write(archive)
+
+            def log_message(self, format, *args):
+                pass
+
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), VersionedArchiveHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}/ip2asn-v4.tsv.gz"
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.temporary_directory.cleanup()
+
+    @staticmethod
+    def line(i: int, as_number: int) -> str:
+        start = ipaddress.IPv4Address(0x01000000 + i * 512)
+        return f"{start}\t{start + 255}\t{as_number}\tIT\tAS-NUMBER-{as_number}\n"
+
+    def tsv_filepath(self) -> str:
+        return str(self.project_root_directory / INPUT_FOLDER_NAME / 'ip2asn-v4.tsv')
+
+    def test_01_first_download_is_unconditional(self):
+        print(f"\n------- START TEST 1 -------")
+        index, diff = IpAsDatabase.download_latest_tsv_database(project_root_directory=self.project_root_directory, url=self.url)
+        self.assertEqual(self.ranges, len(index))
+        self.assertIsNone(diff)
+        self.assertEqual((None, None, 200), self.requests[-1])
+        print(f"------- END TEST 1 -------")
+
+    def test_02_not_modified_costs_one_round_trip(self):
+        print(f"\n------- START TEST 2 -------")
+        compiled_filepath = self.tsv_filepath() + IpAsColumnarIndex.COMPILED_EXTENSION
+        compiled_inode = os.stat(compiled_filepath).st_ino
+        # two hours later: the .tsv is not considered up-to-date anymore
+        aged_mtime_ns = os.stat(self.tsv_filepath()).st_mtime_ns - 2 * 60 * 60 * 10**9
+        os.utime(self.tsv_filepath(), ns=(aged_mtime_ns, aged_mtime_ns))
+        IpAsColumnarIndex.update_compiled_mtime(compiled_filepath, aged_mtime_ns)
+        self.assertFalse(file_utils.is_tsv_database_updated(project_root_directory=self.project_root_directory))
+        index, diff = IpAsDatabase.download_latest_tsv_database(project_root_directory=self.project_root_directory, url=self.url)
+        self.assertIsNone(index)
+        self.assertIsNone(diff)
+        print(f"conditional request: {self.requests[-1]}")
+        self.assertEqual(('"v1"', formatdate(1600000002, usegmt=True), 304), self.requests[-1])
+        self.assertTrue(file_utils.is_tsv_database_updated(project_root_directory=self.project_root_directory))
+        # compiled file still valid for the touched .tsv: neither rebuilt nor rehashed
+        self.assertEqual(os.stat(self.tsv_filepath()).st_mtime_ns, IpAsColumnarIndex.read_compiled_key(compiled_filepath)[0])
+        IpAsDatabase(project_root_directory=self.project_root_directory)
+        self.assertEqual(compiled_inode, os.stat(compiled_filepath).st_ino)
+        print(f"------- END TEST 2 -------")
+
+    def test_03_modified_is_diffed_against_previous_version(self):
+        print(f"\n------- START TEST 3 -------")
+        self.__class__.current_version = 'v2'
+        database = IpAsDatabase(project_root_directory=self.project_root_directory)
+        kept_entry = database.index.entry(0)
+        index, diff = IpAsDatabase.download_latest_tsv_database(project_root_directory=self.project_root_directory, url=self.url)
+        print(f"diff: {str(diff)}")
+        self.assertEqual(('"v1"', formatdate(1600000002, usegmt=True), 200), self.requests[-1])
+        self.assertListEqual([10, 20], diff.removed_rows.tolist())
+        self.assertListEqual([10, self.ranges - 1], diff.added_rows.tolist())
+        self.assertEqual(self.ranges - 2, len(diff.unchanged_previous_rows))
+        self.assertEqual(65000, IpAsDatabase(project_root_directory=self.project_root_directory).resolve_range(ipaddress.IPv4Address('1.0.20.1')).as_number)
+        # unchanged rows keep their entries across versions
+        index.inherit_entries(database.index, database.index.diff(index))
+        self.assertIs(kept_entry, index.entry(0))
+        print(f"------- END TEST 3 -------")
+
+    def test_04_same_rows_keep_compiled_file(self):
+        print(f"\n------- START TEST 4 -------")
+        compiled_filepath = self.tsv_filepath() + IpAsColumnarIndex.COMPILED_EXTENSION
+        compiled_inode = os.stat(compiled_filepath).st_ino
+        self.__class__.current_version = 'v2-recompressed'        # new ETag, same content
+        index, diff = IpAsDatabase.download_latest_tsv_database(project_root_directory=self.project_root_directory, url=self.url)
+        self.assertEqual(200, self.requests[-1][2])
+        self.assertTrue(diff.is_empty())
+        self.assertEqual(compiled_inode, os.stat(compiled_filepath).st_ino)
+        self.assertEqual(os.stat(self.tsv_filepath()).st_mtime_ns, IpAsColumnarIndex.read_compiled_key(compiled_filepath)[0])
+        print(f"------- END TEST 4 -------")
+
+
+if __name__ == '__main__':
+    unittest.main()
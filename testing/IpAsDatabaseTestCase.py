@@ -0,0 +1,163 @@
+import ipaddress
+import os
+import random
+import tempfile
+import time
+import unittest
+from pathlib import Path
+import numpy as np
+from entities.IpAsColumnarIndex import IpAsColumnarIndex
+from entities.MappedStringTable import MappedStringTable
+from entities.resolvers.IpAsDatabase import IpAsDatabase
+from exceptions.AutonomousSystemNotFoundError import AutonomousSystemNotFoundError
+from static_variables import INPUT_FOLDER_NAME
+
+
+class IpAsDatabaseTestCase(unittest.TestCase):
+    """
+    Offline test of the columnar ip2asn database: a synthetic .tsv database (ranges of 256 addresses separated by gaps,
+    plus some not well-formatted rows) is written in the input folder of a temporary project root directory.
+
+    """
+    temporary_directory = None
+    database = None
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        # PARAMETERS
+        cls.ranges = 20000
+        cls.queries = 20000
+        # ELABORATION
+        cls.temporary_directory = tempfile.TemporaryDirectory()
+        input_folder = Path(cls.temporary_directory.name) / INPUT_FOLDER_NAME
+        input_folder.mkdir()
+        with (input_folder / 'ip2asn-v4.tsv').open('w', encoding='utf-8') as f:
+            for i in range(cls.ranges):
+                start = ipaddress.IPv4Address(0x01000000 + i * 512)
+                f.write(f"{start}\t{start + 255}\t{64512 + i % 1000}\t{'IT' if i % 2 == 0 else 'US'}\tAS-NUMBER-{i % 1000}\n")
+            f.write("not-an-ip\t1.0.0.0\t1\tIT\tBROKEN\n")
+            f.write("1.0.0.0\t1.0.0.255\n")
+        start = time.perf_counter()
+        cls.database = IpAsDatabase(project_root_directory=Path(cls.temporary_directory.name))
+        print(f"{cls.ranges} ranges loaded in {time.perf_counter() - start:.3f}s")
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.temporary_directory.cleanup()
+
+    def test_01_resolve_range(self):
+        print(f"\n------- START TEST 1 -------")
+        entry = self.database.resolve_range(ipaddress.IPv4Address('1.0.2.17'))
+        self.assertEqual(ipaddress.IPv4Address('1.0.2.0'), entry.start_ip_range)
+        self.assertEqual(ipaddress.IPv4Address('1.0.2.255'), entry.end_ip_range)
+        self.assertEqual(64513, entry.as_number)
+        self.assertEqual('US', entry.country_code)
+        self.assertEqual('AS-NUMBER-1', entry.as_description)
+        self.assertIs(entry, self.database.resolve_range(ipaddress.IPv4Address('1.0.2.255')))
+        for ip in ('1.0.1.0', '0.255.255.255', '255.255.255.255'):
+            with self.assertRaises(AutonomousSystemNotFoundError):
+                self.database.resolve_range(ipaddress.IPv4Address(ip))
+        self.assertEqual(self.ranges, len(self.database.index))
+        self.assertEqual(2, len(self.database.index.country_codes))
+        print(f"------- END TEST 1 -------")
+
+    def test_02_batch_same_as_single(self):
+        print(f"\n------- START TEST 2 -------")
+        random.seed(7)
+        ips = [ipaddress.IPv4Address(random.randint(0x00FFFF00, 0x01000000 + self.ranges * 512 + 1024)) for _ in range(self.queries)]
+        start = time.perf_counter()
+        singles = list()
+        for ip in ips:
+            try:
+                singles.append(self.database.resolve_range(ip))
+            except AutonomousSystemNotFoundError:
+                singles.append(None)
+        single_elapsed = time.perf_counter() - start
+        start = time.perf_counter()
+        batch = self.database.resolve_ranges(ips)
+        batch_elapsed = time.perf_counter() - start
+        print(f"{self.queries} lookups: one by one {single_elapsed:.3f}s, batch {batch_elapsed:.3f}s")
+        self.assertEqual(len(singles), len(batch))
+        for single, batched in zip(singles, batch):
+            self.assertIs(single, batched)
+        self.assertTrue(any(entry is None for entry in batch))
+        print(f"------- END TEST 2 -------")
+
+    def test_03_entries_from_as_number(self):
+        print(f"\n------- START TEST 3 -------")
+        entries = self.database.get_entries_from_as_number(64512 + 7)
+        self.assertEqual(self.ranges // 1000, len(entries))
+        with self.assertRaises(AutonomousSystemNotFoundError):
+            self.database.get_entries_from_as_number(1)
+        print(f"------- END TEST 3 -------")
+
+    def test_04_compiled_file_is_mapped_and_rebuilt_only_when_tsv_changes(self):
+        print(f"\n------- START TEST 4 -------")
+        tsv_filepath = self.database.filepath
+        compiled_filepath = tsv_filepath + IpAsColumnarIndex.COMPILED_EXTENSION
+        self.assertTrue(os.path.isfile(compiled_filepath))
+        self.assertIsInstance(self.database.index.descriptions, MappedStringTable)
+        compiled_inode = os.stat(compiled_filepath).st_ino
+        start = time.perf_counter()
+        mapped = IpAsDatabase(project_root_directory=Path(self.temporary_directory.name))
+        print(f"compiled file mapped in {time.perf_counter() - start:.4f}s")
+        self.assertEqual(compiled_inode, os.stat(compiled_filepath).st_ino)
+        self.assertEqual(str(self.database.resolve_range(ipaddress.IPv4Address('1.0.2.17'))), str(mapped.resolve_range(ipaddress.IPv4Address('1.0.2.17'))))
+        # touched but identical: no rebuild
+        os.utime(tsv_filepath, ns=(os.stat(tsv_filepath).st_atime_ns, os.stat(tsv_filepath).st_mtime_ns + 10**9))
+        IpAsDatabase(project_root_directory=Path(self.temporary_directory.name))
+        self.assertEqual(compiled_inode, os.stat(compiled_filepath).st_ino)
+        self.assertEqual(os.stat(tsv_filepath).st_mtime_ns, IpAsColumnarIndex.read_compiled_key(compiled_filepath)[0])
+        # changed: rebuild
+        with open(tsv_filepath, 'a', encoding='utf-8') as f:
+            f.write("223.0.0.0\t223.0.0.255\t65000\tFR\tNEW-AS\n")
+        changed = IpAsDatabase(project_root_directory=Path(self.temporary_directory.name))
+        self.assertEqual(65000, changed.resolve_range(ipaddress.IPv4Address('223.0.0.1')).as_number)
+        self.assertEqual(self.ranges + 1, len(changed.index))
+        print(f"------- END TEST 4 -------")
+
+    def test_05_as_number_index_and_aggregates(self):
+        print(f"\n------- START TEST 5 -------")
+        as_number = 64512 + 7
+        rows = self.database.index.rows_of_as_number(as_number)
+        self.assertListEqual(list(range(7, self.ranges, 1000)), rows.tolist())
+        self.assertEqual(1000, len(self.database.get_as_numbers()))
+        self.assertEqual(self.ranges // 1000, self.database.get_ranges_count_of_as_number(as_number))
+        self.assertEqual(256 * (self.ranges // 1000), self.database.get_address_space_of_as_number(as_number))
+        self.assertEqual(self.ranges // 1000, self.database.get_prefixes_count_of_as_number(as_number))
+        with self.assertRaises(AutonomousSystemNotFoundError):
+            self.database.get_address_space_of_as_number(1)
+        start = time.perf_counter()
+        aggregates = self.database.get_as_aggregates()
+        print(f"aggregates of {len(aggregates)} Autonomous Systems in {time.perf_counter() - start:.3f}s")
+        self.assertEqual(1000, len(aggregates))
+        self.assertEqual(self.database.get_address_space_of_as_number(as_number), aggregates[as_number].address_space)
+        self.assertListEqual([as_number], list(self.database.get_as_aggregates([as_number, 1]).keys()))
+        # prefixes count is the same of ipaddress.summarize_address_range
+        random.seed(11)
+        starts = list()
+        ends = list()
+        for _ in range(500):
+            start_ip = random.randint(0, 0xFFFFFFFF)
+            starts.append(start_ip)
+            ends.append(random.randint(start_ip, min(0xFFFFFFFF, start_ip + random.choice((1, 300, 1 << 20, 1 << 31)))))
+        starts.extend((0, 0, 0xFFFFFFFF))
+        ends.extend((0xFFFFFFFF, 0, 0xFFFFFFFF))
+        counts = IpAsColumnarIndex.count_prefixes(np.array(starts, dtype=np.uint32), np.array(ends, dtype=np.uint32))
+        for start_ip, end_ip, count in zip(starts, ends, counts):
+            self.assertEqual(len(list(ipaddress.summarize_address_range(ipaddress.IPv4Address(start_ip), ipaddress.IPv4Address(end_ip)))), count)
+        print(f"------- END TEST 5 -------")
+
+    def test_06_resolve_distinct_ranges(self):
+        print(f"\n------- START TEST 6 -------")
+        ips = [ipaddress.IPv4Address('1.0.2.17'), ipaddress.IPv4Address('1.0.1.0'), ipaddress.IPv4Address('1.0.2.17'), ipaddress.IPv4Address('1.0.0.1')]
+        entries = self.database.resolve_distinct_ranges(ips)
+        self.assertListEqual([ips[0], ips[1], ips[3]], list(entries.keys()))
+        self.assertIs(self.database.resolve_range(ips[0]), entries[ips[0]])
+        self.assertIsNone(entries[ips[1]])
+        self.assertEqual(64512, entries[ips[3]].as_number)
+        print(f"------- END TEST 6 -------")
+
+
+if __name__ == '__main__':
+    unittest.main()
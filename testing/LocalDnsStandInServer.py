@@ -0,0 +1,132 @@
+import socket
+import struct
+import threading
+import time
+from typing import Callable
+import dns.flags
+import dns.message
+
+
+class LocalDnsStandInServer:
+    """
+    This class represents a tiny DNS server listening on localhost (UDP and TCP on the same port) used as stand-in for
+    the real nameservers in the tests that must run offline. Every query is answered by the handler function.
+
+    ...
+
+    Attributes
+    ----------
+    handler : Callable[[dns.message.Message], dns.message.Message]
+        Function that computes the response of a query.
+    truncate_udp : bool
+        Flag that tells if every UDP response should be sent truncated (TC=1, no records).
+    tcp_connection_delay : float
+        Seconds waited before answering the first query of every new TCP connection, to emulate the handshake cost.
+    udp_response_delay : float
+        Seconds waited before answering every UDP query, to emulate the round-trip towards a remote nameserver. Delayed
+        queries are answered concurrently.
+    port : int
+        The port of the server.
+    udp_queries : int
+        Number of queries received via UDP.
+    tcp_queries : int
+        Number of queries received via TCP.
+    tcp_connections : int
+        Number of TCP connections accepted.
+    """
+    def __init__(self, handler: Callable[[dns.message.Message], dns.message.Message], truncate_udp=False, tcp_connection_delay=0.0, udp_response_delay=0.0):
+        self.handler = handler
+        self.truncate_udp = truncate_udp
+        self.tcp_connection_delay = tcp_connection_delay
+        self.udp_response_delay = udp_response_delay
+        self.lock = threading.Lock()
+        self.udp_queries = 0
+        self.tcp_queries = 0
+        self.tcp_connections = 0
+        self.running = False
+        self.udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.udp_socket.bind(('127.0.0.1', 0))
+        self.port = self.udp_socket.getsockname()[1]
+        self.tcp_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.tcp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.tcp_socket.bind(('127.0.0.1', self.port))
+        self.tcp_socket.listen(64)
+
+    def start(self) -> 'LocalDnsStandInServer':
+        self.running = True
+        threading.Thread(target=self.__serve_udp, daemon=True).start()
+        threading.Thread(target=self.__serve_tcp, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.running = False
+        self.udp_socket.close()
+        self.tcp_socket.close()
+
+    def __serve_udp(self) -> None:
+        while self.running:
+            try:
+                wire, address = self.udp_socket.recvfrom(65535)
+            except OSError:
+                return
+            with self.lock:
+                self.udp_queries = self.udp_queries + 1
+            if self.udp_response_delay > 0:
+                threading.Thread(target=self.__answer_udp, args=(wire, address), daemon=True).start()
+            else:
+                self.__answer_udp(wire, address)
+
+    def __answer_udp(self, wire: bytes, address: tuple) -> None:
+        time.sleep(self.udp_response_delay)
+        request = dns.message.from_wire(wire)
+        if self.truncate_udp:
+            response = dns.message.make_response(request)
+            response.flags |= dns.flags.TC
+        else:
+            response = self.handler(request)
+        try:
+            self.udp_socket.sendto(response.to_wire(), address)
+        except OSError:
+            pass
+
+    def __serve_tcp(self) -> None:
+        while self.running:
+            try:
+                connection, address = self.tcp_socket.accept()
+            except OSError:
+                return
+            self.tcp_connections = self.tcp_connections + 1
+            threading.Thread(target=self.__serve_tcp_connection, args=(connection,), daemon=True).start()
+
+    def __serve_tcp_connection(self, connection: socket.socket) -> None:
+        is_first = True
+        with connection:
+            while self.running:
+                header = self.__read_exactly(connection, 2)
+                if header is None:
+                    return
+                wire = self.__read_exactly(connection, struct.unpack('!H', header)[0])
+                if wire is None:
+                    return
+                if is_first:
+                    time.sleep(self.tcp_connection_delay)
+                    is_first = False
+                self.tcp_queries = self.tcp_queries + 1
+                response = self.handler(dns.message.from_wire(wire)).to_wire()
+                try:
+                    connection.sendall(struct.pack('!H', len(response)) + response)
+                except OSError:
+                    return
+
+    @staticmethod
+    def __read_exactly(connection: socket.socket, count: int):
+        data = b''
+        while len(data) < count:
+            try:
+                chunk = connection.recv(count - len(data))
+            except OSError:
+                return None
+            if chunk == b'':
+                return None
+            data = data + chunk
+        return data
@@ -0,0 +1,136 @@
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from entities.MainFrameScript import MainFrameScript
+from entities.MainFrameScriptsHtmlParser import MainFrameScriptsHtmlParser
+from entities.Url import Url
+from utils import requests_utils
+
+
+class MainFrameScriptsHtmlParserTestCase(unittest.TestCase):
+    """
+    Offline test of the parsing of the main frame scripts from the html of the landing pages saved in the 'fixtures'
+    folder, also while they are downloaded from a local HTTP stand-in.
+
+    """
+    server = None
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        # PARAMETERS
+        cls.fixtures = Path(__file__).parent / 'fixtures'
+        cls.page_url = 'https://www.example.com/home/index.html'
+        cls.expected_static_scripts = {
+            MainFrameScript('https://www.example.com/static/js/app.js', 'sha384-oqVuAfXRKap7fdgcCY5uykM6+R9GqQ8K/uxy9rx7HNQlGYl1kPzQho1wx4JwY8wC'),
+            MainFrameScript('https://cdn.example.net/lib.min.js', None),
+            MainFrameScript('https://cdn.example.net/footer.js', None)
+        }
+        # ELABORATION
+        bodies = {
+            '/static/': (cls.fixtures / 'landing_page_static_scripts.html').read_bytes(),
+            '/dynamic/': (cls.fixtures / 'landing_page_dynamic_scripts.html').read_bytes()
+        }
+
+        class FixtureHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/slow/':       # trickled, one piece every 50 milliseconds
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'text/html; charset=utf-8')
+                    self.end_headers()
+                    try:
+                        for _ in range(40):
+                            self.wfile.write(b'<p>' + b'x' * 60 + b'</p>')
+                            self.wfile.flush()
+                            time.sleep(0.05)
+                    except OSError:
+                        pass
+                    return
+                body = bodies.get(self.path)
+                if body is None:
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'application/javascript')
+                    body = b'var x = 1;'
+                else:
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), FixtureHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.netloc = f"127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_01_static_page(self):
+        print(f"\n------- START TEST 1 -------")
+        html = (self.fixtures / 'landing_page_static_scripts.html').read_text()
+        scripts, dynamic_scripts_suspected = MainFrameScriptsHtmlParser.parse(html, self.page_url)
+        for script in scripts:
+            print(f"{str(script)}")
+        self.assertSetEqual(self.expected_static_scripts, scripts)
+        for script in scripts:
+            expected = next(s for s in self.expected_static_scripts if s == script)
+            self.assertEqual(expected.integrity, script.integrity)
+        self.assertFalse(dynamic_scripts_suspected)
+        print(f"------- END TEST 1 -------")
+
+    def test_02_dynamic_page(self):
+        print(f"\n------- START TEST 2 -------")
+        html = (self.fixtures / 'landing_page_dynamic_scripts.html').read_text()
+        scripts, dynamic_scripts_suspected = MainFrameScriptsHtmlParser.parse(html, self.page_url)
+        self.assertSetEqual({MainFrameScript('https://www.example.org/loader.js', None)}, scripts)
+        self.assertTrue(dynamic_scripts_suspected)
+        print(f"------- END TEST 2 -------")
+
+    def test_03_same_result_in_chunks(self):
+        print(f"\n------- START TEST 3 -------")
+        html = (self.fixtures / 'landing_page_static_scripts.html').read_text()
+        for chunk_size in (1, 7, 64):
+            parser = MainFrameScriptsHtmlParser()
+            for i in range(0, len(html), chunk_size):
+                parser.feed(html[i:i+chunk_size])
+            parser.close()
+            self.assertSetEqual(self.expected_static_scripts, parser.get_main_frame_scripts(self.page_url))
+            self.assertFalse(parser.dynamic_scripts_suspected)
+        print(f"------- END TEST 3 -------")
+
+    def test_04_parsed_while_landing(self):
+        print(f"\n------- START TEST 4 -------")
+        parser = MainFrameScriptsHtmlParser()
+        landing_url, redirection_path, hsts, ip = requests_utils.resolve_landing_page(Url(self.netloc + '/static'), as_https=False, read_body=parser.feed_response)
+        self.assertFalse(parser.truncated)
+        scripts = parser.get_main_frame_scripts(landing_url.string)
+        print(f"landing url: {landing_url.string}, scripts: {len(scripts)}")
+        self.assertIn(MainFrameScript(f"http://{self.netloc}/static/js/app.js", None), scripts)
+        # not html
+        parser = MainFrameScriptsHtmlParser()
+        requests_utils.resolve_landing_page(Url(self.netloc + '/script.js'), as_https=False, read_body=parser.feed_response)
+        self.assertTrue(parser.truncated)
+        # too long
+        parser = MainFrameScriptsHtmlParser()
+        requests_utils.resolve_landing_page(Url(self.netloc + '/static'), as_https=False, read_body=lambda response: parser.feed_response(response, max_html_characters=100))
+        self.assertTrue(parser.truncated)
+        # too slow
+        parser = MainFrameScriptsHtmlParser()
+        start = time.monotonic()
+        requests_utils.resolve_landing_page(Url(self.netloc + '/slow'), as_https=False, read_body=lambda response: parser.feed_response(response, max_read_seconds=0.3, chunk_size=64))
+        elapsed = time.monotonic() - start
+        print(f"slow page read for {elapsed:.2f}s")
+        self.assertTrue(parser.truncated)
+        self.assertIsNone(parser.body_hash)
+        self.assertLess(elapsed, 1.5)
+        print(f"------- END TEST 4 -------")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+import ipaddress
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from entities.ValidatedRoaPayloadsIndex import ValidatedRoaPayloadsIndex
+from entities.enums.ROVStates import ROVStates
+from entities.resolvers.IpAsDatabase import IpAsDatabase
+from entities.resolvers.OfflineROVValidator import OfflineROVValidator
+from exceptions.FilenameNotFoundError import FilenameNotFoundError
+from exceptions.TableNotPresentError import TableNotPresentError
+from static_variables import INPUT_FOLDER_NAME, RPKI_VRPS_CSV_FILE_NAME, RPKI_VRPS_JSON_FILE_NAME
+
+
+class OfflineROVValidatorTestCase(unittest.TestCase):
+    """
+    Offline test of the ROV states computed from a local export of the Validated ROA Payloads, over a small .tsv database
+    written in a temporary project root directory.
+
+    """
+    temporary_directory = None
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.temporary_directory = tempfile.TemporaryDirectory()
+        cls.project_root_directory = Path(cls.temporary_directory.name)
+        (cls.project_root_directory / INPUT_FOLDER_NAME).mkdir()
+        with open(cls.project_root_directory / INPUT_FOLDER_NAME / 'ip2asn-v4.tsv', 'w', encoding='utf-8') as f:
+            f.write("10.0.0.0\t10.0.1.255\t64500\tIT\tVALID-AS\n")          # 10.0.0.0/23
+            f.write("10.1.0.0\t10.1.0.255\t64501\tIT\tHIJACKER-AS\n")       # 10.1.0.0/24
+            f.write("10.2.0.0\t10.2.0.255\t64502\tIT\tTOO-SPECIFIC-AS\n")   # 10.2.0.0/24
+            f.write("10.3.0.0\t10.3.0.255\t64503\tNone\tUNKNOWN-AS\n")      # 10.3.0.0/24
+            f.write("10.4.0.0\t10.4.2.255\t64500\tIT\tVALID-AS\n")          # 10.4.0.0/23 + 10.4.2.0/24
+        cls.vrps = [
+            ('AS64500', '10.0.0.0/16', '24'),
+            ('AS64500', '10.1.0.0/16', '24'),
+            ('AS64502', '10.2.0.0/16', '16'),
+            ('AS64500', '10.4.0.0/23', ''),
+            ('AS64500', '2001:db8::/32', '48')
+        ]
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.temporary_directory.cleanup()
+
+    def write_csv(self) -> None:
+        with open(self.project_root_directory / INPUT_FOLDER_NAME / RPKI_VRPS_CSV_FILE_NAME, 'w', encoding='utf-8') as f:
+            f.write("ASN,IP Prefix,Max Length,Trust Anchor\n")
+            for as_number, prefix, max_length in self.vrps:
+                f.write(f"{as_number},{prefix},{max_length},ripe\n")
+
+    def test_01_rfc_6811_states(self):
+        print(f"\n------- START TEST 1 -------")
+        index = ValidatedRoaPayloadsIndex(ValidatedRoaPayloadsIndex.parse_vrp(*vrp) for vrp in self.vrps)
+        self.assertEqual(4, len(index))
+        self.assertEqual(ROVStates.VLD, index.validate(ipaddress.IPv4Network('10.0.0.0/23'), 64500)[0])
+        self.assertEqual(ROVStates.INV, index.validate(ipaddress.IPv4Network('10.1.0.0/24'), 64501)[0])
+        self.assertEqual(ROVStates.INV, index.validate(ipaddress.IPv4Network('10.2.0.0/24'), 64502)[0])
+        self.assertEqual(ROVStates.VLD, index.validate(ipaddress.IPv4Network('10.2.0.0/16'), 64502)[0])
+        self.assertEqual(ROVStates.UNK, index.validate(ipaddress.IPv4Network('10.3.0.0/24'), 64503)[0])
+        self.assertEqual(ROVStates.UNK, index.validate(ipaddress.IPv4Network('10.0.0.0/8'), 64500)[0])
+        state, vrps = index.validate(ipaddress.IPv4Network('10.4.2.0/24'), 64500)
+        self.assertEqual(ROVStates.UNK, state)
+        self.assertListEqual([], vrps)
+        with self.assertRaises(ValueError):
+            ValidatedRoaPayloadsIndex.parse_vrp('AS64500', '10.0.0.0/16', '8')
+        print(f"------- END TEST 1 -------")
+
+    def test_02_prefixes_table_of_as(self):
+        print(f"\n------- START TEST 2 -------")
+        self.write_csv()
+        vrps, filepath = ValidatedRoaPayloadsIndex.from_input_folder(project_root_directory=self.project_root_directory)
+        self.assertTrue(filepath.endswith(RPKI_VRPS_CSV_FILE_NAME))
+        validator = OfflineROVValidator(IpAsDatabase(project_root_directory=self.project_root_directory), vrps)
+        validator.load_as_page(64500)
+        for row in validator.prefixes_table:
+            print(str(row))
+        self.assertListEqual(['10.0.0.0/23', '10.4.0.0/23', '10.4.2.0/24'], [row.prefix.compressed for row in validator.prefixes_table])
+        self.assertListEqual([ROVStates.VLD, ROVStates.VLD, ROVStates.UNK], [row.rov_state for row in validator.prefixes_table])
+        self.assertEqual('10.0.0.0/16-24 AS64500', validator.prefixes_table[0].roas)
+        rows = validator.get_networks_if_present([ipaddress.IPv4Address('10.4.2.1'), ipaddress.IPv4Address('10.5.0.1')])
+        self.assertEqual(ipaddress.IPv4Network('10.4.2.0/24'), rows[ipaddress.IPv4Address('10.4.2.1')].prefix)
+        self.assertIsNone(rows[ipaddress.IPv4Address('10.5.0.1')])
+        validator.load_as_page(64503)
+        self.assertEqual(ROVStates.UNK, validator.prefixes_table[0].rov_state)
+        self.assertEqual('ZZ', validator.prefixes_table[0].cc)
+        with self.assertRaises(TableNotPresentError):
+            validator.load_as_page(64599)
+        print(f"------- END TEST 2 -------")
+
+    def test_03_json_export_same_as_csv(self):
+        print(f"\n------- START TEST 3 -------")
+        self.write_csv()
+        csv_vrps = ValidatedRoaPayloadsIndex.from_csv(str(self.project_root_directory / INPUT_FOLDER_NAME / RPKI_VRPS_CSV_FILE_NAME))
+        (self.project_root_directory / INPUT_FOLDER_NAME / RPKI_VRPS_CSV_FILE_NAME).unlink()
+        with self.assertRaises(FilenameNotFoundError):
+            ValidatedRoaPayloadsIndex.from_input_folder(project_root_directory=self.project_root_directory)
+        with open(self.project_root_directory / INPUT_FOLDER_NAME / RPKI_VRPS_JSON_FILE_NAME, 'w', encoding='utf-8') as f:
+            json.dump({'metadata': {}, 'roas': [{'asn': as_number, 'prefix': prefix, 'maxLength': int(max_length) if max_length != '' else int(prefix.split('/')[1]), 'ta': 'ripe'} for as_number, prefix, max_length in self.vrps]}, f)
+        json_vrps, filepath = ValidatedRoaPayloadsIndex.from_input_folder(project_root_directory=self.project_root_directory)
+        self.assertTrue(filepath.endswith(RPKI_VRPS_JSON_FILE_NAME))
+        self.assertDictEqual(csv_vrps.vrps_per_length, json_vrps.vrps_per_length)
+        print(f"------- END TEST 3 -------")
+
+
+    def test_04_approximate_states_of_addresses(self):
+        print(f"\n------- START TEST 4 -------")
+        # PARAMETERS
+        vrps = [
+            ('AS64500', '10.0.0.0/16', '24'),
+            ('AS64502', '10.2.0.0/16', '16'),
+            ('AS64500', '10.4.2.128/25', ''),
+            ('AS64599', '10.4.0.0/24', '')
+        ]
+        # ELABORATION
+        index = ValidatedRoaPayloadsIndex(ValidatedRoaPayloadsIndex.parse_vrp(*vrp) for vrp in vrps)
+        # the max length is not checked: the announced prefix is unknown
+        self.assertEqual(ROVStates.VLD, index.validate_origin(ipaddress.IPv4Network('10.2.0.0/24'), 64502)[0])
+        self.assertEqual(ROVStates.VLD, index.validate_origin(ipaddress.IPv4Network('10.0.0.1/32'), 64500)[0])
+        self.assertEqual(ROVStates.INV, index.validate_origin(ipaddress.IPv4Network('10.0.0.1/32'), 64501)[0])
+        self.assertEqual(ROVStates.UNK, index.validate_origin(ipaddress.IPv4Network('10.3.0.1/32'), 64503)[0])
+        validator = OfflineROVValidator(IpAsDatabase(project_root_directory=self.project_root_directory), index)
+        validator.load_as_page(64500)
+        self.assertEqual(ROVStates.UNK, validator.prefixes_table[2].rov_state)      # 10.4.2.0/24: VRP more specific
+        rows = validator.get_networks_if_present([ipaddress.IPv4Address('10.4.2.1'), ipaddress.IPv4Address('10.4.2.200'), ipaddress.IPv4Address('10.4.0.1')])
+        for ip, row in rows.items():
+            print(f"{ip.compressed}: {str(row)}")
+        self.assertEqual(ipaddress.IPv4Network('10.4.2.0/24'), rows[ipaddress.IPv4Address('10.4.2.200')].prefix)
+        self.assertEqual(ROVStates.UNK, rows[ipaddress.IPv4Address('10.4.2.1')].rov_state)
+        self.assertEqual(ROVStates.VLD, rows[ipaddress.IPv4Address('10.4.2.200')].rov_state)
+        self.assertEqual('10.4.2.128/25-25 AS64500', rows[ipaddress.IPv4Address('10.4.2.200')].roas)
+        self.assertEqual(ROVStates.INV, rows[ipaddress.IPv4Address('10.4.0.1')].rov_state)
+        self.assertEqual(ROVStates.VLD, validator.get_network_if_present(ipaddress.IPv4Address('10.4.2.200')).rov_state)
+        self.assertEqual(ROVStates.UNK, validator.prefixes_table[2].rov_state)      # the table is not changed
+        print(f"------- END TEST 4 -------")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import time
+import unittest
+from entities.DomainName import DomainName
+from entities.OrderedWorklist import OrderedWorklist
+from utils import list_utils
+
+
+class OrderedWorklistTestCase(unittest.TestCase):
+    def test_01_fifo_while_growing(self):
+        print(f"\n------- START TEST 1 -------")
+        worklist = OrderedWorklist([1, 2, 3])
+        elaborated = list()
+        for element in worklist:
+            elaborated.append(element)
+            if element < 6:
+                worklist.add(element + 3)
+                worklist.add(element)       # already added: ignored
+        self.assertListEqual([1, 2, 3, 4, 5, 6, 7, 8], elaborated)
+        self.assertListEqual(elaborated, worklist.to_list())
+        self.assertIn(8, worklist)
+        self.assertFalse(worklist.has_pending())
+        print(f"------- END TEST 1 -------")
+
+    def test_02_parents_before_children(self):
+        print(f"\n------- START TEST 2 -------")
+        worklist = OrderedWorklist.by_labels_count(DomainName('www.a.example.com.').parse_subdomains(False, False, True))
+        elaborated = list()
+        for domain_name in worklist:
+            elaborated.append(domain_name.string)
+            if domain_name.string == 'example.com.':
+                worklist.add_all(DomainName('ns1.dns.example.net.').parse_subdomains(False, False, True))
+        print(f"elaboration order: {elaborated}")
+        self.assertListEqual(['example.com.', 'example.net.', 'a.example.com.', 'dns.example.net.', 'www.a.example.com.', 'ns1.dns.example.net.'], elaborated)
+        print(f"------- END TEST 2 -------")
+
+    def test_03_merge_set_in_list(self):
+        print(f"\n------- START TEST 3 -------")
+        _list = [1, 2, 3]
+        list_utils.merge_set_in_list(_list, {3, 4})
+        self.assertListEqual([1, 2, 3, 4], _list)
+        elements = list(range(5000))
+        start = time.perf_counter()
+        appended = list()
+        for element in elements + elements:
+            list_utils.append_with_no_duplicates(appended, element)
+        list_elapsed = time.perf_counter() - start
+        start = time.perf_counter()
+        worklist = OrderedWorklist(elements + elements)
+        worklist_elapsed = time.perf_counter() - start
+        print(f"{len(elements)} elements added twice: list {list_elapsed:.3f}s, worklist {worklist_elapsed:.3f}s")
+        self.assertListEqual(appended, worklist.to_list())
+        self.assertLess(worklist_elapsed, list_elapsed)
+        print(f"------- END TEST 3 -------")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import ipaddress
+import random
+import time
+import unittest
+from entities.PrefixesTableIndex import PrefixesTableIndex
+from entities.RowPrefixesTable import RowPrefixesTable
+from entities.resolvers.ROVPageScraper import ROVPageScraper
+from exceptions.NetworkNotFoundError import NetworkNotFoundError
+from exceptions.TableEmptyError import TableEmptyError
+from exceptions.TableNotPresentError import TableNotPresentError
+
+
+class PrefixesTableIndexTestCase(unittest.TestCase):
+    """
+    Offline test of the longest-prefix match over a synthetic prefixes table (nested prefixes of many lengths), checked
+    against a linear scan that picks the most specific prefix.
+
+    """
+    @classmethod
+    def setUpClass(cls) -> None:
+        # PARAMETERS
+        cls.prefixes = 3000
+        cls.queries = 20000
+        # ELABORATION
+        random.seed(13)
+        cls.rows = list()
+        for i in range(cls.prefixes):
+            length = random.randint(8, 28)
+            network = ipaddress.IPv4Network((random.randint(0x0A000000, 0x0AFFFFFF) & PrefixesTableIndex.netmask(length), length))
+            cls.rows.append(RowPrefixesTable('AS64512', network.compressed, str(network.num_addresses), 'IT', '100', random.choice(('VLD', 'INV', 'UNK')), '1'))
+        cls.ips = [ipaddress.IPv4Address(random.randint(0x09FFFF00, 0x0B000100)) for _ in range(cls.queries)]
+
+    @staticmethod
+    def linear_longest_prefix_match(rows, ip):
+        best = None
+        for row in rows:
+            if ip in row.prefix and (best is None or row.prefix.prefixlen > best.prefix.prefixlen):
+                best = row
+        return best
+
+    def test_01_longest_prefix_match(self):
+        print(f"\n------- START TEST 1 -------")
+        index = PrefixesTableIndex(self.rows)
+        print(f"{len(index)} distinct prefixes, lengths: {index.lengths}")
+        for ip in self.ips[:500]:
+            expected = self.linear_longest_prefix_match(self.rows, ip)
+            row = index.longest_prefix_match(ip)
+            if expected is None:
+                self.assertIsNone(row)
+            else:
+                self.assertEqual(expected.prefix, row.prefix)
+        self.assertIsNone(index.longest_prefix_match(ipaddress.IPv6Address('::1')))
+        print(f"------- END TEST 1 -------")
+
+    def test_02_batch_same_as_single(self):
+        print(f"\n------- START TEST 2 -------")
+        index = PrefixesTableIndex(self.rows)
+        start = time.perf_counter()
+        singles = [index.longest_prefix_match(ip) for ip in self.ips]
+        single_elapsed = time.perf_counter() - start
+        start = time.perf_counter()
+        batch = index.longest_prefix_matches(self.ips)
+        batch_elapsed = time.perf_counter() - start
+        print(f"{self.queries} lookups over {self.prefixes} prefixes: one by one {single_elapsed:.3f}s, batch {batch_elapsed:.3f}s")
+        for single, batched in zip(singles, batch):
+            self.assertIs(single, batched)
+        self.assertTrue(any(row is None for row in batch))
+        print(f"------- END TEST 2 -------")
+
+    def test_03_scraper_uses_index(self):
+        print(f"\n------- START TEST 3 -------")
+        scraper = ROVPageScraper(None)
+        scraper.current_as_number = 64512
+        scraper.prefixes_table = [
+            RowPrefixesTable('AS64512', '10.0.0.0/8', '16777216', 'IT', '100', 'VLD', '1'),
+            RowPrefixesTable('AS64512', '10.1.0.0/16', '65536', 'IT', '100', 'INV', '1')
+        ]
+        self.assertEqual(ipaddress.IPv4Network('10.1.0.0/16'), scraper.get_network_if_present(ipaddress.IPv4Address('10.1.2.3')).prefix)
+        self.assertEqual(ipaddress.IPv4Network('10.0.0.0/8'), scraper.get_network_if_present(ipaddress.IPv4Address('10.2.2.3')).prefix)
+        with self.assertRaises(NetworkNotFoundError):
+            scraper.get_network_if_present(ipaddress.IPv4Address('11.0.0.1'))
+        rows = scraper.get_networks_if_present([ipaddress.IPv4Address('10.1.2.3'), ipaddress.IPv4Address('11.0.0.1')])
+        self.assertEqual(ipaddress.IPv4Network('10.1.0.0/16'), rows[ipaddress.IPv4Address('10.1.2.3')].prefix)
+        self.assertIsNone(rows[ipaddress.IPv4Address('11.0.0.1')])
+        scraper.prefixes_table = list()
+        with self.assertRaises(TableEmptyError):
+            scraper.get_network_if_present(ipaddress.IPv4Address('10.1.2.3'))
+        scraper.prefixes_table = None
+        with self.assertRaises(TableNotPresentError):
+            scraper.get_networks_if_present([ipaddress.IPv4Address('10.1.2.3')])
+        print(f"------- END TEST 3 -------")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+from entities.DnsQueryLatencyStats import DnsQueryLatencyStats
+from entities.DomainName import DomainName
+from entities.LocalDnsResolverCache import LocalDnsResolverCache
+from entities.RRecord import RRecord
+from entities.Url import Url
+from entities.enums.TypesRR import TypesRR
+from entities.resolvers.QueryCostEstimator import QueryCostEstimator
+
+
+class QueryCostEstimatorTestCase(unittest.TestCase):
+    """
+    Offline test of the dry run: the cache is built by hand so that the expected number of hits and live queries is
+    known in advance.
+
+    """
+    cache = None
+    latency_stats = None
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        # PARAMETERS
+        cls.cache = LocalDnsResolverCache()
+        cls.cache.add_entry(RRecord('www.example.test.', TypesRR.CNAME, ['web.example.test.']))
+        cls.cache.add_entry(RRecord('web.example.test.', TypesRR.A, ['192.0.2.1']))
+        cls.cache.add_entry(RRecord('example.test.', TypesRR.NS, ['ns1.example.test.']))
+        cls.cache.add_entry(RRecord('ns1.example.test.', TypesRR.A, ['192.0.2.53']))
+        cls.cache.add_entry(RRecord('example.test.', TypesRR.MX, ['mail.example.test.']))
+        cls.cache.add_entry(RRecord('mail.example.test.', TypesRR.A, ['192.0.2.25']))
+        cls.cache.add_nonexistent_name(DomainName('gone.example.test.'), 300)
+        cls.latency_stats = DnsQueryLatencyStats()
+        cls.latency_stats.record(TypesRR.CNAME, 1.0, count=10)
+        cls.latency_stats.record(TypesRR.NS, 2.0, count=10)
+
+    def test_01_counts_hits_and_live_queries(self):
+        print(f"\n------- START TEST 1 -------")
+        estimator = QueryCostEstimator(self.cache, self.latency_stats, False)
+        estimate = estimator.estimate_input([Url('www.example.test')], [DomainName('example.test.')])
+        estimate.print_report()
+        # A: www (via CNAME), mail, ns1 are hits
+        self.assertEqual(3, estimate.cache_hits[TypesRR.A])
+        self.assertEqual(0, estimate.live_queries[TypesRR.A])
+        self.assertEqual(1, estimate.cache_hits[TypesRR.MX])
+        # CNAME: www hit; example, web, mail, ns1 are live (absence of CNAME is not cached)
+        self.assertEqual(1, estimate.cache_hits[TypesRR.CNAME])
+        self.assertEqual(4, estimate.live_queries[TypesRR.CNAME])
+        # NS: example hit; web, mail, ns1 are live
+        self.assertEqual(1, estimate.cache_hits[TypesRR.NS])
+        self.assertEqual(3, estimate.live_queries[TypesRR.NS])
+        self.assertEqual(3, estimate.unexpanded_lookups)
+        self.assertAlmostEqual(4 * 0.1 + 3 * 0.2, estimate.estimated_seconds)
+        self.assertAlmostEqual(6 / 13, estimate.hit_rate())
+        print(f"------- END TEST 1 -------")
+
+    def test_02_negative_cache_avoids_queries(self):
+        print(f"\n------- START TEST 2 -------")
+        estimator = QueryCostEstimator(self.cache, self.latency_stats, False)
+        estimate = estimator.estimate_input([Url('gone.example.test')], [])
+        estimate.print_report()
+        # A, CNAME and NS of the non-existent name
+        self.assertEqual(3, estimate.negative_hits)
+        self.assertEqual(0, estimate.live_queries[TypesRR.A])
+        print(f"------- END TEST 2 -------")
+
+
+if __name__ == '__main__':
+    unittest.main()
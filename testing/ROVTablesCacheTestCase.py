@@ -0,0 +1,141 @@
+import ipaddress
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import requests
+from entities.ROVTablesCache import ROVTablesCache
+from entities.RowPrefixesTable import RowPrefixesTable
+from entities.resolvers.HttpROVPageScraper import HttpROVPageScraper
+
+
+class ROVTablesCacheTestCase(unittest.TestCase):
+    """
+    Offline test of the persistent cache of the ROV prefixes tables: a local HTTP stand-in serves the saved page in the
+    'fixtures' folder with an ETag, answers 304 to the matching conditional requests and counts the requests.
+
+    """
+    temporary_directory = None
+    server = None
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        body = (Path(__file__).parent / 'fixtures' / 'rov_page_AS64500.html').read_bytes()
+        cls.requests = list()
+
+        class FixtureHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                cls.requests.append(self.headers.get('If-None-Match'))
+                if self.headers.get('If-None-Match') == '"v1"':
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                if self.path.startswith('/unavailable/'):
+                    self.send_error(503)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('ETag', '"v1"')
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), FixtureHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}/roa/AS"
+        cls.unavailable_base_url = f"http://127.0.0.1:{cls.server.server_address[1]}/unavailable/AS"
+        cls.temporary_directory = tempfile.TemporaryDirectory()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.temporary_directory.cleanup()
+
+    def test_01_ttl_and_format_version(self):
+        print(f"\n------- START TEST 1 -------")
+        filepath = str(Path(self.temporary_directory.name) / 'test_01.sqlite')
+        rows = [RowPrefixesTable('AS64500', '10.0.0.0/16', '65,536', 'IT', '100', 'VLD', '10.0.0.0/16-24 AS64500, 10.0.0.0/8-16 AS64500')]
+        cache = ROVTablesCache(filepath, ttl=0.2)
+        self.assertIsNone(cache.get(64500))
+        cache.put(64500, rows, '"v1"', None)
+        cached = cache.get(64500)
+        self.assertListEqual([str(row) for row in rows], [str(row) for row in cached])
+        time.sleep(0.3)
+        self.assertIsNone(cache.get(64500))
+        self.assertTupleEqual(('"v1"', None), cache.get_validators(64500))
+        self.assertEqual("1 hits, 2 misses, 0 revalidated", cache.get_summary())
+        cache.close()
+        # another format version: the file is discarded
+        connection = sqlite3.connect(filepath)
+        connection.execute('PRAGMA user_version = 0')
+        connection.commit()
+        connection.close()
+        cache = ROVTablesCache(filepath)
+        self.assertEqual(0, len(cache))
+        cache.close()
+        print(f"------- END TEST 1 -------")
+
+    def test_02_later_runs_skip_or_revalidate_pages(self):
+        print(f"\n------- START TEST 2 -------")
+        filepath = str(Path(self.temporary_directory.name) / 'test_02.sqlite')
+        del self.requests[:]
+        # first run: the page is loaded and saved
+        scraper = HttpROVPageScraper(None, url_of_as_number=lambda as_number: self.base_url + str(as_number), cache=ROVTablesCache(filepath))
+        scraper.load_as_page(64500)
+        expected = [str(row) for row in scraper.prefixes_table]
+        scraper.cache.close()
+        # second run: fresh table, no request
+        scraper = HttpROVPageScraper(None, url_of_as_number=lambda as_number: self.base_url + str(as_number), cache=ROVTablesCache(filepath))
+        scraper.load_as_page(64500)
+        self.assertListEqual(expected, [str(row) for row in scraper.prefixes_table])
+        self.assertEqual(0, scraper.http_pages_count)
+        print(f"second run: {scraper.cache.get_summary()}")
+        self.assertEqual(1, scraper.cache.hits_count)
+        scraper.cache.close()
+        # third run: stale table, revalidated with a conditional request
+        scraper = HttpROVPageScraper(None, url_of_as_number=lambda as_number: self.base_url + str(as_number), cache=ROVTablesCache(filepath, ttl=0))
+        time.sleep(0.01)
+        scraper.load_as_page(64500)
+        self.assertListEqual(expected, [str(row) for row in scraper.prefixes_table])
+        print(f"third run: {scraper.cache.get_summary()}")
+        self.assertEqual(1, scraper.cache.misses_count)
+        self.assertEqual(1, scraper.cache.revalidations_count)
+        self.assertListEqual([None, '"v1"'], self.requests)
+        self.assertEqual('10.0.128.0/24', scraper.get_network_if_present(ipaddress.IPv4Address('10.0.128.1')).prefix.compressed)
+        scraper.cache.close()
+        print(f"------- END TEST 2 -------")
+
+
+    def test_03_not_modified_without_cached_table(self):
+        print(f"\n------- START TEST 3 -------")
+        filepath = str(Path(self.temporary_directory.name) / 'test_03.sqlite')
+        cache = ROVTablesCache(filepath, ttl=0)
+        scraper = HttpROVPageScraper(None, url_of_as_number=lambda as_number: self.base_url + str(as_number), cache=cache)
+        scraper.load_as_page(64500)
+        # the table is gone when the site answers 304: the page is fetched again, unconditionally
+        cache.get_validators = lambda as_number: ('"v1"', None)
+        cache.revalidate = lambda as_number: None
+        del self.requests[:]
+        scraper.load_as_page(64500)
+        self.assertListEqual(['"v1"', None], self.requests)
+        self.assertEqual(64500, scraper.current_as_number)
+        self.assertEqual(4, len(scraper.prefixes_table))
+        # the second request fails as the first one would
+        scraper.url_of_as_number = lambda as_number: self.unavailable_base_url + str(as_number)
+        with self.assertRaises(requests.exceptions.HTTPError):
+            scraper.load_as_page(64500)
+        self.assertEqual(-1, scraper.current_as_number)
+        self.assertListEqual([], scraper.prefixes_table)
+        scraper.close()
+        cache.close()
+        print(f"------- END TEST 3 -------")
+
+if __name__ == '__main__':
+    unittest.main()
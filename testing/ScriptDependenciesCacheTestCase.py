@@ -0,0 +1,150 @@
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from entities.MainFrameScript import MainFrameScript
+from entities.MainFrameScriptsHtmlParser import MainFrameScriptsHtmlParser
+from entities.ScriptDependenciesCache import ScriptDependenciesCache
+from entities.Url import Url
+from entities.resolvers.LandingResolver import LandingResolver
+from utils import requests_utils
+
+
+class StandInDnsResolver:
+    """
+    Stand-in of the DNS resolver that resolves every access path to the name it is asked for.
+
+    """
+    def resolve_a_path(self, domain_name):
+        return domain_name
+
+
+class ScriptDependenciesCacheTestCase(unittest.TestCase):
+    """
+    Offline test of the persistent cache of the script dependencies resolving: a local HTTP stand-in serves the landing
+    page saved in the 'fixtures' folder (with an ETag or without one) and counts the requests.
+
+    """
+    temporary_directory = None
+    server = None
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        body = (Path(__file__).parent / 'fixtures' / 'landing_page_dynamic_scripts.html').read_bytes()
+        cls.requests = list()
+
+        class FixtureHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                cls.requests.append(self.path)
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                if self.path.startswith('/etag'):
+                    self.send_header('ETag', '"v1"')
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), FixtureHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.netloc = f"127.0.0.1:{cls.server.server_address[1]}"
+        cls.temporary_directory = tempfile.TemporaryDirectory()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.temporary_directory.cleanup()
+
+    def test_01_validators_ttl_and_format_version(self):
+        print(f"\n------- START TEST 1 -------")
+        # PARAMETERS
+        filepath = str(Path(self.temporary_directory.name) / 'test_01.sqlite')
+        landing_url = 'https://www.example.com/'
+        scripts = {MainFrameScript('https://www.example.com/app.js', 'sha384-abc'), MainFrameScript('https://cdn.example.net/lib.js', None)}
+        # ELABORATION
+        cache = ScriptDependenciesCache(filepath, scripts_ttl=0.2)
+        self.assertIsNone(cache.get_landing_page_scripts(landing_url, '"v1"', 'hash1'))
+        cache.put_landing_page_scripts(landing_url, '"v1"', 'hash1', scripts)
+        cached = cache.get_landing_page_scripts(landing_url, '"v1"', 'hash2')       # same ETag, different html
+        self.assertSetEqual(scripts, cached)
+        self.assertSetEqual({script.integrity for script in scripts}, {script.integrity for script in cached})
+        self.assertIsNone(cache.get_landing_page_scripts(landing_url, '"v2"', 'hash1'))        # the page changed
+        self.assertSetEqual(scripts, cache.get_landing_page_scripts(landing_url, None, 'hash1'))
+        self.assertIsNone(cache.get_landing_page_scripts(landing_url, None, None))
+        time.sleep(0.3)
+        self.assertIsNone(cache.get_landing_page_scripts(landing_url, '"v1"', 'hash1'))
+        # without validators nothing is saved
+        cache.put_landing_page_scripts('https://www.example.org/', None, None, scripts)
+        self.assertEqual(1, len(cache))
+        print(f"{cache.get_summary()}")
+        self.assertEqual(2, cache.scripts_hits_count)
+        self.assertEqual(4, cache.scripts_misses_count)
+        cache.close()
+        # another format version: the file is discarded
+        connection = sqlite3.connect(filepath)
+        connection.execute('PRAGMA user_version = 0')
+        connection.commit()
+        connection.close()
+        cache = ScriptDependenciesCache(filepath)
+        self.assertEqual(0, len(cache))
+        cache.close()
+        print(f"------- END TEST 1 -------")
+
+    def test_02_landing_validators(self):
+        print(f"\n------- START TEST 2 -------")
+        hashes = list()
+        for path in ('/etag', '/no-etag', '/no-etag'):
+            parser = MainFrameScriptsHtmlParser()
+            requests_utils.resolve_landing_page(Url(self.netloc + path), as_https=False, read_body=parser.feed_response)
+            self.assertFalse(parser.truncated)
+            self.assertEqual('"v1"' if path == '/etag' else None, parser.etag)
+            hashes.append(parser.body_hash)
+        self.assertEqual(1, len(set(hashes)))
+        self.assertEqual(64, len(hashes[0]))
+        # too long: no hash
+        parser = MainFrameScriptsHtmlParser()
+        requests_utils.resolve_landing_page(Url(self.netloc + '/etag'), as_https=False, read_body=lambda response: parser.feed_response(response, max_html_characters=100))
+        self.assertTrue(parser.truncated)
+        self.assertEqual('"v1"', parser.etag)
+        self.assertIsNone(parser.body_hash)
+        print(f"------- END TEST 2 -------")
+
+    def test_03_later_runs_skip_script_sites_landing(self):
+        print(f"\n------- START TEST 3 -------")
+        # PARAMETERS
+        filepath = str(Path(self.temporary_directory.name) / 'test_03.sqlite')
+        script_site = Url(self.netloc + '/no-etag')
+        # ELABORATION
+        del self.requests[:]
+        resolver = LandingResolver(StandInDnsResolver())
+        # first run: the script site is landed and saved
+        cache = ScriptDependenciesCache(filepath)
+        first = resolver.resolve_site(script_site, landing_cache=cache)
+        self.assertIsNotNone(first.http)
+        requests_count = len(self.requests)
+        self.assertGreater(requests_count, 0)
+        cache.close()
+        # second run: no request
+        cache = ScriptDependenciesCache(filepath)
+        second = resolver.resolve_site(script_site, landing_cache=cache)
+        self.assertEqual(requests_count, len(self.requests))
+        self.assertEqual(first.http.url.string, second.http.url.string)
+        self.assertListEqual(first.http.redirection_path, second.http.redirection_path)
+        self.assertEqual(first.http.hsts, second.http.hsts)
+        print(f"second run: {cache.get_summary()}")
+        self.assertGreaterEqual(cache.landing_hits_count, 1)
+        # the landing of the web sites (html parsed) doesn't use it
+        resolver.resolve_site(script_site, parse_main_frame_scripts=True, landing_cache=cache)
+        self.assertGreater(len(self.requests), requests_count)
+        cache.close()
+        print(f"------- END TEST 3 -------")
+
+
+if __name__ == '__main__':
+    unittest.main()
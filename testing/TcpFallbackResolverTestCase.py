@@ -0,0 +1,159 @@
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+import dns.exception
+import dns.message
+import dns.rdatatype
+import dns.resolver
+import dns.rrset
+from entities.DnsTcpConnection import DnsTcpConnection
+from entities.resolvers.TcpFallbackResolver import TcpFallbackResolver
+from testing.LocalDnsStandInServer import LocalDnsStandInServer
+
+
+class TcpFallbackResolverTestCase(unittest.TestCase):
+    """
+    Offline test (and small benchmark) of the TCP fallback for truncated responses. A local stand-in nameserver
+    truncates every UDP response and it answers via TCP with a large NS set; every new TCP connection costs
+    'connection_delay' seconds to emulate the handshake round-trip towards a remote nameserver.
+
+    """
+    server = None
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        # PARAMETERS
+        cls.queries = 30
+        cls.connection_delay = 0.02
+        cls.name_servers = [f"a-very-long-name-server-label-number-{i}.nameservers.example.com." for i in range(13)]
+        # ELABORATION
+        cls.server = LocalDnsStandInServer(cls.answer_with_large_ns_set, truncate_udp=True, tcp_connection_delay=cls.connection_delay).start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.stop()
+
+    @classmethod
+    def answer_with_large_ns_set(cls, request: dns.message.Message) -> dns.message.Message:
+        response = dns.message.make_response(request)
+        question = request.question[0]
+        response.answer.append(dns.rrset.from_text_list(question.name, 300, 'IN', 'NS', cls.name_servers))
+        return response
+
+    def configure(self, resolver: dns.resolver.Resolver) -> dns.resolver.Resolver:
+        resolver.nameservers = ['127.0.0.1']
+        resolver.port = self.server.port
+        resolver.lifetime = 5
+        return resolver
+
+    def test_01_truncated_responses_reuse_one_connection(self):
+        print(f"\n------- START TEST 1 -------")
+        resolver = self.configure(TcpFallbackResolver(configure=False))
+        connections_before = self.server.tcp_connections
+        for i in range(self.queries):
+            answer = resolver.resolve(f"zone{i}.example.com.", 'NS')
+            self.assertSetEqual(set(self.name_servers), set(rr.target.to_text() for rr in answer))
+        print(f"truncated responses: {resolver.truncated_responses}, TCP connections: {self.server.tcp_connections - connections_before}")
+        self.assertEqual(self.queries, resolver.truncated_responses)
+        self.assertEqual(1, self.server.tcp_connections - connections_before)
+        self.assertEqual(1, resolver.tcp_pool.connections_opened())
+        resolver.close()
+        print(f"------- END TEST 1 -------")
+
+    def test_02_pipelined_concurrent_queries(self):
+        print(f"\n------- START TEST 2 -------")
+        resolver = self.configure(TcpFallbackResolver(configure=False))
+        names = [f"zone{i}.example.com." for i in range(self.queries)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            answers = list(executor.map(lambda name: resolver.resolve(name, 'NS'), names))
+        for name, answer in zip(names, answers):
+            self.assertEqual(name, answer.qname.to_text())
+        print(f"TCP connections opened by the pool: {resolver.tcp_pool.connections_opened()}")
+        self.assertEqual(1, resolver.tcp_pool.connections_opened())
+        resolver.close()
+        print(f"------- END TEST 2 -------")
+
+    def test_03_benchmark_against_plain_dnspython(self):
+        print(f"\n------- START TEST 3 -------")
+        plain_resolver = self.configure(dns.resolver.Resolver(configure=False))
+        connections_before = self.server.tcp_connections
+        start = time.perf_counter()
+        for i in range(self.queries):
+            plain_resolver.resolve(f"zone{i}.example.com.", 'NS')
+        plain_elapsed = time.perf_counter() - start
+        plain_connections = self.server.tcp_connections - connections_before
+        resolver = self.configure(TcpFallbackResolver(configure=False))
+        connections_before = self.server.tcp_connections
+        start = time.perf_counter()
+        for i in range(self.queries):
+            resolver.resolve(f"zone{i}.example.com.", 'NS')
+        pooled_elapsed = time.perf_counter() - start
+        pooled_connections = self.server.tcp_connections - connections_before
+        resolver.close()
+        print(f"{self.queries} truncated NS queries: plain dnspython {plain_elapsed:.3f}s ({plain_connections} TCP connections), connection reusing {pooled_elapsed:.3f}s ({pooled_connections} TCP connections)")
+        self.assertEqual(self.queries, plain_connections)
+        self.assertEqual(1, pooled_connections)
+        print(f"------- END TEST 3 -------")
+
+    def test_04_late_responses_are_discarded(self):
+        print(f"\n------- START TEST 4 -------")
+        # PARAMETERS
+        delay = 0.3
+
+        def answer_slowly(request: dns.message.Message) -> dns.message.Message:
+            if request.question[0].name.to_text().startswith('slow'):
+                time.sleep(delay)
+            return self.answer_with_large_ns_set(request)
+        # ELABORATION
+        server = LocalDnsStandInServer(answer_slowly).start()
+        try:
+            connection = DnsTcpConnection('127.0.0.1', server.port)
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                # another thread reads the socket while the query below times out waiting for its response
+                reader = executor.submit(connection.query, dns.message.make_query('slow-reader.example.com.', 'NS'), 5)
+                time.sleep(delay / 6)
+                with self.assertRaises(dns.exception.Timeout):
+                    connection.query(dns.message.make_query('slow-timed-out.example.com.', 'NS'), delay / 3)
+                self.assertEqual('slow-reader.example.com.', reader.result().question[0].name.to_text())
+            # the late response of the timed out query is read (and discarded) before this one
+            response = connection.query(dns.message.make_query('fast.example.com.', 'NS'), 5)
+            self.assertEqual('fast.example.com.', response.question[0].name.to_text())
+            self.assertEqual(1, connection.connections_opened)
+            self.assertDictEqual(dict(), connection.pending_responses)
+            self.assertSetEqual(set(), connection.awaited_ids)
+            connection.close()
+        finally:
+            server.stop()
+        print(f"------- END TEST 4 -------")
+
+    def test_05_reader_timeout_keeps_the_connection(self):
+        print(f"\n------- START TEST 5 -------")
+        # PARAMETERS
+        delay = 0.3
+
+        def answer_slowly(request: dns.message.Message) -> dns.message.Message:
+            if request.question[0].name.to_text().startswith('slow'):
+                time.sleep(delay)
+            return self.answer_with_large_ns_set(request)
+        # ELABORATION
+        server = LocalDnsStandInServer(answer_slowly).start()
+        try:
+            connection = DnsTcpConnection('127.0.0.1', server.port)
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                # the query below reads the socket and times out, this one (later deadline) goes on reading
+                waiter = executor.submit(lambda: (time.sleep(delay / 6), connection.query(dns.message.make_query('slow-waiter.example.com.', 'NS'), 5))[1])
+                with self.assertRaises(dns.exception.Timeout):
+                    connection.query(dns.message.make_query('slow-reader.example.com.', 'NS'), delay / 3)
+                self.assertEqual('slow-waiter.example.com.', waiter.result().question[0].name.to_text())
+            response = connection.query(dns.message.make_query('fast.example.com.', 'NS'), 5)
+            self.assertEqual('fast.example.com.', response.question[0].name.to_text())
+            self.assertEqual(1, connection.connections_opened)
+            self.assertEqual(0, len(connection.read_buffer))
+            connection.close()
+        finally:
+            server.stop()
+        print(f"------- END TEST 5 -------")
+
+
+if __name__ == '__main__':
+    unittest.main()
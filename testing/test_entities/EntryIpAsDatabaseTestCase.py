@@ -0,0 +1,44 @@
+import ipaddress
+import random
+import unittest
+from entities.EntryIpAsDatabase import EntryIpAsDatabase
+from utils import network_utils
+
+
+class EntryIpAsDatabaseTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        # PARAMETER
+        cls.entry = EntryIpAsDatabase(['1.0.0.3', '1.0.4.17', '13335', 'US', 'CLOUDFLARENET'])
+
+    def test_01_networks_same_as_summarize_address_range(self):
+        print(f"\n------- START TEST 1 -------")
+        expected = list(ipaddress.summarize_address_range(self.entry.start_ip_range, self.entry.end_ip_range))
+        print(f"networks of [{self.entry.start_ip_range} - {self.entry.end_ip_range}]: {[str(network) for network in expected]}")
+        self.assertListEqual(expected, self.entry.get_all_networks())
+        random.seed(5)
+        for _ in range(1000):
+            first = random.randint(0, 0xFFFFFFFF)
+            last = random.randint(first, min(0xFFFFFFFF, first + random.choice((0, 300, 1 << 20, 1 << 31))))
+            blocks = list(map(lambda network: (int(network.network_address), network.prefixlen), ipaddress.summarize_address_range(ipaddress.IPv4Address(first), ipaddress.IPv4Address(last))))
+            self.assertListEqual(blocks, network_utils.decompose_range_in_cidr_blocks(first, last))
+        self.assertListEqual([(0, 0)], network_utils.decompose_range_in_cidr_blocks(0, 0xFFFFFFFF))
+        with self.assertRaises(ValueError):
+            network_utils.decompose_range_in_cidr_blocks(2, 1)
+        print(f"------- END TEST 1 -------")
+
+    def test_02_network_of_ip(self):
+        print(f"\n------- START TEST 2 -------")
+        for ip_int in range(int(self.entry.start_ip_range), int(self.entry.end_ip_range) + 1):
+            ip = ipaddress.IPv4Address(ip_int)
+            network, networks = self.entry.get_network_of_ip(ip)
+            self.assertIn(ip, network)
+            self.assertIn(network, networks)
+        for ip in ('1.0.0.2', '1.0.4.18'):
+            with self.assertRaises(ValueError):
+                self.entry.get_network_of_ip(ipaddress.IPv4Address(ip))
+        print(f"------- END TEST 2 -------")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -128,8 +128,9 @@ def last_modified(path_to_file: str) -> float:
 def is_tsv_database_updated(project_root_directory=Path.cwd()) -> bool:
     """
     This method checks if the .tsv database downloaded in the input folder is updated: we consider the database
-    'updated' if it was downloaded at most one hour ago; this because in https://iptoasn.com/ it is said that the
-    database is updated hourly. It returns False even in the case that the file is absent.
+    'updated' if it was downloaded (or confirmed as not modified by the server) at most one hour ago; this because in
+    https://iptoasn.com/ it is said that the database is updated hourly. It returns False even in the case that the file
+    is absent.
 
     :return: A boolean saying if it is updated or not (or there is no file).
     :rtype: bool
@@ -145,8 +146,8 @@ def is_tsv_database_updated(project_root_directory=Path.cwd()) -> bool:
         return False
     dt = datetime.fromtimestamp(ct)
     now = datetime.now()
-    diff_sec = (now - dt).seconds
-    if diff_sec / (60*24) >= 1:  # more than 1 hour is passed
+    diff_sec = (now - dt).total_seconds()
+    if diff_sec >= 60*60:  # more than 1 hour is passed
         return False
     else:
         return True
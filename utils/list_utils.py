@@ -1,6 +1,7 @@
 def append_with_no_duplicates(_list: list, element) -> None:
     """
     Appends an element to the parameter list only if the element is not already contained in the list parameter.
+    The membership check is O(n): when many elements are appended, use an OrderedWorklist instead.
 
     :param _list: A list.
     :type _list: list
@@ -22,9 +23,25 @@ def remove_duplicates(_list: list):
 
 
 def merge_set_in_list(_list: list, _set: set, duplicates=False) -> list:
+    """
+    Appends the elements of the set parameter to the list parameter (in place). Without duplicates the membership check
+    uses a set of the list elements (which must be hashable), so the merge costs O(n + m) instead of O(n * m).
+
+    :param _list: A list.
+    :type _list: list
+    :param _set: A set.
+    :type _set: set
+    :param duplicates: Flag that sets if elements already contained in the list should be appended anyway.
+    :type duplicates: bool
+    :return: The list parameter.
+    :rtype: list
+    """
+    if duplicates:
+        _list.extend(_set)
+        return _list
+    seen = set(_list)
     for elem in _set:
-        if duplicates:
+        if elem not in seen:
+            seen.add(elem)
             _list.append(elem)
-        else:
-            append_with_no_duplicates(_list, elem)
     return _list
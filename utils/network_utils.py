@@ -1,5 +1,6 @@
 import ipaddress
 import socket
+from typing import List, Tuple
 
 
 def get_local_ip() -> str:
@@ -45,3 +46,32 @@ def get_predefined_network(ip_parameter: ipaddress.IPv4Address or str) -> ipaddr
         ip = ip_parameter
     split = ip.split('.')
     return ipaddress.IPv4Network(split[0]+'.'+split[1]+'.'+split[2]+'.0/24')
+
+
+def decompose_range_in_cidr_blocks(first: int, last: int) -> List[Tuple[int, int]]:
+    """
+    Given the first and last IPv4 addresses (as integers) of a range, computes the minimal list of CIDR blocks that
+    covers exactly the range (the same of ipaddress.summarize_address_range) with integer arithmetic: at every step the
+    block starting at the current address is the largest one that is both aligned to it (its lowest set bit) and not
+    bigger than the remaining addresses (the highest set bit of their number).
+
+    :param first: The first address of the range.
+    :type first: int
+    :param last: The last address of the range.
+    :type last: int
+    :raise ValueError: If last is lower than first or they are not valid IPv4 addresses.
+    :return: The blocks, sorted, as tuples of network address and prefix length.
+    :rtype: List[Tuple[int, int]]
+    """
+    if first < 0 or last > 0xFFFFFFFF:
+        raise ValueError(f"Not valid IPv4 range: {first} - {last}")
+    if last < first:
+        raise ValueError('last IP address must be greater than first')
+    blocks = list()
+    current = first
+    while current <= last:
+        alignment = current & -current if current != 0 else 1 << 32
+        size = min(alignment, 1 << ((last - current + 1).bit_length() - 1))
+        blocks.append((current, 33 - size.bit_length()))
+        current = current + size
+    return blocks
@@ -1,5 +1,10 @@
+import codecs
+import hashlib
 import ipaddress
-from typing import Tuple, List
+import json
+import shutil
+import zlib
+from typing import Tuple, List, Iterable, Iterator, BinaryIO, Dict, Optional, Callable, Any
 from entities.SchemeUrl import SchemeUrl
 from entities.Url import Url
 import os
@@ -7,19 +12,25 @@ from pathlib import Path
 import requests
 import gzip
 from exceptions.FileWithExtensionNotFoundError import FileWithExtensionNotFoundError
-from static_variables import INPUT_FOLDER_NAME, IP_ASN_ARCHIVE_NAME
+from static_variables import INPUT_FOLDER_NAME, IP_ASN_ARCHIVE_NAME, IP_ASN_DATABASE_URL, IP_ASN_VALIDATORS_FILE_NAME, IP_ASN_DATABASE_REQUEST_TIMEOUT, LANDING_REQUEST_TIMEOUT
 from utils import file_utils
 
 
-def resolve_landing_page(url: Url, as_https=True) -> Tuple[SchemeUrl, List[str], bool, ipaddress.IPv4Address]:
+def resolve_landing_page(url: Url, as_https=True, read_body: Optional[Callable[[requests.Response], None]] = None, timeout: Tuple[float, float] = LANDING_REQUEST_TIMEOUT) -> Tuple[SchemeUrl, List[str], bool, ipaddress.IPv4Address]:
     """
     This method returns the landing page, the redirection path, the Strict Transport Security validity from an HTTP URL.
     In particular tries a GET HTTP method from the url parameter.
+    If a read_body function is given, the streamed response of the landing page is handed to it, so that the body can
+    be consumed as it is downloaded (e.g. by a html parser).
 
     :param url: An URL.
     :type url: Url
     :param as_https: A boolean setting if the url constructed from the domain name parameter uses HTTPS or HTTP.
     :type as_https: bool
+    :param read_body: The function that reads the body of the streamed response, or None not to read the body.
+    :type read_body: Optional[Callable[[requests.Response], None]]
+    :param timeout: The (connect, read) timeouts of every request, in seconds.
+    :type timeout: Tuple[float, float]
     :raise requests.exceptions.ConnectTimeout: The request timed out while trying to connect to the remote server.
     Requests that produced this error are safe to retry.
     :raise requests.exceptions.ConnectionError: A Connection error occurred. This occurs if https is not supported by
@@ -39,7 +50,7 @@ def resolve_landing_page(url: Url, as_https=True) -> Tuple[SchemeUrl, List[str],
     else:
         url_string = url.http().string
     try:
-        response = requests.get(url_string, headers={'Connection': 'close'}, stream=True)
+        response = requests.get(url_string, headers={'Connection': 'close'}, stream=True, timeout=timeout)
         # tmp = response.raw._connection.sock.getsockname()
         # tmp = response.raw._connection.sock.getpeername()
         tmp = response.raw._fp.fp.raw._sock.getpeername()
@@ -77,14 +88,24 @@ def resolve_landing_page(url: Url, as_https=True) -> Tuple[SchemeUrl, List[str],
         hsts = True
     else:
         hsts = False
+    if read_body is not None:
+        read_body(response)
     redirection_path.append(response.url)  # final page
     landing_url = SchemeUrl(response.url)
     return landing_url, redirection_path, hsts, ip
 
 
-def download_latest_tsv_database(project_root_directory=Path.cwd()) -> None:
+def download_tsv_database(parse_lines: Callable[[Iterator[str]], Any], project_root_directory=Path.cwd(), url=IP_ASN_DATABASE_URL, chunk_size=1 << 16, timeout: Tuple[float, float] = IP_ASN_DATABASE_REQUEST_TIMEOUT) -> Optional[Tuple[Any, bytes]]:
     """
-    Download the .tsv database from the site, extract it and finally delete the archive. Everything in the input folder.
+    Download the .tsv database from the site in the input folder. The .gz archive is never held in memory nor saved:
+    the HTTP body is streamed in chunks, every chunk is decompressed and written to the .tsv file and, at the same
+    time, its lines are handed to the parse_lines function, whose result is returned. Peak memory is what parse_lines
+    keeps, not the size of the file.
+    The request is conditional: the ETag and Last-Modified validators of the previous download (saved in a file next
+    to the .tsv) are sent back, so if the database didn't change the server answers 304 (Not Modified), nothing is
+    downloaded and the .tsv is left untouched.
+    The .tsv file is written aside and then renamed, so a failed download doesn't leave a truncated database: when
+    parse_lines is called the .tsv file is still the previous one.
     Path.cwd() returns the current working directory which depends upon the entry point of the application; in
     particular, if we start the application from the main.py file in the PRD, every time Path.cwd() is encountered
     (even in methods belonging to files that are in sub-folders with respect to PRD) then the actual PRD is
@@ -92,20 +113,142 @@ def download_latest_tsv_database(project_root_directory=Path.cwd()) -> None:
     return the entities sub-folder with respect to the PRD. So to give a bit of modularity, the PRD parameter is set
     to default as if the entry point is main.py file (which is the only entry point considered).
 
+    :param parse_lines: The function that consumes the lines of the .tsv database (without line terminator).
+    :type parse_lines: Callable[[Iterator[str]], Any]
     :param project_root_directory: The Path object pointing at the project root directory.
     :type project_root_directory: Path
+    :param url: The url of the .gz archive.
+    :type url: str
+    :param chunk_size: The size of the chunks read from the HTTP body.
+    :type chunk_size: int
+    :param timeout: The (connect, read) timeouts of the request, in seconds.
+    :type timeout: Tuple[float, float]
+    :raise requests.exceptions.RequestException: If the download fails.
+    :raise zlib.error: If the archive is not valid.
+    :raise OSError: If the .tsv file can't be written.
+    :return: A tuple containing the result of parse_lines and the SHA-256 digest of the .tsv file, or None if the
+    database was not modified.
+    :rtype: Optional[Tuple[Any, bytes]]
     """
-    url = 'https://iptoasn.com/data/ip2asn-v4.tsv.gz'
-    r = requests.get(url, allow_redirects=True)
-    with open(f"{str(project_root_directory)}{os.sep}{INPUT_FOLDER_NAME}{os.sep}{IP_ASN_ARCHIVE_NAME}", 'wb') as d:
-        d.write(r.content)
-        d.close()
-        extract_gz_archive(project_root_directory=project_root_directory)
+    file_archive_extracted_name = IP_ASN_ARCHIVE_NAME.replace('.gz', '')
+    filepath = f"{str(project_root_directory)}{os.sep}{INPUT_FOLDER_NAME}{os.sep}{file_archive_extracted_name}"
+    validators_filepath = f"{str(project_root_directory)}{os.sep}{INPUT_FOLDER_NAME}{os.sep}{IP_ASN_VALIDATORS_FILE_NAME}"
+    temporary_filepath = f"{filepath}.{os.getpid()}.tmp"
+    headers = dict()
+    if os.path.isfile(filepath):
+        validators = read_validators(validators_filepath)
+        if validators.get('url') == url:
+            if validators.get('etag') is not None:
+                headers['If-None-Match'] = validators['etag']
+            if validators.get('last_modified') is not None:
+                headers['If-Modified-Since'] = validators['last_modified']
+    sha256 = hashlib.sha256()
+    try:
+        with requests.get(url, allow_redirects=True, stream=True, headers=headers, timeout=timeout) as r:
+            if r.status_code == 304:
+                return None
+            r.raise_for_status()
+            with open(temporary_filepath, 'wb') as f:
+                result = parse_lines(decompress_gz_stream_lines(r.raw.stream(chunk_size, decode_content=False), f, sha256))
+            validators = {'url': url, 'etag': r.headers.get('ETag'), 'last_modified': r.headers.get('Last-Modified')}
+        os.replace(temporary_filepath, filepath)
+    except (requests.exceptions.RequestException, zlib.error, OSError):
+        try:
+            os.remove(temporary_filepath)
+        except OSError:
+            pass
+        raise
+    write_validators(validators_filepath, validators)
+    return result, sha256.digest()
+
+
+def read_validators(filepath: str) -> Dict[str, Optional[str]]:
+    """
+    Reads the HTTP validators (url, ETag and Last-Modified) of the last download.
+
+    :param filepath: The path of the validators file.
+    :type filepath: str
+    :return: The validators, or an empty dictionary if the file is absent or not valid.
+    :rtype: Dict[str, Optional[str]]
+    """
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            validators = json.load(f)
+    except (OSError, ValueError):
+        return dict()
+    if not isinstance(validators, dict):
+        return dict()
+    return validators
+
+
+def write_validators(filepath: str, validators: Dict[str, Optional[str]]) -> None:
+    """
+    Writes the HTTP validators (url, ETag and Last-Modified) of the last download. Errors are ignored: the next
+    download is just not conditional.
+
+    :param filepath: The path of the validators file.
+    :type filepath: str
+    :param validators: The validators.
+    :type validators: Dict[str, Optional[str]]
+    """
+    try:
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(validators, f)
+    except OSError:
+        pass
+
+
+def decompress_gz_stream_lines(chunks: Iterable[bytes], output: BinaryIO, sha256=None) -> Iterator[str]:
+    """
+    Decompresses a stream of .gz chunks, writing the decompressed bytes to a binary file (and updating the hash, if
+    any), and returns the decoded lines as soon as they are complete. Only one chunk at a time is kept in memory.
+
+    :param chunks: The chunks of the .gz archive.
+    :type chunks: Iterable[bytes]
+    :param output: The file where the decompressed bytes are written.
+    :type output: BinaryIO
+    :param sha256: The hash object updated with the decompressed bytes, or None.
+    :type sha256: hashlib._Hash or None
+    :raise zlib.error: If the archive is not valid.
+    :return: The lines, without line terminator.
+    :rtype: Iterator[str]
+    """
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)     # 16: gzip header and trailer
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    pending = ''
+    in_member = False
+
+    def consume(data: bytes, final=False) -> List[str]:
+        nonlocal pending
+        output.write(data)
+        if sha256 is not None:
+            sha256.update(data)
+        lines = (pending + decoder.decode(data, final=final)).split('\n')
+        pending = lines.pop()
+        return lines
+
+    for chunk in chunks:
+        while chunk:
+            in_member = True
+            data = decompressor.decompress(chunk)
+            if decompressor.eof:        # concatenated .gz members
+                chunk = decompressor.unused_data
+                data = data + decompressor.flush()
+                decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                in_member = False
+            else:
+                chunk = b''
+            yield from consume(data)
+    if in_member:
+        raise zlib.error('Truncated .gz archive')
+    yield from consume(decompressor.flush(), final=True)
+    if pending != '':
+        yield pending
 
 
 def extract_gz_archive(project_root_directory=Path.cwd()) -> None:
     """
-    Extract the first .gz archive found in the input folder.
+    Extract the first .gz archive found in the input folder, decompressing it in chunks.
     Then it deletes the archive.
     Path.cwd() returns the current working directory which depends upon the entry point of the application; in
     particular, if we start the application from the main.py file in the PRD, every time Path.cwd() is encountered
@@ -124,11 +267,7 @@ def extract_gz_archive(project_root_directory=Path.cwd()) -> None:
         raise
     archive = result[0]
     file = file_utils.set_file_in_folder(INPUT_FOLDER_NAME, file_archive_extracted_name, project_root_directory=project_root_directory)
-    file_content = None
     with gzip.open(f"{str(archive)}", 'rb') as ar:
-        file_content = ar.read()        # if content is very large, lots of RAM is occupied
-        ar.close()
-    with open(f"{str(file)}", 'wb') as f:
-        f.write(file_content)
-        f.close()
-        archive.unlink()
+        with open(f"{str(file)}", 'wb') as f:
+            shutil.copyfileobj(ar, f, 1 << 16)
+    archive.unlink()